@@ -241,6 +241,13 @@ class SystemStatusResponse(BaseModel):
     new_matches: int
     scheduler_running: bool
     scheduled_jobs: int
+    queue_depth: int = 0
+    batches_run: int = 0
+    last_batch_size: int = 0
+    last_batch_latency_seconds: Optional[float] = None
+    avg_batch_latency_seconds: Optional[float] = None
+    last_batch_scan: Optional[str] = None
+    agent_last_runs: Dict[str, Dict[str, Any]] = {}
 
 
 class ErrorResponse(BaseModel):
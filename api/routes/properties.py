@@ -4,7 +4,7 @@ Manual property search and market insights
 """
 
 from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
+from typing import Dict, List, Optional
 import logging
 
 from api.models.schemas import (
@@ -13,28 +13,33 @@ from api.models.schemas import (
     PropertyDetail,
     MarketInsightsResponse
 )
-from modules.ai_agent import AIPropertyAgent
-import os
+from modules.property_search import get_property_search
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# Initialize AI agent for property search functions
-_ai_agent = None
 
-
-def get_ai_agent() -> AIPropertyAgent:
-    """Get or create AI agent singleton"""
-    global _ai_agent
-    if _ai_agent is None:
-        api_key = os.getenv('ANTHROPIC_API_KEY')
-        if not api_key:
-            raise HTTPException(
-                status_code=500,
-                detail="ANTHROPIC_API_KEY not configured"
-            )
-        _ai_agent = AIPropertyAgent(api_key=api_key)
-    return _ai_agent
+def _property_detail(prop: Dict, address: str) -> PropertyDetail:
+    """Build a PropertyDetail response model from a scan property"""
+    return PropertyDetail(
+        address=address,
+        city=prop.get('city'),
+        state=prop.get('state'),
+        zip_code=prop.get('zip_code'),
+        price=prop.get('list_price'),
+        bedrooms=prop.get('bedrooms'),
+        bathrooms=prop.get('bathrooms'),
+        square_feet=prop.get('square_feet'),
+        year_built=prop.get('year_built'),
+        property_type=prop.get('property_type'),
+        opportunity_score=prop.get('opportunity_score'),
+        deal_quality=prop.get('deal_quality'),
+        days_on_market=prop.get('days_on_market'),
+        price_per_sqft=prop.get('price_per_sqft'),
+        tax_assessed_value=prop.get('tax_assessed_value'),
+        hoa_fee=prop.get('hoa_fee'),
+        listing_url=prop.get('listing_url')
+    )
 
 
 @router.post("/search", response_model=PropertySearchResponse)
@@ -46,8 +51,6 @@ async def search_properties(request: PropertySearchRequest):
     Useful for manual browsing or preview before creating agent.
     """
     try:
-        ai_agent = get_ai_agent()
-
         # Build filters dictionary
         filters = {}
 
@@ -57,46 +60,29 @@ async def search_properties(request: PropertySearchRequest):
             filters['max_price'] = request.price_max
         if request.city:
             filters['city'] = request.city
+        if request.zip_codes:
+            filters['zip_codes'] = request.zip_codes
         if request.bedrooms_min is not None:
             filters['bedrooms'] = request.bedrooms_min
+        if request.bathrooms_min is not None:
+            filters['bathrooms'] = request.bathrooms_min
         if request.min_score is not None:
             filters['min_score'] = request.min_score
+        if request.deal_quality:
+            filters['deal_quality'] = request.deal_quality
 
-        # Execute search using AI agent's tool
-        search_params = {
-            "query": f"Search properties",
-            "filters": filters,
-            "limit": request.limit,
-            "sort_by": request.sort_by
-        }
-
-        result = ai_agent._tool_search_properties(search_params)
+        # Served from indexes built once per scan version
+        result = get_property_search().get_index().search(
+            filters, limit=request.limit, sort_by=request.sort_by
+        )
 
-        # Convert to PropertyDetail models
         properties = [
-            PropertyDetail(
-                address=prop.get('address', ''),
-                city=prop.get('city'),
-                state=prop.get('state'),
-                zip_code=prop.get('zip_code'),
-                price=prop.get('price'),
-                bedrooms=prop.get('bedrooms'),
-                bathrooms=prop.get('bathrooms'),
-                square_feet=prop.get('sqft'),
-                year_built=prop.get('year_built'),
-                property_type=prop.get('property_type'),
-                opportunity_score=prop.get('score'),
-                deal_quality=prop.get('quality'),
-                days_on_market=prop.get('days_on_market'),
-                price_per_sqft=prop.get('price_per_sqft'),
-                hoa_fee=prop.get('hoa_fee'),
-                listing_url=prop.get('listing_url')
-            )
-            for prop in result.get('properties', [])
+            _property_detail(prop, f"{prop.get('street_address', 'Unknown')}, {prop.get('city', '')}")
+            for prop in result['properties']
         ]
 
         return PropertySearchResponse(
-            total_found=result.get('total_found', 0),
+            total_found=result['total_found'],
             returned=len(properties),
             properties=properties
         )
@@ -117,14 +103,7 @@ async def get_market_stats(
     or overall market.
     """
     try:
-        ai_agent = get_ai_agent()
-
-        # Get market insights using AI agent's tool
-        params = {}
-        if location:
-            params['location'] = location
-
-        result = ai_agent._tool_market_insights(params)
+        result = get_property_search().get_index().market_insights(location)
 
         return MarketInsightsResponse(
             location=result.get('location', 'All markets'),
@@ -147,38 +126,13 @@ async def get_property_details(property_address: str):
     Returns full property details with opportunity score and insights.
     """
     try:
-        ai_agent = get_ai_agent()
-
-        # Analyze property using AI agent's tool
-        params = {
-            "property_address": property_address,
-            "analysis_type": "full"
-        }
-
-        result = ai_agent._tool_analyze_property(params)
-
-        if 'error' in result:
-            raise HTTPException(status_code=404, detail=result['error'])
-
-        prop = result.get('property', {})
-
-        return PropertyDetail(
-            address=prop.get('address', ''),
-            city=prop.get('city'),
-            state=prop.get('state'),
-            zip_code=prop.get('zip_code'),
-            price=prop.get('price'),
-            bedrooms=prop.get('bedrooms'),
-            bathrooms=prop.get('bathrooms'),
-            square_feet=prop.get('sqft'),
-            year_built=prop.get('year_built'),
-            property_type=prop.get('property_type'),
-            opportunity_score=prop.get('score'),
-            deal_quality=prop.get('quality'),
-            days_on_market=prop.get('days_on_market'),
-            price_per_sqft=prop.get('price_per_sqft'),
-            tax_assessed_value=prop.get('tax_assessed'),
-            hoa_fee=prop.get('hoa_fee')
+        prop = get_property_search().get_index().find_by_address(property_address)
+
+        if not prop:
+            raise HTTPException(status_code=404, detail="Property not found")
+
+        return _property_detail(
+            prop, f"{prop.get('street_address')}, {prop.get('city')}, {prop.get('state')}"
         )
 
     except HTTPException:
@@ -0,0 +1,63 @@
+-- =====================================================
+-- DealFinder Pro Database Migration: 002
+-- Market Snapshots
+-- Version: 1.1
+-- Date: 2026-10-16
+-- =====================================================
+
+-- Migration Up
+-- =====================================================
+
+-- =====================================================
+-- TABLE: market_snapshots
+-- Daily per-ZIP market statistics, one row per
+-- (property_type, bedrooms) segment plus a ZIP-wide row
+-- (property_type '*', bedrooms -1). Today's rows are
+-- refreshed as properties are upserted; earlier days
+-- are kept as price history.
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS market_snapshots (
+    zip_code VARCHAR(10) NOT NULL,
+    property_type VARCHAR(50) NOT NULL,
+    bedrooms INTEGER NOT NULL,
+    snapshot_date DATE NOT NULL,
+
+    listing_count INTEGER NOT NULL,
+    avg_price DECIMAL(12,2),
+    median_price DECIMAL(12,2),
+    priced_count INTEGER NOT NULL DEFAULT 0,
+    avg_price_per_sqft DECIMAL(10,2),
+    median_price_per_sqft DECIMAL(10,2),
+    avg_days_on_market DECIMAL(8,2),
+    recent_count INTEGER NOT NULL DEFAULT 0,
+    recent_avg_price_per_sqft DECIMAL(10,2),
+    older_count INTEGER NOT NULL DEFAULT 0,
+    older_avg_price_per_sqft DECIMAL(10,2),
+
+    PRIMARY KEY (zip_code, property_type, bedrooms, snapshot_date)
+);
+
+-- Indexes for market_snapshots table
+CREATE INDEX IF NOT EXISTS idx_market_snapshots_date ON market_snapshots(snapshot_date);
+
+COMMENT ON TABLE market_snapshots IS 'Daily per-ZIP market statistics by property type and bedrooms';
+
+INSERT INTO schema_version (version, description)
+VALUES ('1.1', 'Add market_snapshots table')
+ON CONFLICT (version) DO NOTHING;
+
+-- Populate today's snapshots afterwards with:
+--   python main.py --refresh-market-snapshots
+
+-- =====================================================
+-- Migration Down (Rollback)
+-- =====================================================
+
+-- To rollback this migration, execute the following:
+-- DELETE FROM schema_version WHERE version = '1.1';
+-- DROP TABLE IF EXISTS market_snapshots;
+
+-- =====================================================
+-- END OF MIGRATION 002
+-- =====================================================
@@ -0,0 +1,34 @@
+-- =====================================================
+-- DealFinder Pro Database Migration: 003
+-- Buyer Do-Not-Disturb Flag
+-- Version: 1.2
+-- Date: 2026-10-16
+-- =====================================================
+
+-- Migration Up
+-- =====================================================
+
+-- GHL's do-not-disturb flag, so buyers read back from the
+-- buyers table pass the same SMS checks as live contacts
+ALTER TABLE buyers ADD COLUMN IF NOT EXISTS dnd BOOLEAN DEFAULT false;
+
+COMMENT ON COLUMN buyers.dnd IS 'GHL do-not-disturb flag';
+
+INSERT INTO schema_version (version, description)
+VALUES ('1.2', 'Add buyers.dnd')
+ON CONFLICT (version) DO NOTHING;
+
+-- Existing rows default to false; backfill them with a full buyer
+-- resync (SyncManager.sync_buyers_from_ghl(full_resync=True))
+
+-- =====================================================
+-- Migration Down (Rollback)
+-- =====================================================
+
+-- To rollback this migration, execute the following:
+-- DELETE FROM schema_version WHERE version = '1.2';
+-- ALTER TABLE buyers DROP COLUMN IF EXISTS dnd;
+
+-- =====================================================
+-- END OF MIGRATION 003
+-- =====================================================
@@ -1,8 +1,8 @@
 -- =====================================================
 -- DealFinder Pro Database Schema
 -- PostgreSQL 12+ Compatible
--- Version: 1.0
--- Last Updated: 2025-10-08
+-- Version: 1.1
+-- Last Updated: 2026-10-16
 -- =====================================================
 
 -- Enable UUID extension (optional for future use)
@@ -134,6 +134,7 @@ CREATE TABLE IF NOT EXISTS buyers (
     buyer_status VARCHAR(20) DEFAULT 'active',  -- active, passive, on_hold
     tags TEXT[],
     sms_opt_in BOOLEAN DEFAULT false,
+    dnd BOOLEAN DEFAULT false,   -- GHL do-not-disturb flag
 
     -- GHL Synchronization
     last_synced_at TIMESTAMP,
@@ -215,6 +216,39 @@ CREATE INDEX IF NOT EXISTS idx_sync_logs_sync_type ON sync_logs(sync_type);
 CREATE INDEX IF NOT EXISTS idx_sync_logs_status ON sync_logs(status);
 CREATE INDEX IF NOT EXISTS idx_sync_logs_started_at ON sync_logs(started_at DESC);
 
+-- =====================================================
+-- TABLE: market_snapshots
+-- Daily per-ZIP market statistics, one row per
+-- (property_type, bedrooms) segment plus a ZIP-wide row
+-- (property_type '*', bedrooms -1). Today's rows are
+-- refreshed as properties are upserted; earlier days
+-- are kept as price history.
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS market_snapshots (
+    zip_code VARCHAR(10) NOT NULL,
+    property_type VARCHAR(50) NOT NULL,
+    bedrooms INTEGER NOT NULL,
+    snapshot_date DATE NOT NULL,
+
+    listing_count INTEGER NOT NULL,
+    avg_price DECIMAL(12,2),
+    median_price DECIMAL(12,2),
+    priced_count INTEGER NOT NULL DEFAULT 0,
+    avg_price_per_sqft DECIMAL(10,2),
+    median_price_per_sqft DECIMAL(10,2),
+    avg_days_on_market DECIMAL(8,2),
+    recent_count INTEGER NOT NULL DEFAULT 0,
+    recent_avg_price_per_sqft DECIMAL(10,2),
+    older_count INTEGER NOT NULL DEFAULT 0,
+    older_avg_price_per_sqft DECIMAL(10,2),
+
+    PRIMARY KEY (zip_code, property_type, bedrooms, snapshot_date)
+);
+
+-- Indexes for market_snapshots table
+CREATE INDEX IF NOT EXISTS idx_market_snapshots_date ON market_snapshots(snapshot_date);
+
 -- =====================================================
 -- VIEWS
 -- Convenient views for common queries
@@ -364,6 +398,10 @@ INSERT INTO schema_version (version, description)
 VALUES ('1.0', 'Initial schema creation with properties, buyers, property_matches, and sync_logs tables')
 ON CONFLICT (version) DO NOTHING;
 
+INSERT INTO schema_version (version, description)
+VALUES ('1.1', 'Add market_snapshots table')
+ON CONFLICT (version) DO NOTHING;
+
 -- =====================================================
 -- COMMENTS
 -- Documentation for tables and columns
@@ -383,6 +421,8 @@ COMMENT ON COLUMN property_matches.match_score IS 'Match quality score from 0-10
 
 COMMENT ON TABLE sync_logs IS 'Tracks all data synchronization operations for monitoring and debugging';
 
+COMMENT ON TABLE market_snapshots IS 'Daily per-ZIP market statistics by property type and bedrooms';
+
 -- =====================================================
 -- END OF SCHEMA
 -- =====================================================
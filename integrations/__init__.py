@@ -2,7 +2,8 @@
 GoHighLevel Integration Module
 
 Provides complete API integration with GoHighLevel CRM including:
-- Rate-limited API connector
+- Rate-limited API connector (sync wrapper over an asyncio/httpx client)
+- Cross-process rate limit budget shared fairly between workloads
 - Workflow automation and opportunity management
 - Intelligent buyer-property matching
 - Automated notifications (SMS, Email, Workflows)
@@ -47,16 +48,26 @@ Usage:
 
 from .ghl_connector import (
     GoHighLevelConnector,
-    GHLRateLimiter,
     GHLAPIError
 )
+from .ghl_async_connector import (
+    AsyncGoHighLevelConnector,
+    AsyncGHLRateLimiter
+)
+from .ghl_shared_rate_limiter import (
+    SharedGHLRateLimiter,
+    get_shared_rate_limiter
+)
 from .ghl_workflows import GHLWorkflowManager
 from .ghl_buyer_matcher import BuyerMatcher
 
 __all__ = [
     'GoHighLevelConnector',
-    'GHLRateLimiter',
     'GHLAPIError',
+    'AsyncGoHighLevelConnector',
+    'AsyncGHLRateLimiter',
+    'SharedGHLRateLimiter',
+    'get_shared_rate_limiter',
     'GHLWorkflowManager',
     'BuyerMatcher'
 ]
@@ -222,13 +222,12 @@ def example_rate_limiter_demo(ghl):
         print("No GHL connection available")
         return
 
-    print(f"Current requests in window: {len(ghl.rate_limiter.requests)}")
     print(f"Remaining capacity: {ghl.rate_limiter.get_remaining_requests()}")
 
     # Simulate making requests
     print("\nSimulating 10 rapid requests...")
     for i in range(10):
-        ghl.rate_limiter.wait_if_needed()  # This will auto-throttle if needed
+        ghl.wait_for_rate_limit()  # This will auto-throttle if needed
         print(f"  Request {i+1} - Remaining: {ghl.rate_limiter.get_remaining_requests()}")
 
 
@@ -0,0 +1,818 @@
+"""
+GoHighLevel Async API Connector (v2 API)
+asyncio/httpx client with a persistent keep-alive connection pool, an async
+token-bucket rate limiter and concurrent fan-out.
+Base URL: https://services.leadconnectorhq.com
+"""
+
+import asyncio
+import math
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Dict, Iterable, List, Optional, Union
+import logging
+
+import httpx
+
+from integrations.ghl_shared_rate_limiter import get_shared_rate_limiter
+
+
+class GHLAPIError(Exception):
+    """Custom exception for GHL API errors"""
+
+    def __init__(self, message: str, status_code: int = None, response: Dict = None):
+        self.message = message
+        self.status_code = status_code
+        self.response = response
+        super().__init__(self.message)
+
+
+def parse_ghl_timestamp(value) -> Optional[datetime]:
+    """Parse an ISO timestamp from GHL (naive values are taken as UTC)"""
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, str) and value:
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    else:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+class AsyncGHLRateLimiter:
+    """Token bucket keeping async callers under the 100 requests/minute budget"""
+
+    def __init__(self, max_requests: int = 95, time_window: int = 60, burst: int = 5):
+        """
+        Initialize rate limiter
+
+        Tokens refill continuously at max_requests per time_window. With a
+        burst of 5, no 60 second window can exceed max_requests + burst.
+
+        Args:
+            max_requests: Sustained requests allowed per time window (default 95 to be safe)
+            time_window: Time window in seconds (default 60 for 1 minute)
+            burst: Maximum tokens that can accumulate while idle
+        """
+        self.max_requests = max_requests
+        self.time_window = time_window
+        self.rate = max_requests / time_window
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.last_refill = time.monotonic()
+        self.total_waits = 0
+        self.total_wait_seconds = 0.0
+        self.total_throttles = 0
+        self.total_backoff_seconds = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self.logger = logging.getLogger(__name__)
+
+    def _refill(self):
+        """Add tokens earned since the last refill"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    async def wait_if_needed(self):
+        """Wait until a request token is available, then take it"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        # The lock keeps waiters in FIFO order
+        async with self._lock:
+            self._refill()
+            if self.tokens < 1:
+                sleep_time = (1 - self.tokens) / self.rate
+                self.total_waits += 1
+                self.total_wait_seconds += sleep_time
+                self.logger.debug(f"Rate limit reached. Sleeping for {sleep_time:.2f} seconds")
+                await asyncio.sleep(sleep_time)
+                self._refill()
+            self.tokens -= 1
+
+    async def backoff(self, retry_after: float):
+        """
+        Record a 429 and wait out Retry-After
+
+        The bucket goes into debt by retry_after seconds of tokens, so requests
+        queued behind this one wait out the back-off too.
+
+        Args:
+            retry_after: Seconds from the Retry-After header
+        """
+        self.total_throttles += 1
+        self.total_backoff_seconds += retry_after
+        self._refill()
+        self.tokens = min(self.tokens, 0) - retry_after * self.rate
+        await asyncio.sleep(retry_after)
+
+    def get_remaining_requests(self) -> int:
+        """Get number of requests that can be sent right now without waiting"""
+        self._refill()
+        return max(0, int(self.tokens))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Wait and 429 back-off statistics"""
+        return {
+            'waits': self.total_waits,
+            'wait_seconds': round(self.total_wait_seconds, 3),
+            'throttled': self.total_throttles,
+            'backoff_seconds': round(self.total_backoff_seconds, 3)
+        }
+
+
+class AsyncGoHighLevelConnector:
+    """Async GHL API client sharing one pooled HTTP connection set"""
+
+    def __init__(self, api_key: str, location_id: str, test_mode: bool = False,
+                 max_connections: int = 10, rate_limiter: Optional[AsyncGHLRateLimiter] = None,
+                 caller: Optional[str] = None):
+        """
+        Initialize async GHL connector (v2 API)
+
+        Args:
+            api_key: GHL API key (Private Integration Token - PIT)
+            location_id: GHL location ID
+            test_mode: If True, log actions but don't make actual API calls
+            max_connections: Size of the keep-alive connection pool and fan-out limit
+            rate_limiter: Limiter to use (overrides caller)
+            caller: Workload name (e.g. 'workflow', 'chat'); draws from the
+                cross-process budget shared by every connector for this location.
+                Without one, the connector gets its own in-memory AsyncGHLRateLimiter.
+        """
+        self.api_key = api_key
+        self.location_id = location_id
+        self.base_url = "https://services.leadconnectorhq.com"
+        self.headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+            "Version": "2021-07-28"
+        }
+        if rate_limiter is None:
+            rate_limiter = get_shared_rate_limiter(location_id, caller) if caller else AsyncGHLRateLimiter()
+        self.rate_limiter = rate_limiter
+        self.test_mode = test_mode
+        self.max_connections = max_connections
+        self.logger = logging.getLogger(__name__)
+        self._client: Optional[httpx.AsyncClient] = None
+
+        if test_mode:
+            self.logger.info("GHL Async Connector initialized in TEST MODE - no actual API calls will be made")
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Keep-alive HTTP client, created on first use inside the event loop"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.headers,
+                timeout=30,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                )
+            )
+        return self._client
+
+    async def aclose(self):
+        """Close pooled connections"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+
+    async def __aenter__(self) -> 'AsyncGoHighLevelConnector':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def _request(self, method: str, endpoint: str, retry_count: int = 3, **kwargs) -> Dict:
+        """
+        Make HTTP request with rate limiting and error handling
+
+        Args:
+            method: HTTP method (GET, POST, PUT, DELETE)
+            endpoint: API endpoint (without base URL)
+            retry_count: Number of retries for server errors
+            **kwargs: Additional arguments for httpx (params, json)
+
+        Returns:
+            Response data as dictionary
+
+        Raises:
+            GHLAPIError: For API errors
+        """
+        url = f"{self.base_url}{endpoint}"
+
+        # Test mode - log and return mock response
+        if self.test_mode:
+            self.logger.info(f"[TEST MODE] {method} {url}")
+            self.logger.debug(f"[TEST MODE] Data: {kwargs.get('json', {})}")
+            return {"test_mode": True, "message": "No actual API call made"}
+
+        for attempt in range(retry_count):
+            # Every attempt, retries included, spends a rate limiter token
+            await self.rate_limiter.wait_if_needed()
+
+            try:
+                self.logger.debug(f"API Request: {method} {url} (attempt {attempt + 1}/{retry_count})")
+
+                response = await self.client.request(method, endpoint, **kwargs)
+
+                # Handle specific status codes
+                if response.status_code == 401:
+                    raise GHLAPIError(
+                        "Authentication failed - invalid API key",
+                        status_code=401,
+                        response=response.json() if response.text else {}
+                    )
+
+                if response.status_code == 429:
+                    # Rate limit exceeded - back off for Retry-After before the next attempt
+                    retry_after = float(response.headers.get('Retry-After', 60))
+                    self.logger.warning(f"Rate limit exceeded. Waiting {retry_after:g} seconds")
+                    await self.rate_limiter.backoff(retry_after)
+                    continue
+
+                if response.status_code == 404:
+                    raise GHLAPIError(
+                        f"Resource not found: {endpoint}",
+                        status_code=404,
+                        response=response.json() if response.text else {}
+                    )
+
+                if response.status_code >= 500:
+                    # Server error - retry
+                    if attempt < retry_count - 1:
+                        wait_time = (2 ** attempt) * 1  # Exponential backoff: 1s, 2s, 4s
+                        self.logger.warning(f"Server error {response.status_code}. Retrying in {wait_time}s")
+                        await asyncio.sleep(wait_time)
+                        continue
+                    else:
+                        raise GHLAPIError(
+                            f"Server error after {retry_count} attempts",
+                            status_code=response.status_code,
+                            response=response.json() if response.text else {}
+                        )
+
+                # Check for success
+                if response.status_code >= 400:
+                    raise GHLAPIError(
+                        f"API error: {response.status_code}",
+                        status_code=response.status_code,
+                        response=response.json() if response.text else {}
+                    )
+
+                # Success
+                result = response.json() if response.text else {}
+                self.logger.debug(f"API Response: {response.status_code}")
+                return result
+
+            except httpx.HTTPError as e:
+                if attempt < retry_count - 1:
+                    wait_time = (2 ** attempt) * 1
+                    self.logger.warning(f"Request exception: {e}. Retrying in {wait_time}s")
+                    await asyncio.sleep(wait_time)
+                    continue
+                else:
+                    raise GHLAPIError(f"Request failed after {retry_count} attempts: {str(e)}")
+
+        raise GHLAPIError(f"Request failed after {retry_count} attempts")
+
+    async def gather(self, calls: Iterable[Awaitable], return_exceptions: bool = True) -> List[Any]:
+        """
+        Run many API calls concurrently, at most max_connections at a time
+
+        Args:
+            calls: Awaitables such as connector.send_sms(...) coroutines
+            return_exceptions: Return errors in place of results instead of raising
+
+        Returns:
+            Results in the same order as calls
+        """
+        semaphore = asyncio.Semaphore(self.max_connections)
+
+        async def bounded(call):
+            async with semaphore:
+                return await call
+
+        return await asyncio.gather(*(bounded(call) for call in calls),
+                                    return_exceptions=return_exceptions)
+
+    async def test_connection(self) -> bool:
+        """
+        Validate API key and connection (v2 API)
+
+        Returns:
+            True if connection is valid
+        """
+        try:
+            if self.test_mode:
+                self.logger.info("[TEST MODE] Connection test - simulated success")
+                return True
+
+            # Test by getting location details
+            await self._request("GET", f"/locations/{self.location_id}")
+            self.logger.info("GHL v2 connection test successful")
+            return True
+        except GHLAPIError as e:
+            self.logger.error(f"GHL connection test failed: {e.message}")
+            return False
+
+    # CONTACT MANAGEMENT
+
+    async def get_contacts(self, filters: Dict = None, limit: int = 100, offset: int = 0) -> List[Dict]:
+        """
+        Get contacts with optional filters
+
+        Args:
+            filters: Query parameters for filtering
+            limit: Maximum number of results (default 100)
+            offset: Pagination offset
+
+        Returns:
+            List of contact dictionaries
+        """
+        params = {
+            "locationId": self.location_id,
+            "limit": limit,
+            "skip": offset
+        }
+
+        if filters:
+            params.update(filters)
+
+        response = await self._request("GET", "/contacts/", params=params)
+        return response.get("contacts", [])
+
+    async def search_contacts(self, tags: List[str] = None, custom_fields: Dict = None,
+                              updated_since: Optional[Union[datetime, str]] = None,
+                              page_size: int = 100) -> List[Dict]:
+        """
+        Advanced contact search by tags and custom fields
+
+        Filters are sent to the v2 search endpoint, which returns the total
+        match count with the first page; the remaining pages are fetched
+        concurrently (bounded by max_connections and the rate limiter).
+        Locations without the search endpoint fall back to paging through
+        /contacts/ and filtering client-side.
+
+        Args:
+            tags: List of tags to filter by (a contact needs any one of them)
+            custom_fields: Dictionary of custom field key-value pairs
+            updated_since: Only contacts updated at or after this time
+            page_size: Contacts per page (default 100)
+
+        Returns:
+            List of matching contacts, oldest update first
+        """
+        if isinstance(updated_since, datetime):
+            updated_since = updated_since.isoformat()
+
+        try:
+            contacts = await self._search_contacts_v2(tags, custom_fields, updated_since, page_size)
+        except GHLAPIError as e:
+            if e.status_code not in (400, 404, 422):
+                raise
+            self.logger.warning(f"Contact search endpoint unavailable ({e.status_code}), "
+                                f"listing contacts instead")
+            contacts = await self._list_all_contacts(page_size)
+
+        # Re-check every filter locally; the server only narrows the pages
+        return [contact for contact in contacts
+                if self._contact_matches(contact, tags, custom_fields, updated_since)]
+
+    @staticmethod
+    def _contact_search_filters(tags: Optional[List[str]], custom_fields: Optional[Dict],
+                                updated_since: Optional[str]) -> List[Dict]:
+        """Build v2 search filters for tags (any of), custom fields and update time"""
+        filters = []
+
+        if tags:
+            tag_filters = [{"field": "tags", "operator": "contains", "value": tag} for tag in tags]
+            filters.append(tag_filters[0] if len(tag_filters) == 1
+                           else {"group": "OR", "filters": tag_filters})
+
+        for key, value in (custom_fields or {}).items():
+            filters.append({"field": f"customFields.{key}", "operator": "eq", "value": value})
+
+        if updated_since:
+            filters.append({"field": "dateUpdated", "operator": "range",
+                            "value": {"gte": updated_since}})
+
+        return filters
+
+    async def _search_contacts_v2(self, tags: Optional[List[str]], custom_fields: Optional[Dict],
+                                  updated_since: Optional[str], page_size: int) -> List[Dict]:
+        """Fetch every page of a v2 contact search"""
+        body = {
+            "locationId": self.location_id,
+            "pageLimit": page_size,
+            "filters": self._contact_search_filters(tags, custom_fields, updated_since),
+            "sort": [{"field": "dateUpdated", "direction": "asc"}]
+        }
+
+        first = await self._request("POST", "/contacts/search", json={**body, "page": 1})
+        contacts = list(first.get("contacts", []))
+        total = first.get("total") or len(contacts)
+        pages = math.ceil(total / page_size) if page_size else 1
+
+        if pages > 1:
+            responses = await self.gather(
+                [self._request("POST", "/contacts/search", json={**body, "page": page})
+                 for page in range(2, pages + 1)],
+                return_exceptions=False
+            )
+            for response in responses:
+                contacts.extend(response.get("contacts", []))
+
+        # Pages can overlap if contacts change while we read
+        unique = {}
+        for contact in contacts:
+            unique.setdefault(contact.get("id"), contact)
+
+        self.logger.debug(f"Contact search returned {len(unique)} of {total} contacts in {pages} pages")
+        return list(unique.values())
+
+    async def _list_all_contacts(self, page_size: int) -> List[Dict]:
+        """Page through /contacts/ until a short page"""
+        all_contacts = []
+        offset = 0
+
+        while True:
+            contacts = await self.get_contacts(limit=page_size, offset=offset)
+            all_contacts.extend(contacts)
+
+            # Decide on the unfiltered page size: a full page means there may be more
+            if len(contacts) < page_size:
+                break
+
+            offset += page_size
+
+        return all_contacts
+
+    @staticmethod
+    def _contact_matches(contact: Dict, tags: Optional[List[str]], custom_fields: Optional[Dict],
+                         updated_since: Optional[str]) -> bool:
+        """True if a contact passes the tag, custom field and update time filters"""
+        if tags and not any(tag in contact.get("tags", []) for tag in tags):
+            return False
+
+        if custom_fields:
+            contact_custom_fields = contact.get("customFields") or {}
+            if not all(contact_custom_fields.get(key) == value
+                       for key, value in custom_fields.items()):
+                return False
+
+        if updated_since:
+            updated = parse_ghl_timestamp(contact.get("dateUpdated"))
+            since = parse_ghl_timestamp(updated_since)
+            if updated is not None and since is not None and updated < since:
+                return False
+
+        return True
+
+    async def create_contact(self, contact_data: Dict) -> Dict:
+        """
+        Create new contact
+
+        Args:
+            contact_data: Contact information (firstName, lastName, email, phone, etc.)
+
+        Returns:
+            Created contact with ID
+        """
+        contact_data["locationId"] = self.location_id
+        response = await self._request("POST", "/contacts/", json=contact_data)
+        return response.get("contact", response)
+
+    async def update_contact(self, contact_id: str, updates: Dict) -> Dict:
+        """
+        Update existing contact
+
+        Args:
+            contact_id: GHL contact ID
+            updates: Fields to update
+
+        Returns:
+            Updated contact data
+        """
+        response = await self._request("PUT", f"/contacts/{contact_id}", json=updates)
+        return response.get("contact", response)
+
+    async def add_contact_tags(self, contact_id: str, tags: List[str]) -> bool:
+        """
+        Add tags to contact
+
+        Args:
+            contact_id: GHL contact ID
+            tags: List of tag names
+
+        Returns:
+            True if successful
+        """
+        try:
+            await self._request("POST", f"/contacts/{contact_id}/tags", json={"tags": tags})
+            return True
+        except GHLAPIError:
+            return False
+
+    async def update_custom_field(self, contact_id: str, field_key: str, value: Any) -> bool:
+        """
+        Update single custom field for contact
+
+        Args:
+            contact_id: GHL contact ID
+            field_key: Custom field key
+            value: New value
+
+        Returns:
+            True if successful
+        """
+        try:
+            await self.update_contact(contact_id, {
+                "customFields": {field_key: value}
+            })
+            return True
+        except GHLAPIError:
+            return False
+
+    async def get_contact_by_email(self, email: str) -> Optional[Dict]:
+        """
+        Search for contact by email address
+
+        Args:
+            email: Email address
+
+        Returns:
+            Contact dictionary or None if not found
+        """
+        contacts = await self.get_contacts(filters={"email": email}, limit=1)
+        return contacts[0] if contacts else None
+
+    # OPPORTUNITY MANAGEMENT
+
+    async def create_opportunity(self, opportunity_data: Dict) -> Dict:
+        """
+        Create new opportunity (v2 API)
+
+        Args:
+            opportunity_data: Must include pipelineId, name, pipelineStageId, contactId
+                Optional: monetaryValue, status, assignedTo, customFields
+
+        Returns:
+            Created opportunity with ID
+        """
+        opportunity_data["locationId"] = self.location_id
+        response = await self._request("POST", "/opportunities/", json=opportunity_data)
+        return response.get("opportunity", response)
+
+    async def update_opportunity(self, opportunity_id: str, updates: Dict) -> Dict:
+        """
+        Update existing opportunity
+
+        Args:
+            opportunity_id: GHL opportunity ID
+            updates: Fields to update
+
+        Returns:
+            Updated opportunity data
+        """
+        response = await self._request("PUT", f"/opportunities/{opportunity_id}", json=updates)
+        return response.get("opportunity", response)
+
+    async def move_opportunity_stage(self, opportunity_id: str, stage_id: str) -> bool:
+        """
+        Move opportunity to different pipeline stage
+
+        Args:
+            opportunity_id: GHL opportunity ID
+            stage_id: Target pipeline stage ID
+
+        Returns:
+            True if successful
+        """
+        try:
+            await self.update_opportunity(opportunity_id, {"pipelineStageId": stage_id})
+            return True
+        except GHLAPIError:
+            return False
+
+    async def get_opportunity(self, opportunity_id: str) -> Dict:
+        """
+        Get opportunity by ID
+
+        Args:
+            opportunity_id: GHL opportunity ID
+
+        Returns:
+            Opportunity data
+        """
+        response = await self._request("GET", f"/opportunities/{opportunity_id}")
+        return response.get("opportunity", response)
+
+    async def get_pipeline_stages(self, pipeline_id: str) -> List[Dict]:
+        """
+        Get all stages for a pipeline
+
+        Args:
+            pipeline_id: GHL pipeline ID
+
+        Returns:
+            List of stage dictionaries
+        """
+        response = await self._request("GET", f"/opportunities/pipelines/{pipeline_id}")
+        pipeline = response.get("pipeline", response)
+        return pipeline.get("stages", [])
+
+    async def assign_opportunity(self, opportunity_id: str, user_id: str) -> bool:
+        """
+        Assign opportunity to team member
+
+        Args:
+            opportunity_id: GHL opportunity ID
+            user_id: GHL user ID
+
+        Returns:
+            True if successful
+        """
+        try:
+            await self.update_opportunity(opportunity_id, {"assignedTo": user_id})
+            return True
+        except GHLAPIError:
+            return False
+
+    # TASK MANAGEMENT
+
+    async def create_task(self, task_data: Dict) -> Dict:
+        """
+        Create new task
+
+        Args:
+            task_data: Task fields (title, description, assignedTo, dueDate, priority, relatedTo)
+
+        Returns:
+            Created task with ID
+        """
+        response = await self._request("POST", "/tasks/", json=task_data)
+        return response.get("task", response)
+
+    async def update_task(self, task_id: str, updates: Dict) -> Dict:
+        """
+        Update existing task
+
+        Args:
+            task_id: GHL task ID
+            updates: Fields to update
+
+        Returns:
+            Updated task data
+        """
+        response = await self._request("PUT", f"/tasks/{task_id}", json=updates)
+        return response.get("task", response)
+
+    async def complete_task(self, task_id: str) -> bool:
+        """
+        Mark task as complete
+
+        Args:
+            task_id: GHL task ID
+
+        Returns:
+            True if successful
+        """
+        try:
+            await self.update_task(task_id, {"completed": True, "status": "completed"})
+            return True
+        except GHLAPIError:
+            return False
+
+    # WORKFLOW TRIGGERS
+
+    async def trigger_workflow(self, workflow_id: str, contact_id: str, custom_data: Dict = None) -> bool:
+        """
+        Trigger workflow for contact with custom data
+
+        Args:
+            workflow_id: GHL workflow ID
+            contact_id: GHL contact ID
+            custom_data: Custom data to pass to workflow
+
+        Returns:
+            True if successful
+        """
+        try:
+            payload = {
+                "contactId": contact_id
+            }
+            if custom_data:
+                payload["customData"] = custom_data
+
+            await self._request("POST", f"/workflows/{workflow_id}/subscribe", json=payload)
+            return True
+        except GHLAPIError as e:
+            self.logger.error(f"Failed to trigger workflow: {e.message}")
+            return False
+
+    async def add_to_workflow(self, contact_id: str, workflow_id: str) -> bool:
+        """
+        Enroll contact in workflow
+
+        Args:
+            contact_id: GHL contact ID
+            workflow_id: GHL workflow ID
+
+        Returns:
+            True if successful
+        """
+        return await self.trigger_workflow(workflow_id, contact_id)
+
+    # COMMUNICATION
+
+    async def send_sms(self, contact_id: str, message: str) -> Dict:
+        """
+        Send SMS message to contact
+
+        Args:
+            contact_id: GHL contact ID
+            message: SMS message text
+
+        Returns:
+            Message data
+        """
+        payload = {
+            "type": "SMS",
+            "contactId": contact_id,
+            "message": message
+        }
+        return await self._request("POST", "/conversations/messages", json=payload)
+
+    async def send_email(self, contact_id: str, subject: str, html_body: str) -> Dict:
+        """
+        Send email to contact
+
+        Args:
+            contact_id: GHL contact ID
+            subject: Email subject
+            html_body: HTML email body
+
+        Returns:
+            Message data
+        """
+        payload = {
+            "type": "Email",
+            "contactId": contact_id,
+            "subject": subject,
+            "html": html_body
+        }
+        return await self._request("POST", "/conversations/messages", json=payload)
+
+    async def add_note(self, contact_id: str, note_text: str) -> Dict:
+        """
+        Add note to contact
+
+        Args:
+            contact_id: GHL contact ID
+            note_text: Note content
+
+        Returns:
+            Note data
+        """
+        payload = {
+            "body": note_text
+        }
+        return await self._request("POST", f"/contacts/{contact_id}/notes", json=payload)
+
+    # CUSTOM FIELDS
+
+    async def get_custom_fields(self) -> List[Dict]:
+        """
+        Get all custom field definitions for location
+
+        Returns:
+            List of custom field definitions
+        """
+        params = {"locationId": self.location_id}
+        response = await self._request("GET", "/custom-fields/", params=params)
+        return response.get("customFields", [])
+
+    async def validate_custom_field_exists(self, field_key: str, field_type: str = 'contact') -> bool:
+        """
+        Check if custom field exists in GHL
+
+        Args:
+            field_key: Custom field key to validate
+            field_type: 'contact' or 'opportunity'
+
+        Returns:
+            True if field exists
+        """
+        try:
+            custom_fields = await self.get_custom_fields()
+            for field in custom_fields:
+                if field.get("key") == field_key and field.get("model") == field_type:
+                    return True
+            return False
+        except GHLAPIError:
+            return False
@@ -0,0 +1,351 @@
+"""
+GoHighLevel Buyer Index
+Parses buyer preferences once and indexes them for property matching.
+
+Indexes built per buyer list:
+- Location token -> buyers (a property looks up every substring of its
+  city and ZIP, matching the substring test BuyerMatcher has always used)
+- Property type token -> buyers (resolved once per distinct property type)
+- Budget ceilings (budget_max + 10%) sorted for bisection
+
+For a property, only buyers whose location/type/budget classes can still
+reach min_score are scored; everyone else is skipped without being touched.
+"""
+
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+import json
+import threading
+
+# Points per match component (see BuyerProfile.score)
+BUDGET_POINTS = 40
+LOCATION_POINTS = {'match': 30, 'none': 15}
+TYPE_POINTS = {'match': 20, 'none': 10}
+BEDROOM_POINTS = 10
+
+
+def _to_float(value, default: float) -> float:
+    """Parse a numeric preference, using default when blank or invalid"""
+    try:
+        return float(value) if value else default
+    except (ValueError, TypeError):
+        return default
+
+
+def _to_int(value) -> int:
+    """Parse an integer preference (0 when blank or invalid)"""
+    try:
+        return int(value) if value else 0
+    except (ValueError, TypeError):
+        return int(_to_float(value, 0))
+
+
+def _preference_tokens(value) -> List[str]:
+    """Split a comma-separated (or list) preference into lowercase tokens"""
+    if isinstance(value, (list, tuple)):
+        value = ", ".join(str(v) for v in value)
+    value = str(value or "").lower()
+    return [token.strip() for token in value.split(",")] if value else []
+
+
+class BuyerProfile:
+    """A buyer's preferences parsed into typed fields"""
+
+    __slots__ = ('buyer', 'budget_min', 'budget_max', 'locations', 'property_types', 'min_bedrooms')
+
+    def __init__(self, buyer: Dict):
+        """
+        Parse preferences from a GHL contact's custom fields
+
+        Args:
+            buyer: Buyer contact dictionary
+        """
+        custom_fields = buyer.get("customFields") or {}
+        self.buyer = buyer
+        self.budget_min = _to_float(custom_fields.get("budget_min"), 0)
+        self.budget_max = _to_float(custom_fields.get("budget_max"), float('inf'))
+        self.locations = _preference_tokens(custom_fields.get("location_preference"))
+        self.property_types = _preference_tokens(custom_fields.get("property_type_preference"))
+        self.min_bedrooms = _to_int(custom_fields.get("min_bedrooms"))
+
+    def score(self, property_data: Dict) -> Tuple[int, List[str]]:
+        """
+        Calculate 0-100 match score between a property and this buyer
+
+        Args:
+            property_data: Property information
+
+        Returns:
+            Tuple of (score, list of match reasons)
+        """
+        score = 0
+        reasons = []
+
+        property_price = property_data.get("list_price") or 0
+        property_city = str(property_data.get("city") or "").lower()
+        property_zip = str(property_data.get("zip_code") or "")
+        property_type = str(property_data.get("property_type") or "").lower()
+        property_bedrooms = property_data.get("bedrooms") or 0
+
+        # 1. Budget Match (40 points)
+        if self.budget_min <= property_price <= self.budget_max:
+            score += BUDGET_POINTS
+            reasons.append(f"Price ${property_price:,.0f} within budget "
+                           f"(${self.budget_min:,.0f}-${self.budget_max:,.0f})")
+        elif property_price < self.budget_min:
+            # Still give partial points if property is cheaper
+            score += 30
+            reasons.append(f"Price ${property_price:,.0f} below budget")
+        elif property_price <= self.budget_max * 1.1:
+            # Partial points if slightly over budget (within 10%)
+            score += 20
+            reasons.append(f"Price ${property_price:,.0f} slightly above budget")
+
+        # 2. Location Match (30 points)
+        if self.locations:
+            for pref_loc in self.locations:
+                if pref_loc in property_city or pref_loc in property_zip:
+                    score += LOCATION_POINTS['match']
+                    reasons.append(f"Location match: {pref_loc}")
+                    break
+        else:
+            # No preference specified - give neutral score
+            score += LOCATION_POINTS['none']
+
+        # 3. Property Type Match (20 points)
+        if self.property_types:
+            for pref_type in self.property_types:
+                if pref_type in property_type or property_type in pref_type:
+                    score += TYPE_POINTS['match']
+                    reasons.append(f"Property type match: {property_type}")
+                    break
+        else:
+            # No preference - neutral score
+            score += TYPE_POINTS['none']
+
+        # 4. Bedrooms Match (10 points)
+        if property_bedrooms >= self.min_bedrooms:
+            score += BEDROOM_POINTS
+            reasons.append(f"{property_bedrooms} bedrooms meets requirement ({self.min_bedrooms}+)")
+        elif self.min_bedrooms == 0:
+            # No requirement specified
+            score += 5
+
+        return min(100, max(0, score)), reasons
+
+
+class BuyerIndex:
+    """Immutable preference indexes over one list of active buyers"""
+
+    def __init__(self, buyers: List[Dict]):
+        """
+        Parse and index buyers
+
+        Args:
+            buyers: Buyer contact dictionaries
+        """
+        self.buyers = buyers
+        self.profiles = [BuyerProfile(buyer) for buyer in buyers]
+
+        self.location_rows: Dict[str, Set[int]] = {}
+        self.no_location_rows: Set[int] = set()
+        self.type_rows: Dict[str, Set[int]] = {}
+        self.no_type_rows: Set[int] = set()
+
+        for row, profile in enumerate(self.profiles):
+            if profile.locations:
+                for token in profile.locations:
+                    self.location_rows.setdefault(token, set()).add(row)
+            else:
+                self.no_location_rows.add(row)
+
+            if profile.property_types:
+                for token in profile.property_types:
+                    self.type_rows.setdefault(token, set()).add(row)
+            else:
+                self.no_type_rows.add(row)
+
+        # Buyers sorted by the highest price that still earns budget points
+        ceilings = sorted((profile.budget_max * 1.1, row) for row, profile in enumerate(self.profiles))
+        self.budget_ceilings = [ceiling for ceiling, _ in ceilings]
+        self.budget_ceiling_rows = [row for _, row in ceilings]
+
+        self._type_cache: Dict[str, Set[int]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.buyers)
+
+    def _location_matches(self, property_data: Dict) -> Set[int]:
+        """Buyers with a location token contained in the property's city or ZIP"""
+        rows: Set[int] = set()
+        for text in (str(property_data.get("city") or "").lower(),
+                     str(property_data.get("zip_code") or "")):
+            substrings = {text[i:j] for i in range(len(text)) for j in range(i + 1, len(text) + 1)}
+            substrings.add("")
+            for substring in substrings:
+                matched = self.location_rows.get(substring)
+                if matched:
+                    rows |= matched
+        return rows
+
+    def _type_matches(self, property_data: Dict) -> Set[int]:
+        """Buyers with a type token contained in (or containing) the property type"""
+        property_type = str(property_data.get("property_type") or "").lower()
+        with self._lock:
+            rows = self._type_cache.get(property_type)
+            if rows is None:
+                rows = set()
+                for token, token_rows in self.type_rows.items():
+                    if token in property_type or property_type in token:
+                        rows |= token_rows
+                self._type_cache[property_type] = rows
+        return rows
+
+    def candidate_rows(self, property_data: Dict, min_score: int) -> List[int]:
+        """
+        Buyers that could score at least min_score for a property
+
+        Args:
+            property_data: Property information
+            min_score: Minimum match score
+
+        Returns:
+            Buyer rows in original order
+        """
+        location_classes = [(LOCATION_POINTS['match'], self._location_matches(property_data)),
+                            (LOCATION_POINTS['none'], self.no_location_rows),
+                            (0, None)]
+        type_classes = [(TYPE_POINTS['match'], self._type_matches(property_data)),
+                        (TYPE_POINTS['none'], self.no_type_rows),
+                        (0, None)]
+
+        # Collect buyers from every (location, type) class pair that can
+        # still reach min_score with full budget and bedroom points
+        rows: Optional[Set[int]] = set()
+        for location_points, location_rows in location_classes:
+            for type_points, type_rows in type_classes:
+                if BUDGET_POINTS + location_points + type_points + BEDROOM_POINTS < min_score:
+                    continue
+                if location_rows is None and type_rows is None:
+                    rows = None
+                    break
+                if location_rows is None or type_rows is None:
+                    rows |= location_rows if type_rows is None else type_rows
+                else:
+                    rows |= location_rows & type_rows
+            if rows is None:
+                break
+
+        # Buyers priced out by more than 10% earn no budget points
+        price = property_data.get("list_price") or 0
+        needs_budget = max(LOCATION_POINTS.values()) + max(TYPE_POINTS.values()) + BEDROOM_POINTS < min_score
+        if rows is None:
+            if needs_budget:
+                return sorted(self.budget_ceiling_rows[bisect_left(self.budget_ceilings, price):])
+            return list(range(len(self.buyers)))
+
+        if needs_budget:
+            rows = {row for row in rows if price <= self.profiles[row].budget_max * 1.1}
+        return sorted(rows)
+
+    def match(self, property_data: Dict, min_score: int) -> List[Tuple[Dict, int, List[str]]]:
+        """
+        Score candidate buyers for a property
+
+        Args:
+            property_data: Property information
+            min_score: Minimum match score to include
+
+        Returns:
+            (buyer, score, reasons) for each buyer scoring at least min_score,
+            in original buyer order
+        """
+        matches = []
+        for row in self.candidate_rows(property_data, min_score):
+            score, reasons = self.profiles[row].score(property_data)
+            if score >= min_score:
+                matches.append((self.buyers[row], score, reasons))
+        return matches
+
+
+def _list_field(value) -> List[str]:
+    """Array column value (PostgreSQL list, or JSON/comma text elsewhere)"""
+    if isinstance(value, (list, tuple)):
+        return [str(v) for v in value]
+    if isinstance(value, str) and value:
+        try:
+            parsed = json.loads(value)
+            if isinstance(parsed, list):
+                return [str(v) for v in parsed]
+        except ValueError:
+            pass
+        return [item.strip() for item in value.strip('{}').split(',') if item.strip()]
+    return []
+
+
+def buyer_row_from_contact(contact: Dict) -> Dict:
+    """
+    Map a GHL contact to a buyers table row
+
+    Args:
+        contact: GHL contact dictionary
+
+    Returns:
+        Buyer data dictionary for DatabaseManager.upsert_buyer
+    """
+    custom_fields = contact.get('customFields') or {}
+    tags = contact.get('tags', [])
+    budget_min = _to_float(custom_fields.get('budget_min'), 0)
+    budget_max = _to_float(custom_fields.get('budget_max'), 0)
+
+    return {
+        'ghl_contact_id': contact['id'],
+        'first_name': contact.get('firstName'),
+        'last_name': contact.get('lastName'),
+        'email': contact.get('email'),
+        'phone': contact.get('phone'),
+        'min_budget': budget_min or None,
+        'max_budget': budget_max or None,
+        'preferred_locations': [t for t in _preference_tokens(custom_fields.get('location_preference')) if t],
+        'property_types': [t for t in _preference_tokens(custom_fields.get('property_type_preference')) if t],
+        'min_bedrooms': _to_int(custom_fields.get('min_bedrooms')) or None,
+        'buyer_status': str(custom_fields.get('buyer_status') or 'active').lower(),
+        'tags': tags,
+        'sms_opt_in': 'sms_opt_in' in tags,
+        'dnd': bool(contact.get('dnd', False)),
+        'last_synced_at': datetime.now()
+    }
+
+
+def contact_from_buyer_row(row: Dict) -> Dict:
+    """
+    Rebuild a GHL-style contact dict from a buyers table row
+
+    Args:
+        row: Row from DatabaseManager.get_active_buyers
+
+    Returns:
+        Contact dictionary with preferences in customFields
+    """
+    tags = _list_field(row.get('tags'))
+    if row.get('sms_opt_in') and 'sms_opt_in' not in tags:
+        tags.append('sms_opt_in')
+
+    return {
+        'id': row.get('ghl_contact_id'),
+        'firstName': row.get('first_name'),
+        'lastName': row.get('last_name'),
+        'email': row.get('email'),
+        'phone': row.get('phone'),
+        'tags': tags,
+        'dnd': bool(row.get('dnd')),
+        'customFields': {
+            'budget_min': row.get('min_budget'),
+            'budget_max': row.get('max_budget'),
+            'location_preference': ', '.join(_list_field(row.get('preferred_locations'))),
+            'property_type_preference': ', '.join(_list_field(row.get('property_types'))),
+            'min_bedrooms': row.get('min_bedrooms')
+        }
+    }
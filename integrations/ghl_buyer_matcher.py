@@ -4,9 +4,14 @@ Intelligent buyer-property matching and automated notifications.
 """
 
 from typing import Dict, List, Tuple, Optional
+import json
 import logging
+import threading
+import time
 from datetime import datetime, timedelta
 
+from .ghl_buyer_index import BuyerIndex, BuyerProfile, buyer_row_from_contact, contact_from_buyer_row
+
 
 class BuyerMatcher:
     """Matches properties to buyers based on preferences and sends automated notifications"""
@@ -29,6 +34,31 @@ class BuyerMatcher:
         self.buyer_cache_duration = config.get("buyer_cache_duration_minutes", 60)
         self.max_sms_per_day = config.get("max_sms_per_buyer_per_day", 3)
 
+        # Parsed and indexed active buyers, refreshed after buyer_cache_duration
+        self._buyer_index: Optional[BuyerIndex] = None
+        self._buyer_index_expires = 0.0
+        self._buyer_index_lock = threading.Lock()
+
+    def get_buyer_index(self, refresh: bool = False) -> BuyerIndex:
+        """
+        Get the preference index over active buyers, rebuilding it when the TTL expires
+
+        Args:
+            refresh: Rebuild now, bypassing the in-memory and database caches
+
+        Returns:
+            BuyerIndex (not retained if no buyers were found, so the next call retries)
+        """
+        with self._buyer_index_lock:
+            if refresh or self._buyer_index is None or time.monotonic() >= self._buyer_index_expires:
+                buyers = self.fetch_active_buyers_from_ghl(use_cache=not refresh)
+                index = BuyerIndex(buyers)
+                if not buyers:
+                    return index
+                self._buyer_index = index
+                self._buyer_index_expires = time.monotonic() + self.buyer_cache_duration * 60
+            return self._buyer_index
+
     def fetch_active_buyers_from_ghl(self, use_cache: bool = True) -> List[Dict]:
         """
         Get all active buyers from GHL with optional caching
@@ -63,28 +93,50 @@ class BuyerMatcher:
             return []
 
     def _get_cached_buyers(self) -> Optional[List[Dict]]:
-        """Get buyers from cache if fresh"""
+        """Get buyers from the buyers table if they were synced within the cache duration"""
         try:
-            # This would interact with actual database
-            # Placeholder for database query
-            # Check if cache exists and is within cache_duration
-            cache_timestamp = None  # Get from DB
-            if cache_timestamp:
-                age_minutes = (datetime.now() - cache_timestamp).total_seconds() / 60
-                if age_minutes < self.buyer_cache_duration:
-                    # Return cached buyers from DB
-                    return None  # Would return actual cached data
-            return None
+            rows = self.db.get_active_buyers()
+            synced = [self._parse_timestamp(row.get('last_synced_at')) for row in rows]
+            synced = [timestamp for timestamp in synced if timestamp]
+            if not rows or not synced:
+                return None
+
+            age_minutes = (datetime.now() - max(synced)).total_seconds() / 60
+            if age_minutes >= self.buyer_cache_duration:
+                return None
+
+            return [contact_from_buyer_row(row) for row in rows]
         except Exception as e:
             self.logger.warning(f"Cache lookup failed: {e}")
             return None
 
+    @staticmethod
+    def _parse_timestamp(value) -> Optional[datetime]:
+        """Timestamp column value as a naive datetime"""
+        if isinstance(value, str):
+            try:
+                value = datetime.fromisoformat(value)
+            except ValueError:
+                return None
+        if isinstance(value, datetime):
+            return value.replace(tzinfo=None)
+        return None
+
     def _cache_buyers(self, buyers: List[Dict]):
-        """Cache buyers in database"""
+        """Cache buyers in the buyers table"""
         try:
-            # This would save to actual database
-            # Placeholder for database insert/update
-            self.logger.debug(f"Cached {len(buyers)} buyers")
+            # Only PostgreSQL binds Python lists to array columns
+            encode_lists = getattr(self.db, 'db_type', 'postgresql') != 'postgresql'
+
+            cached = 0
+            for buyer in buyers:
+                row = buyer_row_from_contact(buyer)
+                if encode_lists:
+                    row = {k: json.dumps(v) if isinstance(v, list) else v for k, v in row.items()}
+                self.db.upsert_buyer(row)
+                cached += 1
+
+            self.logger.debug(f"Cached {cached} buyers")
         except Exception as e:
             self.logger.warning(f"Failed to cache buyers: {e}")
 
@@ -105,88 +157,7 @@ class BuyerMatcher:
         Returns:
             Tuple of (score, list of match reasons)
         """
-        score = 0
-        reasons = []
-
-        # Extract property details
-        property_price = property_data.get("list_price", 0)
-        property_city = property_data.get("city", "").lower()
-        property_zip = property_data.get("zip_code", "")
-        property_type = property_data.get("property_type", "").lower()
-        property_bedrooms = property_data.get("bedrooms", 0)
-
-        # Extract buyer preferences from custom fields
-        buyer_custom_fields = buyer.get("customFields", {})
-        budget_min = buyer_custom_fields.get("budget_min", 0)
-        budget_max = buyer_custom_fields.get("budget_max", float('inf'))
-        location_pref = buyer_custom_fields.get("location_preference", "").lower()
-        property_type_pref = buyer_custom_fields.get("property_type_preference", "").lower()
-        min_bedrooms = buyer_custom_fields.get("min_bedrooms", 0)
-
-        # Convert string values to numbers if needed
-        try:
-            budget_min = float(budget_min) if budget_min else 0
-            budget_max = float(budget_max) if budget_max else float('inf')
-            min_bedrooms = int(min_bedrooms) if min_bedrooms else 0
-        except (ValueError, TypeError):
-            self.logger.warning(f"Invalid buyer preference values for {buyer.get('email', 'unknown')}")
-
-        # 1. Budget Match (40 points)
-        if budget_min <= property_price <= budget_max:
-            score += 40
-            reasons.append(f"Price ${property_price:,.0f} within budget (${budget_min:,.0f}-${budget_max:,.0f})")
-        elif property_price < budget_min:
-            # Still give partial points if property is cheaper
-            score += 30
-            reasons.append(f"Price ${property_price:,.0f} below budget")
-        elif property_price <= budget_max * 1.1:
-            # Partial points if slightly over budget (within 10%)
-            score += 20
-            reasons.append(f"Price ${property_price:,.0f} slightly above budget")
-
-        # 2. Location Match (30 points)
-        location_matches = []
-        if location_pref:
-            # Split multiple locations (e.g., "austin, dallas, houston")
-            preferred_locations = [loc.strip() for loc in location_pref.split(",")]
-
-            for pref_loc in preferred_locations:
-                if pref_loc in property_city or pref_loc in property_zip:
-                    score += 30
-                    location_matches.append(pref_loc)
-                    break
-
-            if location_matches:
-                reasons.append(f"Location match: {', '.join(location_matches)}")
-        else:
-            # No preference specified - give neutral score
-            score += 15
-
-        # 3. Property Type Match (20 points)
-        if property_type_pref:
-            property_type_prefs = [t.strip() for t in property_type_pref.split(",")]
-
-            for pref_type in property_type_prefs:
-                if pref_type in property_type or property_type in pref_type:
-                    score += 20
-                    reasons.append(f"Property type match: {property_type}")
-                    break
-        else:
-            # No preference - neutral score
-            score += 10
-
-        # 4. Bedrooms Match (10 points)
-        if property_bedrooms >= min_bedrooms:
-            score += 10
-            reasons.append(f"{property_bedrooms} bedrooms meets requirement ({min_bedrooms}+)")
-        elif min_bedrooms == 0:
-            # No requirement specified
-            score += 5
-
-        # Ensure score is within 0-100
-        score = min(100, max(0, score))
-
-        return score, reasons
+        return BuyerProfile(buyer).score(property_data)
 
     def match_property_to_buyers(self, property_data: Dict, min_score: int = 70) -> List[Dict]:
         """
@@ -199,26 +170,24 @@ class BuyerMatcher:
         Returns:
             List of top 5 matches sorted by score, each containing buyer and match info
         """
-        buyers = self.fetch_active_buyers_from_ghl()
+        index = self.get_buyer_index()
 
-        if not buyers:
+        if not len(index):
             self.logger.warning("No active buyers found")
             return []
 
-        matches = []
-
-        for buyer in buyers:
-            score, reasons = self.calculate_match_score(property_data, buyer)
-
-            if score >= min_score:
-                matches.append({
-                    "buyer": buyer,
-                    "score": score,
-                    "reasons": reasons,
-                    "contact_id": buyer.get("id"),
-                    "email": buyer.get("email"),
-                    "name": f"{buyer.get('firstName', '')} {buyer.get('lastName', '')}".strip()
-                })
+        # Only buyers whose indexed preferences can reach min_score are scored
+        matches = [
+            {
+                "buyer": buyer,
+                "score": score,
+                "reasons": reasons,
+                "contact_id": buyer.get("id"),
+                "email": buyer.get("email"),
+                "name": f"{buyer.get('firstName', '')} {buyer.get('lastName', '')}".strip()
+            }
+            for buyer, score, reasons in index.match(property_data, min_score)
+        ]
 
         # Sort by score descending and take top 5
         matches.sort(key=lambda x: x["score"], reverse=True)
@@ -249,57 +218,88 @@ class BuyerMatcher:
             "errors": []
         }
 
+        # Buyers are notified concurrently; the connector's rate limiter
+        # keeps the combined request rate within the GHL budget
+        fan_out = getattr(self.ghl, "fan_out", None)
+        notify = lambda match: self._notify_buyer(property_data, match)
+        outcomes = fan_out(notify, matched_buyers) if fan_out else [notify(m) for m in matched_buyers]
+
+        for match, outcome in zip(matched_buyers, outcomes):
+            if outcome == "notified":
+                stats["notified"] += 1
+            elif outcome == "skipped":
+                stats["skipped"] += 1
+            else:
+                stats["errors"].append({
+                    "buyer": match.get("name", "Unknown"),
+                    "contact_id": match["contact_id"],
+                    "error": outcome
+                })
+
+        self.logger.info(
+            f"Notification complete: {stats['notified']} notified, {stats['skipped']} skipped, "
+            f"{len(stats['errors'])} errors out of {stats['total']}"
+        )
+
+        return stats
+
+    def _notify_buyer(self, property_data: Dict, match: Dict) -> str:
+        """
+        Send SMS, workflow, tag, note and task for one matched buyer
+
+        Args:
+            property_data: Property information
+            match: Matched buyer dictionary from match_property_to_buyers
+
+        Returns:
+            "notified", "skipped", or the error message if notification failed
+        """
         property_id = property_data.get("id", "unknown")
         address = property_data.get("address", "Unknown Address")
+        buyer = match["buyer"]
+        contact_id = match["contact_id"]
+        match_score = match["score"]
+        reasons = match["reasons"]
 
-        for match in matched_buyers:
-            buyer = match["buyer"]
-            contact_id = match["contact_id"]
-            match_score = match["score"]
-            reasons = match["reasons"]
-
-            try:
-                # Check SMS opt-in
-                if not self.check_sms_opt_in(buyer):
-                    self.logger.info(f"Skipping {contact_id} - no SMS opt-in")
-                    stats["skipped"] += 1
-                    continue
-
-                # Check quiet hours
-                if not self.check_quiet_hours():
-                    self.logger.info(f"Skipping {contact_id} - quiet hours")
-                    stats["skipped"] += 1
-                    continue
-
-                # Check daily SMS limit
-                sms_count_today = self.get_sms_count_today(contact_id)
-                if sms_count_today >= self.max_sms_per_day:
-                    self.logger.info(f"Skipping {contact_id} - SMS limit reached ({sms_count_today}/{self.max_sms_per_day})")
-                    stats["skipped"] += 1
-                    continue
-
-                # Send SMS
-                sms_message = self._create_match_sms(property_data, match_score)
-                self.ghl.send_sms(contact_id, sms_message)
-                self._record_sms_sent(contact_id, property_id)
-
-                # Trigger workflow if configured
-                workflow_id = self.config.get("workflows", {}).get("property_match")
-                if workflow_id:
-                    custom_data = {
-                        "property_address": address,
-                        "match_score": match_score,
-                        "list_price": property_data.get("list_price", 0),
-                        "property_id": property_id
-                    }
-                    self.ghl.trigger_workflow(workflow_id, contact_id, custom_data)
-
-                # Add tag
-                tag = f"matched_{property_id}"
-                self.ghl.add_contact_tags(contact_id, [tag])
-
-                # Add note with match details
-                note_text = f"""
+        try:
+            # Check SMS opt-in
+            if not self.check_sms_opt_in(buyer):
+                self.logger.info(f"Skipping {contact_id} - no SMS opt-in")
+                return "skipped"
+
+            # Check quiet hours
+            if not self.check_quiet_hours():
+                self.logger.info(f"Skipping {contact_id} - quiet hours")
+                return "skipped"
+
+            # Check daily SMS limit
+            sms_count_today = self.get_sms_count_today(contact_id)
+            if sms_count_today >= self.max_sms_per_day:
+                self.logger.info(f"Skipping {contact_id} - SMS limit reached ({sms_count_today}/{self.max_sms_per_day})")
+                return "skipped"
+
+            # Send SMS
+            sms_message = self._create_match_sms(property_data, match_score)
+            self.ghl.send_sms(contact_id, sms_message)
+            self._record_sms_sent(contact_id, property_id)
+
+            # Trigger workflow if configured
+            workflow_id = self.config.get("workflows", {}).get("property_match")
+            if workflow_id:
+                custom_data = {
+                    "property_address": address,
+                    "match_score": match_score,
+                    "list_price": property_data.get("list_price", 0),
+                    "property_id": property_id
+                }
+                self.ghl.trigger_workflow(workflow_id, contact_id, custom_data)
+
+            # Add tag
+            tag = f"matched_{property_id}"
+            self.ghl.add_contact_tags(contact_id, [tag])
+
+            # Add note with match details
+            note_text = f"""
 PROPERTY MATCH - Score: {match_score}/100
 
 Property: {address}
@@ -309,37 +309,26 @@ Match Reasons:
 {chr(10).join(f'- {reason}' for reason in reasons)}
 
 Deal Score: {property_data.get('deal_score', 0)}/100
-                """.strip()
-                self.ghl.add_note(contact_id, note_text)
-
-                # Create follow-up task if configured
-                if self.config.get("create_followup_tasks", True):
-                    task_data = {
-                        "title": f"Follow up with {match['name']} - Property Match",
-                        "description": f"Matched buyer to {address}. Match score: {match_score}/100",
-                        "assignedTo": self.config.get("default_assignee"),
-                        "dueDate": (datetime.now() + timedelta(hours=4)).isoformat(),
-                        "priority": "high" if match_score >= 85 else "medium"
-                    }
-                    self.ghl.create_task(task_data)
+            """.strip()
+            self.ghl.add_note(contact_id, note_text)
+
+            # Create follow-up task if configured
+            if self.config.get("create_followup_tasks", True):
+                task_data = {
+                    "title": f"Follow up with {match['name']} - Property Match",
+                    "description": f"Matched buyer to {address}. Match score: {match_score}/100",
+                    "assignedTo": self.config.get("default_assignee"),
+                    "dueDate": (datetime.now() + timedelta(hours=4)).isoformat(),
+                    "priority": "high" if match_score >= 85 else "medium"
+                }
+                self.ghl.create_task(task_data)
+
+            self.logger.info(f"Notified buyer {contact_id} about {address} (score: {match_score})")
+            return "notified"
 
-                stats["notified"] += 1
-                self.logger.info(f"Notified buyer {contact_id} about {address} (score: {match_score})")
-
-            except Exception as e:
-                stats["errors"].append({
-                    "buyer": match.get("name", "Unknown"),
-                    "contact_id": contact_id,
-                    "error": str(e)
-                })
-                self.logger.error(f"Failed to notify buyer {contact_id}: {e}")
-
-        self.logger.info(
-            f"Notification complete: {stats['notified']} notified, {stats['skipped']} skipped, "
-            f"{len(stats['errors'])} errors out of {stats['total']}"
-        )
-
-        return stats
+        except Exception as e:
+            self.logger.error(f"Failed to notify buyer {contact_id}: {e}")
+            return str(e)
 
     def _create_match_sms(self, property_data: Dict, match_score: int) -> str:
         """
@@ -470,6 +459,10 @@ Deal Score: {property_data.get('deal_score', 0)}/100
             if custom_fields:
                 self.ghl.update_contact(contact_id, {"customFields": custom_fields})
                 self.logger.info(f"Updated preferences for contact {contact_id}")
+
+                # Re-index on next match so the new preferences apply
+                with self._buyer_index_lock:
+                    self._buyer_index = None
                 return True
 
             return False
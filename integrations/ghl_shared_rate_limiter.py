@@ -0,0 +1,303 @@
+"""
+GoHighLevel Shared Rate Limiter
+Token bucket kept in SQLite so every thread and process talking to one GHL
+location draws from the same 95 requests/minute budget.
+
+- The bucket (tokens, last refill, 429 back-off deadline) is updated inside
+  BEGIN IMMEDIATE transactions, so concurrent processes never both spend
+  the same token.
+- Callers (workflow sync, agent notifications, chat, ...) register with a
+  weight. When tokens are scarce, a token goes to the waiting caller that has
+  used the least of its weighted share recently; an idle caller reserves
+  nothing, so a lone caller still gets the whole budget.
+- A 429 response blocks the bucket for Retry-After seconds for everyone and
+  is counted in the caller's stats.
+"""
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+
+# Relative share of the budget per caller when several are busy (others get 1)
+CALLER_WEIGHTS = {
+    'workflow': 2,
+    'agent_notifications': 1,
+    'chat': 1
+}
+
+# A waiting caller that hasn't polled for this long is treated as gone
+WAITER_STALE_SECONDS = 5.0
+
+# Upper bound on a single sleep between token checks
+MAX_POLL_SECONDS = 1.0
+
+
+class SharedGHLRateLimiter:
+    """Cross-process token bucket with weighted fair sharing between callers"""
+
+    def __init__(self, location_id: str, caller: str = 'default', db_path: Optional[str] = None,
+                 max_requests: int = 95, time_window: int = 60, burst: int = 5,
+                 weight: Optional[float] = None):
+        """
+        Initialize shared rate limiter
+
+        Args:
+            location_id: GHL location the budget belongs to
+            caller: Name of the workload using this limiter (e.g. 'workflow')
+            db_path: SQLite file shared by all processes (default:
+                $GHL_RATE_LIMIT_DB or data/ghl_rate_limit.db)
+            max_requests: Sustained requests allowed per time window
+            time_window: Time window in seconds
+            burst: Maximum tokens that can accumulate while idle
+            weight: Share of the budget under contention (default: CALLER_WEIGHTS)
+        """
+        if db_path is None:
+            db_path = os.getenv('GHL_RATE_LIMIT_DB') or \
+                Path(__file__).parent.parent / 'data' / 'ghl_rate_limit.db'
+
+        self.db_path = str(db_path)
+        self.bucket = location_id
+        self.caller = caller
+        self.weight = float(weight if weight is not None else CALLER_WEIGHTS.get(caller, 1))
+        self.max_requests = max_requests
+        self.time_window = time_window
+        self.rate = max_requests / time_window
+        self.capacity = max(1, burst)
+        self.total_waits = 0
+        self.total_wait_seconds = 0.0
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._init_database()
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection holding the write lock; commits on success, rolls back on error"""
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _init_database(self):
+        """Create limiter tables and this bucket/caller's rows if they don't exist"""
+        with self._connect() as conn:
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS rate_buckets (
+                bucket TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                refilled_at REAL NOT NULL,
+                blocked_until REAL NOT NULL DEFAULT 0
+            )
+            """)
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS rate_callers (
+                bucket TEXT NOT NULL,
+                caller TEXT NOT NULL,
+                weight REAL NOT NULL,
+                usage REAL NOT NULL DEFAULT 0,
+                usage_at REAL NOT NULL DEFAULT 0,
+                waiting_at REAL,
+                requests INTEGER NOT NULL DEFAULT 0,
+                waits INTEGER NOT NULL DEFAULT 0,
+                wait_seconds REAL NOT NULL DEFAULT 0,
+                throttled INTEGER NOT NULL DEFAULT 0,
+                backoff_seconds REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (bucket, caller)
+            )
+            """)
+            conn.execute(
+                "INSERT OR IGNORE INTO rate_buckets (bucket, tokens, refilled_at) VALUES (?, ?, ?)",
+                (self.bucket, float(self.capacity), time.time())
+            )
+            conn.execute("""
+                INSERT INTO rate_callers (bucket, caller, weight) VALUES (?, ?, ?)
+                ON CONFLICT (bucket, caller) DO UPDATE SET weight = excluded.weight
+            """, (self.bucket, self.caller, self.weight))
+
+    def _refill(self, conn, now: float) -> Tuple[float, float]:
+        """Add tokens earned since the last refill; returns (tokens, blocked_until)"""
+        tokens, refilled_at, blocked_until = conn.execute(
+            "SELECT tokens, refilled_at, blocked_until FROM rate_buckets WHERE bucket = ?",
+            (self.bucket,)
+        ).fetchone()
+        # After a 429, refilled_at is the end of the back-off, so nothing accrues until then
+        tokens = min(self.capacity, tokens + max(0.0, now - refilled_at) * self.rate)
+        return tokens, blocked_until
+
+    def _decayed_usage(self, usage: float, usage_at: float, now: float) -> float:
+        """Recent request count, halving every time_window"""
+        return usage * 0.5 ** (max(0.0, now - usage_at) / self.time_window)
+
+    def _try_acquire(self, waited: float) -> float:
+        """
+        Take a token if one is available and it is this caller's turn
+
+        Args:
+            waited: Seconds this request has already waited (for stats)
+
+        Returns:
+            0 if a token was taken, otherwise seconds to wait before trying again
+        """
+        now = time.time()
+
+        with self._connect() as conn:
+            tokens, blocked_until = self._refill(conn, now)
+
+            callers = conn.execute(
+                "SELECT caller, weight, usage, usage_at, waiting_at FROM rate_callers WHERE bucket = ?",
+                (self.bucket,)
+            ).fetchall()
+            share = {caller: self._decayed_usage(usage, usage_at, now) / weight
+                     for caller, weight, usage, usage_at, _ in callers}
+            my_share = share.get(self.caller, 0.0)
+
+            # Defer to waiting callers that have had less than their share
+            yield_to = [
+                caller for caller, _, _, _, waiting_at in callers
+                if caller != self.caller and waiting_at is not None
+                and now - waiting_at < WAITER_STALE_SECONDS
+                and share[caller] < my_share
+            ]
+
+            if now >= blocked_until and tokens >= 1 and not yield_to:
+                _, _, usage, usage_at, _ = next(row for row in callers if row[0] == self.caller)
+                conn.execute(
+                    "UPDATE rate_buckets SET tokens = ?, refilled_at = ? WHERE bucket = ?",
+                    (tokens - 1, now, self.bucket)
+                )
+                conn.execute("""
+                    UPDATE rate_callers
+                    SET usage = ?, usage_at = ?, waiting_at = NULL,
+                        requests = requests + 1,
+                        waits = waits + ?,
+                        wait_seconds = wait_seconds + ?
+                    WHERE bucket = ? AND caller = ?
+                """, (self._decayed_usage(usage, usage_at, now) + 1, now,
+                      1 if waited else 0, waited, self.bucket, self.caller))
+                return 0.0
+
+            conn.execute("UPDATE rate_callers SET waiting_at = ? WHERE bucket = ? AND caller = ?",
+                         (now, self.bucket, self.caller))
+
+        if now < blocked_until:
+            return min(blocked_until - now, MAX_POLL_SECONDS)
+        if tokens < 1:
+            return min((1 - tokens) / self.rate, MAX_POLL_SECONDS)
+        # A token is free but another caller is due it; check back shortly
+        return min(1 / self.rate, MAX_POLL_SECONDS) / 2
+
+    def acquire(self):
+        """Block until a request token is available, then take it"""
+        # One poller per instance; threads of the same caller queue here
+        with self._lock:
+            waited = 0.0
+            while True:
+                delay = self._try_acquire(waited)
+                if delay <= 0:
+                    break
+                time.sleep(delay)
+                waited += delay
+
+            if waited:
+                self.total_waits += 1
+                self.total_wait_seconds += waited
+                self.logger.debug(f"[{self.caller}] Waited {waited:.2f}s for rate limit")
+
+    async def wait_if_needed(self):
+        """Wait until a request token is available, then take it"""
+        await asyncio.to_thread(self.acquire)
+
+    async def backoff(self, retry_after: float):
+        """
+        Record a 429 and pause every caller of this bucket for retry_after seconds
+
+        Args:
+            retry_after: Seconds from the Retry-After header
+        """
+        await asyncio.to_thread(self.record_throttle, retry_after)
+        await asyncio.sleep(retry_after)
+
+    def record_throttle(self, retry_after: float):
+        """
+        Block the shared bucket after a 429 response
+
+        Args:
+            retry_after: Seconds from the Retry-After header
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("""
+                UPDATE rate_buckets
+                SET tokens = 0,
+                    refilled_at = MAX(refilled_at, ?),
+                    blocked_until = MAX(blocked_until, ?)
+                WHERE bucket = ?
+            """, (now + retry_after, now + retry_after, self.bucket))
+            conn.execute("""
+                UPDATE rate_callers
+                SET throttled = throttled + 1, backoff_seconds = backoff_seconds + ?
+                WHERE bucket = ? AND caller = ?
+            """, (retry_after, self.bucket, self.caller))
+
+        self.logger.warning(f"[{self.caller}] GHL returned 429; all callers backing off {retry_after:.1f}s")
+
+    def get_remaining_requests(self) -> int:
+        """Get number of requests that can be sent right now without waiting"""
+        now = time.time()
+        with self._connect() as conn:
+            tokens, blocked_until = self._refill(conn, now)
+        return 0 if now < blocked_until else int(tokens)
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """
+        Per-caller request, wait and 429 back-off statistics for this bucket
+
+        Returns:
+            Stats dict keyed by caller name
+        """
+        with self._connect() as conn:
+            rows = conn.execute("""
+                SELECT caller, weight, requests, waits, wait_seconds, throttled, backoff_seconds
+                FROM rate_callers WHERE bucket = ? ORDER BY caller
+            """, (self.bucket,)).fetchall()
+
+        return {
+            caller: {
+                'weight': weight,
+                'requests': requests,
+                'waits': waits,
+                'wait_seconds': round(wait_seconds, 3),
+                'throttled': throttled,
+                'backoff_seconds': round(backoff_seconds, 3)
+            }
+            for caller, weight, requests, waits, wait_seconds, throttled, backoff_seconds in rows
+        }
+
+
+# Limiters per (db file, location, caller) so connectors in one process share instances
+_shared_limiters: Dict[Tuple[str, str, str], SharedGHLRateLimiter] = {}
+_shared_limiters_lock = threading.Lock()
+
+def get_shared_rate_limiter(location_id: str, caller: str,
+                            db_path: Optional[str] = None) -> SharedGHLRateLimiter:
+    """Get the process-wide SharedGHLRateLimiter for a location and caller"""
+    key = (str(db_path or os.getenv('GHL_RATE_LIMIT_DB') or ''), location_id, caller)
+    with _shared_limiters_lock:
+        if key not in _shared_limiters:
+            _shared_limiters[key] = SharedGHLRateLimiter(location_id, caller, db_path=db_path)
+        return _shared_limiters[key]
@@ -53,49 +53,9 @@ class GHLWorkflowManager:
             Exception if opportunity creation fails
         """
         try:
-            # Extract property details
-            address = property_data.get("address", "Unknown Address")
-            score = property_data.get("deal_score", 0)
-            price = property_data.get("list_price", 0)
-            mls_id = property_data.get("mls_id", "N/A")
-            est_profit = property_data.get("estimated_profit", 0)
-            below_market_pct = property_data.get("below_market_pct", 0)
-            days_on_market = property_data.get("days_on_market", 0)
-            price_per_sqft = property_data.get("price_per_sqft", 0)
-            estimated_arv = property_data.get("estimated_arv", 0)
-
-            # Determine deal quality
-            if score >= 90:
-                deal_quality = "Hot Deal"
-            elif score >= 75:
-                deal_quality = "Good Deal"
-            elif score >= 60:
-                deal_quality = "Potential"
-            else:
-                deal_quality = "Review Needed"
-
-            # Prepare opportunity data
-            opportunity_name = f"{address} - Score: {score}"
-
-            opportunity_data = {
-                "pipelineId": self.config.get("pipeline_id"),
-                "pipelineStageId": self.config["stages"].get("new_lead"),
-                "name": opportunity_name,
-                "monetaryValue": price,
-                "status": "open",
-                "customFields": {
-                    "property_address": address,
-                    "deal_score": score,
-                    "list_price": price,
-                    "est_profit": est_profit,
-                    "mls_id": mls_id,
-                    "price_per_sqft": price_per_sqft,
-                    "below_market_pct": below_market_pct,
-                    "days_on_market": days_on_market,
-                    "deal_quality": deal_quality,
-                    "estimated_arv": estimated_arv
-                }
-            }
+            opportunity_data = self._opportunity_data(property_data)
+            address = opportunity_data["customFields"]["property_address"]
+            deal_quality = opportunity_data["customFields"]["deal_quality"]
 
             # Add default assignee if configured
             if "default_assignee" in self.config:
@@ -133,6 +93,77 @@ class GHLWorkflowManager:
             self.logger.error(f"Failed to create opportunity: {e}")
             raise
 
+    def update_opportunity_from_property(self, property_data: Dict, opportunity_id: str) -> bool:
+        """
+        Refresh an existing opportunity with newer property data (e.g. after
+        a duplicate listing was merged into the property)
+
+        Args:
+            property_data: Property analysis data
+            opportunity_id: Opportunity created by create_opportunity_from_property
+
+        Returns:
+            True if successful
+        """
+        try:
+            opportunity_data = self._opportunity_data(property_data)
+            updates = {key: opportunity_data[key] for key in ("name", "monetaryValue", "customFields")}
+            self.ghl.update_opportunity(opportunity_id, updates)
+            self.logger.info(f"Updated opportunity {opportunity_id} for "
+                             f"{opportunity_data['customFields']['property_address']}")
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to update opportunity {opportunity_id}: {e}")
+            return False
+
+    def _opportunity_data(self, property_data: Dict) -> Dict:
+        """Opportunity name, value and custom fields for a property"""
+        # Extract property details
+        address = property_data.get("address", "Unknown Address")
+        score = property_data.get("deal_score", 0)
+        price = property_data.get("list_price", 0)
+        mls_id = property_data.get("mls_id", "N/A")
+        est_profit = property_data.get("estimated_profit", 0)
+        below_market_pct = property_data.get("below_market_pct", 0)
+        days_on_market = property_data.get("days_on_market", 0)
+        price_per_sqft = property_data.get("price_per_sqft", 0)
+        estimated_arv = property_data.get("estimated_arv", 0)
+
+        # Determine deal quality
+        if score >= 90:
+            deal_quality = "Hot Deal"
+        elif score >= 75:
+            deal_quality = "Good Deal"
+        elif score >= 60:
+            deal_quality = "Potential"
+        else:
+            deal_quality = "Review Needed"
+
+        # Prepare opportunity data
+        opportunity_name = f"{address} - Score: {score}"
+
+        opportunity_data = {
+            "pipelineId": self.config.get("pipeline_id"),
+            "pipelineStageId": self.config["stages"].get("new_lead"),
+            "name": opportunity_name,
+            "monetaryValue": price,
+            "status": "open",
+            "customFields": {
+                "property_address": address,
+                "deal_score": score,
+                "list_price": price,
+                "est_profit": est_profit,
+                "mls_id": mls_id,
+                "price_per_sqft": price_per_sqft,
+                "below_market_pct": below_market_pct,
+                "days_on_market": days_on_market,
+                "deal_quality": deal_quality,
+                "estimated_arv": estimated_arv
+            }
+        }
+
+        return opportunity_data
+
     def _create_analysis_note(self, property_data: Dict) -> str:
         """
         Create detailed analysis note for opportunity
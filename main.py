@@ -15,21 +15,25 @@ Usage:
 import argparse
 import logging
 import sys
+import threading
+from contextlib import nullcontext
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 import json
 import os
 from dotenv import load_dotenv
 
 # Import all modules
 from modules.database import DatabaseManager
-from modules.scraper import RealtorScraper
+from modules.scraper import RealtorScraper, CaptchaDetectedError
 from modules.data_enrichment import DataEnrichment
 from modules.analyzer import PropertyAnalyzer
+from modules.parallel_analyzer import ParallelAnalyzer
 from modules.scorer import OpportunityScorer
 from modules.reporter import ReportGenerator
 from modules.sync_manager import SyncManager
 from modules.notifier import Notifier
+from modules.pipeline import Pipeline, PipelineStage
 
 from integrations.ghl_connector import GoHighLevelConnector
 from integrations.ghl_workflows import GHLWorkflowManager
@@ -43,15 +47,18 @@ load_dotenv()
 class DealFinderPro:
     """Main application orchestrator"""
 
-    def __init__(self, config_path: str = 'config.json'):
+    def __init__(self, config_path: str = 'config.json', force_rescore: bool = False):
         """
         Initialize DealFinder Pro application
 
         Args:
             config_path: Path to configuration JSON file
+            force_rescore: Re-analyze every property instead of reusing
+                stored analyses for unchanged ones
         """
         # Load configuration
         self.config_path = config_path
+        self.force_rescore = force_rescore
         with open(config_path) as f:
             self.config = json.load(f)
 
@@ -127,7 +134,7 @@ class DealFinderPro:
 
             # Reporter
             self.logger.info("Initializing reporter...")
-            self.reporter = ReportGenerator(self.config)
+            self.reporter = ReportGenerator(self.config, self.db)
 
             # Notifier
             self.logger.info("Initializing notifier...")
@@ -149,7 +156,7 @@ class DealFinderPro:
                 ghl_location_id = os.getenv('GHL_LOCATION_ID')
 
                 if ghl_api_key and ghl_location_id:
-                    self.ghl = GoHighLevelConnector(ghl_api_key, ghl_location_id)
+                    self.ghl = GoHighLevelConnector(ghl_api_key, ghl_location_id, caller='workflow')
                     self.ghl_workflows = GHLWorkflowManager(self.ghl, self.config)
                     self.buyer_matcher = BuyerMatcher(self.ghl, self.db, self.config)
                     self.sync_manager = SyncManager(self.db, self.ghl, self.config)
@@ -195,58 +202,21 @@ class DealFinderPro:
                 mls_properties = []
                 stats['mls_imported'] = 0
 
-            # Step 2: Scrape Realtor.com
-            self.logger.info("")
-            self.logger.info("Step 2: Scraping Realtor.com...")
-            scraped_properties = self._scrape_properties()
-            stats['scraped'] = len(scraped_properties)
-
-            # Step 3: Merge and deduplicate
-            self.logger.info("")
-            self.logger.info("Step 3: Merging and deduplicating...")
-            all_properties = mls_properties + scraped_properties
-            unique_properties = self.enricher.deduplicate_properties(all_properties)
-            stats['unique'] = len(unique_properties)
-            stats['duplicates_removed'] = len(all_properties) - len(unique_properties)
-            self.logger.info(f"Removed {stats['duplicates_removed']} duplicates")
-
-            # Step 4: Analyze properties
-            self.logger.info("")
-            self.logger.info("Step 4: Analyzing properties...")
-            analyzed_properties = self._analyze_properties(unique_properties)
-            stats['analyzed'] = len(analyzed_properties)
-
-            # Step 5: Store in database
-            self.logger.info("")
-            self.logger.info("Step 5: Storing in database...")
-            self._store_properties(analyzed_properties)
-
-            # Step 6: Import buyers from GHL
+            # Step 2: Import buyers from GHL (needed before matching starts)
             if self.ghl:
                 self.logger.info("")
-                self.logger.info("Step 6: Importing buyers from GHL...")
+                self.logger.info("Step 2: Importing buyers from GHL...")
                 buyers_imported = self.sync_manager.sync_buyers_from_ghl()
                 stats['buyers_imported'] = buyers_imported.get('imported', 0)
             else:
                 stats['buyers_imported'] = 0
 
-            # Step 7: Match properties to buyers
-            if self.ghl:
-                self.logger.info("")
-                self.logger.info("Step 7: Matching properties to buyers...")
-                match_stats = self._match_properties_to_buyers(analyzed_properties)
-                stats['matches'] = match_stats
-            else:
-                stats['matches'] = {'total_matches': 0, 'notified_buyers': 0}
-
-            # Step 8: Create GHL opportunities
-            if self.ghl:
-                self.logger.info("")
-                self.logger.info("Step 8: Creating GHL opportunities...")
-                ghl_stats = self._sync_to_ghl(analyzed_properties)
-                stats['ghl'] = ghl_stats
-            else:
-                stats['ghl'] = {'opportunities_created': 0, 'workflows_triggered': 0, 'tasks_created': 0}
+            # Steps 3-8: Stream scrape -> normalize -> dedup -> analyze ->
+            # store -> match -> sync, so each ZIP flows through as it finishes
+            self.logger.info("")
+            self.logger.info("Steps 3-8: Running streaming pipeline "
+                             "(scrape, dedup, analyze, store, match, sync)...")
+            analyzed_properties = self._run_pipeline(mls_properties, stats)
 
             # Step 9: Generate reports
             self.logger.info("")
@@ -272,6 +242,10 @@ class DealFinderPro:
             self.logger.info(f"  - Properties Scraped: {stats['scraped']}")
             self.logger.info(f"  - Unique Properties: {stats['unique']}")
             self.logger.info(f"  - Properties Analyzed: {stats['analyzed']}")
+            if 'analysis_reuse' in stats:
+                reuse = stats['analysis_reuse']
+                self.logger.info(f"  - Analyses Reused: {reuse['reused']}/{reuse['reused'] + reuse['rescored']} "
+                                 f"({reuse['hit_rate']:.0%} hit rate)")
             self.logger.info(f"  - GHL Opportunities: {stats['ghl']['opportunities_created']}")
             self.logger.info(f"  - Buyer Matches: {stats['matches']['total_matches']}")
             self.logger.info("=" * 60)
@@ -290,149 +264,279 @@ class DealFinderPro:
             self.logger.info(f"Imported {len(properties)} properties from MLS")
             return properties
 
-    def _scrape_properties(self) -> List[Dict]:
-        """Scrape properties from Realtor.com"""
+    def _iter_scraped_properties(self) -> Iterator[Dict]:
+        """Yield scraped properties as each location finishes"""
         locations = self.config['search_criteria']['target_locations']
         days_back = self.config['search_criteria'].get('days_back', 30)
-        all_properties = []
-
-        for location in locations:
-            try:
-                self.logger.info(f"  Scraping: {location}")
-                properties = self.scraper.scrape_zip_code(
-                    zip_code=location,
-                    days_back=days_back
-                )
-                all_properties.extend(properties)
-                self.logger.info(f"    Found {len(properties)} properties")
-            except Exception as e:
-                self.logger.error(f"Failed to scrape {location}: {e}")
-
-        self.logger.info(f"Total scraped: {len(all_properties)} properties")
-        return all_properties
-
-    def _analyze_properties(self, properties: List[Dict]) -> List[Dict]:
-        """Analyze and score all properties"""
-        analyzed = []
-
-        self.logger.info(f"Analyzing {len(properties)} properties...")
 
-        for i, prop in enumerate(properties, 1):
-            try:
-                # Analyze property
-                analysis = self.analyzer.analyze_property(prop)
+        try:
+            for location, properties in self.scraper.iter_scrape_locations(
+                    locations, days_back=days_back):
+                self.logger.info(f"  Scraped {location}: {len(properties)} properties")
+                yield from properties
+        except CaptchaDetectedError as e:
+            self.logger.error(f"Scraping stopped early: {e}")
 
-                # Merge analysis results into property data
-                prop.update(analysis)
+    def _store_properties(self, properties: List[Dict]):
+        """Store properties in database"""
+        batch_size = self.config.get('performance', {}).get('database_batch_insert', 100)
+        result = self.db.bulk_upsert_properties(properties, batch_size=batch_size)
 
-                analyzed.append(prop)
+        for error in result['errors']:
+            self.logger.warning(f"Failed to store property {error['property_id']}: {error['error']}")
 
-                # Log progress every 10 properties
-                if i % 10 == 0:
-                    self.logger.info(f"  Progress: {i}/{len(properties)}")
+        self.logger.info(f"Stored {result['upserted']}/{len(properties)} properties in database")
 
-            except Exception as e:
-                self.logger.warning(f"Failed to analyze property {prop.get('street_address')}: {e}")
+    def _run_pipeline(self, mls_properties: List[Dict], stats: Dict) -> List[Dict]:
+        """
+        Run scrape through GHL sync as a streaming pipeline.
 
-        self.logger.info(f"Successfully analyzed {len(analyzed)}/{len(properties)} properties")
-        return analyzed
+        Args:
+            mls_properties: Properties imported from MLS (fed first so MLS
+                records win over later scraped duplicates)
+            stats: Workflow stats dict, updated in place
 
-    def _store_properties(self, properties: List[Dict]):
-        """Store properties in database"""
-        stored_count = 0
-        for prop in properties:
+        Returns:
+            Analyzed properties, for reporting
+        """
+        performance = self.config.get('performance', {})
+        queue_size = performance.get('pipeline_queue_size', 200)
+        workers = performance.get('pipeline_workers', {})
+        batch_size = performance.get('database_batch_insert', 100)
+
+        counts = {'scraped': 0}
+        match_stats = {'total_matches': 0, 'notified_buyers': 0}
+        ghl_stats = {'opportunities_created': 0, 'opportunities_updated': 0,
+                     'workflows_triggered': 0, 'tasks_created': 0}
+        stats_lock = threading.Lock()
+        deduplicator = self.enricher.new_stream_deduplicator()
+        # property_id -> buyers matched / opportunity created so far, so a
+        # version superseded by a merge is followed up rather than repeated
+        matched_buyers: Dict[str, frozenset] = {}
+        opportunities: Dict[str, str] = {}
+        match_min_score = self._min_opportunity_score(70)
+        sync_min_score = self._min_opportunity_score(75)
+
+        # Market stats are computed once per ZIP for this run
+        self.analyzer.market_stats.invalidate()
+        market_queries = self.analyzer.market_stats.get_cache_stats()['queries']
+        if self.analyzer.analysis_cache:
+            self.analyzer.analysis_cache.reset_stats()
+
+        # With analysis_processes > 1, analyze batches go to one process pool
+        # for the run; each worker has its own DB connection and market stats
+        processes = performance.get('analysis_processes', 0)
+        parallel = None
+        if processes > 1:
+            parallel = ParallelAnalyzer(self.analyzer, self.db.config, processes=processes,
+                                        chunk_size=performance.get('batch_size_analysis', 50))
+
+        def source():
+            yield from mls_properties
+            for prop in self._iter_scraped_properties():
+                counts['scraped'] += 1
+                yield prop
+
+        def dedup(prop):
+            # A duplicate comes back merged into the listing it repeats, as a
+            # newer version that is analyzed and stored again
+            return [deduplicator.add(prop)]
+
+        def analyze(batch):
             try:
-                self.db.insert_property(prop)
-                stored_count += 1
+                if parallel:
+                    analyses = parallel.analyze(batch, force_rescore=self.force_rescore)
+                else:
+                    analyses = self.analyzer.analyze_properties(batch, force_rescore=self.force_rescore)
             except Exception as e:
-                self.logger.warning(f"Failed to store property: {e}")
-
-        self.logger.info(f"Stored {stored_count}/{len(properties)} properties in database")
+                # One bad listing must not drop the batch; analyze_property
+                # gives a failing property the default analysis
+                self.logger.warning(f"Batch analysis of {len(batch)} properties failed, "
+                                    f"analyzing individually: {e}")
+                analyses = [self.analyzer.analyze_property(prop) for prop in batch]
+            for prop, analysis in zip(batch, analyses):
+                prop.update(analysis)
+            return batch
+
+        def store(batch):
+            # Analyze workers can finish an older version after a newer
+            # merged one; storing it would overwrite the merged row
+            self._store_properties([prop for prop in batch if deduplicator.is_latest(prop)])
+            return batch
+
+        def claim(batch, step, min_score):
+            # Only the newest version that clears the threshold is claimed, so
+            # a merge that raises a listing's score still gets it handled
+            return [prop for prop in batch
+                    if prop.get('opportunity_score', 0) >= min_score and deduplicator.claim(prop, step)]
+
+        def match_one(prop):
+            property_id = prop.get('property_id')
+            with stats_lock:
+                matched = matched_buyers.get(property_id, frozenset())
+            matches, notified, contact_ids = self._match_property_to_buyers(prop, matched)
+            with stats_lock:
+                matched_buyers[property_id] = matched_buyers.get(property_id, frozenset()).union(contact_ids)
+                match_stats['total_matches'] += matches
+                match_stats['notified_buyers'] += notified
+
+        def sync_one(prop):
+            property_id = prop.get('property_id')
+            with stats_lock:
+                opportunity_id = opportunities.get(property_id)
+            result, opportunity_id = self._sync_property_to_ghl(prop, opportunity_id)
+            with stats_lock:
+                if opportunity_id:
+                    opportunities[property_id] = opportunity_id
+                for key, value in result.items():
+                    ghl_stats[key] += value
+
+        def match(batch):
+            self.ghl.fan_out(match_one, claim(batch, 'match', match_min_score))
+            return batch
+
+        def sync(batch):
+            self.ghl.fan_out(sync_one, claim(batch, 'sync', sync_min_score))
+            return batch
+
+        # One dedup worker sees listings in source order, so MLS listings
+        # are always the first-seen versions
+        stages = [
+            PipelineStage('dedup', dedup, 1, queue_size),
+            PipelineStage('analyze', analyze, workers.get('analyze', 4), queue_size, batch_size=batch_size),
+            PipelineStage('store', store, 1, queue_size, batch_size=batch_size)
+        ]
+        if self.ghl:
+            # Each batch is whatever is waiting, fanned out over the
+            # connector's pool; every call shares its rate limiter, so the
+            # request budget stays saturated without being exceeded
+            ghl_batch = self.ghl.max_connections
+            stages.append(PipelineStage('match', match, workers.get('match', 1), queue_size,
+                                        batch_size=ghl_batch))
+            stages.append(PipelineStage('sync', sync, workers.get('sync', 1), queue_size,
+                                        batch_size=ghl_batch))
+
+        pipeline = Pipeline(stages, sink=deduplicator.finish)
+        with parallel or nullcontext():
+            stats['pipeline'] = pipeline.run(source())
+        analyzed_properties = deduplicator.results()
+
+        stats['scraped'] = counts['scraped']
+        stats['unique'] = deduplicator.unique
+        stats['duplicates_removed'] = deduplicator.duplicates
+        stats['analyzed'] = len(analyzed_properties)
+        stats['matches'] = match_stats
+        stats['ghl'] = ghl_stats
+        if self.analyzer.analysis_cache:
+            if parallel:
+                # Reuse was counted by the worker processes' caches
+                reused, rescored = parallel.stats['reused'], parallel.stats['rescored']
+                total = reused + rescored
+                stats['analysis_reuse'] = {'reused': reused, 'rescored': rescored,
+                                           'hit_rate': reused / total if total else 0.0}
+            else:
+                stats['analysis_reuse'] = self.analyzer.analysis_cache.get_cache_stats()
+            self.analyzer.analysis_cache.prune()
+        if parallel:
+            market_queries = parallel.stats['market_queries']
+        else:
+            market_queries = self.analyzer.market_stats.get_cache_stats()['queries'] - market_queries
 
-    def _match_properties_to_buyers(self, properties: List[Dict]) -> Dict:
-        """Match properties to GHL buyers"""
-        total_matches = 0
-        notified_buyers = 0
+        self.logger.info(f"Merged {deduplicator.duplicates} duplicates")
+        self.logger.info(f"Analyzed {len(analyzed_properties)} properties ({market_queries} market queries)")
+        self.logger.info(f"Created {match_stats['total_matches']} matches, "
+                        f"notified {match_stats['notified_buyers']} buyers")
+        return analyzed_properties
 
-        # Filter to high-scoring properties
-        min_score = self.config.get('gohighlevel', {}).get('automation_rules', {}).get('min_score_for_opportunity', 70)
-        high_score_properties = [p for p in properties
-                                if p.get('opportunity_score', 0) >= min_score]
+    def _min_opportunity_score(self, default: int) -> int:
+        """Opportunity score a property needs for buyer matching and GHL sync"""
+        return self.config.get('gohighlevel', {}).get('automation_rules', {}).get(
+            'min_score_for_opportunity', default)
 
-        self.logger.info(f"Matching {len(high_score_properties)} high-scoring properties to buyers...")
+    def _match_property_to_buyers(self, prop: Dict,
+                                  matched: frozenset = frozenset()) -> Tuple[int, int, List[str]]:
+        """
+        Match one high-scoring property to buyers
 
-        for prop in high_score_properties:
-            try:
-                matches = self.buyer_matcher.match_property_to_buyers(prop)
-
-                if matches:
-                    # Store matches in database
-                    for buyer in matches:
-                        self.db.insert_property_match(
-                            property_id=prop.get('id'),
-                            buyer_id=buyer['id'],
-                            match_data={
-                                'match_score': buyer['match_score'],
-                                'match_reasons': json.dumps(buyer['match_reasons'])
-                            }
-                        )
-
-                    # Notify matched buyers
-                    notify_stats = self.buyer_matcher.notify_matched_buyers(prop, matches)
-                    total_matches += len(matches)
-                    notified_buyers += notify_stats.get('notified', 0)
+        Args:
+            prop: Analyzed property (callers apply the score threshold)
+            matched: Contact IDs already matched to this property, e.g. by an
+                earlier version before a duplicate listing was merged into it
 
-            except Exception as e:
-                self.logger.warning(f"Failed to match property: {e}")
+        Returns:
+            Tuple of (new matches, buyers notified, newly matched contact IDs)
+        """
+        try:
+            matches = [buyer for buyer in self.buyer_matcher.match_property_to_buyers(prop)
+                       if buyer['contact_id'] not in matched]
+
+            if matches:
+                # Store matches in database
+                for buyer in matches:
+                    self.db.insert_property_match(
+                        property_id=prop.get('id'),
+                        buyer_id=buyer['id'],
+                        match_data={
+                            'match_score': buyer['match_score'],
+                            'match_reasons': json.dumps(buyer['match_reasons'])
+                        }
+                    )
+
+                # Notify matched buyers
+                notify_stats = self.buyer_matcher.notify_matched_buyers(prop, matches)
+                return (len(matches), notify_stats.get('notified', 0),
+                        [buyer['contact_id'] for buyer in matches])
 
-        self.logger.info(f"Created {total_matches} matches, notified {notified_buyers} buyers")
+        except Exception as e:
+            self.logger.warning(f"Failed to match property: {e}")
 
-        return {
-            'total_matches': total_matches,
-            'notified_buyers': notified_buyers
-        }
+        return 0, 0, []
 
-    def _sync_to_ghl(self, properties: List[Dict]) -> Dict:
-        """Sync high-scoring properties to GHL"""
-        min_score = self.config.get('gohighlevel', {}).get('automation_rules', {}).get('min_score_for_opportunity', 75)
-        hot_deal_threshold = self.config.get('gohighlevel', {}).get('automation_rules', {}).get('hot_deal_threshold', 90)
+    def _sync_property_to_ghl(self, prop: Dict,
+                              opportunity_id: Optional[str] = None) -> Tuple[Dict, Optional[str]]:
+        """
+        Create the GHL opportunity, tasks and hot deal workflow for one property
 
-        high_score_props = [p for p in properties if p.get('opportunity_score', 0) >= min_score]
+        Args:
+            prop: Analyzed property (callers apply the score threshold)
+            opportunity_id: Opportunity already created for an earlier version
+                of this property; it is updated with the newer data instead
 
-        self.logger.info(f"Syncing {len(high_score_props)} high-scoring properties to GHL...")
+        Returns:
+            Tuple of (counts, opportunity ID or None if the sync failed)
+        """
+        hot_deal_threshold = self.config.get('gohighlevel', {}).get('automation_rules', {}).get('hot_deal_threshold', 90)
 
-        opportunities_created = 0
-        workflows_triggered = 0
-        tasks_created = 0
+        result = {'opportunities_created': 0, 'opportunities_updated': 0,
+                  'workflows_triggered': 0, 'tasks_created': 0}
 
-        for prop in high_score_props:
-            try:
-                # Create opportunity
-                opp_id = self.ghl_workflows.create_opportunity_from_property(prop)
-                opportunities_created += 1
+        if opportunity_id:
+            if self.ghl_workflows.update_opportunity_from_property(prop, opportunity_id):
+                result['opportunities_updated'] += 1
+            return result, opportunity_id
 
-                # Create tasks
-                task_ids = self.ghl_workflows.create_tasks_for_property(prop, opp_id)
-                tasks_created += len(task_ids)
+        try:
+            # Create opportunity
+            opp_id = self.ghl_workflows.create_opportunity_from_property(prop)
+            result['opportunities_created'] += 1
 
-                # Trigger hot deal workflow if score >= threshold
-                if prop.get('opportunity_score', 0) >= hot_deal_threshold:
-                    self.ghl_workflows.trigger_hot_deal_workflow(prop, opp_id)
-                    workflows_triggered += 1
+            # Create tasks
+            task_ids = self.ghl_workflows.create_tasks_for_property(prop, opp_id)
+            result['tasks_created'] += len(task_ids)
 
-                # Update database with GHL opportunity ID
-                self.db.mark_property_synced(prop.get('property_id'), opp_id)
+            # Trigger hot deal workflow if score >= threshold
+            if prop.get('opportunity_score', 0) >= hot_deal_threshold:
+                self.ghl_workflows.trigger_hot_deal_workflow(prop, opp_id)
+                result['workflows_triggered'] += 1
 
-            except Exception as e:
-                self.logger.warning(f"Failed to sync property to GHL: {e}")
+            # Update database with GHL opportunity ID
+            self.db.mark_property_synced(prop.get('property_id'), opp_id)
+            return result, opp_id
 
-        self.logger.info(f"GHL sync complete: {opportunities_created} opportunities, {workflows_triggered} workflows, {tasks_created} tasks")
+        except Exception as e:
+            self.logger.warning(f"Failed to sync property to GHL: {e}")
 
-        return {
-            'opportunities_created': opportunities_created,
-            'workflows_triggered': workflows_triggered,
-            'tasks_created': tasks_created
-        }
+        return result, None
 
     def _generate_reports(self, properties: List[Dict], stats: Dict) -> str:
         """Generate email and Excel reports"""
@@ -535,6 +639,13 @@ class DealFinderPro:
 
         return prop
 
+    def refresh_market_snapshots(self):
+        """Recompute today's market snapshots for every ZIP code (daily job)"""
+        self.logger.info("Refreshing market snapshots...")
+        snapshots = self.db.refresh_market_snapshots()
+        zip_codes = len({row['zip_code'] for row in snapshots})
+        self.logger.info(f"Stored {len(snapshots)} market snapshots for {zip_codes} ZIP codes")
+
     def generate_reports_only(self):
         """Generate reports from existing database data"""
         self.logger.info("Generating reports from database...")
@@ -561,11 +672,13 @@ def main():
         epilog="""
 Examples:
   python main.py --full-workflow                 Run complete daily workflow
+  python main.py --full-workflow --force-rescore Re-analyze every property
   python main.py --test-ghl                      Test GHL connection
   python main.py --test-db                       Test database connection
   python main.py --test-scrape 90210             Test scraping single ZIP code
   python main.py --analyze-property PROP123      Analyze single property
   python main.py --generate-report               Generate reports only
+  python main.py --refresh-market-snapshots      Refresh daily market snapshots
         """
     )
 
@@ -576,6 +689,10 @@ Examples:
     parser.add_argument('--test-scrape', type=str, metavar='ZIP', help='Test scraping (provide ZIP code)')
     parser.add_argument('--analyze-property', type=str, metavar='ID', help='Analyze single property by ID')
     parser.add_argument('--generate-report', action='store_true', help='Generate reports only')
+    parser.add_argument('--refresh-market-snapshots', action='store_true',
+                        help='Recompute today\'s market snapshots for all ZIP codes')
+    parser.add_argument('--force-rescore', action='store_true',
+                        help='Re-analyze all properties instead of reusing unchanged analyses')
 
     args = parser.parse_args()
 
@@ -587,7 +704,7 @@ Examples:
 
     # Initialize application
     try:
-        app = DealFinderPro(config_path=args.config)
+        app = DealFinderPro(config_path=args.config, force_rescore=args.force_rescore)
     except Exception as e:
         print(f"Error initializing application: {e}")
         sys.exit(1)
@@ -612,6 +729,9 @@ Examples:
         elif args.generate_report:
             app.generate_reports_only()
 
+        elif args.refresh_market_snapshots:
+            app.refresh_market_snapshots()
+
         else:
             parser.print_help()
 
@@ -0,0 +1,106 @@
+"""
+Address Normalizer Module for DealFinder Pro
+One normalization for every place addresses are compared.
+
+An address is upper-cased and tokenized once; each token is then mapped
+through a single dict (STREET -> ST, NORTH -> N, APARTMENT/SUITE/# -> UNIT,
+...). Only whole tokens are rewritten, so "Northridge" stays intact.
+Results are kept in a bounded LRU keyed by the raw string, so the same
+listing address seen by dedup, schema mapping and agent matching is only
+normalized once.
+
+The normalized key is stable: stored keys (agent match dedup) only need
+recomputing when ADDRESS_KEY_VERSION changes.
+"""
+
+from functools import lru_cache
+from typing import Dict, Tuple
+
+
+# Bump when normalization rules change so stored keys are recomputed
+ADDRESS_KEY_VERSION = 1
+
+# Raw addresses whose normalization is kept
+ADDRESS_CACHE_SIZE = 65536
+
+# Whole-token rewrites applied to the upper-cased address
+ADDRESS_TOKENS = {
+    'STREET': 'ST',
+    'AVENUE': 'AVE',
+    'ROAD': 'RD',
+    'DRIVE': 'DR',
+    'BOULEVARD': 'BLVD',
+    'LANE': 'LN',
+    'COURT': 'CT',
+    'CIRCLE': 'CIR',
+    'PLACE': 'PL',
+    'TERRACE': 'TER',
+    'PARKWAY': 'PKWY',
+    'NORTH': 'N',
+    'SOUTH': 'S',
+    'EAST': 'E',
+    'WEST': 'W',
+    # Unit designators all read as UNIT so "Apt 5", "Ste 5" and "#5" agree
+    'APARTMENT': 'UNIT',
+    'APT': 'UNIT',
+    'SUITE': 'UNIT',
+    'STE': 'UNIT',
+    '#': 'UNIT',
+}
+
+# Periods are dropped ("St." -> "ST"); commas separate tokens; "#5" -> "# 5"
+_PUNCTUATION = str.maketrans({'.': '', ',': ' ', '#': ' # '})
+
+
+@lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def _normalize(address: str) -> Tuple[str, str, str, str]:
+    """Normalize once: (key, house number, street, unit)"""
+    tokens = []
+    for token in address.upper().translate(_PUNCTUATION).split():
+        token = ADDRESS_TOKENS.get(token, token)
+        # "Apt #4" has two designators for one unit
+        if not (token == 'UNIT' and tokens and tokens[-1] == 'UNIT'):
+            tokens.append(token)
+
+    house_number = tokens[0] if tokens and tokens[0][:1].isdigit() else ''
+    start = 1 if house_number else 0
+    unit_at = next((i for i in range(start, len(tokens)) if tokens[i] == 'UNIT'), len(tokens))
+    street = ' '.join(tokens[start:unit_at])
+    unit = tokens[unit_at + 1] if unit_at + 1 < len(tokens) else ''
+
+    return ' '.join(tokens), house_number, street, unit
+
+
+def normalize_address(address: str) -> str:
+    """
+    Stable comparison key for an address
+
+    Args:
+        address: Raw address string
+
+    Returns:
+        Upper-case key with standard abbreviations and single spaces
+        ("" for an empty address)
+    """
+    return _normalize(str(address or ''))[0]
+
+
+def parse_address(address: str) -> Dict[str, str]:
+    """
+    Split a street address line into house number, street and unit
+
+    Args:
+        address: Raw street address (e.g. "123 North Main Street, Apt 4")
+
+    Returns:
+        Dict with house_number ("123"), street ("N MAIN ST") and unit ("4");
+        missing parts are ""
+    """
+    _, house_number, street, unit = _normalize(str(address or ''))
+    return {'house_number': house_number, 'street': street, 'unit': unit}
+
+
+def get_cache_stats() -> Dict[str, int]:
+    """Return normalization cache hits, misses and size"""
+    info = _normalize.cache_info()
+    return {'hits': info.hits, 'misses': info.misses, 'size': info.currsize}
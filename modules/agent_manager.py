@@ -3,14 +3,19 @@ AgentManager - Lifecycle Management for SearchAgents
 Handles starting, stopping, scheduling, and monitoring of autonomous agents
 """
 
-from typing import Dict, List, Optional
-from datetime import datetime
+from typing import Deque, Dict, List, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 import logging
+import threading
+import time
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 import atexit
 
 from modules.client_db import get_db
+from modules.match_engine import get_match_engine
 from modules.search_agent import SearchAgent
 
 logger = logging.getLogger(__name__)
@@ -23,17 +28,63 @@ class AgentManager:
     - Schedules periodic checks
     - Monitors agent health
     - Coordinates notifications
+
+    Checks are batched: a single scheduler job queues every agent that is
+    due, and a dispatcher thread evaluates each queued batch against one
+    loaded scan on a worker pool.
     """
 
-    def __init__(self):
-        """Initialize agent manager with scheduler"""
+    def __init__(self, check_interval_hours: float = 4, tick_minutes: float = 5,
+                 max_workers: int = 4):
+        """
+        Initialize agent manager with scheduler
+
+        Args:
+            check_interval_hours: Hours between checks for each agent
+            tick_minutes: How often the scheduler looks for due agents
+            max_workers: Worker threads evaluating a batch
+        """
         self.db = get_db()
+        self.match_engine = get_match_engine()
         self.active_agents: Dict[str, SearchAgent] = {}
+        self.check_interval = timedelta(hours=check_interval_hours)
+
+        # Check queue (agent IDs, de-duplicated) and batch metrics
+        self._pending: Deque[str] = deque()
+        self._pending_set = set()
+        self._queue_cond = threading.Condition()
+        self._stopping = False
+        self._last_run_at: Dict[str, datetime] = {}
+        self.agent_runs: Dict[str, Dict] = {}
+        # Guards agent_runs: written by pool threads, read by status calls
+        self._runs_lock = threading.Lock()
+        self.batch_metrics = {
+            'batches_run': 0,
+            'last_batch_size': 0,
+            'last_batch_latency_seconds': None,
+            'avg_batch_latency_seconds': None,
+            'last_batch_scan': None
+        }
+
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix="agent-check")
+        self._dispatcher = threading.Thread(target=self._dispatch_loop,
+                                            name="agent-dispatcher", daemon=True)
+        self._dispatcher.start()
+
         self.scheduler = BackgroundScheduler()
         self.scheduler.start()
 
+        # One job for all agents: queue whichever are due
+        self.scheduler.add_job(
+            func=self._queue_due_agents,
+            trigger=IntervalTrigger(minutes=tick_minutes),
+            id='agent-checks',
+            replace_existing=True
+        )
+
         # Shutdown scheduler on exit
-        atexit.register(lambda: self.scheduler.shutdown())
+        atexit.register(self.shutdown)
 
         # Load and start all active agents from database
         self._load_active_agents()
@@ -98,7 +149,7 @@ class AgentManager:
 
     def _start_agent(self, agent_id: str):
         """
-        Start an agent and schedule its periodic checks
+        Start an agent and queue its first check
 
         Args:
             agent_id: Agent ID to start
@@ -111,19 +162,92 @@ class AgentManager:
         agent = SearchAgent(agent_id)
         self.active_agents[agent_id] = agent
 
-        # Schedule periodic checks (every 4 hours)
-        self.scheduler.add_job(
-            func=self._run_agent_check,
-            trigger=IntervalTrigger(hours=4),
-            id=agent_id,
-            args=[agent_id],
-            replace_existing=True
-        )
+        # First check runs in the next batch, not inside this call
+        self._queue_check(agent_id)
+
+        logger.info(f"Agent {agent_id} started, first check queued")
+
+    def _queue_check(self, agent_id: str):
+        """
+        Queue an agent for the next evaluation batch
+
+        Args:
+            agent_id: Agent ID to check
+        """
+        with self._queue_cond:
+            if agent_id not in self._pending_set:
+                self._pending.append(agent_id)
+                self._pending_set.add(agent_id)
+            self._queue_cond.notify()
+
+    def _dequeue_check(self, agent_id: str):
+        """Drop an agent's pending check, if any"""
+        with self._queue_cond:
+            if agent_id in self._pending_set:
+                self._pending.remove(agent_id)
+                self._pending_set.discard(agent_id)
+
+    def _queue_due_agents(self):
+        """Queue every active agent whose check interval has elapsed"""
+        now = datetime.now()
+        due = 0
+
+        for agent_id in list(self.active_agents):
+            last_run = self._last_run_at.get(agent_id)
+            if last_run is None or now - last_run >= self.check_interval:
+                self._queue_check(agent_id)
+                due += 1
+
+        if due:
+            logger.info(f"Queued {due} due agents for checking")
+
+    def _dispatch_loop(self):
+        """Run queued checks in batches until shutdown"""
+        while True:
+            with self._queue_cond:
+                while not self._pending and not self._stopping:
+                    self._queue_cond.wait()
+                if self._stopping:
+                    return
+
+                batch = list(self._pending)
+                self._pending.clear()
+                self._pending_set.clear()
+
+            self.run_batch(batch)
+
+    def run_batch(self, agent_ids: List[str]):
+        """
+        Evaluate a batch of agents against the current scan
+
+        The scan is loaded and indexed once for the whole batch; agents
+        then run on the worker pool.
 
-        # Run initial check immediately
-        self._run_agent_check(agent_id)
+        Args:
+            agent_ids: Agent IDs to check
+        """
+        if not agent_ids:
+            return
 
-        logger.info(f"Agent {agent_id} started and scheduled for 4-hour checks")
+        start = time.time()
+        index = self.match_engine.get_index()
+        scan_timestamp = index.scan_timestamp if index else None
+
+        logger.info(f"Running batch of {len(agent_ids)} agent checks (scan {scan_timestamp})")
+        list(self.executor.map(self._run_agent_check, agent_ids))
+
+        latency = time.time() - start
+        metrics = self.batch_metrics
+        metrics['batches_run'] += 1
+        metrics['last_batch_size'] = len(agent_ids)
+        metrics['last_batch_latency_seconds'] = round(latency, 3)
+        metrics['last_batch_scan'] = scan_timestamp
+        previous_avg = metrics['avg_batch_latency_seconds'] or 0
+        metrics['avg_batch_latency_seconds'] = round(
+            previous_avg + (latency - previous_avg) / metrics['batches_run'], 3
+        )
+
+        logger.info(f"Batch of {len(agent_ids)} agents finished in {latency:.2f}s")
 
     def _run_agent_check(self, agent_id: str):
         """
@@ -132,6 +256,9 @@ class AgentManager:
         Args:
             agent_id: Agent ID to check
         """
+        start = time.time()
+        run = {'matches': 0, 'new_matches': 0, 'error': None}
+
         try:
             agent = self.active_agents.get(agent_id)
             if not agent:
@@ -142,17 +269,39 @@ class AgentManager:
 
             # Check for matches
             matches = agent.check_for_matches()
+            run['matches'] = len(matches)
 
             # Process any new matches
             if matches:
                 new_count = agent.process_new_matches(matches)
+                run['new_matches'] = new_count
                 logger.info(f"Agent {agent_id}: Processed {new_count} new matches")
             else:
                 logger.info(f"Agent {agent_id}: No new matches found")
 
         except Exception as e:
+            run['error'] = str(e)
             logger.error(f"Error running check for agent {agent_id}: {e}", exc_info=True)
 
+        finally:
+            if agent_id in self.active_agents:
+                now = datetime.now()
+                self._last_run_at[agent_id] = now
+                run['last_run'] = now.isoformat()
+                run['duration_seconds'] = round(time.time() - start, 3)
+                with self._runs_lock:
+                    self.agent_runs[agent_id] = run
+
+    def shutdown(self):
+        """Stop the scheduler, dispatcher and worker pool"""
+        with self._queue_cond:
+            self._stopping = True
+            self._queue_cond.notify_all()
+
+        if self.scheduler.running:
+            self.scheduler.shutdown(wait=False)
+        self.executor.shutdown(wait=False)
+
     def pause_agent(self, agent_id: str):
         """
         Pause an agent (stop scheduled checks)
@@ -168,8 +317,8 @@ class AgentManager:
         agent = self.active_agents[agent_id]
         agent.pause()
 
-        # Remove from scheduler
-        self.scheduler.remove_job(agent_id)
+        # Drop any queued check
+        self._dequeue_check(agent_id)
 
         # Remove from active agents
         del self.active_agents[agent_id]
@@ -199,8 +348,8 @@ class AgentManager:
             agent_id: Agent ID to cancel
         """
         if agent_id in self.active_agents:
-            # Remove from scheduler
-            self.scheduler.remove_job(agent_id)
+            # Drop any queued check
+            self._dequeue_check(agent_id)
 
             # Cancel agent
             agent = self.active_agents[agent_id]
@@ -222,8 +371,8 @@ class AgentManager:
             agent_id: Agent ID to complete
         """
         if agent_id in self.active_agents:
-            # Remove from scheduler
-            self.scheduler.remove_job(agent_id)
+            # Drop any queued check
+            self._dequeue_check(agent_id)
 
             # Complete agent
             agent = self.active_agents[agent_id]
@@ -247,27 +396,32 @@ class AgentManager:
         Returns:
             Status dictionary or None if not found
         """
-        agent = self.active_agents.get(agent_id)
-        if agent:
-            return agent.get_status_summary()
-
-        # Try to get from database
-        agent_data = self.db.get_agent(agent_id)
-        if not agent_data:
+        summary = self.db.get_agent_summary(agent_id)
+        if not summary:
             return None
 
-        matches = self.db.get_agent_matches(agent_id)
-
-        return {
-            'agent_id': agent_id,
-            'client_name': agent_data.get('client_name'),
-            'status': agent_data.get('status'),
-            'created_at': agent_data.get('created_at'),
-            'last_check': agent_data.get('last_check'),
-            'matches_found': len(matches),
-            'new_matches': len([m for m in matches if m['status'] == 'new'])
+        return self._status_from_summary(summary)
+
+    def _status_from_summary(self, summary: Dict) -> Dict:
+        """Build an agent status dict from a database summary row"""
+        status = {
+            'agent_id': summary['agent_id'],
+            'client_name': summary.get('client_name'),
+            'status': summary.get('status'),
+            'created_at': summary.get('created_at'),
+            'last_check': summary.get('last_check'),
+            'matches_found': summary['total_matches'],
+            'new_matches': summary['new_matches']
         }
 
+        # Loaded agents also describe their criteria (no database access)
+        agent = self.active_agents.get(summary['agent_id'])
+        if agent:
+            status['status'] = agent.status
+            status['criteria_summary'] = agent._get_criteria_summary()
+
+        return status
+
     def list_active_agents(self, client_id: Optional[str] = None) -> List[Dict]:
         """
         List all active agents, optionally filtered by client
@@ -278,16 +432,8 @@ class AgentManager:
         Returns:
             List of agent status dictionaries
         """
-        agents = self.db.get_active_agents(client_id=client_id)
-
-        result = []
-        for agent_data in agents:
-            agent_id = agent_data['agent_id']
-            status = self.get_agent_status(agent_id)
-            if status:
-                result.append(status)
-
-        return result
+        summaries = self.db.get_active_agent_summaries(client_id=client_id)
+        return [self._status_from_summary(summary) for summary in summaries]
 
     def get_agent_matches(self, agent_id: str, status: Optional[str] = None) -> List[Dict]:
         """
@@ -317,8 +463,7 @@ class AgentManager:
         """Force immediate check for all active agents (useful for testing)"""
         logger.info(f"Force checking {len(self.active_agents)} active agents")
 
-        for agent_id in list(self.active_agents.keys()):
-            self._run_agent_check(agent_id)
+        self.run_batch(list(self.active_agents.keys()))
 
     def get_system_status(self) -> Dict:
         """
@@ -327,26 +472,20 @@ class AgentManager:
         Returns:
             Dictionary with system-wide statistics
         """
-        all_agents = self.db.get_active_agents()
-
-        active_count = len([a for a in all_agents if a['status'] == 'active'])
-        paused_count = len([a for a in all_agents if a['status'] == 'paused'])
-
-        total_matches = 0
-        new_matches = 0
-
-        for agent in all_agents:
-            matches = self.db.get_agent_matches(agent['agent_id'])
-            total_matches += len(matches)
-            new_matches += len([m for m in matches if m['status'] == 'new'])
+        counts = self.db.get_status_counts()
+        with self._runs_lock:
+            runs = dict(self.agent_runs)
 
         return {
-            'active_agents': active_count,
-            'paused_agents': paused_count,
-            'total_matches': total_matches,
-            'new_matches': new_matches,
+            'active_agents': counts['agents'].get('active', 0),
+            'paused_agents': counts['agents'].get('paused', 0),
+            'total_matches': sum(counts['matches'].values()),
+            'new_matches': counts['matches'].get('new', 0),
             'scheduler_running': self.scheduler.running,
-            'scheduled_jobs': len(self.scheduler.get_jobs())
+            'scheduled_jobs': len(self.scheduler.get_jobs()),
+            'queue_depth': len(self._pending),
+            **self.batch_metrics,
+            'agent_last_runs': {agent_id: dict(run) for agent_id, run in runs.items()}
         }
 
 
@@ -7,11 +7,12 @@ import os
 import json
 from typing import Dict, List, Optional, Any
 from datetime import datetime
-from pathlib import Path
 import anthropic
 from modules.perplexity_agent import PerplexityAgent
 from modules.client_db import get_db
 from modules.agent_manager import get_agent_manager
+from modules.property_search import get_property_search
+from modules.scan_store import get_scan_store
 from integrations.ghl_connector import GoHighLevelConnector
 
 
@@ -51,7 +52,11 @@ class AIPropertyAgent:
 
         # Initialize GHL connector (optional)
         try:
-            self.ghl_connector = GoHighLevelConnector()
+            ghl_api_key = os.getenv('GHL_API_KEY')
+            ghl_location_id = os.getenv('GHL_LOCATION_ID')
+            self.ghl_connector = GoHighLevelConnector(
+                ghl_api_key, ghl_location_id, caller='chat'
+            ) if ghl_api_key and ghl_location_id else None
         except Exception:
             self.ghl_connector = None
 
@@ -65,13 +70,11 @@ class AIPropertyAgent:
         self.system_prompt = self._build_system_prompt()
 
     def _load_properties(self) -> List[Dict]:
-        """Load property data from latest scan"""
+        """Load property data from the current scan store version"""
         try:
-            scan_file = Path(__file__).parent.parent / 'data' / 'latest_scan.json'
-            if scan_file.exists():
-                with open(scan_file, 'r') as f:
-                    data = json.load(f)
-                return data.get('properties', [])
+            snapshot = get_scan_store().current()
+            if snapshot is not None:
+                return snapshot.properties()
         except Exception as e:
             print(f"Error loading properties: {e}")
         return []
@@ -657,30 +660,11 @@ search_properties, analyze_property, get_market_insights, compare_properties, ca
         limit = params.get('limit', 5)
         sort_by = params.get('sort_by', 'opportunity_score')
 
-        # Filter properties
-        filtered = self.properties.copy()
-
-        if 'min_price' in filters:
-            filtered = [p for p in filtered if p.get('list_price', 0) >= filters['min_price']]
-        if 'max_price' in filters:
-            filtered = [p for p in filtered if p.get('list_price', 0) <= filters['max_price']]
-        if 'city' in filters:
-            city = filters['city'].lower()
-            filtered = [p for p in filtered if city in p.get('city', '').lower()]
-        if 'bedrooms' in filters:
-            filtered = [p for p in filtered if p.get('bedrooms', 0) >= filters['bedrooms']]
-        if 'min_score' in filters:
-            filtered = [p for p in filtered if p.get('opportunity_score', 0) >= filters['min_score']]
-
-        # Sort
-        if sort_by in ['opportunity_score', 'list_price', 'days_on_market']:
-            filtered.sort(key=lambda x: x.get(sort_by, 0), reverse=(sort_by != 'list_price'))
-
-        # Limit results
-        results = filtered[:limit]
+        result = get_property_search().get_index().search(filters, limit=limit, sort_by=sort_by)
+        results = result['properties']
 
         return {
-            "total_found": len(filtered),
+            "total_found": result['total_found'],
             "returned": len(results),
             "properties": [
                 {
@@ -700,14 +684,8 @@ search_properties, analyze_property, get_market_insights, compare_properties, ca
 
     def _tool_analyze_property(self, params: Dict) -> Dict:
         """Analyze property tool implementation"""
-        address = params.get('property_address', '').lower()
-
         # Find property
-        prop = None
-        for p in self.properties:
-            if address in p.get('street_address', '').lower():
-                prop = p
-                break
+        prop = get_property_search().get_index().find_by_address(params.get('property_address', ''))
 
         if not prop:
             return {"error": "Property not found"}
@@ -735,41 +713,7 @@ search_properties, analyze_property, get_market_insights, compare_properties, ca
 
     def _tool_market_insights(self, params: Dict) -> Dict:
         """Market insights tool implementation"""
-        location = params.get('location', '').lower() if params.get('location') else None
-
-        # Filter by location if specified
-        properties = self.properties
-        if location:
-            properties = [p for p in properties if location in p.get('city', '').lower()]
-
-        if not properties:
-            return {"error": "No properties found for location"}
-
-        # Calculate statistics
-        prices = [p.get('list_price', 0) for p in properties if p.get('list_price')]
-        scores = [p.get('opportunity_score', 0) for p in properties]
-        dom = [p.get('days_on_market', 0) for p in properties if p.get('days_on_market')]
-
-        return {
-            "location": location or "All markets",
-            "total_properties": len(properties),
-            "pricing": {
-                "median": sorted(prices)[len(prices)//2] if prices else 0,
-                "average": sum(prices) / len(prices) if prices else 0,
-                "min": min(prices) if prices else 0,
-                "max": max(prices) if prices else 0
-            },
-            "opportunity": {
-                "hot_deals": len([p for p in properties if p.get('opportunity_score', 0) >= 90]),
-                "good_deals": len([p for p in properties if 75 <= p.get('opportunity_score', 0) < 90]),
-                "average_score": sum(scores) / len(scores) if scores else 0
-            },
-            "market_dynamics": {
-                "average_dom": sum(dom) / len(dom) if dom else 0,
-                "quick_sales": len([d for d in dom if d < 30]),
-                "stale_listings": len([d for d in dom if d > 90])
-            }
-        }
+        return get_property_search().get_index().market_insights(params.get('location'))
 
     def _tool_compare_properties(self, params: Dict) -> Dict:
         """Compare properties tool implementation"""
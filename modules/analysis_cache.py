@@ -0,0 +1,201 @@
+"""
+Analysis Cache Module for DealFinder Pro
+Reuses stored property analyses when nothing that feeds the score changed.
+
+Each property is fingerprinted from its scoring inputs (price, size, DOM,
+description, taxes, ...), the market stats it is compared against and the
+scoring configuration (scoring_weights and distressed keywords). Analyses
+are stored in SQLite by fingerprint, so a property is only re-scored when
+one of those inputs differs from a previous run.
+"""
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import zlib
+
+
+# Bump when scoring logic changes so every stored analysis is recomputed
+SCORING_VERSION = 2
+
+# Property fields read by metrics, scoring, signals and recommendations
+SCORING_INPUT_FIELDS = (
+    'street_address', 'zip_code', 'property_type', 'bedrooms', 'list_price',
+    'square_feet', 'days_on_market', 'price_reduction_amount', 'description',
+    'annual_taxes', 'hoa_fee', 'tax_assessed_value'
+)
+
+
+class AnalysisCache:
+    """SQLite-backed store of analyses keyed by scoring-input fingerprint"""
+
+    def __init__(self, config: Dict, db_path: Optional[str] = None, retention_days: int = 30):
+        """
+        Initialize analysis cache
+
+        Args:
+            config: Application config (scoring_weights and undervalued_criteria
+                are part of every fingerprint)
+            db_path: SQLite file (default: data/analysis_cache.db)
+            retention_days: Drop analyses not used for this many days
+        """
+        if db_path is None:
+            db_path = Path(__file__).parent.parent / 'data' / 'analysis_cache.db'
+
+        self.db_path = str(db_path)
+        self.retention_days = retention_days
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self.reused = 0
+        self.rescored = 0
+
+        self.config_digest = self._digest({
+            'scoring_version': SCORING_VERSION,
+            'scoring_weights': config.get('scoring_weights'),
+            'distressed_keywords': config.get('undervalued_criteria', {}).get('distressed_keywords')
+        })
+
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._init_database()
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection; commits on success, rolls back on error"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def _init_database(self):
+        """Create cache table if it doesn't exist"""
+        with self._connect() as conn:
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS analyses (
+                fingerprint TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                created_at TEXT NOT NULL,
+                last_used TEXT NOT NULL
+            )
+            """)
+
+    @staticmethod
+    def _digest(value) -> str:
+        """Stable hash of a JSON-serializable value"""
+        payload = json.dumps(value, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def fingerprint(self, prop: Dict, market_data: Dict) -> str:
+        """
+        Fingerprint of everything that determines a property's analysis
+
+        Args:
+            prop: Property dictionary
+            market_data: Market stats the property is scored against
+
+        Returns:
+            Hex digest
+        """
+        return self._digest([
+            self.config_digest,
+            [prop.get(field) for field in SCORING_INPUT_FIELDS],
+            market_data
+        ])
+
+    def get_many(self, fingerprints: List[str]) -> Dict[str, Dict]:
+        """
+        Load stored analyses
+
+        Args:
+            fingerprints: Fingerprints to look up
+
+        Returns:
+            Analysis dict per fingerprint found
+        """
+        unique = list(dict.fromkeys(fingerprints))
+        found = {}
+
+        with self._connect() as conn:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(unique), 500):
+                chunk = unique[start:start + 500]
+                placeholders = ', '.join('?' * len(chunk))
+                rows = conn.execute(
+                    f"SELECT fingerprint, data FROM analyses WHERE fingerprint IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                for fingerprint, data in rows:
+                    found[fingerprint] = json.loads(zlib.decompress(data))
+
+            if found:
+                now = datetime.now().isoformat()
+                conn.executemany("UPDATE analyses SET last_used = ? WHERE fingerprint = ?",
+                                 [(now, fingerprint) for fingerprint in found])
+
+        with self._lock:
+            self.reused += sum(1 for fingerprint in fingerprints if fingerprint in found)
+
+        return found
+
+    def put_many(self, analyses: Dict[str, Dict]):
+        """
+        Store freshly computed analyses
+
+        Args:
+            analyses: Analysis dict per fingerprint
+        """
+        if not analyses:
+            return
+
+        now = datetime.now().isoformat()
+        rows = [
+            (fingerprint, zlib.compress(json.dumps(analysis, default=str).encode('utf-8')), now, now)
+            for fingerprint, analysis in analyses.items()
+        ]
+
+        with self._lock, self._connect() as conn:
+            conn.executemany("""
+                INSERT INTO analyses (fingerprint, data, created_at, last_used)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (fingerprint) DO UPDATE SET
+                    data = excluded.data,
+                    last_used = excluded.last_used
+            """, rows)
+            self.rescored += len(rows)
+
+    def prune(self) -> int:
+        """
+        Drop analyses not used within retention_days
+
+        Returns:
+            Number of analyses removed
+        """
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).isoformat()
+        with self._lock, self._connect() as conn:
+            return conn.execute("DELETE FROM analyses WHERE last_used < ?", (cutoff,)).rowcount
+
+    def reset_stats(self):
+        """Zero the reuse counters (e.g. at the start of a run)"""
+        with self._lock:
+            self.reused = 0
+            self.rescored = 0
+
+    def get_cache_stats(self) -> Dict:
+        """Return reused/rescored counts and the hit rate"""
+        with self._lock:
+            total = self.reused + self.rescored
+            return {
+                'reused': self.reused,
+                'rescored': self.rescored,
+                'hit_rate': self.reused / total if total else 0.0
+            }
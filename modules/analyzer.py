@@ -1,7 +1,15 @@
 from typing import Dict, List, Optional, Tuple
 import logging
 from datetime import datetime, timedelta
-import statistics
+
+from modules.analysis_cache import AnalysisCache
+from modules.batch_scorer import BatchScorer, BREAKDOWN_COLUMNS, METRIC_COLUMNS
+from modules.keyword_matcher import (
+    HEAVY_REHAB_KEYWORDS, MODERATE_REHAB_KEYWORDS,
+    distressed_keywords, get_keyword_matcher
+)
+from modules.market_stats import MIN_TREND_DAYS, MarketStatsCache
+from modules.scorer import OpportunityScorer
 
 class PropertyAnalyzer:
     """Analyzes properties for investment opportunities"""
@@ -10,6 +18,26 @@ class PropertyAnalyzer:
         self.db = db_manager
         self.config = config
         self.logger = logging.getLogger(__name__)
+        self.scorer = OpportunityScorer(config)
+        self.batch_scorer = BatchScorer(config)
+        self.keywords = get_keyword_matcher(config)
+
+        market_config = config.get('analysis', {}).get('market_data', {})
+        self.market_stats = MarketStatsCache(
+            db_manager,
+            self._summarize_market,
+            ttl_hours=market_config.get('cache_duration_hours', 24)
+        )
+
+        # Stored analyses are reused for properties whose inputs are unchanged
+        incremental_config = config.get('analysis', {}).get('incremental', {})
+        self.analysis_cache = None
+        if incremental_config.get('enabled', False):
+            self.analysis_cache = AnalysisCache(
+                config,
+                db_path=incremental_config.get('path'),
+                retention_days=incremental_config.get('retention_days', 30)
+            )
 
     def analyze_property(self, property_data: Dict) -> Dict:
         """
@@ -29,6 +57,8 @@ class PropertyAnalyzer:
             - investment_metrics: cap_rate, cash_on_cash_return, etc.
             - recommendation: text summary
             - distressed_signals: list of motivation indicators
+            - cache_stale: True if price and status come from the scrape
+              cache rather than the latest fetch
         """
         try:
             # Get market data for comparison
@@ -41,12 +71,8 @@ class PropertyAnalyzer:
             # Calculate investment metrics
             metrics = self.calculate_investment_metrics(property_data, market_data)
 
-            # Import scorer for opportunity score calculation
-            from modules.scorer import OpportunityScorer
-            scorer = OpportunityScorer(self.config)
-
             # Calculate opportunity score
-            score, deal_quality, breakdown = scorer.calculate_score(
+            score, deal_quality, breakdown = self.scorer.calculate_score(
                 property_data,
                 market_data,
                 metrics
@@ -76,12 +102,119 @@ class PropertyAnalyzer:
                 'recommendation': recommendation,
                 'distressed_signals': signals,
                 'analysis_date': datetime.now().isoformat(),
-                'market_data': market_data
+                'market_data': market_data,
+                'cache_stale': bool(property_data.get('cache_stale'))
             }
         except Exception as e:
             self.logger.error(f"Error analyzing property: {e}", exc_info=True)
             return self._default_analysis()
 
+    def analyze_properties(self, properties: List[Dict], force_rescore: bool = False) -> List[Dict]:
+        """
+        Analyze a batch of properties with vectorized metrics and scoring
+
+        Produces the same analysis dicts as analyze_property, but computes
+        investment metrics and opportunity scores for the whole batch at once.
+        When the analysis cache is enabled, only properties whose scoring
+        inputs, market stats or scoring config changed are re-scored.
+
+        Args:
+            properties: Property dictionaries
+            force_rescore: Re-score every property, ignoring stored analyses
+
+        Returns:
+            Analysis dict for each property (same order)
+        """
+        if not properties:
+            return []
+
+        market_data = [
+            self.get_market_data(
+                zip_code=prop.get('zip_code', ''),
+                property_type=prop.get('property_type', 'Single Family'),
+                bedrooms=prop.get('bedrooms', 3)
+            )
+            for prop in properties
+        ]
+
+        if self.analysis_cache is None:
+            analyses = [analysis or self._default_analysis()
+                        for analysis in self._score_batch(properties, market_data)]
+            return self._flag_stale(properties, analyses)
+
+        fingerprints = [self.analysis_cache.fingerprint(prop, market)
+                        for prop, market in zip(properties, market_data)]
+        stored = {} if force_rescore else self.analysis_cache.get_many(fingerprints)
+
+        dirty = [i for i, fingerprint in enumerate(fingerprints) if fingerprint not in stored]
+        scored = self._score_batch([properties[i] for i in dirty],
+                                   [market_data[i] for i in dirty])
+
+        fresh = {}
+        analyses = [stored.get(fingerprint) for fingerprint in fingerprints]
+        for i, analysis in zip(dirty, scored):
+            if analysis is None:
+                analyses[i] = self._default_analysis()
+            else:
+                analyses[i] = analysis
+                fresh[fingerprints[i]] = analysis
+        self.analysis_cache.put_many(fresh)
+
+        self.logger.info(f"Reused {len(properties) - len(dirty)}/{len(properties)} stored analyses")
+        return self._flag_stale(properties, analyses)
+
+    @staticmethod
+    def _flag_stale(properties: List[Dict], analyses: List[Dict]) -> List[Dict]:
+        """Mark analyses of listings served from the scrape cache (not stored)"""
+        for prop, analysis in zip(properties, analyses):
+            analysis['cache_stale'] = bool(prop.get('cache_stale'))
+        return analyses
+
+    def _score_batch(self, properties: List[Dict], market_data: List[Dict]) -> List[Optional[Dict]]:
+        """
+        Score properties against their market data in one vectorized pass
+
+        Returns:
+            Analysis dict for each property, or None where analysis failed
+        """
+        if not properties:
+            return []
+
+        frame = self.batch_scorer.build_frame(properties, market_data)
+        scored = self.batch_scorer.score(frame)
+        # to_dict boxes values as native Python int/float/str
+        metric_rows = scored[METRIC_COLUMNS].to_dict('records')
+        score_rows = scored[BREAKDOWN_COLUMNS].to_dict('records')
+
+        analyses = []
+        for prop, market, metrics, breakdown in zip(properties, market_data, metric_rows, score_rows):
+            try:
+                score = breakdown['total_score']
+                deal_quality = breakdown['deal_quality']
+                signals = self.detect_distressed_signals(prop)
+
+                analyses.append({
+                    'opportunity_score': score,
+                    'deal_quality': deal_quality,
+                    'score_breakdown': breakdown,
+                    'below_market_percentage': breakdown['price_advantage_pct'],
+                    'estimated_market_value': metrics['estimated_market_value'],
+                    'estimated_profit': metrics['estimated_profit'],
+                    'investment_metrics': metrics,
+                    'recommendation': self.generate_recommendation(
+                        prop, score, deal_quality, breakdown, signals, metrics
+                    ),
+                    'distressed_signals': signals,
+                    'analysis_date': datetime.now().isoformat(),
+                    'market_data': market
+                })
+            except Exception as e:
+                self.logger.error(f"Error analyzing property: {e}", exc_info=True)
+                analyses.append(None)
+
+        self.logger.info(f"Scored {len(properties)} properties in batch")
+        return analyses
+
     def get_market_data(self, zip_code: str, property_type: str,
                         bedrooms: int) -> Dict:
         """
@@ -101,104 +234,75 @@ class PropertyAnalyzer:
             - price_trend: "rising", "falling", or "stable"
         """
         try:
-            # Query similar properties from last 90 days
-            similar_properties = self.db.get_properties_by_criteria({
-                'zip_code': zip_code,
-                'property_type': property_type,
-                'bedrooms': bedrooms,
-                'created_at_after': (datetime.now() - timedelta(days=90)).isoformat()
-            })
-
-            if not similar_properties or len(similar_properties) < 3:
-                # Fallback to broader search (same ZIP, any type/beds)
-                similar_properties = self.db.get_properties_by_criteria({
-                    'zip_code': zip_code,
-                    'created_at_after': (datetime.now() - timedelta(days=90)).isoformat()
-                })
+            # Served from the per-ZIP cache; falls back to ZIP-wide stats
+            market_data = self.market_stats.get(zip_code, property_type, bedrooms)
 
-            if not similar_properties or len(similar_properties) < 3:
+            if market_data is None:
                 # Final fallback to default values
                 self.logger.warning(f"Insufficient market data for ZIP {zip_code}, using defaults")
                 return self._default_market_data()
 
-            # Calculate price per sqft for properties with valid data
-            prices_per_sqft = []
-            for p in similar_properties:
-                sqft = p.get('square_feet', 0)
-                price = p.get('list_price', 0)
-                if sqft > 0 and price > 0:
-                    prices_per_sqft.append(price / sqft)
-
-            # Calculate days on market
-            dom_values = [p.get('days_on_market', 0) for p in similar_properties
-                         if p.get('days_on_market', 0) > 0]
-
-            # Calculate trend
-            price_trend = self.calculate_price_trend(similar_properties)
-
-            return {
-                'avg_price_per_sqft': statistics.mean(prices_per_sqft) if prices_per_sqft else 250,
-                'median_price_per_sqft': statistics.median(prices_per_sqft) if prices_per_sqft else 250,
-                'avg_days_on_market': statistics.mean(dom_values) if dom_values else 30,
-                'inventory_count': len(similar_properties),
-                'price_trend': price_trend
-            }
+            return market_data
         except Exception as e:
             self.logger.error(f"Error calculating market data: {e}", exc_info=True)
             return self._default_market_data()
 
-    def calculate_price_trend(self, properties: List[Dict]) -> str:
+    def _summarize_market(self, stats: Dict, history: Optional[List[Dict]] = None) -> Dict:
+        """
+        Turn aggregated comparable stats into market data
+
+        Args:
+            stats: Current market_snapshots (or market_stats) row
+            history: Earlier snapshots of the same segment, oldest first
+
+        Returns:
+            Market data dict (see get_market_data)
+        """
+        return {
+            'avg_price_per_sqft': stats.get('avg_price_per_sqft') or 250,
+            'median_price_per_sqft': stats.get('median_price_per_sqft') or 250,
+            'avg_days_on_market': stats.get('avg_days_on_market') or 30,
+            'inventory_count': stats.get('listing_count') or 0,
+            'price_trend': self.calculate_price_trend(stats, history)
+        }
+
+    def calculate_price_trend(self, stats: Dict, history: Optional[List[Dict]] = None) -> str:
         """
         Calculate if prices are rising, falling, or stable
 
+        Compares current $/sqft with the oldest stored snapshot at least
+        MIN_TREND_DAYS old. Without one, compares listings from the last
+        30 days with older listings in the current stats.
+
         Args:
-            properties: List of property dicts with created_at and list_price
+            stats: Current market_snapshots (or market_stats) row
+            history: Earlier snapshots of the same segment, oldest first
 
         Returns:
             "rising", "falling", or "stable"
         """
-        try:
-            # Split properties into recent (last 30 days) vs older (30-90 days)
-            now = datetime.now()
-            thirty_days_ago = now - timedelta(days=30)
-
-            recent_prices = []
-            older_prices = []
-
-            for p in properties:
-                created_at_str = p.get('created_at', '')
-                try:
-                    created_at = datetime.fromisoformat(created_at_str.replace('Z', '+00:00'))
-                    price = p.get('list_price', 0)
-                    sqft = p.get('square_feet', 1)
-
-                    if price > 0 and sqft > 0:
-                        price_per_sqft = price / sqft
-
-                        if created_at >= thirty_days_ago:
-                            recent_prices.append(price_per_sqft)
-                        else:
-                            older_prices.append(price_per_sqft)
-                except (ValueError, TypeError):
-                    continue
-
-            if not recent_prices or not older_prices:
-                return "stable"
-
-            avg_recent = statistics.mean(recent_prices)
-            avg_older = statistics.mean(older_prices)
-
-            # Calculate percentage change
-            pct_change = ((avg_recent - avg_older) / avg_older) * 100
-
-            if pct_change > 3:
-                return "rising"
-            elif pct_change < -3:
-                return "falling"
-            else:
-                return "stable"
-        except Exception as e:
-            self.logger.error(f"Error calculating price trend: {e}")
+        cutoff = (datetime.now() - timedelta(days=MIN_TREND_DAYS)).date().isoformat()
+        baseline = next((row for row in history or []
+                         if row['snapshot_date'] <= cutoff and row.get('avg_price_per_sqft')), None)
+
+        if baseline:
+            avg_recent = stats.get('avg_price_per_sqft')
+            avg_older = baseline['avg_price_per_sqft']
+        else:
+            avg_recent = stats.get('recent_avg_price_per_sqft')
+            avg_older = stats.get('older_avg_price_per_sqft')
+
+        if not avg_recent or not avg_older:
+            return "stable"
+
+        # Calculate percentage change
+        pct_change = ((avg_recent - avg_older) / avg_older) * 100
+
+        if pct_change > 3:
+            return "rising"
+        elif pct_change < -3:
+            return "falling"
+        else:
             return "stable"
 
     def calculate_investment_metrics(self, property_data: Dict,
@@ -243,8 +347,11 @@ class PropertyAnalyzer:
             annual_rental_income = estimated_monthly_rent * 12
 
             # Calculate annual expenses
-            annual_taxes = property_data.get('annual_taxes', list_price * 0.012)
-            annual_hoa = property_data.get('hoa_fee', 0) * 12
+            # Scraped listings store missing taxes and HOA fees as None
+            annual_taxes = property_data.get('annual_taxes')
+            if annual_taxes is None:
+                annual_taxes = list_price * 0.012
+            annual_hoa = (property_data.get('hoa_fee') or 0) * 12
             annual_insurance = list_price * 0.004  # Estimate 0.4% of value
             annual_maintenance = annual_rental_income * 0.10  # 10% of rent
             annual_vacancy = annual_rental_income * 0.08  # 8% vacancy
@@ -287,16 +394,14 @@ class PropertyAnalyzer:
 
     def _estimate_rehab_costs(self, property_data: Dict, list_price: float) -> float:
         """Estimate rehab costs based on description keywords"""
-        description = property_data.get('description', '').lower()
+        found = self.keywords.find(property_data.get('description', '').lower())
 
         # Heavy rehab indicators
-        if any(kw in description for kw in ['fixer upper', 'gut rehab', 'needs work',
-                                             'investor special', 'major repairs']):
+        if not found.isdisjoint(HEAVY_REHAB_KEYWORDS):
             return list_price * 0.20  # 20% of purchase
 
         # Moderate rehab
-        elif any(kw in description for kw in ['tlc', 'as-is', 'cosmetic updates',
-                                               'potential', 'handyman']):
+        elif not found.isdisjoint(MODERATE_REHAB_KEYWORDS):
             return list_price * 0.10  # 10% of purchase
 
         # Light cosmetic
@@ -342,14 +447,8 @@ class PropertyAnalyzer:
                 signals.append(f"Listed {dom} days (motivated seller)")
 
             # Distressed keywords
-            description = property_data.get('description', '').lower()
-            distressed_keywords = self.config.get('undervalued_criteria', {}).get(
-                'distressed_keywords',
-                ['motivated', 'as-is', 'fixer', 'needs work', 'estate sale',
-                 'must sell', 'tlc', 'handyman', 'cash only']
-            )
-
-            found_keywords = [kw for kw in distressed_keywords if kw in description]
+            found = self.keywords.find(property_data.get('description', '').lower())
+            found_keywords = [kw for kw in distressed_keywords(self.config) if kw.lower() in found]
             if found_keywords:
                 signals.append(f"Keywords: {', '.join(found_keywords[:3])}")
 
@@ -0,0 +1,368 @@
+"""
+Batch Scoring Module for DealFinder Pro
+Vectorized investment metrics and opportunity scores over a columnar frame.
+
+Computes the same values as the per-property path
+(PropertyAnalyzer.calculate_investment_metrics, OpportunityScorer.calculate_score
+and SimplePropertyScorer.score_properties) using NumPy array operations, so a
+whole run is scored in a few passes instead of one Python call per listing.
+
+Frame columns (missing columns take the per-property defaults):
+- list_price, square_feet, days_on_market, price_reduction_amount
+- description, annual_taxes, hoa_fee
+- median_price_per_sqft (from the property's market data)
+
+Null annual_taxes / hoa_fee are treated as not provided.
+"""
+
+from typing import Dict, List, Optional
+import logging
+
+import numpy as np
+import pandas as pd
+
+from modules.keyword_matcher import (
+    DISTRESSED_SCORE_KEYWORDS, HEAVY_REHAB_KEYWORDS, MODERATE_REHAB_KEYWORDS,
+    get_keyword_matcher
+)
+
+
+# Financing assumptions for cash-on-cash return
+DOWN_PAYMENT_PCT = 0.20
+MORTGAGE_RATE = 0.07
+MORTGAGE_YEARS = 30
+
+DEFAULT_WEIGHTS = {
+    'price_advantage': 30,
+    'days_on_market': 20,
+    'financial_returns': 25,
+    'condition_price': 15,
+    'location_quality': 10
+}
+
+METRIC_COLUMNS = [
+    'estimated_market_value', 'estimated_profit', 'rehab_estimate', 'cap_rate',
+    'estimated_monthly_rent', 'annual_rental_income', 'annual_expenses',
+    'annual_noi', 'cash_on_cash_return', 'gross_rent_multiplier',
+    'price_per_sqft', 'market_price_per_sqft'
+]
+
+BREAKDOWN_COLUMNS = [
+    'price_score', 'price_advantage_pct', 'dom_score', 'financial_score',
+    'condition_score', 'location_score', 'total_score', 'deal_quality'
+]
+
+
+def round_cents(values: np.ndarray) -> np.ndarray:
+    """
+    Round to 2 decimals exactly like Python's round(x, 2)
+
+    np.round scales by 100 and rounds, which can differ from Python's
+    correctly rounded result when x * 100 lands on a half. Those rare
+    near-ties are re-rounded in Python.
+    """
+    values = np.asarray(values, dtype=float)
+    rounded = np.round(values, 2)
+    with np.errstate(invalid='ignore'):
+        scaled = values * 100
+        near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        rows = np.flatnonzero(near_tie)
+        rounded[rows] = [round(float(value), 2) for value in values[rows]]
+    return rounded
+
+
+def annual_mortgage_factor(rate: float = MORTGAGE_RATE, years: int = MORTGAGE_YEARS):
+    """Monthly payment per dollar of principal, as (numerator, denominator)"""
+    monthly_rate = rate / 12
+    num_payments = years * 12
+    if monthly_rate == 0:
+        return 1.0, float(num_payments)
+    growth = (1 + monthly_rate) ** num_payments
+    return monthly_rate * growth, growth - 1
+
+
+class BatchScorer:
+    """Scores a whole batch of properties with array operations"""
+
+    def __init__(self, config: Dict):
+        """
+        Initialize batch scorer
+
+        Args:
+            config: Configuration dictionary (uses scoring_weights)
+        """
+        self.config = config
+        self.weights = config.get('scoring_weights', DEFAULT_WEIGHTS)
+        self.keywords = get_keyword_matcher(config)
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def build_frame(properties: List[Dict], market_data: Optional[List[Dict]] = None) -> pd.DataFrame:
+        """
+        Build a scoring frame from property dicts
+
+        Args:
+            properties: Property dictionaries
+            market_data: Market data dict for each property (same order)
+
+        Returns:
+            DataFrame with one row per property
+        """
+        frame = pd.DataFrame.from_records(properties) if properties else pd.DataFrame()
+        frame.index = pd.RangeIndex(len(properties))
+        if market_data is not None:
+            frame['median_price_per_sqft'] = [m.get('median_price_per_sqft', 250) for m in market_data]
+        return frame
+
+    @staticmethod
+    def _numeric(frame: pd.DataFrame, column: str, default: float) -> np.ndarray:
+        """Column as float64 (nulls become NaN), or default when absent"""
+        if column not in frame:
+            return np.full(len(frame), default, dtype=float)
+        return pd.to_numeric(frame[column], errors='coerce').to_numpy(dtype=float)
+
+    def _keyword_hits(self, frame: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """
+        Hits for every scoring keyword, from one matcher pass per description
+
+        Returns:
+            Boolean array per keyword, plus a 'null_description' entry
+        """
+        if 'description' in frame:
+            descriptions = frame['description']
+            null_description = descriptions.isna().to_numpy()
+            found = self.keywords.find_all(
+                str(text).lower() for text in descriptions.fillna('')
+            )
+        else:
+            null_description = np.zeros(len(frame), dtype=bool)
+            found = [frozenset()] * len(frame)
+
+        hits = {'null_description': null_description}
+        for keyword in set(DISTRESSED_SCORE_KEYWORDS + HEAVY_REHAB_KEYWORDS + MODERATE_REHAB_KEYWORDS):
+            hits[keyword] = np.fromiter((keyword in phrases for phrases in found),
+                                        dtype=bool, count=len(found))
+        return hits
+
+    @staticmethod
+    def _any_hit(hits: Dict[str, np.ndarray], keywords: List[str]) -> np.ndarray:
+        """True where a description contains any of the keywords"""
+        return np.logical_or.reduce([hits[keyword] for keyword in keywords])
+
+    def investment_metrics(self, frame: pd.DataFrame,
+                           keyword_hits: Optional[Dict[str, np.ndarray]] = None) -> pd.DataFrame:
+        """
+        Calculate investment metrics for every row
+
+        Args:
+            frame: Scoring frame (see module docstring)
+            keyword_hits: Precomputed _keyword_hits for the frame
+
+        Returns:
+            DataFrame with the calculate_investment_metrics keys as columns.
+            Rows the per-property path rejects get the default (all zero) metrics.
+        """
+        list_price = self._numeric(frame, 'list_price', 0)
+        sqft = self._numeric(frame, 'square_feet', 1)
+        median_ppsf = self._numeric(frame, 'median_price_per_sqft', 250)
+        hits = keyword_hits if keyword_hits is not None else self._keyword_hits(frame)
+
+        valid = (list_price > 0) & (sqft > 0) & ~hits['null_description']
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            market_value = median_ppsf * sqft
+
+            heavy = self._any_hit(hits, HEAVY_REHAB_KEYWORDS)
+            moderate = self._any_hit(hits, MODERATE_REHAB_KEYWORDS)
+            rehab_estimate = np.where(heavy, list_price * 0.20,
+                                      np.where(moderate, list_price * 0.10, list_price * 0.05))
+
+            # Profit potential (70% ARV rule for flips)
+            max_purchase_price = market_value * 0.70 - rehab_estimate
+            potential_profit = max_purchase_price - list_price
+
+            # Rental income (1% rule)
+            monthly_rent = market_value * 0.01
+            annual_rent = monthly_rent * 12
+
+            annual_taxes = self._numeric(frame, 'annual_taxes', np.nan)
+            annual_taxes = np.where(np.isnan(annual_taxes), list_price * 0.012, annual_taxes)
+            hoa_fee = self._numeric(frame, 'hoa_fee', 0)
+            annual_hoa = np.where(np.isnan(hoa_fee), 0, hoa_fee) * 12
+            annual_insurance = list_price * 0.004
+            annual_maintenance = annual_rent * 0.10
+            annual_vacancy = annual_rent * 0.08
+
+            total_expenses = (annual_taxes + annual_hoa + annual_insurance +
+                              annual_maintenance + annual_vacancy)
+            noi = annual_rent - total_expenses
+            cap_rate = (noi / list_price) * 100
+
+            down_payment = list_price * DOWN_PAYMENT_PCT
+            numerator, denominator = annual_mortgage_factor()
+            annual_mortgage = (list_price * (1 - DOWN_PAYMENT_PCT)) * numerator / denominator * 12
+            cash_flow = noi - annual_mortgage
+            cash_on_cash = np.where(down_payment > 0, (cash_flow / down_payment) * 100, 0)
+
+            grm = np.where(annual_rent > 0, list_price / annual_rent, 0)
+            price_per_sqft = list_price / sqft
+
+        columns = {
+            'estimated_market_value': market_value,
+            'estimated_profit': potential_profit,
+            'rehab_estimate': rehab_estimate,
+            'cap_rate': cap_rate,
+            'estimated_monthly_rent': monthly_rent,
+            'annual_rental_income': annual_rent,
+            'annual_expenses': total_expenses,
+            'annual_noi': noi,
+            'cash_on_cash_return': cash_on_cash,
+            'gross_rent_multiplier': grm,
+            'price_per_sqft': price_per_sqft,
+            'market_price_per_sqft': median_ppsf
+        }
+        return pd.DataFrame(
+            {name: np.where(valid, round_cents(values), 0) for name, values in columns.items()},
+            index=frame.index
+        )
+
+    def opportunity_scores(self, frame: pd.DataFrame, metrics: pd.DataFrame,
+                           keyword_hits: Optional[Dict[str, np.ndarray]] = None) -> pd.DataFrame:
+        """
+        Calculate opportunity score components for every row
+
+        Args:
+            frame: Scoring frame (see module docstring)
+            metrics: Output of investment_metrics for the same frame
+            keyword_hits: Precomputed _keyword_hits for the frame
+
+        Returns:
+            DataFrame with the calculate_score breakdown keys as columns
+        """
+        list_price = self._numeric(frame, 'list_price', 0)
+        sqft = self._numeric(frame, 'square_feet', 0)
+        market_avg = self._numeric(frame, 'median_price_per_sqft', 250)
+        dom = self._numeric(frame, 'days_on_market', 0)
+        price_reduction = self._numeric(frame, 'price_reduction_amount', 0)
+        hits = keyword_hits if keyword_hits is not None else self._keyword_hits(frame)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Factor 1: Price advantage vs market $/sqft
+            priced = (sqft > 0) & (list_price > 0) & (market_avg != 0)
+            advantage_pct = ((market_avg - list_price / sqft) / market_avg) * 100
+            advantage_pct = np.where(priced, advantage_pct, 0.0)
+            price_score = np.select(
+                [advantage_pct >= 20, advantage_pct >= 15, advantage_pct >= 10, advantage_pct >= 5],
+                [30, 25, 20, 10], 0
+            )
+            price_score = np.where(priced, price_score, 0)
+
+            # Factor 2: Days on market
+            dom_score = np.select([dom >= 90, dom >= 60, dom >= 30], [20, 15, 10], 5)
+
+            # Factor 3: Financial returns (better of rental and flip)
+            cap_rate = metrics['cap_rate'].to_numpy(dtype=float)
+            rental_score = np.select([cap_rate >= 10, cap_rate >= 8, cap_rate >= 6, cap_rate >= 4],
+                                     [25, 20, 15, 10], 5)
+            flip_price = self._numeric(frame, 'list_price', 1)
+            profit = metrics['estimated_profit'].to_numpy(dtype=float)
+            profit_pct = np.where(flip_price > 0, profit / flip_price * 100, 0)
+            flip_score = np.select([profit_pct >= 25, profit_pct >= 20, profit_pct >= 15, profit_pct >= 10],
+                                   [25, 20, 15, 10], 5)
+            financial_score = np.where(np.isnan(flip_price), 10, np.maximum(rental_score, flip_score))
+
+            # Factor 4: Price reductions and distressed keywords
+            reduction_points = np.select([price_reduction >= 20000, price_reduction >= 10000], [5, 3], 0)
+            keyword_count = np.sum([hits[keyword] for keyword in DISTRESSED_SCORE_KEYWORDS], axis=0)
+            keyword_points = np.select([keyword_count >= 3, keyword_count >= 1], [10, 5], 0)
+            condition_score = np.minimum(reduction_points + keyword_points, 15)
+            condition_score = np.where(np.isnan(price_reduction) | hits['null_description'],
+                                       0, condition_score)
+
+            # Factor 5: Location (neutral until location data is integrated)
+            location_score = np.full(len(frame), 5)
+
+        weighted = ((price_score / 30) * self.weights['price_advantage'] +
+                    (dom_score / 20) * self.weights['days_on_market'] +
+                    (financial_score / 25) * self.weights['financial_returns'] +
+                    (condition_score / 15) * self.weights['condition_price'] +
+                    (location_score / 10) * self.weights['location_quality'])
+        total_score = np.clip(np.rint(weighted), 0, 100).astype(int)
+
+        deal_quality = np.select(
+            [total_score >= 90, total_score >= 75, total_score >= 60],
+            ["HOT DEAL", "GOOD OPPORTUNITY", "FAIR DEAL"], "PASS"
+        )
+
+        return pd.DataFrame({
+            'price_score': price_score,
+            'price_advantage_pct': advantage_pct,
+            'dom_score': dom_score,
+            'financial_score': financial_score,
+            'condition_score': condition_score,
+            'location_score': location_score,
+            'total_score': total_score,
+            'deal_quality': deal_quality
+        }, index=frame.index)
+
+    def score(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """
+        Calculate investment metrics and opportunity scores
+
+        Args:
+            frame: Scoring frame (see module docstring)
+
+        Returns:
+            Metrics and score breakdown columns side by side
+        """
+        hits = self._keyword_hits(frame)
+        metrics = self.investment_metrics(frame, hits)
+        scores = self.opportunity_scores(frame, metrics, hits)
+        return pd.concat([metrics, scores], axis=1)
+
+    def simple_scores(self, frame: pd.DataFrame) -> np.ndarray:
+        """
+        Unrounded SimplePropertyScorer opportunity scores
+
+        Args:
+            frame: Frame with list_price, square_feet/sqft, days_on_market and
+                tax_assessed_value/assessed_value/estimated_value columns
+
+        Returns:
+            Score per row (0-100)
+        """
+        def first_truthy(*columns):
+            result = np.zeros(len(frame))
+            for column in reversed(columns):
+                values = self._numeric(frame, column, 0)
+                result = np.where(np.isnan(values) | (values == 0), result, values)
+            return result
+
+        list_price = first_truthy('list_price')
+        assessed_value = first_truthy('tax_assessed_value', 'assessed_value', 'estimated_value')
+        days_on_market = first_truthy('days_on_market')
+        sqft = first_truthy('square_feet', 'sqft')
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            price_per_sqft = list_price / sqft
+            valid_ppsf = price_per_sqft[(sqft > 0) & (list_price != 0)]
+            avg_price_per_sqft = float(np.median(valid_ppsf)) if len(valid_ppsf) else 0
+
+            # 1. Price below market (40 points max)
+            discount_pct = ((assessed_value - list_price) / assessed_value) * 100
+            score = np.where((list_price != 0) & (assessed_value != 0) & (list_price < assessed_value),
+                             np.minimum(discount_pct * 1.6, 40), 0.0)
+
+            # 2. Days on market (30 points max)
+            score = score + np.where(days_on_market != 0, np.minimum(days_on_market / 3, 30), 0)
+
+            # 3. Price per sqft vs batch median (30 points max)
+            if avg_price_per_sqft:
+                sqft_discount = ((avg_price_per_sqft - price_per_sqft) / avg_price_per_sqft) * 100
+                score = score + np.where(
+                    (sqft != 0) & (list_price != 0) & (price_per_sqft < avg_price_per_sqft),
+                    np.minimum(sqft_discount * 1.2, 30), 0
+                )
+
+        return np.minimum(score, 100)
@@ -1,14 +1,87 @@
 """
 Client Database Module
 Manages clients, search criteria, active agents, and match history using SQLite
+
+The database is shared by API handlers, scheduler threads running agent
+checks and the AI agent, so it runs in WAL mode:
+- Reads use pooled connections and never wait for writers
+- Writes are queued to one writer thread, which commits everything queued
+  in a single transaction (each write inside its own savepoint, so one
+  failure doesn't undo the others) and then wakes the callers
+- Hot statements are module constants, so every call hits sqlite3's
+  per-connection prepared statement cache
 """
 
 import sqlite3
 import json
+import queue
+import threading
 import uuid
+from concurrent.futures import Future
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Set, Tuple
 from pathlib import Path
+import logging
+
+from modules.address_normalizer import ADDRESS_KEY_VERSION, normalize_address
+
+logger = logging.getLogger(__name__)
+
+# Most writes committed together by the writer thread
+WRITE_BATCH_SIZE = 256
+
+# Idle read connections kept open
+READ_POOL_SIZE = 16
+
+SELECT_CLIENT = "SELECT * FROM clients WHERE client_id = ?"
+SELECT_SEARCH_CRITERIA = "SELECT * FROM search_criteria WHERE criteria_id = ?"
+SELECT_AGENT = """
+    SELECT a.*, c.name as client_name, s.*
+    FROM active_agents a
+    JOIN clients c ON a.client_id = c.client_id
+    JOIN search_criteria s ON a.criteria_id = s.criteria_id
+    WHERE a.agent_id = ?
+"""
+SELECT_AGENT_MATCHES = """
+    SELECT * FROM agent_matches
+    WHERE agent_id = ?
+    ORDER BY matched_at DESC
+"""
+SELECT_AGENT_MATCHES_BY_STATUS = """
+    SELECT * FROM agent_matches
+    WHERE agent_id = ? AND status = ?
+    ORDER BY matched_at DESC
+"""
+INSERT_MATCH = """
+    INSERT INTO agent_matches (
+        match_id, agent_id, property_address, property_data,
+        matched_at, status, normalized_address
+    ) VALUES (?, ?, ?, ?, ?, 'new', ?)
+    ON CONFLICT (agent_id, normalized_address) DO NOTHING
+"""
+SELECT_MATCHED_ADDRESSES = """
+    SELECT normalized_address FROM agent_matches
+    WHERE agent_id = ? AND normalized_address IS NOT NULL
+"""
+INCREMENT_AGENT_MATCHES = """
+    UPDATE active_agents
+    SET matches_found = matches_found + ?
+    WHERE agent_id = ?
+"""
+UPDATE_AGENT_LAST_CHECK = "UPDATE active_agents SET last_check = ? WHERE agent_id = ?"
+SELECT_AGENT_SUMMARIES = """
+    SELECT a.agent_id, a.client_id, a.status, a.created_at, a.last_check,
+           c.name AS client_name,
+           IFNULL(SUM(mc.count), 0) AS total_matches,
+           IFNULL(SUM(CASE WHEN mc.status = 'new' THEN mc.count END), 0) AS new_matches
+    FROM active_agents a
+    JOIN clients c ON a.client_id = c.client_id
+    LEFT JOIN agent_match_counts mc ON mc.agent_id = a.agent_id
+    WHERE {where}
+    GROUP BY a.agent_id
+    ORDER BY a.created_at DESC
+"""
 
 
 class ClientDatabase:
@@ -25,15 +98,110 @@ class ClientDatabase:
             db_path = Path(__file__).parent.parent / 'database' / 'clients.db'
 
         self.db_path = str(db_path)
-        self.conn = None
+        self._read_pool: queue.LifoQueue = queue.LifoQueue()
+        self._write_queue: queue.Queue = queue.Queue()
+        self._closed = False
         self._init_database()
 
+        self._writer = threading.Thread(target=self._writer_loop, name="client-db-writer", daemon=True)
+        self._writer.start()
+
+    def _open_connection(self) -> sqlite3.Connection:
+        """Open a WAL-mode connection usable from any thread"""
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False,
+                               cached_statements=256)
+        conn.row_factory = sqlite3.Row  # Return rows as dictionaries
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def _read(self):
+        """Borrow a pooled read connection"""
+        try:
+            conn = self._read_pool.get_nowait()
+        except queue.Empty:
+            conn = self._open_connection()
+        try:
+            yield conn
+        finally:
+            # End any implicit read transaction before reuse
+            if conn.in_transaction:
+                conn.rollback()
+            if self._closed or self._read_pool.qsize() >= READ_POOL_SIZE:
+                conn.close()
+            else:
+                self._read_pool.put(conn)
+
+    def _write(self, operation: Callable[[sqlite3.Connection], object]):
+        """
+        Run a write on the writer thread and wait until it is committed
+
+        Args:
+            operation: Function taking the writer's connection
+
+        Returns:
+            The operation's return value (its exception is re-raised here)
+        """
+        if self._closed:
+            raise sqlite3.ProgrammingError("Cannot write to a closed database")
+
+        future: Future = Future()
+        self._write_queue.put((operation, future))
+        return future.result()
+
+    def _writer_loop(self):
+        """Apply queued writes, committing each drained batch once"""
+        conn = self._open_connection()
+        conn.isolation_level = None  # Transactions are managed explicitly below
+
+        while True:
+            item = self._write_queue.get()
+            if item is None:
+                break
+
+            batch = [item]
+            while len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    item = self._write_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._write_queue.put(None)
+                    break
+                batch.append(item)
+
+            results = []
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                for operation, future in batch:
+                    conn.execute("SAVEPOINT write_op")
+                    try:
+                        results.append((future, operation(conn), None))
+                        conn.execute("RELEASE write_op")
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO write_op")
+                        conn.execute("RELEASE write_op")
+                        results.append((future, None, e))
+                conn.execute("COMMIT")
+            except Exception as e:
+                logger.error(f"Client database write batch failed: {e}")
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                results = [(future, None, e) for _, future in batch]
+
+            for future, result, error in results:
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+
+        conn.close()
+
     def _init_database(self):
         """Create database and tables if they don't exist"""
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row  # Return rows as dictionaries
-
-        cursor = self.conn.cursor()
+        conn = self._open_connection()
+        cursor = conn.cursor()
 
         # Clients table
         cursor.execute("""
@@ -101,6 +269,7 @@ class ClientDatabase:
             notified INTEGER DEFAULT 0,
             notified_at TEXT,
             status TEXT DEFAULT 'new',
+            normalized_address TEXT,
             FOREIGN KEY (agent_id) REFERENCES active_agents(agent_id)
         )
         """)
@@ -112,7 +281,90 @@ class ClientDatabase:
             # Column already exists
             pass
 
-        self.conn.commit()
+        # Add normalized_address to agent_matches if it doesn't exist (migration)
+        try:
+            cursor.execute("ALTER TABLE agent_matches ADD COLUMN normalized_address TEXT")
+        except sqlite3.OperationalError:
+            # Column already exists
+            pass
+
+        # (Re)compute dedup keys when the normalization rules changed (migration)
+        if cursor.execute("PRAGMA user_version").fetchone()[0] < ADDRESS_KEY_VERSION:
+            conn.create_function('normalize_address', 1, normalize_address)
+            cursor.execute("UPDATE agent_matches SET normalized_address = NULL")
+            # Keep earlier duplicate matches, but only the first of each holds the dedup key
+            cursor.execute("""
+            UPDATE agent_matches SET normalized_address = normalize_address(property_address)
+            WHERE rowid IN (
+                SELECT MIN(rowid) FROM agent_matches
+                GROUP BY agent_id, normalize_address(property_address)
+            )
+            """)
+            cursor.execute(f"PRAGMA user_version = {ADDRESS_KEY_VERSION}")
+
+        # One match per agent and address
+        cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_agent_matches_address
+        ON agent_matches (agent_id, normalized_address)
+        """)
+
+        # Match counts per agent and status, kept current by triggers
+        counts_exist = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'agent_match_counts'"
+        ).fetchone()
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS agent_match_counts (
+            agent_id TEXT NOT NULL,
+            status TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (agent_id, status)
+        )
+        """)
+        if not counts_exist:
+            cursor.execute("""
+            INSERT INTO agent_match_counts (agent_id, status, count)
+            SELECT agent_id, IFNULL(status, ''), COUNT(*) FROM agent_matches
+            GROUP BY agent_id, IFNULL(status, '')
+            """)
+        cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS agent_match_counts_insert AFTER INSERT ON agent_matches
+        BEGIN
+            INSERT INTO agent_match_counts (agent_id, status, count)
+            VALUES (NEW.agent_id, IFNULL(NEW.status, ''), 1)
+            ON CONFLICT (agent_id, status) DO UPDATE SET count = count + 1;
+        END
+        """)
+        cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS agent_match_counts_update
+        AFTER UPDATE OF status, agent_id ON agent_matches
+        BEGIN
+            UPDATE agent_match_counts SET count = count - 1
+            WHERE agent_id = OLD.agent_id AND status = IFNULL(OLD.status, '');
+            INSERT INTO agent_match_counts (agent_id, status, count)
+            VALUES (NEW.agent_id, IFNULL(NEW.status, ''), 1)
+            ON CONFLICT (agent_id, status) DO UPDATE SET count = count + 1;
+        END
+        """)
+        cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS agent_match_counts_delete AFTER DELETE ON agent_matches
+        BEGIN
+            UPDATE agent_match_counts SET count = count - 1
+            WHERE agent_id = OLD.agent_id AND status = IFNULL(OLD.status, '');
+        END
+        """)
+
+        # Match history is read per agent, newest first
+        cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_agent_matches_agent
+        ON agent_matches (agent_id, matched_at)
+        """)
+        cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_active_agents_status
+        ON active_agents (status, created_at)
+        """)
+
+        conn.commit()
+        conn.close()
 
     # ===== CLIENT OPERATIONS =====
 
@@ -122,31 +374,29 @@ class ClientDatabase:
         client_id = str(uuid.uuid4())
         now = datetime.now().isoformat()
 
-        cursor = self.conn.cursor()
-        cursor.execute("""
+        self._write(lambda conn: conn.execute("""
         INSERT INTO clients (client_id, name, email, phone, notes, created_at, updated_at)
         VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (client_id, name, email, phone, notes, now, now))
+        """, (client_id, name, email, phone, notes, now, now)))
 
-        self.conn.commit()
         return client_id
 
     def get_client(self, client_id: str) -> Optional[Dict]:
         """Get client by ID"""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM clients WHERE client_id = ?", (client_id,))
-        row = cursor.fetchone()
+        with self._read() as conn:
+            row = conn.execute(SELECT_CLIENT, (client_id,)).fetchone()
         return dict(row) if row else None
 
     def get_all_clients(self, status: Optional[str] = None) -> List[Dict]:
         """Get all clients, optionally filtered by status"""
-        cursor = self.conn.cursor()
-        if status:
-            cursor.execute("SELECT * FROM clients WHERE status = ? ORDER BY created_at DESC", (status,))
-        else:
-            cursor.execute("SELECT * FROM clients ORDER BY created_at DESC")
+        with self._read() as conn:
+            if status:
+                rows = conn.execute("SELECT * FROM clients WHERE status = ? ORDER BY created_at DESC",
+                                    (status,)).fetchall()
+            else:
+                rows = conn.execute("SELECT * FROM clients ORDER BY created_at DESC").fetchall()
 
-        return [dict(row) for row in cursor.fetchall()]
+        return [dict(row) for row in rows]
 
     def update_client(self, client_id: str, **kwargs):
         """Update client fields"""
@@ -155,9 +405,7 @@ class ClientDatabase:
         fields = ', '.join([f"{k} = ?" for k in kwargs.keys()])
         values = list(kwargs.values()) + [client_id]
 
-        cursor = self.conn.cursor()
-        cursor.execute(f"UPDATE clients SET {fields} WHERE client_id = ?", values)
-        self.conn.commit()
+        self._write(lambda conn: conn.execute(f"UPDATE clients SET {fields} WHERE client_id = ?", values))
 
     # ===== SEARCH CRITERIA OPERATIONS =====
 
@@ -174,8 +422,7 @@ class ClientDatabase:
         if 'deal_quality' in kwargs and isinstance(kwargs['deal_quality'], list):
             kwargs['deal_quality'] = json.dumps(kwargs['deal_quality'])
 
-        cursor = self.conn.cursor()
-        cursor.execute("""
+        self._write(lambda conn: conn.execute("""
         INSERT INTO search_criteria (
             criteria_id, client_id, zip_codes, price_min, price_max,
             bedrooms_min, bathrooms_min, property_types, deal_quality,
@@ -194,16 +441,14 @@ class ClientDatabase:
             kwargs.get('investment_type'),
             kwargs.get('timeline'),
             now
-        ))
+        )))
 
-        self.conn.commit()
         return criteria_id
 
     def get_search_criteria(self, criteria_id: str) -> Optional[Dict]:
         """Get search criteria by ID"""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM search_criteria WHERE criteria_id = ?", (criteria_id,))
-        row = cursor.fetchone()
+        with self._read() as conn:
+            row = conn.execute(SELECT_SEARCH_CRITERIA, (criteria_id,)).fetchone()
 
         if not row:
             return None
@@ -230,8 +475,7 @@ class ClientDatabase:
         agent_id = str(uuid.uuid4())[:8].upper()  # Short readable ID
         now = datetime.now().isoformat()
 
-        cursor = self.conn.cursor()
-        cursor.execute("""
+        self._write(lambda conn: conn.execute("""
         INSERT INTO active_agents (
             agent_id, client_id, criteria_id, status,
             notification_email, notification_sms, notification_chat,
@@ -241,23 +485,15 @@ class ClientDatabase:
               1 if notification_email else 0,
               1 if notification_sms else 0,
               1 if notification_chat else 0,
-              now))
+              now)))
 
-        self.conn.commit()
         return agent_id
 
     def get_agent(self, agent_id: str) -> Optional[Dict]:
         """Get agent by ID"""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-        SELECT a.*, c.name as client_name, s.*
-        FROM active_agents a
-        JOIN clients c ON a.client_id = c.client_id
-        JOIN search_criteria s ON a.criteria_id = s.criteria_id
-        WHERE a.agent_id = ?
-        """, (agent_id,))
-
-        row = cursor.fetchone()
+        with self._read() as conn:
+            row = conn.execute(SELECT_AGENT, (agent_id,)).fetchone()
+
         if not row:
             return None
 
@@ -275,26 +511,86 @@ class ClientDatabase:
 
     def get_active_agents(self, client_id: Optional[str] = None) -> List[Dict]:
         """Get all active agents, optionally filtered by client"""
-        cursor = self.conn.cursor()
+        with self._read() as conn:
+            if client_id:
+                rows = conn.execute("""
+                SELECT a.*, c.name as client_name
+                FROM active_agents a
+                JOIN clients c ON a.client_id = c.client_id
+                WHERE a.client_id = ? AND a.status = 'active'
+                ORDER BY a.created_at DESC
+                """, (client_id,)).fetchall()
+            else:
+                rows = conn.execute("""
+                SELECT a.*, c.name as client_name
+                FROM active_agents a
+                JOIN clients c ON a.client_id = c.client_id
+                WHERE a.status = 'active'
+                ORDER BY a.created_at DESC
+                """).fetchall()
+
+        return [dict(row) for row in rows]
+
+    def get_agent_summary(self, agent_id: str) -> Optional[Dict]:
+        """
+        Get an agent's status fields with its match counts in one query
 
-        if client_id:
-            cursor.execute("""
-            SELECT a.*, c.name as client_name
-            FROM active_agents a
-            JOIN clients c ON a.client_id = c.client_id
-            WHERE a.client_id = ? AND a.status = 'active'
-            ORDER BY a.created_at DESC
-            """, (client_id,))
-        else:
-            cursor.execute("""
-            SELECT a.*, c.name as client_name
-            FROM active_agents a
-            JOIN clients c ON a.client_id = c.client_id
-            WHERE a.status = 'active'
-            ORDER BY a.created_at DESC
-            """)
+        Args:
+            agent_id: Agent ID
 
-        return [dict(row) for row in cursor.fetchall()]
+        Returns:
+            Dict with agent_id, client_id, client_name, status, created_at,
+            last_check, total_matches and new_matches, or None if not found
+        """
+        with self._read() as conn:
+            row = conn.execute(SELECT_AGENT_SUMMARIES.format(where="a.agent_id = ?"),
+                               (agent_id,)).fetchone()
+        return dict(row) if row else None
+
+    def get_active_agent_summaries(self, client_id: Optional[str] = None) -> List[Dict]:
+        """
+        Get every active agent's summary (see get_agent_summary) in one query
+
+        Args:
+            client_id: Optional client filter
+
+        Returns:
+            Summaries, newest agent first
+        """
+        with self._read() as conn:
+            if client_id:
+                rows = conn.execute(
+                    SELECT_AGENT_SUMMARIES.format(where="a.status = 'active' AND a.client_id = ?"),
+                    (client_id,)
+                ).fetchall()
+            else:
+                rows = conn.execute(SELECT_AGENT_SUMMARIES.format(where="a.status = 'active'")).fetchall()
+
+        return [dict(row) for row in rows]
+
+    def get_status_counts(self) -> Dict:
+        """
+        Count agents by status and matches (of active agents) by status
+
+        Returns:
+            Dict with 'agents' and 'matches', each mapping status to count
+        """
+        with self._read() as conn:
+            agents = conn.execute(
+                "SELECT status, COUNT(*) FROM active_agents GROUP BY status"
+            ).fetchall()
+            matches = conn.execute("""
+                SELECT mc.status, SUM(mc.count)
+                FROM agent_match_counts mc
+                JOIN active_agents a ON a.agent_id = mc.agent_id
+                WHERE a.status = 'active'
+                GROUP BY mc.status
+            """).fetchall()
+
+        return {
+            'agents': {status: count for status, count in agents},
+            'matches': {status: count for status, count in matches}
+        }
 
     def update_agent_status(self, agent_id: str, status: str):
         """Update agent status (active, paused, completed, cancelled)"""
@@ -306,76 +602,82 @@ class ClientDatabase:
         elif status == 'cancelled':
             timestamp_field = 'cancelled_at'
 
-        cursor = self.conn.cursor()
         if timestamp_field:
-            cursor.execute(f"""
+            self._write(lambda conn: conn.execute(f"""
             UPDATE active_agents
             SET status = ?, {timestamp_field} = ?
             WHERE agent_id = ?
-            """, (status, datetime.now().isoformat(), agent_id))
+            """, (status, datetime.now().isoformat(), agent_id)))
         else:
-            cursor.execute("UPDATE active_agents SET status = ? WHERE agent_id = ?",
-                         (status, agent_id))
-
-        self.conn.commit()
+            self._write(lambda conn: conn.execute(
+                "UPDATE active_agents SET status = ? WHERE agent_id = ?", (status, agent_id)
+            ))
 
     def update_agent_last_check(self, agent_id: str):
         """Update agent's last check timestamp"""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-        UPDATE active_agents SET last_check = ? WHERE agent_id = ?
-        """, (datetime.now().isoformat(), agent_id))
-        self.conn.commit()
+        now = datetime.now().isoformat()
+        self._write(lambda conn: conn.execute(UPDATE_AGENT_LAST_CHECK, (now, agent_id)))
 
-    def increment_agent_matches(self, agent_id: str):
+    def increment_agent_matches(self, agent_id: str, count: int = 1):
         """Increment the matches_found counter"""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-        UPDATE active_agents
-        SET matches_found = matches_found + 1
-        WHERE agent_id = ?
-        """, (agent_id,))
-        self.conn.commit()
+        self._write(lambda conn: conn.execute(INCREMENT_AGENT_MATCHES, (count, agent_id)))
 
     # ===== MATCH OPERATIONS =====
 
-    def add_match(self, agent_id: str, property_address: str, property_data: Dict) -> str:
-        """Add a new property match for an agent"""
-        match_id = str(uuid.uuid4())
-        now = datetime.now().isoformat()
+    def add_match(self, agent_id: str, property_address: str, property_data: Dict) -> Optional[str]:
+        """Add a new property match for an agent (None if the address was already matched)"""
+        return self.add_matches(agent_id, [(property_address, property_data)])[0]
 
-        cursor = self.conn.cursor()
-        cursor.execute("""
-        INSERT INTO agent_matches (
-            match_id, agent_id, property_address, property_data,
-            matched_at, status
-        ) VALUES (?, ?, ?, ?, ?, 'new')
-        """, (match_id, agent_id, property_address, json.dumps(property_data), now))
+    def add_matches(self, agent_id: str, matches: List[Tuple[str, Dict]]) -> List[Optional[str]]:
+        """
+        Add property matches for an agent in one transaction
 
-        self.conn.commit()
-        self.increment_agent_matches(agent_id)
+        Addresses the agent already matched (after normalization) are skipped
+        by the unique (agent_id, normalized_address) index.
 
-        return match_id
+        Args:
+            agent_id: Agent ID
+            matches: (property_address, property_data) pairs
+
+        Returns:
+            Match ID for each inserted match, None for each skipped one
+        """
+        now = datetime.now().isoformat()
+        rows = [
+            (str(uuid.uuid4()), agent_id, address, json.dumps(data), now,
+             normalize_address(address))
+            for address, data in matches
+        ]
+
+        def insert(conn):
+            match_ids = []
+            for row in rows:
+                inserted = conn.execute(INSERT_MATCH, row).rowcount
+                match_ids.append(row[0] if inserted else None)
+
+            added = sum(1 for match_id in match_ids if match_id)
+            if added:
+                conn.execute(INCREMENT_AGENT_MATCHES, (added, agent_id))
+            return match_ids
+
+        return self._write(insert) if rows else []
+
+    def get_matched_addresses(self, agent_id: str) -> Set[str]:
+        """Normalized addresses an agent has already matched"""
+        with self._read() as conn:
+            rows = conn.execute(SELECT_MATCHED_ADDRESSES, (agent_id,)).fetchall()
+        return {row[0] for row in rows}
 
     def get_agent_matches(self, agent_id: str, status: Optional[str] = None) -> List[Dict]:
         """Get all matches for an agent"""
-        cursor = self.conn.cursor()
-
-        if status:
-            cursor.execute("""
-            SELECT * FROM agent_matches
-            WHERE agent_id = ? AND status = ?
-            ORDER BY matched_at DESC
-            """, (agent_id, status))
-        else:
-            cursor.execute("""
-            SELECT * FROM agent_matches
-            WHERE agent_id = ?
-            ORDER BY matched_at DESC
-            """, (agent_id,))
+        with self._read() as conn:
+            if status:
+                rows = conn.execute(SELECT_AGENT_MATCHES_BY_STATUS, (agent_id, status)).fetchall()
+            else:
+                rows = conn.execute(SELECT_AGENT_MATCHES, (agent_id,)).fetchall()
 
         matches = []
-        for row in cursor.fetchall():
+        for row in rows:
             match = dict(row)
             if match.get('property_data'):
                 match['property_data'] = json.loads(match['property_data'])
@@ -385,26 +687,45 @@ class ClientDatabase:
 
     def mark_match_notified(self, match_id: str):
         """Mark a match as notified"""
-        cursor = self.conn.cursor()
-        cursor.execute("""
+        now = datetime.now().isoformat()
+        self._write(lambda conn: conn.execute("""
+        UPDATE agent_matches
+        SET notified = 1, notified_at = ?
+        WHERE match_id = ?
+        """, (now, match_id)))
+
+    def mark_matches_notified(self, match_ids: List[str]):
+        """Mark several matches as notified in one transaction"""
+        if not match_ids:
+            return
+
+        now = datetime.now().isoformat()
+        self._write(lambda conn: conn.executemany("""
         UPDATE agent_matches
         SET notified = 1, notified_at = ?
         WHERE match_id = ?
-        """, (datetime.now().isoformat(), match_id))
-        self.conn.commit()
+        """, [(now, match_id) for match_id in match_ids]))
 
     def update_match_status(self, match_id: str, status: str):
         """Update match status (new, sent, viewed, contacted, closed)"""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-        UPDATE agent_matches SET status = ? WHERE match_id = ?
-        """, (status, match_id))
-        self.conn.commit()
+        self._write(lambda conn: conn.execute(
+            "UPDATE agent_matches SET status = ? WHERE match_id = ?", (status, match_id)
+        ))
 
     def close(self):
-        """Close database connection"""
-        if self.conn:
-            self.conn.close()
+        """Stop the writer (after queued writes finish) and close pooled connections"""
+        if self._closed:
+            return
+
+        self._closed = True
+        self._write_queue.put(None)
+        self._writer.join()
+
+        while True:
+            try:
+                self._read_pool.get_nowait().close()
+            except queue.Empty:
+                break
 
 
 # Singleton instance
@@ -4,6 +4,10 @@ from difflib import SequenceMatcher
 import re
 from datetime import datetime
 
+from modules.address_normalizer import normalize_address
+from modules.dedup_engine import DedupEngine, StreamingDeduplicator
+from modules.keyword_matcher import KEYWORD_CATEGORIES, get_keyword_matcher
+
 class DataEnrichment:
     """Merges and enriches data from multiple sources"""
 
@@ -11,6 +15,8 @@ class DataEnrichment:
         self.config = config
         self.logger = logging.getLogger(__name__)
         self.address_similarity_threshold = 0.90  # 90% similarity for duplicate detection
+        self.dedup_engine = DedupEngine(self.normalize_address, self.address_similarity_threshold)
+        self.keywords = get_keyword_matcher(config)
         self.logger.info("DataEnrichment initialized")
 
     def merge_property_data(self, source1: Dict, source2: Dict,
@@ -108,27 +114,16 @@ class DataEnrichment:
             return []
 
         unique_properties = []
-        processed_indices = set()
-
-        for i, prop in enumerate(properties):
-            if i in processed_indices:
-                continue
-
-            # Find all duplicates of this property
-            duplicates = [prop]
-            processed_indices.add(i)
-
-            for j in range(i + 1, len(properties)):
-                if j in processed_indices:
-                    continue
 
-                if self._is_duplicate(prop, properties[j]):
-                    duplicates.append(properties[j])
-                    processed_indices.add(j)
+        # Blocking index: each address is normalized once and only records
+        # sharing an MLS number or price/sqft/beds/ZIP tuple, or with an
+        # address length that can reach the similarity threshold, are compared
+        for group in self.dedup_engine.find_duplicate_groups(properties):
+            duplicates = [properties[index] for index in group]
 
             # Merge all duplicates
             if len(duplicates) == 1:
-                unique_properties.append(prop)
+                unique_properties.append(duplicates[0])
             else:
                 self.logger.debug("Found %d duplicates for property, merging", len(duplicates))
                 merged = duplicates[0]
@@ -141,6 +136,18 @@ class DataEnrichment:
 
         return unique_properties
 
+    def new_stream_deduplicator(self) -> StreamingDeduplicator:
+        """
+        Create a deduplicator for listings that arrive one at a time
+
+        Duplicates are merged into the first-seen listing with
+        merge_property_data (MLS data wins), as in deduplicate_properties.
+        """
+        return StreamingDeduplicator(
+            self.dedup_engine,
+            lambda kept, duplicate: self.merge_property_data(kept, duplicate, priority="mls")
+        )
+
     def _is_duplicate(self, prop1: Dict, prop2: Dict) -> bool:
         """
         Determine if two properties are duplicates.
@@ -152,40 +159,9 @@ class DataEnrichment:
         Returns:
             True if properties are duplicates
         """
-        # Strategy 1: Exact MLS number match
-        mls1 = prop1.get('mls_number')
-        mls2 = prop2.get('mls_number')
-        if mls1 and mls2 and mls1 == mls2:
-            return True
-
-        # Strategy 2: Address fuzzy match (>90% similarity)
-        addr1 = self.normalize_address(
-            f"{prop1.get('street_address', '')} {prop1.get('city', '')} {prop1.get('state', '')} {prop1.get('zip_code', '')}"
-        )
-        addr2 = self.normalize_address(
-            f"{prop2.get('street_address', '')} {prop2.get('city', '')} {prop2.get('state', '')} {prop2.get('zip_code', '')}"
-        )
-
-        if addr1 and addr2:
-            similarity = self.calculate_address_similarity(addr1, addr2)
-            if similarity >= self.address_similarity_threshold:
-                return True
-
-        # Strategy 3: Price + sqft + bedrooms exact match (same property likely)
-        price1 = prop1.get('list_price')
-        price2 = prop2.get('list_price')
-        sqft1 = prop1.get('square_feet')
-        sqft2 = prop2.get('square_feet')
-        beds1 = prop1.get('bedrooms')
-        beds2 = prop2.get('bedrooms')
-
-        if all([price1, price2, sqft1, sqft2, beds1, beds2]):
-            if price1 == price2 and sqft1 == sqft2 and beds1 == beds2:
-                # Also check ZIP code matches to avoid false positives
-                if prop1.get('zip_code') == prop2.get('zip_code'):
-                    return True
-
-        return False
+        # Same rules as the blocking engine: MLS number, fuzzy address
+        # or price/sqft/beds/ZIP match
+        return self.dedup_engine.is_duplicate(prop1, prop2)
 
     def normalize_address(self, address: str) -> str:
         """
@@ -197,44 +173,8 @@ class DataEnrichment:
         Returns:
             Normalized address string
         """
-        if not address:
-            return ""
-
-        # Convert to uppercase
-        normalized = address.upper()
-
-        # Remove extra whitespace
-        normalized = re.sub(r'\s+', ' ', normalized).strip()
-
-        # Common abbreviations
-        abbreviations = {
-            ' STREET': ' ST',
-            ' AVENUE': ' AVE',
-            ' ROAD': ' RD',
-            ' DRIVE': ' DR',
-            ' BOULEVARD': ' BLVD',
-            ' LANE': ' LN',
-            ' COURT': ' CT',
-            ' CIRCLE': ' CIR',
-            ' PLACE': ' PL',
-            ' TERRACE': ' TER',
-            ' PARKWAY': ' PKWY',
-            ' NORTH': ' N',
-            ' SOUTH': ' S',
-            ' EAST': ' E',
-            ' WEST': ' W',
-            ' APARTMENT': ' APT',
-            ' SUITE': ' STE',
-            ' UNIT': ' UNIT',
-        }
-
-        for full, abbr in abbreviations.items():
-            normalized = normalized.replace(full, abbr)
-
-        # Remove punctuation
-        normalized = re.sub(r'[.,#]', '', normalized)
-
-        return normalized
+        # Shared, cached normalization (same key as agent match dedup)
+        return normalize_address(address)
 
     def calculate_address_similarity(self, addr1: str, addr2: str) -> float:
         """
@@ -266,37 +206,8 @@ class DataEnrichment:
         if not description:
             return []
 
-        description_lower = description.lower()
-
         # Keywords indicating potential deals or special situations
-        keywords_to_find = {
-            'motivated': ['motivated seller', 'motivated', 'must sell'],
-            'as-is': ['as-is', 'as is', 'sold as is'],
-            'fixer': ['fixer', 'fixer upper', 'fixer-upper', 'needs work', 'tlc'],
-            'estate': ['estate sale', 'estate', 'probate'],
-            'foreclosure': ['foreclosure', 'foreclosed', 'bank owned', 'reo'],
-            'short_sale': ['short sale', 'shortsale'],
-            'price_reduction': ['price reduction', 'reduced', 'price drop', 'price cut'],
-            'distressed': ['distressed', 'distress sale'],
-            'handyman': ['handyman special', 'handyman'],
-            'investor': ['investor opportunity', 'investors welcome', 'investor special'],
-            'cash_only': ['cash only', 'cash buyers only'],
-            'no_hoa': ['no hoa', 'no homeowners association'],
-            'pool': ['pool', 'swimming pool'],
-            'waterfront': ['waterfront', 'water front', 'lake front', 'oceanfront'],
-            'corner_lot': ['corner lot'],
-            'cul_de_sac': ['cul de sac', 'cul-de-sac'],
-        }
-
-        found_keywords = []
-
-        for category, phrases in keywords_to_find.items():
-            for phrase in phrases:
-                if phrase in description_lower:
-                    found_keywords.append(category)
-                    break  # Only add category once
-
-        return found_keywords
+        return self.keywords.categories(description.lower(), KEYWORD_CATEGORIES)
 
     def enrich_with_external_data(self, property_data: Dict) -> Dict:
         """
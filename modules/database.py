@@ -12,17 +12,42 @@ from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 import sqlite3
 import mysql.connector
 from mysql.connector import pooling
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, Iterable, List, Optional, Any, Tuple
 import logging
 from contextlib import contextmanager
 import os
 import subprocess
 from datetime import datetime, timedelta
+from decimal import Decimal
 import json
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Columns DatabaseManager.market_stats can group by
+MARKET_GROUP_COLUMNS = ('zip_code', 'city', 'state', 'property_type', 'bedrooms')
+
+# market_stats fields stored in each market_snapshots row
+MARKET_SNAPSHOT_COLUMNS = (
+    'listing_count', 'avg_price', 'median_price', 'priced_count',
+    'avg_price_per_sqft', 'median_price_per_sqft', 'avg_days_on_market',
+    'recent_count', 'recent_avg_price_per_sqft',
+    'older_count', 'older_avg_price_per_sqft'
+)
+
+# Listings counted in a market snapshot are those created within this many days
+MARKET_SNAPSHOT_WINDOW_DAYS = 90
+
+# Segment key of the ZIP-wide market_snapshots row
+MARKET_SNAPSHOT_ALL_TYPES = '*'
+MARKET_SNAPSHOT_ALL_BEDROOMS = -1
+
+# Property columns whose changes alter market snapshots
+MARKET_SNAPSHOT_INPUTS = frozenset({
+    'zip_code', 'property_type', 'bedrooms', 'list_price',
+    'square_feet', 'days_on_market', 'created_at'
+})
+
 
 class DatabaseError(Exception):
     """Custom exception for database operations"""
@@ -57,6 +82,8 @@ class DatabaseManager:
         self.config = config
         self.db_type = config.get('db_type', 'postgresql').lower()
         self.pool = None
+        # Column names of the properties table, read on first write
+        self._property_columns: Optional[frozenset] = None
 
         logger.info(f"Initializing DatabaseManager with {self.db_type}")
 
@@ -174,6 +201,10 @@ class DatabaseManager:
         """
         Insert new property or update if property_id already exists.
 
+        Each call also refreshes today's market snapshots for the property's
+        ZIP code (two aggregate queries plus a DELETE/INSERT). For many rows
+        use bulk_upsert_properties, which refreshes each ZIP code once.
+
         Args:
             property_data: Dictionary containing property fields
 
@@ -199,47 +230,60 @@ class DatabaseManager:
                 existing = cursor.fetchone()
 
                 if existing:
-                    # Update existing property
+                    # Update existing property (refreshes its market snapshots)
                     property_id = existing[0]
                     self.update_property(property_data['property_id'], property_data)
                     logger.info(f"Updated existing property: {property_data['property_id']}")
-                    return property_id
 
-                # Insert new property
-                columns = list(property_data.keys())
-                values = [property_data[col] for col in columns]
+                else:
+                    # Insert new property
+                    row = self._schema_row(cursor, property_data)
+                    columns = list(row.keys())
+                    values = [row[col] for col in columns]
 
-                if self.db_type == 'postgresql':
-                    placeholders = ', '.join(['%s'] * len(columns))
-                    query = f"""
-                        INSERT INTO properties ({', '.join(columns)})
-                        VALUES ({placeholders})
-                        RETURNING id
-                    """
-                    cursor.execute(query, values)
-                    property_id = cursor.fetchone()[0]
+                    if self.db_type == 'postgresql':
+                        placeholders = ', '.join(['%s'] * len(columns))
+                        query = f"""
+                            INSERT INTO properties ({', '.join(columns)})
+                            VALUES ({placeholders})
+                            RETURNING id
+                        """
+                        cursor.execute(query, values)
+                        property_id = cursor.fetchone()[0]
 
-                else:
-                    placeholders = ', '.join(['?'] * len(columns))
-                    query = f"""
-                        INSERT INTO properties ({', '.join(columns)})
-                        VALUES ({placeholders})
-                    """
-                    cursor.execute(query, values)
-                    property_id = cursor.lastrowid
+                    else:
+                        placeholders = ', '.join(['?'] * len(columns))
+                        query = f"""
+                            INSERT INTO properties ({', '.join(columns)})
+                            VALUES ({placeholders})
+                        """
+                        cursor.execute(query, values)
+                        property_id = cursor.lastrowid
+
+                    logger.info(f"Inserted new property: {property_data['property_id']} (ID: {property_id})")
 
                 cursor.close()
-                logger.info(f"Inserted new property: {property_data['property_id']} (ID: {property_id})")
-                return property_id
 
         except Exception as e:
             logger.error(f"Failed to insert property: {e}")
             raise DatabaseError(f"Property insertion failed: {e}")
 
+        if not existing:
+            self._update_market_snapshots([property_data])
+        return property_id
+
     def update_property(self, property_id: str, updates: Dict[str, Any]) -> bool:
         """
         Update existing property by property_id.
 
+        Keys that aren't properties columns (e.g. nested analysis
+        results) are skipped.
+
+        Updates to market inputs (price, size, ZIP code, ...) also refresh
+        today's market snapshots for the property's ZIP code, as in
+        insert_property; status-only updates skip the refresh. A ZIP code
+        change refreshes both the old and the new ZIP code.
+
         Args:
             property_id: Unique property identifier
             updates: Dictionary of fields to update
@@ -251,28 +295,189 @@ class DatabaseManager:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
 
-                # Build UPDATE query
-                set_clause = ', '.join([f"{key} = %s" if self.db_type == 'postgresql' else f"{key} = ?"
-                                       for key in updates.keys()])
-                values = list(updates.values())
-                values.append(property_id)
+                updates = self._schema_row(cursor, updates)
 
-                if self.db_type == 'postgresql':
-                    query = f"UPDATE properties SET {set_clause} WHERE property_id = %s"
-                else:
-                    query = f"UPDATE properties SET {set_clause} WHERE property_id = ?"
+                # The old ZIP code loses the property from its snapshots
+                previous_zip_codes = []
+                if 'zip_code' in updates:
+                    previous_zip_codes = list(self._current_zip_codes(cursor, [property_id]).values())
 
-                cursor.execute(query, values)
-                rows_affected = cursor.rowcount
+                rows_affected = 0
+                if updates:
+                    # Build UPDATE query
+                    set_clause = ', '.join([f"{key} = %s" if self.db_type == 'postgresql' else f"{key} = ?"
+                                           for key in updates.keys()])
+                    values = list(updates.values())
+                    values.append(property_id)
+
+                    if self.db_type == 'postgresql':
+                        query = f"UPDATE properties SET {set_clause} WHERE property_id = %s"
+                    else:
+                        query = f"UPDATE properties SET {set_clause} WHERE property_id = ?"
+
+                    cursor.execute(query, values)
+                    rows_affected = cursor.rowcount
                 cursor.close()
 
                 logger.info(f"Updated property {property_id}: {rows_affected} row(s) affected")
-                return rows_affected > 0
 
         except Exception as e:
             logger.error(f"Failed to update property {property_id}: {e}")
             raise DatabaseError(f"Property update failed: {e}")
 
+        if rows_affected > 0:
+            self._update_market_snapshots([dict(updates, property_id=property_id)],
+                                          previous_zip_codes)
+        return rows_affected > 0
+
+    def bulk_upsert_properties(self, properties: List[Dict[str, Any]],
+                               batch_size: int = 100) -> Dict[str, Any]:
+        """
+        Insert or update many properties keyed by property_id.
+
+        Each batch runs in a single transaction. If a batch fails, it is
+        replayed row by row under savepoints so only the bad rows are
+        skipped and reported. Keys that aren't properties columns are
+        skipped.
+
+        Args:
+            properties: List of property dictionaries (each needs property_id)
+            batch_size: Number of properties per transaction
+
+        Returns:
+            Dictionary with:
+                - upserted: Number of properties written
+                - failed: Number of properties rejected
+                - errors: List of {'index', 'property_id', 'error'} per rejected row
+        """
+        result = {'upserted': 0, 'failed': 0, 'errors': []}
+        batch_size = max(1, batch_size)
+        previous_zip_codes: Dict[str, str] = {}
+
+        rows = []
+        for index, prop in enumerate(properties):
+            if not prop.get('property_id'):
+                result['errors'].append({
+                    'index': index,
+                    'property_id': None,
+                    'error': 'Missing property_id'
+                })
+                continue
+            rows.append((index, prop))
+
+        for start in range(0, len(rows), batch_size):
+            batch = self._collapse_duplicate_rows(rows[start:start + batch_size])
+
+            try:
+                with self.get_connection() as conn:
+                    cursor = conn.cursor()
+                    previous_zip_codes.update(self._current_zip_codes(
+                        cursor, [prop['property_id'] for _, prop in batch if 'zip_code' in prop]
+                    ))
+                    try:
+                        self._upsert_property_rows(cursor, [prop for _, prop in batch])
+                        result['upserted'] += len(batch)
+                    except Exception as e:
+                        logger.warning(f"Batch upsert failed, retrying row by row: {e}")
+                        conn.rollback()
+                        if self.db_type == 'sqlite':
+                            # Keep the row-by-row replay in a single transaction
+                            cursor.execute("BEGIN")
+                        result['upserted'] += self._upsert_rows_individually(
+                            cursor, batch, result['errors']
+                        )
+                    cursor.close()
+
+            except Exception as e:
+                logger.error(f"Failed to upsert property batch: {e}")
+                for index, prop in batch:
+                    result['errors'].append({
+                        'index': index,
+                        'property_id': prop.get('property_id'),
+                        'error': str(e)
+                    })
+
+        result['failed'] = len(result['errors'])
+        logger.info(f"Bulk upserted {result['upserted']} properties ({result['failed']} failed)")
+
+        failed = {error['index'] for error in result['errors']}
+        written = [prop for index, prop in rows if index not in failed]
+        self._update_market_snapshots(written, [
+            previous_zip_codes[prop['property_id']] for prop in written
+            if prop['property_id'] in previous_zip_codes
+        ])
+        return result
+
+    def _collapse_duplicate_rows(self, batch: List[Tuple[int, Dict[str, Any]]]) -> List[Tuple[int, Dict[str, Any]]]:
+        """Merge rows sharing a property_id so one statement never touches a row twice"""
+        merged = {}
+        for index, prop in batch:
+            key = prop['property_id']
+            if key in merged:
+                merged[key] = (index, {**merged[key][1], **prop})
+            else:
+                merged[key] = (index, prop)
+        return list(merged.values())
+
+    def _upsert_property_rows(self, cursor, rows: List[Dict[str, Any]]):
+        """Write rows with one multi-row upsert statement per column set"""
+        by_columns: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for row in rows:
+            row = self._schema_row(cursor, row)
+            by_columns.setdefault(tuple(row.keys()), []).append(row)
+
+        for columns, group in by_columns.items():
+            query = self._build_upsert_query(columns)
+            values = [tuple(row[col] for col in columns) for row in group]
+
+            if self.db_type == 'postgresql':
+                extras.execute_values(cursor, query, values, page_size=len(values))
+            else:
+                cursor.executemany(query, values)
+
+    def _upsert_rows_individually(self, cursor, batch: List[Tuple[int, Dict[str, Any]]],
+                                  errors: List[Dict[str, Any]]) -> int:
+        """Replay a failed batch row by row, recording rows that still fail"""
+        written = 0
+        for index, prop in batch:
+            cursor.execute("SAVEPOINT property_row")
+            try:
+                self._upsert_property_rows(cursor, [prop])
+                cursor.execute("RELEASE SAVEPOINT property_row")
+                written += 1
+            except Exception as e:
+                cursor.execute("ROLLBACK TO SAVEPOINT property_row")
+                errors.append({
+                    'index': index,
+                    'property_id': prop.get('property_id'),
+                    'error': str(e)
+                })
+        return written
+
+    def _build_upsert_query(self, columns: Tuple[str, ...]) -> str:
+        """Build the dialect-specific upsert statement for a column set"""
+        column_list = ', '.join(columns)
+        update_columns = [col for col in columns if col != 'property_id'] or ['property_id']
+
+        if self.db_type == 'postgresql':
+            updates = ', '.join(f"{col} = EXCLUDED.{col}" for col in update_columns)
+            return (f"INSERT INTO properties ({column_list}) VALUES %s "
+                    f"ON CONFLICT (property_id) DO UPDATE SET {updates}")
+
+        if self.db_type == 'mysql':
+            placeholders = ', '.join(['%s'] * len(columns))
+            updates = ', '.join(f"{col} = VALUES({col})" for col in update_columns)
+            return (f"INSERT INTO properties ({column_list}) VALUES ({placeholders}) "
+                    f"ON DUPLICATE KEY UPDATE {updates}")
+
+        placeholders = ', '.join(['?'] * len(columns))
+        if sqlite3.sqlite_version_info >= (3, 24, 0):
+            # Native upsert keeps the row id and any columns not supplied
+            updates = ', '.join(f"{col} = excluded.{col}" for col in update_columns)
+            return (f"INSERT INTO properties ({column_list}) VALUES ({placeholders}) "
+                    f"ON CONFLICT (property_id) DO UPDATE SET {updates}")
+        return f"INSERT OR REPLACE INTO properties ({column_list}) VALUES ({placeholders})"
+
     def get_property_by_id(self, property_id: str) -> Optional[Dict[str, Any]]:
         """
         Fetch single property by property_id.
@@ -483,6 +688,54 @@ class DatabaseManager:
         }
         return self.update_property(property_id, updates)
 
+    def mark_properties_synced(self, synced: List[Tuple[str, str]]) -> int:
+        """
+        Mark many properties as synced to GHL in one transaction.
+
+        Args:
+            synced: (property_id, ghl_opportunity_id) pairs
+
+        Returns:
+            Number of rows updated
+        """
+        if not synced:
+            return 0
+
+        sync_date = datetime.now()
+        values = [(opportunity_id, sync_date, property_id) for property_id, opportunity_id in synced]
+
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+
+                if self.db_type == 'postgresql':
+                    # One UPDATE joined against all pairs
+                    query = """
+                        UPDATE properties AS p
+                        SET ghl_opportunity_id = v.opportunity_id,
+                            ghl_sync_status = 'synced',
+                            ghl_sync_date = v.sync_date
+                        FROM (VALUES %s) AS v (opportunity_id, sync_date, property_id)
+                        WHERE p.property_id = v.property_id
+                    """
+                    extras.execute_values(cursor, query, values, page_size=len(values))
+                else:
+                    query = """
+                        UPDATE properties
+                        SET ghl_opportunity_id = ?, ghl_sync_status = 'synced', ghl_sync_date = ?
+                        WHERE property_id = ?
+                    """
+                    cursor.executemany(query, values)
+                rows_affected = cursor.rowcount
+                cursor.close()
+
+                logger.info(f"Marked {len(values)} properties synced to GHL")
+                return rows_affected
+
+        except Exception as e:
+            logger.error(f"Failed to mark properties synced: {e}")
+            raise DatabaseError(f"Bulk sync update failed: {e}")
+
     def get_price_reductions(self, days_back: int = 1) -> List[Dict[str, Any]]:
         """
         Get properties with recent price reductions.
@@ -531,6 +784,389 @@ class DatabaseManager:
             logger.error(f"Failed to fetch price reductions: {e}")
             return []
 
+    # ========================================
+    # MARKET STATISTICS
+    # ========================================
+
+    def market_stats(self, group_by: Optional[List[str]] = None, window: Optional[int] = 90,
+                     filters: Optional[Dict[str, Any]] = None,
+                     recent_days: int = 30) -> List[Dict[str, Any]]:
+        """
+        Aggregate listing statistics in the database, one row per group.
+
+        Only the aggregates leave the database. PostgreSQL uses percentile_cont
+        and FILTER clauses; SQLite and MySQL compute medians with window
+        functions and use CASE expressions in place of FILTER.
+
+        Args:
+            group_by: Columns to group by (any of MARKET_GROUP_COLUMNS);
+                empty for one row over all matching listings
+            window: Only listings created within this many days (None: all)
+            filters: Optional filters:
+                - zip_code: Single ZIP code
+                - zip_codes: List of ZIP codes
+                - property_type: Property type
+                - city: Text the city contains (case-insensitive)
+            recent_days: Listings newer than this are "recent" for trends
+
+        Returns:
+            Dicts with the group columns and:
+            - listing_count, avg_price, median_price, min_price, max_price
+              (prices ignore listings priced at 0)
+            - priced_count (listings with price and sqft), avg_price_per_sqft,
+              median_price_per_sqft
+            - avg_days_on_market (listings with DOM > 0), quick_sales (DOM < 30),
+              stale_listings (DOM > 90)
+            - recent_count / recent_avg_price_per_sqft and older_count /
+              older_avg_price_per_sqft, split at recent_days
+            - avg_score, hot_deals (score >= 90), good_deals (75-89),
+              avg_below_market, total_estimated_profit
+        """
+        group_by = list(group_by or [])
+        invalid = [column for column in group_by if column not in MARKET_GROUP_COLUMNS]
+        if invalid:
+            raise ValueError(f"Cannot group market stats by {invalid}")
+
+        filters = filters or {}
+        ph = '?' if self.db_type == 'sqlite' else '%s'
+        now = datetime.now()
+
+        def timestamp(value: datetime):
+            # SQLite compares the stored text, which uses CURRENT_TIMESTAMP's format
+            return value.strftime('%Y-%m-%d %H:%M:%S') if self.db_type == 'sqlite' else value
+
+        values: List[Any] = [timestamp(now - timedelta(days=recent_days))]
+        conditions = []
+        if window is not None:
+            conditions.append(f"created_at >= {ph}")
+            values.append(timestamp(now - timedelta(days=window)))
+        if filters.get('zip_code'):
+            conditions.append(f"zip_code = {ph}")
+            values.append(filters['zip_code'])
+        if filters.get('zip_codes'):
+            conditions.append(f"zip_code IN ({', '.join([ph] * len(filters['zip_codes']))})")
+            values.extend(filters['zip_codes'])
+        if filters.get('property_type'):
+            conditions.append(f"property_type = {ph}")
+            values.append(filters['property_type'])
+        if filters.get('city'):
+            conditions.append(f"LOWER(city) LIKE {ph}")
+            values.append(f"%{str(filters['city']).lower()}%")
+
+        where_clause = " AND ".join(conditions) if conditions else "1=1"
+        group_columns = ''.join(f"{column}, " for column in group_by)
+
+        # Per-listing values the aggregates read (NULL where a value doesn't count)
+        listings = f"""
+            listings AS (
+                SELECT {group_columns}
+                       CASE WHEN list_price > 0 THEN list_price END AS price,
+                       CASE WHEN list_price > 0 AND square_feet > 0
+                            THEN list_price * 1.0 / square_feet END AS ppsf,
+                       CASE WHEN days_on_market > 0 THEN days_on_market END AS dom,
+                       CASE WHEN created_at >= {ph} THEN 1
+                            WHEN created_at IS NOT NULL THEN 0 END AS recent,
+                       opportunity_score, below_market_percentage, estimated_profit
+                FROM properties
+                WHERE {where_clause}
+            )
+        """
+
+        if self.db_type == 'postgresql':
+            def when(condition: str, expression: str, aggregate: str) -> str:
+                return f"{aggregate}({expression}) FILTER (WHERE {condition})"
+            price_median = "percentile_cont(0.5) WITHIN GROUP (ORDER BY price)"
+            ppsf_median = "percentile_cont(0.5) WITHIN GROUP (ORDER BY ppsf)"
+        else:
+            def when(condition: str, expression: str, aggregate: str) -> str:
+                return f"{aggregate}(CASE WHEN {condition} THEN {expression} END)"
+            price_median = "MAX(pm.median)"
+            ppsf_median = "MAX(sm.median)"
+
+        select = f"""
+            SELECT {''.join(f"l.{column}, " for column in group_by)}
+                   COUNT(*) AS listing_count,
+                   AVG(price) AS avg_price,
+                   {price_median} AS median_price,
+                   MIN(price) AS min_price,
+                   MAX(price) AS max_price,
+                   COUNT(ppsf) AS priced_count,
+                   AVG(ppsf) AS avg_price_per_sqft,
+                   {ppsf_median} AS median_price_per_sqft,
+                   AVG(dom) AS avg_days_on_market,
+                   {when('dom < 30', '1', 'COUNT')} AS quick_sales,
+                   {when('dom > 90', '1', 'COUNT')} AS stale_listings,
+                   {when('recent = 1', 'ppsf', 'COUNT')} AS recent_count,
+                   {when('recent = 1', 'ppsf', 'AVG')} AS recent_avg_price_per_sqft,
+                   {when('recent = 0', 'ppsf', 'COUNT')} AS older_count,
+                   {when('recent = 0', 'ppsf', 'AVG')} AS older_avg_price_per_sqft,
+                   AVG(opportunity_score) AS avg_score,
+                   {when('opportunity_score >= 90', '1', 'COUNT')} AS hot_deals,
+                   {when('opportunity_score >= 75 AND opportunity_score < 90', '1', 'COUNT')} AS good_deals,
+                   AVG(below_market_percentage) AS avg_below_market,
+                   SUM(estimated_profit) AS total_estimated_profit
+            FROM listings l
+        """
+        group_clause = f"GROUP BY {', '.join(f'l.{column}' for column in group_by)}" if group_by else ""
+
+        if self.db_type == 'postgresql':
+            query = f"WITH {listings} {select} {group_clause}"
+        else:
+            # Medians: average of the middle one or two values of each group
+            partition = f"PARTITION BY {', '.join(group_by)} " if group_by else ""
+            same = 'IS' if self.db_type == 'sqlite' else '<=>'
+
+            def median(name: str, column: str) -> str:
+                return f"""
+                    {name} AS (
+                        SELECT {group_columns} AVG({column}) AS median
+                        FROM (
+                            SELECT {group_columns} {column},
+                                   ROW_NUMBER() OVER ({partition}ORDER BY {column}) AS position,
+                                   COUNT(*) OVER ({partition}) AS total
+                            FROM listings WHERE {column} IS NOT NULL
+                        ) ranked
+                        WHERE 2 * position BETWEEN total AND total + 2
+                        {f"GROUP BY {', '.join(group_by)}" if group_by else ""}
+                    )
+                """
+
+            def join(alias: str) -> str:
+                on = " AND ".join(f"{alias}.{column} {same} l.{column}" for column in group_by) or "1=1"
+                return f"LEFT JOIN {alias[0] + 'median'} {alias} ON {on}"
+
+            query = (f"WITH {listings}, {median('pmedian', 'price')}, {median('smedian', 'ppsf')} "
+                     f"{select} {join('pm')} {join('sm')} {group_clause}")
+
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, values)
+                columns = [col[0] for col in cursor.description]
+                rows = cursor.fetchall()
+                cursor.close()
+
+        except Exception as e:
+            logger.error(f"Failed to compute market stats: {e}")
+            return []
+
+        results = []
+        for row in rows:
+            stats = {}
+            for column, value in zip(columns, row):
+                # PostgreSQL returns NUMERIC aggregates as Decimal
+                stats[column] = float(value) if isinstance(value, Decimal) else value
+            results.append(stats)
+
+        logger.info(f"Computed market stats for {len(results)} group(s)")
+        return results
+
+    def refresh_market_snapshots(self, zip_codes: Optional[List[str]] = None,
+                                 window: int = MARKET_SNAPSHOT_WINDOW_DAYS) -> List[Dict[str, Any]]:
+        """
+        Recompute today's market_snapshots rows from the properties table.
+
+        Called for the ZIP codes touched by each upsert, and as a daily job
+        for all ZIP codes so every market gets a history point and listings
+        that age out of the window are dropped. Earlier days are never
+        rewritten, so they form the history read by get_market_snapshots.
+
+        Args:
+            zip_codes: ZIP codes to refresh (default: all)
+            window: Listings created within this many days are counted
+
+        Returns:
+            Snapshot rows written: one per (zip_code, property_type, bedrooms)
+            segment plus one ZIP-wide row per ZIP, whose property_type is
+            MARKET_SNAPSHOT_ALL_TYPES and bedrooms MARKET_SNAPSHOT_ALL_BEDROOMS
+        """
+        if zip_codes is not None and not zip_codes:
+            return []
+
+        snapshots = self.market_snapshot_rows(zip_codes, window=window)
+        today = datetime.now().date()
+        snapshot_date = today.isoformat() if self.db_type == 'sqlite' else today
+        ph = '?' if self.db_type == 'sqlite' else '%s'
+        columns = ('zip_code', 'property_type', 'bedrooms') + MARKET_SNAPSHOT_COLUMNS
+
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+
+                # Today's rows are replaced so segments with no listings left disappear
+                if zip_codes:
+                    cursor.execute(
+                        f"DELETE FROM market_snapshots WHERE snapshot_date = {ph} "
+                        f"AND zip_code IN ({', '.join([ph] * len(zip_codes))})",
+                        [snapshot_date] + sorted(zip_codes)
+                    )
+                else:
+                    cursor.execute(f"DELETE FROM market_snapshots WHERE snapshot_date = {ph}",
+                                   (snapshot_date,))
+
+                if snapshots:
+                    cursor.executemany(
+                        f"INSERT INTO market_snapshots (snapshot_date, {', '.join(columns)}) "
+                        f"VALUES ({', '.join([ph] * (len(columns) + 1))})",
+                        [(snapshot_date,) + tuple(row[column] for column in columns)
+                         for row in snapshots]
+                    )
+                cursor.close()
+
+        except Exception as e:
+            logger.error(f"Failed to refresh market snapshots: {e}")
+            raise DatabaseError(f"Market snapshot refresh failed: {e}")
+
+        logger.info(f"Refreshed {len(snapshots)} market snapshot(s) "
+                    f"for {len(zip_codes) if zip_codes else 'all'} ZIP code(s)")
+        return snapshots
+
+    def market_snapshot_rows(self, zip_codes: Optional[List[str]] = None,
+                             window: int = MARKET_SNAPSHOT_WINDOW_DAYS) -> List[Dict[str, Any]]:
+        """
+        Compute today's market snapshot rows without storing them.
+
+        Args:
+            zip_codes: ZIP codes to compute (default: all)
+            window: Listings created within this many days are counted
+
+        Returns:
+            Rows shaped like market_snapshots (see refresh_market_snapshots)
+        """
+        filters = {'zip_codes': sorted(zip_codes)} if zip_codes else None
+        segments = self.market_stats(group_by=['zip_code', 'property_type', 'bedrooms'],
+                                     window=window, filters=filters)
+        zip_wide = self.market_stats(group_by=['zip_code'], window=window, filters=filters)
+
+        rows = [row for row in segments
+                if row['zip_code'] and row['property_type'] is not None
+                and row['bedrooms'] is not None]
+        rows += [dict(row, property_type=MARKET_SNAPSHOT_ALL_TYPES,
+                      bedrooms=MARKET_SNAPSHOT_ALL_BEDROOMS)
+                 for row in zip_wide if row['zip_code']]
+
+        columns = ('zip_code', 'property_type', 'bedrooms') + MARKET_SNAPSHOT_COLUMNS
+        today = datetime.now().date().isoformat()
+        return [dict({column: row[column] for column in columns}, snapshot_date=today)
+                for row in rows]
+
+    def get_market_snapshots(self, zip_code: str, days: int = 0) -> List[Dict[str, Any]]:
+        """
+        Get stored market snapshots for one ZIP code.
+
+        Args:
+            zip_code: ZIP code
+            days: Days of history before today to include (0: today only)
+
+        Returns:
+            Snapshot rows (every segment and the ZIP-wide row), oldest first;
+            snapshot_date is an ISO date string
+        """
+        ph = '?' if self.db_type == 'sqlite' else '%s'
+        since = (datetime.now() - timedelta(days=days)).date()
+
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    f"""
+                    SELECT * FROM market_snapshots
+                    WHERE zip_code = {ph} AND snapshot_date >= {ph}
+                    ORDER BY snapshot_date
+                    """,
+                    (zip_code, since.isoformat() if self.db_type == 'sqlite' else since)
+                )
+                columns = [col[0] for col in cursor.description]
+                rows = cursor.fetchall()
+                cursor.close()
+
+        except Exception as e:
+            logger.error(f"Failed to fetch market snapshots for {zip_code}: {e}")
+            return []
+
+        results = []
+        for row in rows:
+            snapshot = {}
+            for column, value in zip(columns, row):
+                snapshot[column] = float(value) if isinstance(value, Decimal) else value
+            snapshot['snapshot_date'] = str(snapshot['snapshot_date'])
+            results.append(snapshot)
+        return results
+
+    def _schema_row(self, cursor, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Drop keys that aren't columns of the properties table"""
+        if self._property_columns is None:
+            if self.db_type == 'sqlite':
+                cursor.execute("PRAGMA table_info(properties)")
+                columns = [column[1] for column in cursor.fetchall()]
+            else:
+                schema = 'current_schema()' if self.db_type == 'postgresql' else 'DATABASE()'
+                cursor.execute(
+                    f"SELECT column_name FROM information_schema.columns "
+                    f"WHERE table_name = 'properties' AND table_schema = {schema}"
+                )
+                columns = [column[0] for column in cursor.fetchall()]
+
+            if not columns:
+                # Table not created yet: let the write report the error
+                return row
+            self._property_columns = frozenset(columns)
+
+        skipped = [key for key in row if key not in self._property_columns]
+        if not skipped:
+            return row
+
+        logger.debug(f"Skipping non-column property fields: {', '.join(skipped)}")
+        return {key: value for key, value in row.items() if key in self._property_columns}
+
+    def _current_zip_codes(self, cursor, property_ids: List[str]) -> Dict[str, str]:
+        """Read the stored ZIP code of existing properties, keyed by property_id"""
+        if not property_ids:
+            return {}
+
+        ph = '?' if self.db_type == 'sqlite' else '%s'
+        cursor.execute(
+            f"SELECT property_id, zip_code FROM properties "
+            f"WHERE property_id IN ({', '.join([ph] * len(property_ids))})",
+            property_ids
+        )
+        return {row[0]: row[1] for row in cursor.fetchall() if row[1]}
+
+    def _update_market_snapshots(self, properties: List[Dict[str, Any]],
+                                 previous_zip_codes: Iterable[str] = ()):
+        """
+        Refresh today's snapshots for the ZIP codes of committed property writes
+
+        Args:
+            properties: Written property rows (full or partial)
+            previous_zip_codes: ZIP codes the properties were moved out of
+        """
+        changed = [prop for prop in properties if MARKET_SNAPSHOT_INPUTS.intersection(prop)]
+        zip_codes = {prop['zip_code'] for prop in changed if prop.get('zip_code')}
+        zip_codes.update(zip_code for zip_code in previous_zip_codes if zip_code)
+
+        # Snapshots are derived data; a failure here must not fail the write
+        try:
+            # Partial updates (e.g. a price change) don't carry their ZIP code
+            unknown = [prop['property_id'] for prop in changed if not prop.get('zip_code')]
+            if unknown:
+                ph = '?' if self.db_type == 'sqlite' else '%s'
+                with self.get_connection() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute(
+                        f"SELECT DISTINCT zip_code FROM properties "
+                        f"WHERE property_id IN ({', '.join([ph] * len(unknown))})",
+                        unknown
+                    )
+                    zip_codes.update(row[0] for row in cursor.fetchall() if row[0])
+                    cursor.close()
+
+            if zip_codes:
+                self.refresh_market_snapshots(sorted(zip_codes))
+
+        except Exception as e:
+            logger.warning(f"Market snapshots not updated: {e}")
+
     # ========================================
     # BUYER OPERATIONS
     # ========================================
@@ -0,0 +1,396 @@
+"""
+Deduplication Engine Module for DealFinder Pro
+Finds duplicate listings with blocking indexes instead of all-pairs comparison.
+
+Each address is normalized once and every record is bucketed under its
+blocking keys:
+- MLS number
+- Normalized address length
+- (list_price, square_feet, bedrooms, zip_code) tuple
+
+Duplicate rules are unchanged from the original all-pairs scan, so results
+are identical. Two addresses can only reach the similarity threshold if
+their lengths are close (SequenceMatcher.real_quick_ratio() bounds the
+ratio by length), so a record is only compared with addresses whose length
+falls inside that window. MLS and attribute matches are exact-key lookups.
+"""
+
+from bisect import bisect_right
+from difflib import SequenceMatcher
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+import threading
+
+
+# Every record with an address, probed when no length window applies
+_ANY_ADDRESS = ('address', '*')
+
+
+class DedupEngine:
+    """Groups duplicate properties using MLS, address and attribute blocking keys"""
+
+    def __init__(self, normalize_address: Callable[[str], str],
+                 similarity_threshold: float = 0.90):
+        """
+        Initialize deduplication engine
+
+        Args:
+            normalize_address: Function that standardizes a full address string
+            similarity_threshold: Minimum address similarity (0.0-1.0) for a fuzzy match
+        """
+        self.normalize_address = normalize_address
+        self.similarity_threshold = similarity_threshold
+        self.logger = logging.getLogger(__name__)
+
+    def find_duplicate_groups(self, properties: List[Dict]) -> List[List[int]]:
+        """
+        Group property indices into duplicate sets.
+
+        Grouping follows the same greedy order as the original pairwise scan:
+        the lowest unprocessed index anchors a group and collects every later
+        unprocessed record that is a duplicate of the anchor itself.
+
+        Args:
+            properties: List of property dictionaries
+
+        Returns:
+            List of index groups in input order. The first index in each
+            group is the anchor, the rest are its duplicates in ascending order.
+        """
+        records = [self._build_record(prop) for prop in properties]
+        buckets = self._build_buckets(records)
+
+        groups = []
+        processed = [False] * len(records)
+
+        for i, record in enumerate(records):
+            if processed[i]:
+                continue
+            processed[i] = True
+
+            group = [i]
+            for j in self._candidates(i, record, buckets):
+                if processed[j]:
+                    continue
+                if self._is_duplicate(record, records[j]):
+                    group.append(j)
+                    processed[j] = True
+
+            groups.append(group)
+
+        self.logger.debug("Built %d blocking buckets for %d properties",
+                          len(buckets), len(records))
+        return groups
+
+    def new_index(self) -> 'DedupIndex':
+        """Create an empty incremental index for streaming deduplication"""
+        return DedupIndex(self)
+
+    def _build_record(self, prop: Dict) -> Dict:
+        """Precompute the comparison fields and blocking keys for one property"""
+        address = self.normalize_address(
+            f"{prop.get('street_address', '')} {prop.get('city', '')} {prop.get('state', '')} {prop.get('zip_code', '')}"
+        )
+
+        mls_number = prop.get('mls_number')
+        price = prop.get('list_price')
+        sqft = prop.get('square_feet')
+        beds = prop.get('bedrooms')
+        zip_code = prop.get('zip_code')
+
+        keys = []
+        if mls_number:
+            keys.append(('mls', mls_number))
+
+        probes = []
+        if address:
+            keys.append(('address', len(address)))
+            keys.append(_ANY_ADDRESS)
+            probes.extend(self._address_probes(len(address)))
+
+        attribute_key = None
+        if all([price, sqft, beds]):
+            attribute_key = ('attributes', price, sqft, beds, zip_code)
+            keys.append(attribute_key)
+
+        return {
+            'mls_number': mls_number,
+            'address': address,
+            'attribute_key': attribute_key,
+            # Buckets the record is stored in, and the buckets it searches
+            'keys': keys,
+            'probes': [key for key in keys if key[0] != 'address'] + probes
+        }
+
+    def _address_probes(self, length: int) -> List[Tuple]:
+        """
+        Return the address buckets that can hold a fuzzy match.
+
+        Uses the same bound as SequenceMatcher.real_quick_ratio(), so every
+        address skipped here would have been rejected by _addresses_match.
+        """
+        threshold = self.similarity_threshold
+        if threshold <= 0:
+            return [_ANY_ADDRESS]
+
+        longest = int(length * (2 - threshold) / threshold) + 1
+        return [('address', other) for other in range(1, longest + 1)
+                if 2.0 * min(length, other) / (length + other) >= threshold]
+
+    def _build_buckets(self, records: List[Dict]) -> Dict[Tuple, List[int]]:
+        """Index record positions under each of their blocking keys"""
+        buckets: Dict[Tuple, List[int]] = {}
+        for index, record in enumerate(records):
+            for key in record['keys']:
+                buckets.setdefault(key, []).append(index)
+        return buckets
+
+    def _candidates(self, index: int, record: Dict,
+                    buckets: Dict[Tuple, List[int]]) -> List[int]:
+        """Collect later record positions sharing at least one blocking key"""
+        candidates = set()
+        for key in record['probes']:
+            members = buckets.get(key, [])
+            # Bucket members are stored in ascending order
+            candidates.update(members[bisect_right(members, index):])
+        return sorted(candidates)
+
+    def is_duplicate(self, prop1: Dict, prop2: Dict) -> bool:
+        """
+        Determine if two properties are duplicates.
+
+        Args:
+            prop1: First property
+            prop2: Second property
+
+        Returns:
+            True if properties are duplicates
+        """
+        return self._is_duplicate(self._build_record(prop1), self._build_record(prop2))
+
+    def build_record(self, prop: Dict) -> Dict:
+        """
+        Precompute the normalized address and blocking keys for a property.
+
+        Args:
+            prop: Property dictionary
+
+        Returns:
+            Record dict accepted by DedupIndex.add
+        """
+        return self._build_record(prop)
+
+    def _is_duplicate(self, record1: Dict, record2: Dict) -> bool:
+        """
+        Determine if two precomputed records are duplicates.
+
+        Applies the same rules as the original pairwise scan.
+        """
+        # Strategy 1: Exact MLS number match
+        mls1 = record1['mls_number']
+        mls2 = record2['mls_number']
+        if mls1 and mls2 and mls1 == mls2:
+            return True
+
+        # Strategy 2: Address fuzzy match (>90% similarity)
+        if self._addresses_match(record1['address'], record2['address']):
+            return True
+
+        # Strategy 3: Price + sqft + bedrooms + ZIP exact match
+        if record1['attribute_key'] is not None and record1['attribute_key'] == record2['attribute_key']:
+            return True
+
+        return False
+
+    def _addresses_match(self, addr1: str, addr2: str) -> bool:
+        """
+        Check whether two normalized addresses reach the similarity threshold.
+
+        SequenceMatcher's real_quick_ratio() and quick_ratio() are upper
+        bounds of ratio(), so pairs that cannot reach the threshold are
+        rejected without running the full matching.
+        """
+        if not addr1 or not addr2:
+            return False
+        if addr1 == addr2:
+            return True
+
+        matcher = SequenceMatcher(None, addr1, addr2)
+        threshold = self.similarity_threshold
+        return (matcher.real_quick_ratio() >= threshold and
+                matcher.quick_ratio() >= threshold and
+                matcher.ratio() >= threshold)
+
+
+class DedupIndex:
+    """Incremental blocking index that flags duplicates as records arrive"""
+
+    def __init__(self, engine: DedupEngine):
+        """
+        Initialize incremental index
+
+        Args:
+            engine: DedupEngine providing the duplicate rules
+        """
+        self.engine = engine
+        self.records: List[Dict] = []
+        self.buckets: Dict[Tuple, List[int]] = {}
+
+    def add(self, record: Dict) -> Optional[int]:
+        """
+        Check a record against every unique record seen so far.
+
+        Like the batch scan, a record is only compared with earlier unique
+        records (group anchors), never with earlier duplicates.
+
+        Args:
+            record: Record from DedupEngine.build_record
+
+        Returns:
+            Position of the matching earlier record, or None if the record
+            is new (it is then added to the index)
+        """
+        candidates = set()
+        for key in record['probes']:
+            candidates.update(self.buckets.get(key, ()))
+
+        for position in sorted(candidates):
+            if self.engine._is_duplicate(self.records[position], record):
+                return position
+
+        position = len(self.records)
+        self.records.append(record)
+        for key in record['keys']:
+            self.buckets.setdefault(key, []).append(position)
+        return None
+
+
+class StreamingDeduplicator:
+    """
+    Deduplicates listings as they stream in, merging each duplicate into
+    the first-seen listing.
+
+    The first-seen listing is passed on immediately. When a duplicate
+    arrives, it is merged into that listing, and the merged record is
+    passed on as a newer version under the same property_id. results()
+    returns the newest version of each listing that made it through.
+
+    Later stages use claim() to handle only the newest version of a listing,
+    and to handle it again when a merge supersedes the version they had.
+
+    Known limitation: memory is not bounded by the pipeline's queues. A
+    later duplicate can repeat any earlier listing, so the blocking index
+    and each listing's merged source record are kept for the whole run,
+    as is the newest finished version, which results() returns for the
+    report. Per-version bookkeeping is dropped as versions finish or are
+    superseded.
+    """
+
+    def __init__(self, engine: DedupEngine, merge: Callable[[Dict, Dict], Dict]):
+        """
+        Initialize streaming deduplicator
+
+        Args:
+            engine: DedupEngine providing the duplicate rules
+            merge: Merges (kept listing, duplicate) into a new listing dict
+        """
+        self.engine = engine
+        self.merge = merge
+        self.index = engine.new_index()
+        self.duplicates = 0
+
+        # Per unique listing: its unanalyzed merged data and newest version number
+        self._sources: List[Dict] = []
+        self._latest: List[int] = []
+        # id(version) -> (listing position, version number), while in flight
+        self._positions: Dict[int, Tuple[int, int]] = {}
+        # Listing position -> (version number, newest finished version)
+        self._finished: Dict[int, Tuple[int, Dict]] = {}
+        # Step name -> listing position -> version number last claimed
+        self._claimed: Dict[str, Dict[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, prop: Dict) -> Dict:
+        """
+        Add a listing (call from one thread, in source order)
+
+        Args:
+            prop: Property dictionary
+
+        Returns:
+            The listing to pass on: prop itself if it is new, otherwise a
+            merged copy of the listing it duplicates
+        """
+        position = self.index.add(self.engine.build_record(prop))
+
+        with self._lock:
+            if position is None:
+                position = len(self._sources)
+                # Kept apart from prop, which later stages update with analysis
+                self._sources.append(dict(prop))
+                self._latest.append(0)
+                emitted = prop
+            else:
+                self.duplicates += 1
+                kept = self._sources[position]
+                merged = self.merge(kept, prop)
+                # The first version is already downstream under this id
+                merged['property_id'] = kept.get('property_id')
+                self._sources[position] = merged
+                self._latest[position] += 1
+                emitted = dict(merged)
+
+            self._positions[id(emitted)] = (position, self._latest[position])
+        return emitted
+
+    def is_latest(self, prop: Dict) -> bool:
+        """
+        Check that no newer version of a listing has been emitted
+
+        Args:
+            prop: A version returned by add
+
+        Returns:
+            False if prop was superseded by a later merge
+        """
+        with self._lock:
+            position, version = self._positions[id(prop)]
+            return version == self._latest[position]
+
+    def claim(self, prop: Dict, step: str) -> bool:
+        """
+        Claim a listing version for a step
+
+        Args:
+            prop: A version returned by add
+            step: Step name (e.g. 'match')
+
+        Returns:
+            True if prop is the newest version of its listing and newer than
+            the version last claimed for step. A listing claimed again was
+            superseded by a merge after step handled it.
+        """
+        with self._lock:
+            position, version = self._positions[id(prop)]
+            claimed = self._claimed.setdefault(step, {})
+            if version != self._latest[position] or version <= claimed.get(position, -1):
+                return False
+            claimed[position] = version
+            return True
+
+    def finish(self, prop: Dict):
+        """Record a version that made it through every stage"""
+        with self._lock:
+            position, version = self._positions.pop(id(prop))
+            if version >= self._finished.get(position, (-1, None))[0]:
+                self._finished[position] = (version, prop)
+
+    @property
+    def unique(self) -> int:
+        """Number of unique listings seen"""
+        return len(self._sources)
+
+    def results(self) -> List[Dict]:
+        """Newest finished version of each listing, in first-seen order"""
+        with self._lock:
+            return [self._finished[position][1] for position in sorted(self._finished)]
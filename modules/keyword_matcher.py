@@ -0,0 +1,174 @@
+"""
+Keyword Matcher Module for DealFinder Pro
+Finds every listing keyword in a description with one pass over the text.
+
+All phrases are compiled into a single regular expression: the alternation
+is factored into a character trie (so each position tries one branch per
+next character, not every phrase) and wrapped in a lookahead so overlapping
+phrases starting at different words are all reported. A phrase found inside
+a longer one ("fixer" in "fixer upper") is reported with it.
+
+Phrases match whole words only, with an optional plural "s": "pools"
+matches "pool", but "stereo" does not match "reo" and "carpool" does not
+match "pool". Results are cached per description, so the analyzer, scorer
+and enrichment steps share one scan of each listing.
+"""
+
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+import re
+import threading
+
+
+# Listing features reported by DataEnrichment.extract_keywords
+KEYWORD_CATEGORIES = {
+    'motivated': ['motivated seller', 'motivated', 'must sell'],
+    'as-is': ['as-is', 'as is', 'sold as is'],
+    'fixer': ['fixer', 'fixer upper', 'fixer-upper', 'needs work', 'tlc'],
+    'estate': ['estate sale', 'estate', 'probate'],
+    'foreclosure': ['foreclosure', 'foreclosed', 'bank owned', 'reo'],
+    'short_sale': ['short sale', 'shortsale'],
+    'price_reduction': ['price reduction', 'reduced', 'price drop', 'price cut'],
+    'distressed': ['distressed', 'distress sale'],
+    'handyman': ['handyman special', 'handyman'],
+    'investor': ['investor opportunity', 'investors welcome', 'investor special'],
+    'cash_only': ['cash only', 'cash buyers only'],
+    'no_hoa': ['no hoa', 'no homeowners association'],
+    'pool': ['pool', 'swimming pool'],
+    'waterfront': ['waterfront', 'water front', 'lake front', 'oceanfront'],
+    'corner_lot': ['corner lot'],
+    'cul_de_sac': ['cul de sac', 'cul-de-sac'],
+}
+
+# Motivated-seller keywords used when config has no distressed_keywords
+DEFAULT_DISTRESSED_KEYWORDS = ['motivated', 'as-is', 'fixer', 'needs work', 'estate sale',
+                               'must sell', 'tlc', 'handyman', 'cash only']
+
+# Keywords counted by the condition score component
+DISTRESSED_SCORE_KEYWORDS = [
+    'motivated', 'as-is', 'fixer', 'needs work',
+    'estate sale', 'must sell', 'tlc', 'handyman',
+    'cash only', 'investor special', 'potential',
+    'bring offers'
+]
+
+# Rehab estimate tiers (checked in order)
+HEAVY_REHAB_KEYWORDS = ['fixer upper', 'gut rehab', 'needs work',
+                        'investor special', 'major repairs']
+MODERATE_REHAB_KEYWORDS = ['tlc', 'as-is', 'cosmetic updates',
+                           'potential', 'handyman']
+
+
+def _trie_pattern(phrases: Iterable[str]) -> str:
+    """Regex alternation for the phrases with common prefixes factored out"""
+    trie: Dict = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{body})?' if '' in node else body
+
+    return build(trie)
+
+
+def _word_pattern(body: str) -> str:
+    """Pattern matching body as whole words, allowing a plural 's'"""
+    return r'(?<!\w)' + body + r's?(?!\w)'
+
+
+class KeywordMatcher:
+    """Compiled single-pass matcher for a fixed set of phrases"""
+
+    def __init__(self, phrases: Iterable[str], cache_size: int = 4096):
+        """
+        Compile phrases
+
+        Args:
+            phrases: Phrases to find (matched lower-case)
+            cache_size: Descriptions whose results are kept for reuse
+        """
+        self.phrases = sorted({phrase.lower() for phrase in phrases if phrase})
+
+        # Longest phrase at each word start; the lookahead lets the next
+        # word start be tried even when it lies inside this match
+        self._pattern = re.compile(r'(?<!\w)(?=(' + _trie_pattern(self.phrases) + r')s?(?!\w))')
+
+        # Every phrase implied by a match of a longer phrase
+        self._implied: Dict[str, FrozenSet[str]] = {}
+        for phrase in self.phrases:
+            self._implied[phrase] = frozenset(
+                other for other in self.phrases
+                if len(other) <= len(phrase) and re.search(_word_pattern(re.escape(other)), phrase)
+            )
+
+        self.find = lru_cache(maxsize=cache_size)(self._find)
+
+    def _find(self, text: str) -> FrozenSet[str]:
+        """
+        Phrases present in a description
+
+        Args:
+            text: Lower-cased description
+
+        Returns:
+            Set of matched phrases
+        """
+        found = set()
+        for match in self._pattern.finditer(text):
+            found |= self._implied[match.group(1)]
+        return frozenset(found)
+
+    def find_all(self, texts: Iterable[str]) -> List[FrozenSet[str]]:
+        """Matched phrases for each of several lower-cased descriptions"""
+        return [self.find(text) for text in texts]
+
+    def categories(self, text: str, categories: Dict[str, List[str]]) -> List[str]:
+        """
+        Categories with at least one phrase in a description
+
+        Args:
+            text: Lower-cased description
+            categories: Phrases per category (all must be known to the matcher)
+
+        Returns:
+            Matched category names, in the order given
+        """
+        found = self.find(text)
+        return [category for category, phrases in categories.items()
+                if not found.isdisjoint(phrases)]
+
+
+def distressed_keywords(config: Dict) -> List[str]:
+    """Motivated-seller keywords from config (undervalued_criteria.distressed_keywords)"""
+    return config.get('undervalued_criteria', {}).get('distressed_keywords', DEFAULT_DISTRESSED_KEYWORDS)
+
+
+# One matcher per distinct set of config keywords
+_matchers: Dict[Tuple[str, ...], KeywordMatcher] = {}
+_matchers_lock = threading.Lock()
+
+def get_keyword_matcher(config: Optional[Dict] = None) -> KeywordMatcher:
+    """
+    Get the shared matcher for the built-in keyword lists plus config keywords
+
+    Args:
+        config: Application config (its distressed_keywords are added)
+
+    Returns:
+        KeywordMatcher (built once per distinct keyword set)
+    """
+    keywords = distressed_keywords(config or {})
+    key = tuple(sorted({kw.lower() for kw in keywords if kw}))
+    with _matchers_lock:
+        if key not in _matchers:
+            phrases = [phrase for group in KEYWORD_CATEGORIES.values() for phrase in group]
+            phrases += DISTRESSED_SCORE_KEYWORDS + HEAVY_REHAB_KEYWORDS + MODERATE_REHAB_KEYWORDS
+            _matchers[key] = KeywordMatcher(phrases + list(key))
+        return _matchers[key]
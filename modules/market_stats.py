@@ -0,0 +1,155 @@
+"""
+Market Stats Cache Module for DealFinder Pro
+Serves comparable-market statistics from memory instead of querying per property.
+
+The first lookup for a ZIP code reads its rows from the market_snapshots
+table (one row per (property_type, bedrooms) segment plus a ZIP-wide row,
+kept current as properties are upserted) together with the last
+TREND_DAYS of snapshot history used for price trends. A ZIP without a
+snapshot for today has it computed and stored first. Later lookups for
+that ZIP are served from memory until the entry expires or is invalidated.
+"""
+
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+import copy
+import logging
+import threading
+import time
+
+from modules.database import MARKET_SNAPSHOT_ALL_BEDROOMS, MARKET_SNAPSHOT_ALL_TYPES
+
+
+# Days of snapshot history loaded for price trends
+TREND_DAYS = 30
+
+# A trend is measured against a snapshot at least this many days old
+MIN_TREND_DAYS = 7
+
+
+class MarketStatsCache:
+    """In-memory, TTL-bounded cache of per-ZIP market statistics"""
+
+    def __init__(self, db_manager, summarize: Callable[[Dict, List[Dict]], Dict],
+                 ttl_hours: float = 24, lookback_days: int = 90,
+                 min_comparables: int = 3):
+        """
+        Initialize market stats cache
+
+        Args:
+            db_manager: DatabaseManager holding market snapshots
+            summarize: Function that turns a snapshot row and the segment's
+                earlier snapshots (oldest first) into a stats dict
+            ttl_hours: Hours before a cached ZIP is reloaded
+            lookback_days: Only listings created within this window are comparables
+                (snapshots are stored for MARKET_SNAPSHOT_WINDOW_DAYS)
+            min_comparables: Minimum listings required for a segment to have stats
+        """
+        self.db = db_manager
+        self.summarize = summarize
+        self.ttl_seconds = ttl_hours * 3600
+        self.lookback_days = lookback_days
+        self.min_comparables = min_comparables
+        self.logger = logging.getLogger(__name__)
+
+        self._entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.queries = 0
+
+    def get(self, zip_code: str, property_type: str, bedrooms: Any) -> Optional[Dict]:
+        """
+        Get market stats for a property segment.
+
+        Falls back to ZIP-wide stats when the (property_type, bedrooms)
+        segment has fewer than min_comparables listings.
+
+        Args:
+            zip_code: Property ZIP code
+            property_type: Single Family, Condo, etc.
+            bedrooms: Number of bedrooms
+
+        Returns:
+            Copy of the stats dict, or None if the ZIP lacks comparables
+        """
+        with self._lock:
+            entry = self._entries.get(zip_code)
+            if entry is None or time.monotonic() - entry['loaded_at'] > self.ttl_seconds:
+                self.misses += 1
+                entry = self._load_zip(zip_code)
+                self._entries[zip_code] = entry
+            else:
+                self.hits += 1
+
+        stats = entry['segments'].get((property_type, bedrooms)) or entry['zip']
+        return copy.deepcopy(stats) if stats is not None else None
+
+    def invalidate(self, zip_code: Optional[str] = None):
+        """
+        Drop cached stats so they are recomputed on next lookup.
+
+        Args:
+            zip_code: ZIP code to drop (default: all ZIP codes)
+        """
+        with self._lock:
+            if zip_code is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(zip_code, None)
+
+    def get_cache_stats(self) -> Dict[str, int]:
+        """Return cache hit/miss/query counters"""
+        return {
+            'cached_zip_codes': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'queries': self.queries
+        }
+
+    def _load_zip(self, zip_code: str) -> Dict:
+        """Load one ZIP's current snapshot rows and their history"""
+        self.queries += 1
+        history = self.db.get_market_snapshots(zip_code, days=TREND_DAYS)
+
+        today = datetime.now().date().isoformat()
+        current = [row for row in history if row['snapshot_date'] == today]
+        if not current:
+            current = self._snapshot_zip(zip_code)
+
+        earlier: Dict[tuple, List[Dict]] = {}
+        for row in history:
+            if row['snapshot_date'] != today:
+                earlier.setdefault((row['property_type'], row['bedrooms']), []).append(row)
+
+        zip_key = (MARKET_SNAPSHOT_ALL_TYPES, MARKET_SNAPSHOT_ALL_BEDROOMS)
+        segments = {}
+        zip_stats = None
+        for row in current:
+            key = (row['property_type'], row['bedrooms'])
+            if row['listing_count'] < self.min_comparables:
+                continue
+            stats = self.summarize(row, earlier.get(key, []))
+            if key == zip_key:
+                zip_stats = stats
+            else:
+                segments[key] = stats
+
+        self.logger.debug(f"Cached market stats for ZIP {zip_code}: "
+                          f"{len(segments)} segments, {len(history) - len(current)} history rows")
+
+        return {
+            'loaded_at': time.monotonic(),
+            'segments': segments,
+            'zip': zip_stats
+        }
+
+    def _snapshot_zip(self, zip_code: str) -> List[Dict]:
+        """Compute and store today's snapshot rows for a ZIP"""
+        self.queries += 1
+        try:
+            return self.db.refresh_market_snapshots([zip_code], window=self.lookback_days)
+        except Exception as e:
+            # Without the table (e.g. an unmigrated database) use the aggregates directly
+            self.logger.warning(f"Could not store market snapshots for ZIP {zip_code}: {e}")
+            return self.db.market_snapshot_rows([zip_code], window=self.lookback_days)
@@ -0,0 +1,351 @@
+"""
+Match Engine - Shared Criteria Matching for SearchAgents
+Loads a property scan once and evaluates agent criteria against prebuilt indexes
+
+Indexes built per scan:
+- ZIP code -> row mask
+- Sorted price / bedroom / bathroom arrays (range filters via bisect)
+- property_type and deal_quality -> row masks
+
+Rows are represented as numpy boolean masks built once per scan, so
+combining filters is a handful of vectorized ANDs instead of a Python loop
+over every property.
+"""
+
+import logging
+import threading
+from bisect import bisect_left, bisect_right
+from numbers import Number
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from modules.scan_store import ScanStore, get_scan_store
+
+logger = logging.getLogger(__name__)
+
+
+class ScanIndex:
+    """Immutable indexes over the properties of one scan"""
+
+    def __init__(self, properties: List[Dict], scan_timestamp: Optional[str] = None):
+        """
+        Build indexes for a scan
+
+        Args:
+            properties: Property dictionaries from the scan
+            scan_timestamp: Scan timestamp used to detect unchanged scans
+        """
+        self.properties = properties
+        self.scan_timestamp = scan_timestamp
+        self.row_count = len(properties)
+
+        zip_rows: Dict[str, List[int]] = {}
+        type_rows: Dict = {}
+        quality_rows: Dict = {}
+
+        prices = []
+        bedrooms = []
+        bathrooms = []
+
+        for row, prop in enumerate(properties):
+            zip_rows.setdefault(str(prop.get('zip_code', '')), []).append(row)
+            self._add_row(type_rows, prop.get('property_type', ''), row)
+            self._add_row(quality_rows, prop.get('deal_quality', ''), row)
+
+            prices.append((prop.get('list_price') or prop.get('price', 0), row))
+            bedrooms.append((prop.get('bedrooms', 0), row))
+            bathrooms.append((prop.get('bathrooms', 0), row))
+
+        self.zip_masks = self._build_masks(zip_rows)
+        self.type_masks = self._build_masks(type_rows)
+        self.quality_masks = self._build_masks(quality_rows)
+
+        self.price_index = self._build_range_index(prices)
+        self.bedroom_index = self._build_range_index(bedrooms)
+        self.bathroom_index = self._build_range_index(bathrooms)
+
+    @staticmethod
+    def _add_row(index: Dict, value, row: int):
+        """Add a row under a categorical value"""
+        try:
+            index.setdefault(value, []).append(row)
+        except TypeError:
+            # Unhashable values can never equal a criteria string
+            pass
+
+    def _mask(self, rows=()) -> np.ndarray:
+        """Boolean row mask with the given rows set"""
+        mask = np.zeros(self.row_count, dtype=bool)
+        mask[np.asarray(rows, dtype=np.intp)] = True
+        return mask
+
+    def _build_masks(self, index: Dict) -> Dict:
+        """Convert value -> row list into value -> row mask"""
+        return {value: self._mask(rows) for value, rows in index.items()}
+
+    def _any_mask(self, masks: Dict, values) -> np.ndarray:
+        """Rows matching any of the values"""
+        mask = self._mask()
+        for value in values:
+            if value in masks:
+                mask |= masks[value]
+        return mask
+
+    def _build_range_index(self, pairs: List[Tuple]) -> Tuple[List, np.ndarray, np.ndarray]:
+        """
+        Sort numeric (value, row) pairs for range filtering.
+
+        Non-numeric values fail every range filter. NaN compares False
+        against any bound, so NaN rows pass every range filter.
+        """
+        numeric = []
+        nan_rows = []
+        for value, row in pairs:
+            if not isinstance(value, Number) or isinstance(value, bool):
+                continue
+            if value != value:
+                nan_rows.append(row)
+            else:
+                numeric.append((value, row))
+
+        numeric.sort()
+        rows = np.array([row for _, row in numeric], dtype=np.intp)
+        return [value for value, _ in numeric], rows, self._mask(nan_rows)
+
+    def _range_mask(self, index: Tuple[List, np.ndarray, np.ndarray], low=None, high=None) -> np.ndarray:
+        """Mask of rows whose value lies within [low, high]"""
+        values, rows, nan_mask = index
+        start = bisect_left(values, low) if low is not None else 0
+        end = bisect_right(values, high) if high is not None else len(values)
+
+        mask = nan_mask.copy()
+        mask[rows[start:end]] = True
+        return mask
+
+    def candidate_rows(self, criteria: Dict) -> List[int]:
+        """
+        Rows passing the basic filters (same rules as the per-property check)
+
+        Args:
+            criteria: SearchAgent criteria dictionary
+
+        Returns:
+            Matching row numbers in scan order
+        """
+        mask = np.ones(self.row_count, dtype=bool)
+
+        if criteria.get('zip_codes'):
+            mask &= self._any_mask(self.zip_masks, criteria['zip_codes'])
+
+        price_min = criteria.get('price_min') or None
+        price_max = criteria.get('price_max') or None
+        if price_min or price_max:
+            mask &= self._range_mask(self.price_index, price_min, price_max)
+
+        if criteria.get('bedrooms_min'):
+            mask &= self._range_mask(self.bedroom_index, criteria['bedrooms_min'])
+
+        if criteria.get('bathrooms_min'):
+            mask &= self._range_mask(self.bathroom_index, criteria['bathrooms_min'])
+
+        if criteria.get('property_types'):
+            mask &= self._any_mask(self.type_masks, criteria['property_types'])
+
+        if criteria.get('deal_quality'):
+            mask &= self._any_mask(self.quality_masks, criteria['deal_quality'])
+
+        return np.flatnonzero(mask).tolist()
+
+
+def calculate_match_score(prop: Dict, criteria: Dict) -> Tuple[int, List[str]]:
+    """
+    Calculate 0-100 match score for property
+
+    Args:
+        prop: Property data dictionary
+        criteria: SearchAgent criteria dictionary
+
+    Returns:
+        (score, reasons) tuple
+    """
+    score = 0
+    reasons = []
+
+    # Start with property's opportunity score (0-100)
+    opp_score = prop.get('opportunity_score', 0)
+    score += min(opp_score, 40)  # Max 40 points from opportunity score
+
+    if opp_score >= 90:
+        reasons.append(f"🔥 HOT DEAL - {opp_score}/100 opportunity score")
+    elif opp_score >= 80:
+        reasons.append(f"✨ GOOD DEAL - {opp_score}/100 opportunity score")
+
+    # Location precision match (30 points max)
+    prop_zip = str(prop.get('zip_code', ''))
+    if prop_zip in criteria['zip_codes']:
+        score += 30
+        reasons.append(f"📍 Exact ZIP match: {prop_zip}")
+
+    # Price positioning (15 points max)
+    price = prop.get('list_price') or prop.get('price', 0)
+    if criteria['price_min'] and criteria['price_max']:
+        price_range = criteria['price_max'] - criteria['price_min']
+        price_midpoint = criteria['price_min'] + (price_range / 2)
+
+        # Closer to midpoint = higher score
+        price_deviation = abs(price - price_midpoint) / price_range
+        price_score = max(0, 15 - (price_deviation * 15))
+        score += price_score
+
+        reasons.append(f"💰 Price ${price:,.0f} within budget")
+
+    # Property characteristics match (15 points max)
+    bedrooms = prop.get('bedrooms', 0)
+    bathrooms = prop.get('bathrooms', 0)
+
+    if bedrooms >= criteria.get('bedrooms_min', 0):
+        score += 8
+        reasons.append(f"🛏️ {bedrooms} bedrooms")
+
+    if bathrooms >= criteria.get('bathrooms_min', 0):
+        score += 7
+        reasons.append(f"🚿 {bathrooms} bathrooms")
+
+    # Privy intelligence bonus (from Privy.pro CSV imports)
+    if prop.get('absentee_owner'):
+        score += 10
+        reasons.append(f"🏚️ Absentee owner - easier to motivate")
+
+    if prop.get('investor_owned'):
+        score += 5
+        owner_name = prop.get('owner_name', 'Unknown')
+        reasons.append(f"💼 Investor-owned: {owner_name[:40]}")
+
+    if prop.get('flip_history'):
+        score += 5
+        prev_owner = prop.get('previous_owner', 'Unknown')
+        reasons.append(f"🔄 Flip history (prev: {prev_owner[:30]})")
+
+    # Investment metrics bonus (bonus points, can exceed 100)
+    if criteria.get('investment_type') == 'cash_flow':
+        monthly_cashflow = prop.get('monthly_cashflow', 0)
+        if monthly_cashflow > 500:
+            score += 10
+            reasons.append(f"💸 Strong cash flow: ${monthly_cashflow:,.0f}/mo")
+
+    if criteria.get('investment_type') == 'appreciation':
+        appreciation_potential = prop.get('appreciation_potential', 0)
+        if appreciation_potential > 15:
+            score += 10
+            reasons.append(f"📈 High appreciation potential: {appreciation_potential}%")
+
+    # Market timing bonus
+    days_on_market = prop.get('days_on_market', 0)
+    if days_on_market > 60:
+        score += 5
+        reasons.append(f"⏰ Motivated seller - {days_on_market} days on market")
+
+    return min(score, 100), reasons
+
+
+class MatchEngine:
+    """Shares one parsed, indexed scan across all SearchAgents"""
+
+    def __init__(self, store: Optional[ScanStore] = None):
+        """
+        Initialize match engine
+
+        Args:
+            store: Scan store (default: shared get_scan_store())
+        """
+        self.store = store or get_scan_store()
+        self._index: Optional[ScanIndex] = None
+        self._index_version = None
+        self._lock = threading.Lock()
+
+    def get_index(self) -> Optional[ScanIndex]:
+        """
+        Get indexes for the current scan, rebuilding only when a new version is published
+
+        Returns:
+            ScanIndex or None if the scan cannot be loaded
+        """
+        with self._lock:
+            try:
+                snapshot = self.store.current()
+                if snapshot is None:
+                    logger.error(f"No scan published in {self.store.store_dir}")
+                    return None
+
+                if self._index is not None and snapshot.version == self._index_version:
+                    return self._index
+
+                self._index = ScanIndex(snapshot.properties(), snapshot.scan_timestamp)
+                self._index_version = snapshot.version
+                logger.info(f"Indexed {len(self._index.properties)} properties from scan version {snapshot.version}")
+                return self._index
+
+            except Exception as e:
+                logger.error(f"Error loading properties: {e}")
+                return None
+
+    def find_matches(self, criteria: Dict, index: ScanIndex) -> List[Dict]:
+        """
+        Evaluate one agent's criteria against a scan index
+
+        Args:
+            criteria: SearchAgent criteria dictionary
+            index: Scan index to match against
+
+        Returns:
+            Matches sorted by match score (highest first)
+        """
+        matches = []
+        for row in index.candidate_rows(criteria):
+            prop = index.properties[row]
+            match_score, reasons = calculate_match_score(prop, criteria)
+
+            if match_score >= criteria['min_score']:
+                matches.append({
+                    'property': prop,
+                    'match_score': match_score,
+                    'match_reasons': reasons
+                })
+
+        # Sort by match score (highest first)
+        matches.sort(key=lambda x: x['match_score'], reverse=True)
+        return matches
+
+    def match_all(self, criteria_by_agent: Dict[str, Dict]) -> Dict[str, List[Dict]]:
+        """
+        Evaluate many agents' criteria against the current scan in one pass
+
+        Args:
+            criteria_by_agent: Criteria dictionaries keyed by agent ID
+
+        Returns:
+            Matches keyed by agent ID (agents whose criteria fail to evaluate are omitted)
+        """
+        index = self.get_index()
+        if index is None:
+            return {}
+
+        results = {}
+        for agent_id, criteria in criteria_by_agent.items():
+            try:
+                results[agent_id] = self.find_matches(criteria, index)
+            except Exception as e:
+                logger.error(f"Error matching criteria for agent {agent_id}: {e}")
+        return results
+
+
+# Singleton instance
+_engine_instance = None
+
+def get_match_engine() -> MatchEngine:
+    """Get singleton MatchEngine instance"""
+    global _engine_instance
+    if _engine_instance is None:
+        _engine_instance = MatchEngine()
+    return _engine_instance
@@ -0,0 +1,201 @@
+"""
+Parallel Analyzer Module for DealFinder Pro
+Spreads property analysis across a pool of worker processes.
+
+Each worker builds its own DatabaseManager and PropertyAnalyzer once, so it
+keeps its own DB connection, market stats cache and analysis cache for the
+whole run. Properties are sorted by ZIP code before being cut into chunks,
+so a ZIP's comparables are usually loaded by just one worker. Chunks come
+back as they finish, in any order, tagged with each property's index.
+
+Used as a context manager, one pool is kept open so that several threads
+(e.g. the pipeline's analyze stage) can send batches to the same workers.
+
+A property that fails to analyze gets the default analysis, as it does in
+PropertyAnalyzer. A chunk whose worker fails entirely is re-analyzed in the
+parent process, so one failure never loses the rest of the run.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import logging
+import multiprocessing
+import os
+import threading
+
+from modules.analyzer import PropertyAnalyzer
+from modules.database import DatabaseManager
+
+
+# Analyzer owned by the current worker process (set by _init_worker)
+_worker_analyzer: Optional[PropertyAnalyzer] = None
+
+
+def _init_worker(db_config: Dict, config: Dict):
+    """Give this worker process its own database connection and analyzer"""
+    global _worker_analyzer
+    _worker_analyzer = PropertyAnalyzer(DatabaseManager(db_config), config)
+
+
+def _analyze_rows(analyzer: PropertyAnalyzer, rows: List[Tuple[int, Dict]],
+                  force_rescore: bool) -> Tuple[List[Tuple[int, Dict]], Dict[str, int]]:
+    """
+    Analyze one chunk, falling back to one property at a time if the batch fails
+
+    Args:
+        analyzer: Analyzer to use
+        rows: (index, property) pairs
+        force_rescore: Ignore stored analyses
+
+    Returns:
+        Tuple of ((index, analysis) pairs, counters for this chunk)
+    """
+    cache = analyzer.analysis_cache
+    queries = analyzer.market_stats.queries
+    reused = cache.reused if cache else 0
+    rescored = cache.rescored if cache else 0
+
+    properties = [prop for _, prop in rows]
+    try:
+        analyses = analyzer.analyze_properties(properties, force_rescore=force_rescore)
+    except Exception as e:
+        analyzer.logger.warning(f"Batch analysis of {len(properties)} properties failed, "
+                                f"analyzing individually: {e}")
+        analyses = [analyzer.analyze_property(prop) for prop in properties]
+
+    counters = {
+        'market_queries': analyzer.market_stats.queries - queries,
+        'reused': (cache.reused - reused) if cache else 0,
+        'rescored': (cache.rescored - rescored) if cache else 0
+    }
+    return [(index, analysis) for (index, _), analysis in zip(rows, analyses)], counters
+
+
+def _analyze_chunk(rows: List[Tuple[int, Dict]],
+                   force_rescore: bool) -> Tuple[List[Tuple[int, Dict]], Dict[str, int]]:
+    """Worker entry point: analyze a chunk with this process's analyzer"""
+    return _analyze_rows(_worker_analyzer, rows, force_rescore)
+
+
+class ParallelAnalyzer:
+    """Analyzes large property lists on a process pool"""
+
+    def __init__(self, analyzer: PropertyAnalyzer, db_config: Dict,
+                 processes: Optional[int] = None, chunk_size: int = 50):
+        """
+        Initialize parallel analyzer
+
+        Args:
+            analyzer: In-process analyzer; supplies the config for workers and
+                re-analyzes chunks whose worker failed
+            db_config: DatabaseManager config each worker connects with
+            processes: Worker processes (default: CPU count)
+            chunk_size: Properties sent to a worker at a time
+        """
+        self.analyzer = analyzer
+        self.db_config = db_config
+        self.processes = processes or os.cpu_count() or 1
+        self.chunk_size = max(1, chunk_size)
+        self.logger = logging.getLogger(__name__)
+        self.stats = self._empty_stats()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._stats_lock = threading.Lock()
+
+    def __enter__(self) -> 'ParallelAnalyzer':
+        """Open a pool shared by every analysis until exit"""
+        self.stats = self._empty_stats()
+        self._executor = self._new_executor(self.processes)
+        return self
+
+    def __exit__(self, *exc):
+        executor, self._executor = self._executor, None
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, int]:
+        return {'market_queries': 0, 'reused': 0, 'rescored': 0, 'failed_chunks': 0}
+
+    def _chunks(self, properties: List[Dict]) -> List[List[Tuple[int, Dict]]]:
+        """Cut (index, property) pairs into chunks, keeping each ZIP code together"""
+        rows = sorted(enumerate(properties), key=lambda row: str(row[1].get('zip_code') or ''))
+        return [rows[start:start + self.chunk_size] for start in range(0, len(rows), self.chunk_size)]
+
+    def _new_executor(self, max_workers: int) -> ProcessPoolExecutor:
+        """Process pool whose workers each build their own analyzer"""
+        # Spawned workers don't inherit the parent's threads, locks or pooled connections
+        return ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(self.db_config, self.analyzer.config)
+        )
+
+    def iter_analyses(self, properties: List[Dict],
+                      force_rescore: bool = False) -> Iterator[List[Tuple[int, Dict]]]:
+        """
+        Analyze properties on the pool, yielding chunks as they finish
+
+        Args:
+            properties: Property dictionaries
+            force_rescore: Ignore stored analyses
+
+        Yields:
+            Lists of (index into properties, analysis), in completion order
+
+        Outside a with block each call gets its own pool and stats; inside
+        one, calls share the open pool and stats add up until exit.
+        """
+        chunks = self._chunks(properties)
+        executor = self._executor
+        if executor is None:
+            self.stats = self._empty_stats()
+            if not chunks:
+                return
+            executor = self._new_executor(min(self.processes, len(chunks)))
+
+        try:
+            futures = {executor.submit(_analyze_chunk, chunk, force_rescore): chunk for chunk in chunks}
+
+            for future in as_completed(futures):
+                try:
+                    results, counters = future.result()
+                except Exception as e:
+                    chunk = futures[future]
+                    self.logger.error(f"Analysis worker failed on {len(chunk)} properties, "
+                                      f"analyzing them in-process: {e}")
+                    with self._stats_lock:
+                        self.stats['failed_chunks'] += 1
+                    results, counters = _analyze_rows(self.analyzer, chunk, force_rescore)
+
+                with self._stats_lock:
+                    for key, value in counters.items():
+                        self.stats[key] += value
+                yield results
+        finally:
+            if executor is not self._executor:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+    def analyze(self, properties: List[Dict], force_rescore: bool = False,
+                progress: Optional[Callable[[int, int], None]] = None) -> List[Dict]:
+        """
+        Analyze properties on the pool
+
+        Args:
+            properties: Property dictionaries
+            force_rescore: Ignore stored analyses
+            progress: Called with (analyzed, total) after each chunk
+
+        Returns:
+            Analysis dict for each property (same order)
+        """
+        analyses: List[Optional[Dict]] = [None] * len(properties)
+        done = 0
+
+        for results in self.iter_analyses(properties, force_rescore=force_rescore):
+            for index, analysis in results:
+                analyses[index] = analysis
+            done += len(results)
+            if progress:
+                progress(done, len(properties))
+
+        return analyses
@@ -0,0 +1,215 @@
+"""
+Pipeline Executor Module for DealFinder Pro
+Runs workflow stages concurrently, connected by bounded queues.
+
+Each stage has its own worker threads and input queue. A full queue blocks
+the stage feeding it (backpressure), so the number of in-flight listings is
+bounded by the queue sizes rather than by the total listing count.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import logging
+import queue
+import threading
+import time
+
+
+# Marks the end of a stage's input
+_END = object()
+
+
+class PipelineStage:
+    """A named processing step with its own workers and input queue"""
+
+    def __init__(self, name: str, func: Callable[[Any], Iterable[Any]],
+                 workers: int = 1, queue_size: int = 100, batch_size: int = 1):
+        """
+        Initialize pipeline stage
+
+        Args:
+            name: Stage name used in logs and metrics
+            func: Called with one item (or a list of items when batch_size > 1)
+                and returns an iterable of items for the next stage
+            workers: Number of worker threads
+            queue_size: Capacity of the stage's input queue
+            batch_size: Maximum items handed to func per call
+        """
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.input = queue.Queue(maxsize=max(1, queue_size))
+
+        self.metrics = {
+            'workers': self.workers,
+            'items_in': 0,
+            'items_out': 0,
+            'errors': 0,
+            'busy_seconds': 0.0,
+            'max_queue_depth': 0
+        }
+        self._lock = threading.Lock()
+        self._active_workers = self.workers
+
+    def record(self, **increments):
+        """Add to this stage's counters"""
+        with self._lock:
+            for key, value in increments.items():
+                self.metrics[key] += value
+
+    def worker_finished(self) -> bool:
+        """Mark one worker as done; True when it was the last one"""
+        with self._lock:
+            self._active_workers -= 1
+            return self._active_workers == 0
+
+
+class Pipeline:
+    """Streams items from a source through a chain of stages"""
+
+    def __init__(self, stages: List[PipelineStage],
+                 sink: Optional[Callable[[Any], None]] = None):
+        """
+        Initialize pipeline
+
+        Args:
+            stages: Stages in processing order
+            sink: Optional callback for each item leaving the last stage
+        """
+        self.stages = stages
+        self.sink = sink
+        self.logger = logging.getLogger(__name__)
+        self._source_error = None
+
+    def run(self, source: Iterable[Any]) -> Dict[str, Dict]:
+        """
+        Feed the source through all stages and wait for completion.
+
+        Args:
+            source: Iterable producing the first stage's input items
+
+        Returns:
+            Per-stage metrics keyed by stage name, plus a 'source' entry
+
+        Raises:
+            Exception raised by the source, after in-flight items drain
+        """
+        start_time = time.time()
+        source_metrics = {'items_out': 0, 'seconds': 0.0}
+        threads = []
+
+        for position, stage in enumerate(self.stages):
+            next_stage = self.stages[position + 1] if position + 1 < len(self.stages) else None
+            for worker_number in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._run_worker,
+                    args=(stage, next_stage),
+                    name=f"pipeline-{stage.name}-{worker_number}",
+                    daemon=True
+                )
+                thread.start()
+                threads.append(thread)
+
+        source_thread = threading.Thread(
+            target=self._run_source,
+            args=(source, source_metrics),
+            name="pipeline-source",
+            daemon=True
+        )
+        source_thread.start()
+
+        source_thread.join()
+        for thread in threads:
+            thread.join()
+
+        metrics = {'source': source_metrics}
+        for stage in self.stages:
+            metrics[stage.name] = dict(stage.metrics)
+        metrics['total_seconds'] = time.time() - start_time
+
+        for stage in self.stages:
+            stage_metrics = metrics[stage.name]
+            self.logger.info(
+                f"  Stage {stage.name}: {stage_metrics['items_in']} in, "
+                f"{stage_metrics['items_out']} out, {stage_metrics['errors']} errors, "
+                f"{stage_metrics['busy_seconds']:.1f}s busy, "
+                f"max queue {stage_metrics['max_queue_depth']}"
+            )
+
+        if self._source_error is not None:
+            raise self._source_error
+
+        return metrics
+
+    def _run_source(self, source: Iterable[Any], source_metrics: Dict):
+        """Push source items into the first stage"""
+        start = time.time()
+        first = self.stages[0] if self.stages else None
+
+        try:
+            for item in source:
+                source_metrics['items_out'] += 1
+                if first is not None:
+                    first.input.put(item)
+                elif self.sink:
+                    self.sink(item)
+        except Exception as e:
+            self.logger.error(f"Pipeline source failed: {e}", exc_info=True)
+            self._source_error = e
+        finally:
+            source_metrics['seconds'] = time.time() - start
+            if first is not None:
+                for _ in range(first.workers):
+                    first.input.put(_END)
+
+    def _run_worker(self, stage: PipelineStage, next_stage: Optional[PipelineStage]):
+        """Process items for one stage until its input ends"""
+        finished = False
+
+        while not finished:
+            batch = []
+            item = stage.input.get()
+
+            with stage._lock:
+                stage.metrics['max_queue_depth'] = max(stage.metrics['max_queue_depth'],
+                                                       stage.input.qsize() + 1)
+
+            if item is _END:
+                finished = True
+            else:
+                batch.append(item)
+                # Top up the batch with whatever is already waiting
+                while len(batch) < stage.batch_size:
+                    try:
+                        item = stage.input.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _END:
+                        finished = True
+                        break
+                    batch.append(item)
+
+            if not batch:
+                continue
+
+            stage.record(items_in=len(batch))
+            start = time.time()
+
+            try:
+                outputs = list(stage.func(batch if stage.batch_size > 1 else batch[0]))
+            except Exception as e:
+                self.logger.warning(f"Stage {stage.name} failed on {len(batch)} item(s): {e}")
+                stage.record(errors=len(batch), busy_seconds=time.time() - start)
+                continue
+
+            stage.record(items_out=len(outputs), busy_seconds=time.time() - start)
+
+            for output in outputs:
+                if next_stage is not None:
+                    next_stage.input.put(output)
+                elif self.sink:
+                    self.sink(output)
+
+        if stage.worker_finished() and next_stage is not None:
+            for _ in range(next_stage.workers):
+                next_stage.input.put(_END)
@@ -10,6 +10,8 @@ from datetime import datetime
 from typing import Dict, List, Optional
 from pathlib import Path
 
+from modules.scan_store import get_scan_store
+
 logger = logging.getLogger(__name__)
 
 
@@ -309,19 +311,25 @@ class PrivyImporter:
 
         Args:
             privy_properties: List of properties from Privy import
-            existing_scan_path: Path to existing latest_scan.json (default: data/latest_scan.json)
+            existing_scan_path: Path to a latest_scan.json export to merge with
+                (default: the current scan store version)
 
         Returns:
             Merged scan data dictionary
         """
-        if existing_scan_path is None:
-            existing_scan_path = Path(__file__).parent.parent / 'data' / 'latest_scan.json'
-        else:
-            existing_scan_path = Path(existing_scan_path)
-
         # Load existing data if available
         existing_properties = []
-        if existing_scan_path.exists():
+        if existing_scan_path is None:
+            try:
+                snapshot = get_scan_store().current()
+                if snapshot is not None:
+                    # Snapshot dicts are shared read-only; merge into copies
+                    existing_properties = [dict(prop) for prop in snapshot.properties()]
+                    self.logger.info(f"Loaded {len(existing_properties)} existing properties")
+            except Exception as e:
+                self.logger.warning(f"Could not load existing scan data: {e}")
+        elif Path(existing_scan_path).exists():
+            existing_scan_path = Path(existing_scan_path)
             try:
                 with open(existing_scan_path, 'r') as f:
                     existing_data = json.load(f)
@@ -386,32 +394,23 @@ class PrivyImporter:
 
     def save_to_scan_file(self, scan_data: Dict, output_path: str = None):
         """
-        Save merged data to latest_scan.json
+        Publish merged data as the current scan
+
+        Writes a new scan store version (earlier versions are kept as backups)
+        and refreshes the data/latest_scan.json export.
 
         Args:
             scan_data: Merged scan data dictionary
-            output_path: Output path (default: data/latest_scan.json)
+            output_path: Only write a latest_scan.json export to this path
         """
-        if output_path is None:
-            output_path = Path(__file__).parent.parent / 'data' / 'latest_scan.json'
-        else:
-            output_path = Path(output_path)
-
-        # Create backup of existing file
-        if output_path.exists():
-            backup_path = output_path.parent / f"latest_scan_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            try:
-                import shutil
-                shutil.copy2(output_path, backup_path)
-                self.logger.info(f"Created backup: {backup_path}")
-            except Exception as e:
-                self.logger.warning(f"Could not create backup: {e}")
-
-        # Save merged data
         try:
-            with open(output_path, 'w') as f:
-                json.dump(scan_data, f, indent=2, default=str)
-            self.logger.info(f"Saved {scan_data['property_count']} properties to {output_path}")
+            if output_path is None:
+                store = get_scan_store()
+                store.publish(scan_data, json_export_path=store.legacy_json_path)
+            else:
+                get_scan_store().export_json(Path(output_path), scan_data)
+            self.logger.info(f"Saved {scan_data['property_count']} properties to "
+                             f"{output_path or 'scan store'}")
         except Exception as e:
             self.logger.error(f"Error saving scan file: {e}")
             raise
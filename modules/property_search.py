@@ -0,0 +1,312 @@
+"""
+Property Search Module for DealFinder Pro
+Answers property searches from indexes built once per scan version
+
+Indexes built per scan:
+- Sorted list_price / opportunity_score arrays (range filters via bisection)
+- city, ZIP code and deal_quality -> row arrays
+- Precomputed row order and rank for each sort field, so top-k never
+  sorts per request: broad filters walk the order until k rows match,
+  narrow ones partially select the k best ranks among the matching rows
+
+Results match the linear filter-then-sort the AI agent used to run:
+missing or null numeric fields count as 0 and ties keep scan order.
+"""
+
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from modules.scan_store import ScanStore, get_scan_store
+
+logger = logging.getLogger(__name__)
+
+# Sort fields and whether they sort highest first
+SORT_FIELDS = {
+    'opportunity_score': True,
+    'list_price': False,
+    'days_on_market': True
+}
+
+# Filters matching at least 1/DENSE_MATCH_RATIO of the scan are served by
+# walking the sort order; sparser ones by partial selection on their rows
+DENSE_MATCH_RATIO = 16
+
+NUMERIC_FIELDS = ('list_price', 'opportunity_score', 'bedrooms', 'bathrooms', 'days_on_market')
+
+
+def _number(value) -> float:
+    """Numeric field value, with missing/invalid values as 0"""
+    try:
+        return float(value) if value is not None else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class PropertySearchIndex:
+    """Immutable search indexes over the properties of one scan"""
+
+    def __init__(self, properties: List[Dict], version: Optional[int] = None):
+        """
+        Build indexes for a scan
+
+        Args:
+            properties: Property dictionaries from the scan
+            version: Scan store version the properties came from
+        """
+        self.properties = properties
+        self.version = version
+        self.count = len(properties)
+
+        self.columns = {
+            field: np.array([_number(p.get(field)) for p in properties], dtype=float)
+            for field in NUMERIC_FIELDS
+        }
+
+        # Range indexes: values sorted ascending, with the row for each value
+        self.sorted_rows = {}
+        self.sorted_values = {}
+        for field in ('list_price', 'opportunity_score'):
+            rows = np.argsort(self.columns[field], kind='stable')
+            self.sorted_rows[field] = rows
+            self.sorted_values[field] = self.columns[field][rows]
+
+        # Stable sort keeps scan order among ties, like list.sort()
+        self.scan_order = np.arange(self.count)
+        self.sort_orders = {}
+        self.sort_ranks = {}
+        for field, descending in SORT_FIELDS.items():
+            values = -self.columns[field] if descending else self.columns[field]
+            order = np.argsort(values, kind='stable')
+            rank = np.empty(self.count, dtype=np.int64)
+            rank[order] = self.scan_order
+            self.sort_orders[field] = order
+            self.sort_ranks[field] = rank
+
+        self.city_rows = self._inverted(properties, 'city', lambda v: str(v).lower())
+        self.zip_rows = self._inverted(properties, 'zip_code', str)
+        self.quality_rows = self._inverted(properties, 'deal_quality', str)
+        self.street_addresses = [str(p.get('street_address') or '').lower() for p in properties]
+
+    @staticmethod
+    def _inverted(properties: List[Dict], field: str, key) -> Dict[str, np.ndarray]:
+        """Map each distinct field value to the rows holding it"""
+        postings: Dict[str, List[int]] = {}
+        for row, prop in enumerate(properties):
+            value = prop.get(field)
+            if value:
+                postings.setdefault(key(value), []).append(row)
+        return {value: np.array(rows, dtype=np.int64) for value, rows in postings.items()}
+
+    def _mask(self, rows: Iterable[np.ndarray]) -> np.ndarray:
+        """Boolean row mask from one or more row arrays"""
+        mask = np.zeros(self.count, dtype=bool)
+        for row_array in rows:
+            mask[row_array] = True
+        return mask
+
+    def _range_mask(self, field: str, low: Optional[float], high: Optional[float]) -> np.ndarray:
+        """Rows with low <= field <= high, found by bisecting the sorted values"""
+        values = self.sorted_values[field]
+        start = np.searchsorted(values, low, side='left') if low is not None else 0
+        end = np.searchsorted(values, high, side='right') if high is not None else len(values)
+        return self._mask([self.sorted_rows[field][start:end]])
+
+    def _city_mask(self, city: str) -> np.ndarray:
+        """Rows whose city contains the given text (case-insensitive)"""
+        city = city.lower()
+        return self._mask(rows for name, rows in self.city_rows.items() if city in name)
+
+    def _quality_mask(self, qualities: List[str]) -> np.ndarray:
+        """Rows with any of the deal qualities ("HOT" also matches "HOT DEAL")"""
+        wanted = [str(q).upper() for q in qualities]
+        return self._mask(
+            rows for label, rows in self.quality_rows.items()
+            if any(label.upper() == q or label.upper().startswith(q + ' ') for q in wanted)
+        )
+
+    def filter_mask(self, filters: Dict) -> np.ndarray:
+        """
+        Rows matching every filter
+
+        Args:
+            filters: Any of min_price, max_price, city, zip_codes,
+                deal_quality, bedrooms (minimum), bathrooms (minimum), min_score
+
+        Returns:
+            Boolean mask over rows
+        """
+        mask = np.ones(self.count, dtype=bool)
+
+        if filters.get('min_price') is not None or filters.get('max_price') is not None:
+            mask &= self._range_mask('list_price', filters.get('min_price'), filters.get('max_price'))
+        if filters.get('min_score') is not None:
+            mask &= self._range_mask('opportunity_score', filters['min_score'], None)
+        if filters.get('city'):
+            mask &= self._city_mask(filters['city'])
+        if filters.get('zip_codes'):
+            mask &= self._mask(self.zip_rows[str(z)] for z in filters['zip_codes']
+                               if str(z) in self.zip_rows)
+        if filters.get('deal_quality'):
+            mask &= self._quality_mask(filters['deal_quality'])
+        if filters.get('bedrooms') is not None:
+            mask &= self.columns['bedrooms'] >= filters['bedrooms']
+        if filters.get('bathrooms') is not None:
+            mask &= self.columns['bathrooms'] >= filters['bathrooms']
+
+        return mask
+
+    def search(self, filters: Dict, limit: int = 10,
+               sort_by: str = 'opportunity_score') -> Dict:
+        """
+        Search properties
+
+        Args:
+            filters: Filters (see filter_mask)
+            limit: Maximum properties to return
+            sort_by: opportunity_score, list_price or days_on_market
+                (anything else keeps scan order)
+
+        Returns:
+            Dict with total_found and the top properties
+        """
+        mask = self.filter_mask(filters)
+        total = int(np.count_nonzero(mask))
+        limit = max(0, min(limit, total))
+
+        if total * DENSE_MATCH_RATIO >= self.count:
+            top = self._walk_order(self.sort_orders.get(sort_by, self.scan_order), mask, limit)
+        else:
+            rows = np.flatnonzero(mask)
+            rank = self.sort_ranks.get(sort_by, self.scan_order)[rows]
+            if limit < len(rows):
+                best = np.argpartition(rank, limit)[:limit]
+            else:
+                best = np.arange(len(rows))
+            top = rows[best[np.argsort(rank[best])]]
+
+        return {
+            'total_found': total,
+            'properties': [self.properties[row] for row in top]
+        }
+
+    @staticmethod
+    def _walk_order(order: np.ndarray, mask: np.ndarray, limit: int) -> List[int]:
+        """First `limit` rows of a precomputed order that pass the mask"""
+        top: List[int] = []
+        start, step = 0, max(64, limit * 2)
+        while len(top) < limit and start < len(order):
+            chunk = order[start:start + step]
+            top.extend(chunk[mask[chunk]].tolist())
+            start += step
+            step *= 2
+        return top[:limit]
+
+    def find_by_address(self, address: str) -> Optional[Dict]:
+        """
+        First property whose street address contains the given text
+
+        Args:
+            address: Address or address fragment (case-insensitive)
+
+        Returns:
+            Property dictionary or None
+        """
+        address = address.lower()
+        for row, street in enumerate(self.street_addresses):
+            if address in street:
+                return self.properties[row]
+        return None
+
+    def market_insights(self, location: Optional[str] = None) -> Dict:
+        """
+        Pricing, opportunity and days-on-market stats
+
+        Args:
+            location: City text to filter by (default: all markets)
+
+        Returns:
+            Insights dict, or a dict with 'error' if no properties match
+        """
+        location = location.lower() if location else None
+        mask = self._city_mask(location) if location else np.ones(self.count, dtype=bool)
+        total = int(mask.sum())
+
+        if not total:
+            return {"error": "No properties found for location"}
+
+        prices = self.columns['list_price'][mask]
+        prices = prices[prices != 0]
+        scores = self.columns['opportunity_score'][mask]
+        dom = self.columns['days_on_market'][mask]
+        dom = dom[dom != 0]
+
+        return {
+            "location": location or "All markets",
+            "total_properties": total,
+            "pricing": {
+                "median": float(np.median(prices)) if len(prices) else 0,
+                "average": float(prices.mean()) if len(prices) else 0,
+                "min": float(prices.min()) if len(prices) else 0,
+                "max": float(prices.max()) if len(prices) else 0
+            },
+            "opportunity": {
+                "hot_deals": int((scores >= 90).sum()),
+                "good_deals": int(((scores >= 75) & (scores < 90)).sum()),
+                "average_score": float(scores.mean())
+            },
+            "market_dynamics": {
+                "average_dom": float(dom.mean()) if len(dom) else 0,
+                "quick_sales": int((dom < 30).sum()),
+                "stale_listings": int((dom > 90).sum())
+            }
+        }
+
+
+class PropertySearchService:
+    """Keeps a PropertySearchIndex for the current scan store version"""
+
+    def __init__(self, store: Optional[ScanStore] = None):
+        """
+        Initialize search service
+
+        Args:
+            store: Scan store (default: shared get_scan_store())
+        """
+        self.store = store or get_scan_store()
+        self._index: Optional[PropertySearchIndex] = None
+        self._lock = threading.Lock()
+
+    def get_index(self) -> PropertySearchIndex:
+        """
+        Get the index for the current scan, rebuilding only when a new version is published
+
+        Returns:
+            PropertySearchIndex (empty if no scan has been published)
+        """
+        snapshot = self.store.current()
+        version = snapshot.version if snapshot is not None else None
+
+        index = self._index
+        if index is not None and index.version == version:
+            return index
+
+        with self._lock:
+            if self._index is None or self._index.version != version:
+                properties = snapshot.properties() if snapshot is not None else []
+                self._index = PropertySearchIndex(properties, version)
+                logger.info(f"Built search index for {len(properties)} properties (scan version {version})")
+            return self._index
+
+
+# Singleton instance
+_search_instance = None
+
+def get_property_search() -> PropertySearchService:
+    """Get singleton PropertySearchService instance"""
+    global _search_instance
+    if _search_instance is None:
+        _search_instance = PropertySearchService()
+    return _search_instance
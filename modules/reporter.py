@@ -10,8 +10,17 @@ import os
 class ReportGenerator:
     """Generates email and Excel reports"""
 
-    def __init__(self, config: Dict):
+    def __init__(self, config: Dict, db_manager=None):
+        """
+        Initialize report generator
+
+        Args:
+            config: Application config
+            db_manager: Optional DatabaseManager; when given, the market sheet
+                is aggregated in the database over all recent listings
+        """
         self.config = config
+        self.db = db_manager
         self.logger = logging.getLogger(__name__)
 
         # Setup Jinja2 for email templates
@@ -299,8 +308,31 @@ class ReportGenerator:
             adjusted_width = min(max_length + 2, 60)
             ws.column_dimensions[column_letter].width = adjusted_width
 
-    def _create_market_analysis_sheet(self, ws, properties: List[Dict]):
-        """Create market statistics sheet grouped by ZIP code"""
+    def _market_rows(self, properties: List[Dict]) -> List[List]:
+        """
+        Market statistics per ZIP code of the given properties
+
+        Aggregated in the database over every recent listing in those ZIP
+        codes when a DatabaseManager is available, otherwise computed from
+        the properties themselves.
+
+        Returns:
+            Rows of [ZIP, total, avg score, hot deals, avg price, avg $/sqft,
+            avg DOM, avg below market %, total est. profit], sorted by ZIP
+        """
+        zip_codes = sorted({prop['zip_code'] for prop in properties if prop.get('zip_code')})
+
+        if self.db is not None and zip_codes:
+            stats = self.db.market_stats(group_by=['zip_code'], filters={'zip_codes': zip_codes})
+            if stats:
+                return [
+                    [row['zip_code'], row['listing_count'], row['avg_score'] or 0,
+                     row['hot_deals'], row['avg_price'] or 0, row['avg_price_per_sqft'] or 0,
+                     row['avg_days_on_market'] or 0, row['avg_below_market'] or 0,
+                     row['total_estimated_profit'] or 0]
+                    for row in sorted(stats, key=lambda row: row['zip_code'])
+                ]
+
         # Group properties by ZIP code
         zip_groups = {}
 
@@ -310,24 +342,8 @@ class ReportGenerator:
                 zip_groups[zip_code] = []
             zip_groups[zip_code].append(prop)
 
-        # Headers
-        headers = [
-            'ZIP Code', 'Total Properties', 'Avg Score', 'Hot Deals',
-            'Avg Price', 'Avg Price/Sqft', 'Avg DOM', 'Avg Below Market %',
-            'Total Est. Profit'
-        ]
-        ws.append(headers)
-
-        # Format header row
-        header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-        header_font = Font(color="FFFFFF", bold=True)
-
-        for cell in ws[1]:
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal='center')
-
         # Calculate stats for each ZIP code
+        rows = []
         for zip_code, props in sorted(zip_groups.items()):
             total = len(props)
             avg_score = sum(p.get('opportunity_score', 0) for p in props) / total
@@ -343,7 +359,7 @@ class ReportGenerator:
             avg_below_market = sum(p.get('below_market_percentage', 0) for p in props) / total
             total_profit = sum(p.get('estimated_profit', 0) for p in props)
 
-            row_data = [
+            rows.append([
                 zip_code,
                 total,
                 avg_score,
@@ -353,7 +369,30 @@ class ReportGenerator:
                 avg_dom,
                 avg_below_market,
                 total_profit
-            ]
+            ])
+
+        return rows
+
+    def _create_market_analysis_sheet(self, ws, properties: List[Dict]):
+        """Create market statistics sheet grouped by ZIP code"""
+        # Headers
+        headers = [
+            'ZIP Code', 'Total Properties', 'Avg Score', 'Hot Deals',
+            'Avg Price', 'Avg Price/Sqft', 'Avg DOM', 'Avg Below Market %',
+            'Total Est. Profit'
+        ]
+        ws.append(headers)
+
+        # Format header row
+        header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+        header_font = Font(color="FFFFFF", bold=True)
+
+        for cell in ws[1]:
+            cell.fill = header_fill
+            cell.font = header_font
+            cell.alignment = Alignment(horizontal='center')
+
+        for row_data in self._market_rows(properties):
             ws.append(row_data)
 
         # Format currency columns
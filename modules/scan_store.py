@@ -0,0 +1,499 @@
+"""
+Scan Store Module for DealFinder Pro
+Versioned, memory-mapped property scan with secondary indexes.
+
+Replaces data/latest_scan.json as the shared scan. Each published scan is
+written once to its own version file and never modified:
+
+    magic (8 bytes) | header length (8 bytes) | JSON header | sections
+
+Sections are 8-byte aligned arrays: per-property JSON records with an
+offsets array, numeric columns (list_price, opportunity_score, bedrooms,
+bathrooms), price/score sort orders for range queries, and ZIP/city
+posting lists. Readers memory-map the file and view columns with
+np.frombuffer, so every consumer in the process shares one mapping.
+
+Publishing writes a temp file, renames it into place, then atomically
+swaps the CURRENT pointer, so readers never see a partial scan. The
+latest_scan.json format stays available through export_json. A
+latest_scan.json written by a tool that doesn't know about the store (newer
+than the current version, with a different scan_timestamp) is imported as a
+new version.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+import json
+import logging
+import math
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+
+MAGIC = b'DFSCAN01'
+ALIGNMENT = 8
+
+NUMERIC_COLUMNS = ('list_price', 'opportunity_score', 'bedrooms', 'bathrooms')
+SORTED_COLUMNS = ('list_price', 'opportunity_score')
+
+
+def _to_float(value: Any) -> float:
+    """Numeric value as float, NaN when missing or not a number"""
+    if isinstance(value, bool) or value is None:
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class ReadOnlyProperty(dict):
+    """Property record shared between snapshot readers; modifying it raises TypeError"""
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Scan snapshot properties are read-only; copy with dict(prop) to modify")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        # Pickles and deep copies are plain, modifiable dicts
+        return dict, (dict(self),)
+
+
+def _city_key(city: Any) -> str:
+    """Case- and whitespace-insensitive city key"""
+    return ' '.join(str(city or '').lower().split())
+
+
+class ScanSnapshot:
+    """Read-only view of one published scan version"""
+
+    def __init__(self, path: Path):
+        """
+        Memory-map a scan version file
+
+        Args:
+            path: Version file written by ScanStore.publish
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"Not a scan store file: {path}")
+
+        header_length, = struct.unpack_from('<Q', self._mmap, len(MAGIC))
+        header_start = len(MAGIC) + 8
+        self.header = json.loads(self._mmap[header_start:header_start + header_length])
+
+        self.version = self.header['version']
+        self.scan_timestamp = self.header.get('scan_timestamp')
+        self.metadata = self.header.get('metadata', {})
+        self.count = self.header['count']
+
+        self._record_offsets = self._section('record_offsets')
+        self._records_start = self.header['sections']['records']['offset']
+        self._properties: Optional[List[Dict]] = None
+        self._lock = threading.Lock()
+
+    def _section(self, name: str) -> np.ndarray:
+        """Zero-copy array view of a section"""
+        section = self.header['sections'][name]
+        return np.frombuffer(self._mmap, dtype=section['dtype'],
+                             count=section['length'], offset=section['offset'])
+
+    def __len__(self) -> int:
+        return self.count
+
+    def get(self, row: int) -> Dict:
+        """
+        Decode one property record
+
+        Args:
+            row: Row number (0-based)
+
+        Returns:
+            Property dictionary (a fresh copy owned by the caller)
+        """
+        start = self._records_start + int(self._record_offsets[row])
+        end = self._records_start + int(self._record_offsets[row + 1])
+        return json.loads(self._mmap[start:end])
+
+    def rows(self, rows: Iterable[int]) -> List[Dict]:
+        """Properties for the given rows, in order"""
+        properties = self.properties()
+        return [properties[row] for row in rows]
+
+    def properties(self) -> List[Dict]:
+        """
+        All properties, decoded once per snapshot and shared by callers
+
+        The records are ReadOnlyProperty dicts, so one caller can't change
+        what the others see; copy with dict(prop) to modify. Nested values
+        (e.g. photo lists) are shared too and must not be modified. Use
+        get() for a private, modifiable record.
+        """
+        with self._lock:
+            if self._properties is None:
+                self._properties = [ReadOnlyProperty(self.get(row)) for row in range(self.count)]
+            return self._properties
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Numeric column (NaN where missing)
+
+        Args:
+            name: One of NUMERIC_COLUMNS
+        """
+        return self._section(f'column:{name}')
+
+    def rows_for_zip(self, zip_code: str) -> np.ndarray:
+        """Rows with the given ZIP code, in scan order"""
+        return self._postings('zip', str(zip_code))
+
+    def rows_for_city(self, city: str) -> np.ndarray:
+        """Rows in the given city (case-insensitive), in scan order"""
+        return self._postings('city', _city_key(city))
+
+    def _postings(self, index: str, key: str) -> np.ndarray:
+        """Posting list for a categorical index key"""
+        entry = self.header['indexes'][index].get(key)
+        postings = self._section(f'postings:{index}')
+        if entry is None:
+            return postings[:0]
+        start, length = entry
+        return postings[start:start + length]
+
+    def zip_codes(self) -> List[str]:
+        """ZIP codes present in the scan"""
+        return list(self.header['indexes']['zip'])
+
+    def rows_in_range(self, column: str, low: Optional[float] = None,
+                      high: Optional[float] = None) -> np.ndarray:
+        """
+        Rows whose value lies within [low, high], sorted by value
+
+        Args:
+            column: One of SORTED_COLUMNS
+            low: Inclusive lower bound (None for open)
+            high: Inclusive upper bound (None for open)
+
+        Returns:
+            Row numbers in ascending value order (missing values excluded)
+        """
+        values = self._section(f'sorted:{column}')
+        order = self._section(f'order:{column}')
+        start = np.searchsorted(values, low, side='left') if low is not None else 0
+        end = np.searchsorted(values, high, side='right') if high is not None else len(values)
+        return order[start:end]
+
+    def to_scan_dict(self) -> Dict:
+        """Scan in the legacy latest_scan.json layout"""
+        scan = dict(self.metadata)
+        scan['scan_timestamp'] = self.scan_timestamp
+        scan['property_count'] = self.count
+        scan['properties'] = [self.get(row) for row in range(self.count)]
+        return scan
+
+    def close(self):
+        """Release the mapping (views created from it must no longer be used)"""
+        self._mmap.close()
+
+
+class ScanStore:
+    """Publishes scan versions and hands out the current shared snapshot"""
+
+    def __init__(self, store_dir: Optional[Path] = None,
+                 legacy_json_path: Optional[Path] = None, keep_versions: int = 3):
+        """
+        Initialize scan store
+
+        Args:
+            store_dir: Directory for version files (default: data/scan_store)
+            legacy_json_path: latest_scan.json imported when the store is empty
+                or the file holds a newer scan (default: data/latest_scan.json)
+            keep_versions: Number of version files kept on disk
+        """
+        data_dir = Path(__file__).parent.parent / 'data'
+        self.store_dir = Path(store_dir) if store_dir else data_dir / 'scan_store'
+        self.legacy_json_path = Path(legacy_json_path) if legacy_json_path else data_dir / 'latest_scan.json'
+        self.keep_versions = max(1, keep_versions)
+        self.logger = logging.getLogger(__name__)
+
+        self._snapshot: Optional[ScanSnapshot] = None
+        self._legacy_mtime: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def current_path(self) -> Path:
+        return self.store_dir / 'CURRENT'
+
+    def current(self) -> Optional[ScanSnapshot]:
+        """
+        Get the current snapshot, re-mapping only when a new version is published
+
+        Returns:
+            ScanSnapshot, or None if nothing has been published
+        """
+        with self._lock:
+            try:
+                version_name = self.current_path.read_text().strip()
+            except FileNotFoundError:
+                version_name = None
+
+            if version_name is None:
+                if not self.legacy_json_path.exists():
+                    return None
+                version_name = self._import_legacy_json(self._read_legacy_json())
+
+            self._map(version_name)
+            scan_data = self._newer_legacy_json()
+            if scan_data is not None:
+                self._map(self._import_legacy_json(scan_data))
+            return self._snapshot
+
+    def _map(self, version_name: str):
+        """Make version_name the mapped snapshot (caller holds the lock)"""
+        if self._snapshot is None or self._snapshot.path.name != version_name:
+            self._snapshot = ScanSnapshot(self.store_dir / version_name)
+            self.logger.info(f"Mapped scan version {self._snapshot.version} "
+                             f"({len(self._snapshot)} properties)")
+
+    def _read_legacy_json(self) -> Dict:
+        """Load latest_scan.json, remembering the mtime it was read at"""
+        self._legacy_mtime = self.legacy_json_path.stat().st_mtime_ns
+        with open(self.legacy_json_path, 'r') as f:
+            return json.load(f)
+
+    def _newer_legacy_json(self) -> Optional[Dict]:
+        """
+        latest_scan.json if another tool wrote a different scan after the current version
+
+        The file is only parsed when its mtime changes and is newer than the
+        current version, and the store's own exports carry the current
+        scan_timestamp, so this is a stat() on most calls.
+        """
+        try:
+            mtime = self.legacy_json_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if mtime == self._legacy_mtime or mtime <= self._snapshot.version:
+            return None
+
+        try:
+            scan_data = self._read_legacy_json()
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Could not read {self.legacy_json_path.name}: {e}")
+            return None
+
+        if scan_data.get('scan_timestamp') == self._snapshot.scan_timestamp:
+            return None
+        self.logger.warning(
+            f"{self.legacy_json_path.name} was written outside the scan store "
+            f"(scan {scan_data.get('scan_timestamp')}, current version has "
+            f"{self._snapshot.scan_timestamp}); importing it as a new version. "
+            f"Publish scans with ScanStore.publish instead."
+        )
+        return scan_data
+
+    def _import_legacy_json(self, scan_data: Dict) -> str:
+        """Publish latest_scan.json data as a new version (caller holds the lock)"""
+        self.logger.info(f"Importing {self.legacy_json_path.name} into scan store")
+        self._publish(scan_data)
+        return self.current_path.read_text().strip()
+
+    def publish(self, scan_data: Dict, json_export_path: Optional[Path] = None) -> int:
+        """
+        Write a new scan version and make it current
+
+        Args:
+            scan_data: Scan in the latest_scan.json layout (scan_timestamp,
+                properties and any other metadata keys)
+            json_export_path: Also write the legacy JSON export here
+
+        Returns:
+            New version number
+        """
+        with self._lock:
+            version = self._publish(scan_data)
+
+        if json_export_path is not None:
+            self.export_json(json_export_path, scan_data)
+
+        return version
+
+    def _publish(self, scan_data: Dict) -> int:
+        """Write a version file and swap CURRENT (caller holds the lock)"""
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        version = time.time_ns()
+        version_name = f'scan-{version}.dfs'
+
+        payload = self._encode(scan_data, version)
+        self._atomic_write(self.store_dir / version_name, payload)
+        self._atomic_write(self.current_path, version_name.encode('utf-8'))
+
+        self.logger.info(f"Published scan version {version} "
+                         f"({len(scan_data.get('properties', []))} properties)")
+        self._prune_versions(version_name)
+        return version
+
+    def _atomic_write(self, path: Path, payload: bytes):
+        """Write to a temp file in the same directory, fsync, then rename over path"""
+        fd, temp_path = tempfile.mkstemp(dir=self.store_dir, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+    def _prune_versions(self, current_name: str):
+        """Delete old version files beyond keep_versions (mapped readers are unaffected)"""
+        versions = sorted(self.store_dir.glob('scan-*.dfs'))
+        for old in versions[:-self.keep_versions]:
+            if old.name != current_name:
+                try:
+                    old.unlink()
+                except OSError as e:
+                    self.logger.warning(f"Could not remove old scan version {old.name}: {e}")
+
+    @staticmethod
+    def _encode(scan_data: Dict, version: int) -> bytes:
+        """Serialize a scan into the version file layout"""
+        properties = scan_data.get('properties', [])
+        count = len(properties)
+        sections: Dict[str, np.ndarray] = {}
+
+        # Records: JSON per property plus offsets
+        encoded = [json.dumps(prop, default=str).encode('utf-8') for prop in properties]
+        offsets = np.zeros(count + 1, dtype='<u8')
+        if encoded:
+            offsets[1:] = np.cumsum([len(record) for record in encoded])
+        sections['record_offsets'] = offsets
+        records = np.frombuffer(b''.join(encoded), dtype='u1')
+
+        # Numeric columns and sort orders for range queries
+        for name in NUMERIC_COLUMNS:
+            if name == 'list_price':
+                values = [_to_float(p.get('list_price') or p.get('price')) for p in properties]
+            else:
+                values = [_to_float(p.get(name)) for p in properties]
+            sections[f'column:{name}'] = np.array(values, dtype='<f8')
+
+        for name in SORTED_COLUMNS:
+            column = sections[f'column:{name}']
+            present = np.flatnonzero(~np.isnan(column))
+            order = present[np.argsort(column[present], kind='stable')].astype('<i8')
+            sections[f'order:{name}'] = order
+            sections[f'sorted:{name}'] = column[order]
+
+        # Categorical indexes: key -> [start, length] into a postings section
+        indexes = {}
+        for index, key_func in (('zip', lambda p: str(p.get('zip_code') or '')),
+                                ('city', lambda p: _city_key(p.get('city')))):
+            groups: Dict[str, List[int]] = {}
+            for row, prop in enumerate(properties):
+                groups.setdefault(key_func(prop), []).append(row)
+
+            postings = []
+            entries = {}
+            for key, rows in groups.items():
+                entries[key] = [len(postings), len(rows)]
+                postings.extend(rows)
+            indexes[index] = entries
+            sections[f'postings:{index}'] = np.array(postings, dtype='<i8')
+
+        # Lay out sections after the header, each 8-byte aligned
+        metadata = {k: v for k, v in scan_data.items()
+                    if k not in ('properties', 'scan_timestamp', 'property_count')}
+        header = {
+            'version': version,
+            'scan_timestamp': scan_data.get('scan_timestamp'),
+            'metadata': metadata,
+            'count': count,
+            'indexes': indexes,
+            'sections': {}
+        }
+
+        ordered = [('records', records)] + list(sections.items())
+
+        def layout(header_length: int) -> int:
+            position = len(MAGIC) + 8 + header_length
+            for name, array in ordered:
+                position += -position % ALIGNMENT
+                header['sections'][name] = {'offset': position, 'dtype': array.dtype.str,
+                                            'length': len(array)}
+                position += array.nbytes
+            return position
+
+        # Offsets depend on the header size, which depends on the offsets
+        header_bytes = b''
+        while True:
+            layout(len(header_bytes))
+            encoded_header = json.dumps(header, default=str).encode('utf-8')
+            if len(encoded_header) <= len(header_bytes):
+                header_bytes = encoded_header.ljust(len(header_bytes))
+                break
+            header_bytes = encoded_header.ljust(len(encoded_header) + 64)
+
+        parts = [MAGIC, struct.pack('<Q', len(header_bytes)), header_bytes]
+        position = len(MAGIC) + 8 + len(header_bytes)
+        for name, array in ordered:
+            padding = -position % ALIGNMENT
+            parts.append(b'\0' * padding)
+            parts.append(array.tobytes())
+            position += padding + array.nbytes
+        return b''.join(parts)
+
+    def export_json(self, path: Path, scan_data: Optional[Dict] = None):
+        """
+        Write the legacy latest_scan.json export
+
+        Args:
+            path: Output path
+            scan_data: Scan to export (default: the current snapshot)
+        """
+        if scan_data is None:
+            snapshot = self.current()
+            if snapshot is None:
+                raise ValueError("No scan has been published")
+            scan_data = snapshot.to_scan_dict()
+
+        scan_data = dict(scan_data)
+        scan_data.setdefault('property_count', len(scan_data.get('properties', [])))
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f'.{path.name}.tmp')
+        with open(temp_path, 'w') as f:
+            json.dump(scan_data, f, indent=2, default=str)
+        os.replace(temp_path, path)
+
+        if path.resolve() == self.legacy_json_path.resolve():
+            # Our own export, so current() needn't parse it back
+            with self._lock:
+                self._legacy_mtime = path.stat().st_mtime_ns
+
+
+# Singleton instance
+_store_instance = None
+_store_lock = threading.Lock()
+
+def get_scan_store() -> ScanStore:
+    """Get singleton ScanStore instance"""
+    global _store_instance
+    with _store_lock:
+        if _store_instance is None:
+            _store_instance = ScanStore()
+        return _store_instance
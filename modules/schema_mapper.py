@@ -11,6 +11,8 @@ from typing import Dict, Any, List, Tuple, Optional
 from datetime import datetime
 import re
 
+from modules.address_normalizer import normalize_address, parse_address
+
 logger = logging.getLogger(__name__)
 
 
@@ -434,6 +436,10 @@ class SchemaMapper:
             street = re.sub(r'\s+', ' ', street).strip()
             normalized['street_address'] = street
 
+            # Comparison key and components from the shared normalizer
+            normalized['address_key'] = normalize_address(street)
+            normalized.update(parse_address(street))
+
         # Extract and normalize city
         if 'city' in address_data:
             city = str(address_data['city']).strip().title()
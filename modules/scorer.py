@@ -1,6 +1,8 @@
 from typing import Dict, Tuple
 import logging
 
+from modules.keyword_matcher import DISTRESSED_SCORE_KEYWORDS, get_keyword_matcher
+
 class OpportunityScorer:
     """Calculates opportunity scores based on multiple factors"""
 
@@ -13,6 +15,7 @@ class OpportunityScorer:
             'condition_price': 15,
             'location_quality': 10
         })
+        self.keywords = get_keyword_matcher(config)
         self.logger = logging.getLogger(__name__)
 
     def calculate_score(self, property_data: Dict, market_data: Dict,
@@ -282,14 +285,8 @@ class OpportunityScorer:
 
             # Distressed keywords
             description = property_data.get('description', '').lower()
-            distressed_keywords = [
-                'motivated', 'as-is', 'fixer', 'needs work',
-                'estate sale', 'must sell', 'tlc', 'handyman',
-                'cash only', 'investor special', 'potential',
-                'bring offers'
-            ]
-
-            keyword_count = sum(1 for kw in distressed_keywords if kw in description)
+            found = self.keywords.find(description)
+            keyword_count = sum(1 for kw in DISTRESSED_SCORE_KEYWORDS if kw in found)
 
             if keyword_count >= 3:
                 score += 10
@@ -0,0 +1,315 @@
+"""
+Scrape Cache Module for DealFinder Pro
+Persists scraped listings so daily runs only fetch what changed.
+
+Listings are stored in SQLite, keyed by (location, listing_type, window_days)
+plus a per-listing key, as zlib-compressed JSON with a content hash. Each
+key also records when it was last scraped successfully. A later run fetches
+only the days since that scrape and merges the delta into the cached rows.
+
+The delta only returns newly listed homes: price cuts and status changes on
+listings already cached are not seen until the next full window refetch,
+every full_refresh_days (default 1, so at most one run a day serves cached
+prices). Listings not returned by the latest fetch are loaded with
+cache_stale=True and cached_at set to when their data was last confirmed.
+Full refetches also drop delistings from the cache.
+"""
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import math
+import sqlite3
+import threading
+import zlib
+
+
+# Fields that change on every scrape without the listing changing
+VOLATILE_FIELDS = ('scrape_timestamp', 'cache_stale', 'cached_at')
+
+
+class ScrapeCache:
+    """SQLite-backed cache of scraped listings per location and window"""
+
+    def __init__(self, db_path: Optional[str] = None, full_refresh_days: int = 1):
+        """
+        Initialize scrape cache
+
+        Args:
+            db_path: SQLite file (default: data/scrape_cache.db)
+            full_refresh_days: Days between full window refetches (cached
+                listings can show prices up to this old)
+        """
+        if db_path is None:
+            db_path = Path(__file__).parent.parent / 'data' / 'scrape_cache.db'
+
+        self.db_path = str(db_path)
+        self.full_refresh_days = full_refresh_days
+        self.logger = logging.getLogger(__name__)
+        self._write_lock = threading.Lock()
+
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._init_database()
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection; commits on success, rolls back on error"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def _init_database(self):
+        """Create cache tables if they don't exist"""
+        with self._connect() as conn:
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS scrape_runs (
+                location TEXT NOT NULL,
+                listing_type TEXT NOT NULL,
+                window_days INTEGER NOT NULL,
+                last_success TEXT NOT NULL,
+                last_full_refresh TEXT NOT NULL,
+                PRIMARY KEY (location, listing_type, window_days)
+            )
+            """)
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS scrape_listings (
+                location TEXT NOT NULL,
+                listing_type TEXT NOT NULL,
+                window_days INTEGER NOT NULL,
+                listing_key TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                data BLOB NOT NULL,
+                first_seen TEXT NOT NULL,
+                scraped_at TEXT NOT NULL,
+                PRIMARY KEY (location, listing_type, window_days, listing_key)
+            )
+            """)
+
+    @staticmethod
+    def listing_key(prop: Dict) -> str:
+        """Stable identity for a listing within a location"""
+        if prop.get('property_id'):
+            return f"id:{prop['property_id']}"
+        if prop.get('mls_number'):
+            return f"mls:{prop['mls_number']}"
+        address = ' '.join(str(prop.get('street_address') or '').upper().split())
+        return f"addr:{address}|{prop.get('zip_code', '')}"
+
+    @staticmethod
+    def content_hash(prop: Dict) -> str:
+        """Hash of a listing's content, ignoring volatile fields"""
+        content = {k: v for k, v in prop.items() if k not in VOLATILE_FIELDS}
+        payload = json.dumps(content, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def plan_fetch(self, location: str, listing_type: str, window_days: int,
+                   now: Optional[datetime] = None) -> Tuple[int, bool]:
+        """
+        Decide how many days back to fetch for a location
+
+        Args:
+            location: ZIP code or city
+            listing_type: Type of listings ("for_sale", "sold", "for_rent")
+            window_days: Full lookback window
+            now: Current time (default: datetime.now())
+
+        Returns:
+            (days_to_fetch, is_full_refresh) tuple
+        """
+        now = now or datetime.now()
+
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT last_success, last_full_refresh FROM scrape_runs "
+                "WHERE location = ? AND listing_type = ? AND window_days = ?",
+                (location, listing_type, window_days)
+            ).fetchone()
+
+        if row is None:
+            return window_days, True
+
+        last_success = datetime.fromisoformat(row[0])
+        last_full_refresh = datetime.fromisoformat(row[1])
+
+        if now - last_full_refresh >= timedelta(days=self.full_refresh_days):
+            return window_days, True
+
+        # Whole days since the last scrape, plus one to cover the boundary
+        delta_days = math.ceil((now - last_success).total_seconds() / 86400) + 1
+        if delta_days >= window_days:
+            return window_days, True
+
+        return max(1, delta_days), False
+
+    def merge(self, location: str, listing_type: str, window_days: int,
+              fetched: List[Dict], full_refresh: bool,
+              now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Merge freshly scraped listings into the cache and mark the scrape successful
+
+        Args:
+            location: ZIP code or city
+            listing_type: Type of listings
+            window_days: Full lookback window
+            fetched: Listings returned by the scrape
+            full_refresh: True if fetched covers the whole window (cached
+                listings missing from it are dropped)
+            now: Current time (default: datetime.now())
+
+        Returns:
+            Counts of 'new', 'changed', 'unchanged' and 'removed' listings
+        """
+        now = now or datetime.now()
+        timestamp = now.isoformat()
+        key = (location, listing_type, window_days)
+        counts = {'new': 0, 'changed': 0, 'unchanged': 0, 'removed': 0}
+
+        with self._write_lock, self._connect() as conn:
+            existing = dict(conn.execute(
+                "SELECT listing_key, content_hash FROM scrape_listings "
+                "WHERE location = ? AND listing_type = ? AND window_days = ?",
+                key
+            ).fetchall())
+
+            rows = {}
+            confirmed = []
+            for prop in fetched:
+                listing_key = self.listing_key(prop)
+                digest = self.content_hash(prop)
+                previous = existing.get(listing_key)
+
+                if previous == digest:
+                    counts['unchanged'] += 1
+                    confirmed.append((timestamp,) + key + (listing_key,))
+                    continue
+
+                counts['new' if previous is None else 'changed'] += 1
+                data = zlib.compress(json.dumps(prop, default=str).encode('utf-8'))
+                rows[listing_key] = key + (listing_key, digest, data, timestamp, timestamp)
+
+            conn.executemany("""
+                INSERT INTO scrape_listings
+                    (location, listing_type, window_days, listing_key,
+                     content_hash, data, first_seen, scraped_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (location, listing_type, window_days, listing_key) DO UPDATE SET
+                    content_hash = excluded.content_hash,
+                    data = excluded.data,
+                    scraped_at = excluded.scraped_at
+            """, list(rows.values()))
+
+            # Refetched without changes: the stored data is current as of now
+            conn.executemany(
+                "UPDATE scrape_listings SET scraped_at = ? WHERE location = ? "
+                "AND listing_type = ? AND window_days = ? AND listing_key = ?",
+                confirmed
+            )
+
+            if full_refresh:
+                fetched_keys = {self.listing_key(prop) for prop in fetched}
+                stale = [(listing_key,) for listing_key in existing if listing_key not in fetched_keys]
+                conn.executemany(
+                    "DELETE FROM scrape_listings WHERE location = ? AND listing_type = ? "
+                    "AND window_days = ? AND listing_key = ?",
+                    [key + row for row in stale]
+                )
+                counts['removed'] = len(stale)
+
+            conn.execute("""
+                INSERT INTO scrape_runs
+                    (location, listing_type, window_days, last_success, last_full_refresh)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (location, listing_type, window_days) DO UPDATE SET
+                    last_success = excluded.last_success,
+                    last_full_refresh = CASE WHEN ? THEN excluded.last_full_refresh
+                                             ELSE scrape_runs.last_full_refresh END
+            """, key + (timestamp, timestamp, int(full_refresh)))
+
+        return counts
+
+    def load(self, location: str, listing_type: str, window_days: int,
+             now: Optional[datetime] = None) -> List[Dict]:
+        """
+        Load cached listings still inside the window
+
+        days_on_market is advanced by the whole days since each listing was
+        scraped, so unchanged listings age the same way a refetch would show.
+        Listings the latest fetch didn't return keep their cached price and
+        status; they are flagged with cache_stale=True and cached_at.
+
+        Args:
+            location: ZIP code or city
+            listing_type: Type of listings
+            window_days: Full lookback window
+            now: Current time (default: datetime.now())
+
+        Returns:
+            List of property dictionaries
+        """
+        now = now or datetime.now()
+        cutoff = now - timedelta(days=window_days)
+
+        with self._connect() as conn:
+            run = conn.execute(
+                "SELECT last_success FROM scrape_runs "
+                "WHERE location = ? AND listing_type = ? AND window_days = ?",
+                (location, listing_type, window_days)
+            ).fetchone()
+            rows = conn.execute(
+                "SELECT data, first_seen, scraped_at FROM scrape_listings "
+                "WHERE location = ? AND listing_type = ? AND window_days = ? "
+                "ORDER BY first_seen, listing_key",
+                (location, listing_type, window_days)
+            ).fetchall()
+
+        properties = []
+        for data, first_seen, scraped_at in rows:
+            prop = json.loads(zlib.decompress(data))
+
+            if not self._in_window(prop, first_seen, cutoff):
+                continue
+
+            elapsed_days = (now - datetime.fromisoformat(scraped_at)).days
+            if elapsed_days > 0 and isinstance(prop.get('days_on_market'), int):
+                prop['days_on_market'] += elapsed_days
+
+            prop['cache_stale'] = (run is not None and
+                                   datetime.fromisoformat(scraped_at) < datetime.fromisoformat(run[0]))
+            prop['cached_at'] = scraped_at
+            properties.append(prop)
+
+        return properties
+
+    @staticmethod
+    def _in_window(prop: Dict, first_seen: str, cutoff: datetime) -> bool:
+        """True if the listing date (or first sighting) is within the window"""
+        listed = prop.get('listing_date') or first_seen
+        try:
+            listed_at = datetime.fromisoformat(str(listed)[:19])
+        except ValueError:
+            return True
+        return listed_at >= cutoff
+
+    def clear(self, location: Optional[str] = None):
+        """
+        Drop cached listings and scrape history
+
+        Args:
+            location: Location to clear (default: everything)
+        """
+        with self._write_lock, self._connect() as conn:
+            for table in ('scrape_listings', 'scrape_runs'):
+                if location is None:
+                    conn.execute(f"DELETE FROM {table}")
+                else:
+                    conn.execute(f"DELETE FROM {table} WHERE location = ?", (location,))
@@ -1,11 +1,70 @@
 from homeharvest import scrape_property
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Tuple
 import logging
+import threading
 import time
 import json
 from datetime import datetime, timedelta
 import pandas as pd
 
+from modules.scrape_cache import ScrapeCache
+
+
+class CaptchaDetectedError(RuntimeError):
+    """Raised when Realtor.com answers with a CAPTCHA / bot check"""
+    pass
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by all scrape workers"""
+
+    def __init__(self, rate: float, capacity: int = 1):
+        """
+        Initialize token bucket
+
+        Args:
+            rate: Tokens added per second (0 disables limiting)
+            capacity: Maximum burst size
+        """
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, cancel_event: Optional[threading.Event] = None) -> bool:
+        """
+        Block until a token is available.
+
+        Args:
+            cancel_event: Optional event that aborts the wait when set
+
+        Returns:
+            True if a token was taken, False if the wait was cancelled
+        """
+        if self.rate <= 0:
+            return True
+
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity,
+                                  self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+
+                wait_time = (1 - self.tokens) / self.rate
+
+            if cancel_event is None:
+                time.sleep(wait_time)
+            elif cancel_event.wait(wait_time):
+                return False
+
+
 class RealtorScraper:
     """Scrapes Realtor.com using HomeHarvest library"""
 
@@ -14,25 +73,82 @@ class RealtorScraper:
         self.logger = logging.getLogger(__name__)
         self.rate_limit_delay = config.get('scraping', {}).get('rate_limit_delay', 1.0)
         self.max_retries = config.get('scraping', {}).get('max_retries', 3)
-        self.logger.info("RealtorScraper initialized with rate limit delay: %s seconds", self.rate_limit_delay)
+        self.max_workers = config.get('performance', {}).get('max_concurrent_scrapes', 5)
+
+        # One request per rate_limit_delay on average across all workers,
+        # with bursts of at most max_workers requests
+        rate = 1.0 / self.rate_limit_delay if self.rate_limit_delay > 0 else 0
+        self.rate_limiter = TokenBucket(rate, capacity=self.max_workers)
+
+        # Persistent listing cache: later runs only fetch the delta window
+        cache_config = config.get('scraping', {}).get('cache', {})
+        self.cache = None
+        if cache_config.get('enabled', False):
+            self.cache = ScrapeCache(cache_config.get('path'),
+                                     full_refresh_days=cache_config.get('full_refresh_days', 1))
+
+        self.logger.info("RealtorScraper initialized with rate limit delay: %s seconds, %d workers",
+                        self.rate_limit_delay, self.max_workers)
 
     def scrape_zip_code(self, zip_code: str, listing_type: str = "for_sale",
-                        days_back: int = 30) -> List[Dict]:
+                        days_back: int = 30,
+                        cancel_event: Optional[threading.Event] = None) -> List[Dict]:
         """
         Scrape properties from a single ZIP code using HomeHarvest.
 
+        With the scrape cache enabled, only the days since the last
+        successful scrape are fetched and merged with cached listings.
+        Cached listings the fetch didn't return are flagged cache_stale.
+
         Args:
             zip_code: ZIP code to scrape
             listing_type: Type of listings ("for_sale", "sold", "for_rent")
             days_back: Number of days to look back for listings
+            cancel_event: Optional event that stops retries when set
 
         Returns:
             List of property dictionaries
         """
+        if self.cache is None:
+            return self._fetch_location(zip_code, listing_type, days_back, cancel_event) or []
+
+        fetch_days, full_refresh = self.cache.plan_fetch(zip_code, listing_type, days_back)
+        fetched = self._fetch_location(zip_code, listing_type, fetch_days, cancel_event)
+        if fetched is None:
+            return []
+
+        counts = self.cache.merge(zip_code, listing_type, days_back, fetched, full_refresh)
+        properties = self.cache.load(zip_code, listing_type, days_back)
+
+        stale = sum(1 for prop in properties if prop['cache_stale'])
+        self.logger.info("ZIP %s: fetched %d days (%d new, %d changed, %d unchanged, %d removed), "
+                        "%d listings in window (%d with cached prices)", zip_code, fetch_days,
+                        counts['new'], counts['changed'], counts['unchanged'], counts['removed'],
+                        len(properties), stale)
+        return properties
+
+    def _fetch_location(self, zip_code: str, listing_type: str, days_back: int,
+                        cancel_event: Optional[threading.Event] = None) -> Optional[List[Dict]]:
+        """
+        Fetch listings from Realtor.com with rate limiting and retries.
+
+        Args:
+            zip_code: ZIP code or city to scrape
+            listing_type: Type of listings ("for_sale", "sold", "for_rent")
+            days_back: Number of days to look back for listings
+            cancel_event: Optional event that stops retries when set
+
+        Returns:
+            List of property dictionaries, or None if cancelled
+        """
         self.logger.info("Scraping ZIP code: %s (type: %s, days_back: %d)",
                         zip_code, listing_type, days_back)
 
         for attempt in range(1, self.max_retries + 1):
+            if not self.rate_limiter.acquire(cancel_event):
+                self.logger.info("Scrape of ZIP %s cancelled", zip_code)
+                return None
+
             try:
                 # Use HomeHarvest scrape_property function
                 df = scrape_property(
@@ -69,7 +185,7 @@ class RealtorScraper:
                 if self.detect_captcha(error_msg):
                     self.logger.error("CAPTCHA detected for ZIP %s. Manual intervention required.",
                                     zip_code)
-                    raise RuntimeError(f"CAPTCHA detected for ZIP {zip_code}")
+                    raise CaptchaDetectedError(f"CAPTCHA detected for ZIP {zip_code}")
 
                 self.logger.warning("Attempt %d/%d failed for ZIP %s: %s",
                                   attempt, self.max_retries, zip_code, error_msg)
@@ -78,7 +194,11 @@ class RealtorScraper:
                     # Exponential backoff
                     wait_time = self.rate_limit_delay * (2 ** (attempt - 1))
                     self.logger.info("Retrying in %s seconds...", wait_time)
-                    time.sleep(wait_time)
+                    if cancel_event is None:
+                        time.sleep(wait_time)
+                    elif cancel_event.wait(wait_time):
+                        self.logger.info("Scrape of ZIP %s cancelled", zip_code)
+                        return None
                 else:
                     self.logger.error("Failed to scrape ZIP %s after %d attempts",
                                     zip_code, self.max_retries)
@@ -86,12 +206,18 @@ class RealtorScraper:
 
         return []
 
-    def scrape_multiple_locations(self, locations: List[str]) -> List[Dict]:
+    def scrape_multiple_locations(self, locations: List[str], listing_type: str = "for_sale",
+                                  days_back: int = 30) -> List[Dict]:
         """
         Scrape properties from multiple ZIP codes or cities.
 
+        Locations are scraped concurrently; see iter_scrape_locations.
+        A CAPTCHA stops the run and returns what was scraped so far.
+
         Args:
             locations: List of ZIP codes or city names
+            listing_type: Type of listings ("for_sale", "sold", "for_rent")
+            days_back: Number of days to look back for listings
 
         Returns:
             Aggregated list of property dictionaries
@@ -99,25 +225,85 @@ class RealtorScraper:
         self.logger.info("Scraping %d locations", len(locations))
         all_properties = []
 
-        for i, location in enumerate(locations, 1):
-            self.logger.info("Processing location %d/%d: %s", i, len(locations), location)
-
-            try:
-                properties = self.scrape_zip_code(location)
+        try:
+            for location, properties in self.iter_scrape_locations(
+                    locations, listing_type=listing_type, days_back=days_back):
                 all_properties.extend(properties)
-
-                # Rate limiting between locations
-                if i < len(locations):
-                    self.logger.debug("Rate limiting: waiting %s seconds", self.rate_limit_delay)
-                    time.sleep(self.rate_limit_delay)
-
-            except Exception as e:
-                self.logger.error("Failed to scrape location %s: %s", location, str(e))
-                continue
+        except CaptchaDetectedError as e:
+            self.logger.error("Stopping scrape early: %s", str(e))
 
         self.logger.info("Total properties scraped from all locations: %d", len(all_properties))
         return all_properties
 
+    def iter_scrape_locations(self, locations: List[str], listing_type: str = "for_sale",
+                              days_back: int = 30,
+                              max_workers: Optional[int] = None) -> Iterator[Tuple[str, List[Dict]]]:
+        """
+        Scrape locations on a bounded thread pool, yielding each as it finishes.
+
+        All workers share the scraper's token bucket, so the overall request
+        rate stays within rate_limit_delay regardless of worker count. Failed
+        locations are logged and skipped. A CAPTCHA cancels all remaining work
+        and is re-raised once in-flight requests have returned.
+
+        Args:
+            locations: List of ZIP codes or city names
+            listing_type: Type of listings ("for_sale", "sold", "for_rent")
+            days_back: Number of days to look back for listings
+            max_workers: Worker count (default: performance.max_concurrent_scrapes)
+
+        Yields:
+            (location, properties) tuples in completion order
+        """
+        if not locations:
+            return
+
+        workers = max(1, min(max_workers or self.max_workers, len(locations)))
+        cancel_event = threading.Event()
+        captcha_error = None
+        completed = 0
+
+        self.logger.info("Scraping %d locations with %d workers", len(locations), workers)
+
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scraper")
+        try:
+            futures = {
+                executor.submit(self.scrape_zip_code, location, listing_type,
+                                days_back, cancel_event): location
+                for location in locations
+            }
+
+            for future in as_completed(futures):
+                location = futures[future]
+                completed += 1
+
+                if future.cancelled():
+                    continue
+
+                try:
+                    properties = future.result()
+                except CaptchaDetectedError as e:
+                    if captcha_error is None:
+                        captcha_error = e
+                        cancel_event.set()
+                        for pending in futures:
+                            pending.cancel()
+                    continue
+                except Exception as e:
+                    self.logger.error("Failed to scrape location %s: %s", location, str(e))
+                    continue
+
+                self.logger.info("Processed location %d/%d: %s (%d properties)",
+                               completed, len(locations), location, len(properties))
+                yield location, properties
+        finally:
+            # Stop queued work if the consumer stops iterating early
+            cancel_event.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        if captcha_error is not None:
+            raise captcha_error
+
     def scrape_city(self, city: str, state: str, days_back: int = 30) -> List[Dict]:
         """
         Scrape properties by city name instead of ZIP code.
@@ -3,15 +3,15 @@ SearchAgent - Autonomous Property Monitoring
 Continuously monitors new property scans for matches based on client criteria
 """
 
-import json
 import os
-from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 import logging
 from dotenv import load_dotenv
 
+from modules.address_normalizer import normalize_address
 from modules.client_db import get_db
+from modules.match_engine import ScanIndex, get_match_engine, calculate_match_score
 from integrations.ghl_connector import GoHighLevelConnector
 from integrations.ghl_buyer_matcher import BuyerMatcher
 
@@ -78,7 +78,8 @@ class SearchAgent:
                 self.ghl_connector = GoHighLevelConnector(
                     api_key=ghl_api_key,
                     location_id=ghl_location_id,
-                    test_mode=False
+                    test_mode=False,
+                    caller='agent_notifications'
                 )
                 # Get GHL contact ID from client data
                 client_data = self.db.get_client(self.client_id)
@@ -89,10 +90,13 @@ class SearchAgent:
         except Exception as e:
             logger.warning(f"GHL integration not available: {e}")
 
-        # Property scan data path
-        self.scan_path = Path(__file__).parent.parent / 'data' / 'latest_scan.json'
+        # Shared, indexed property scan (memory-mapped scan store)
+        self.match_engine = get_match_engine()
         self.last_scan_timestamp = None
 
+        # Normalized addresses already matched (loaded on first use)
+        self._matched_addresses: Optional[Set[str]] = None
+
     def check_for_matches(self) -> List[Dict]:
         """
         Check latest property scan for matches
@@ -104,29 +108,16 @@ class SearchAgent:
             logger.info(f"Agent {self.agent_id} is {self.status}, skipping check")
             return []
 
-        # Load latest properties
-        properties = self._load_latest_properties()
-        if not properties:
+        # Load latest scan (parsed and indexed once, shared by all agents)
+        index = self._load_latest_index()
+        if index is None or not index.properties:
             logger.warning(f"No properties found in scan for agent {self.agent_id}")
             return []
 
-        logger.info(f"Agent {self.agent_id}: Checking {len(properties)} properties")
-
-        # Filter and score properties
-        matches = []
-        for prop in properties:
-            if self._property_matches_criteria(prop):
-                match_score, reasons = self._calculate_match_score(prop)
-
-                if match_score >= self.criteria['min_score']:
-                    matches.append({
-                        'property': prop,
-                        'match_score': match_score,
-                        'match_reasons': reasons
-                    })
+        logger.info(f"Agent {self.agent_id}: Checking {len(index.properties)} properties")
 
-        # Sort by match score (highest first)
-        matches.sort(key=lambda x: x['match_score'], reverse=True)
+        # Filter via the scan indexes, then score (highest first)
+        matches = self.match_engine.find_matches(self.criteria, index)
 
         logger.info(f"Agent {self.agent_id}: Found {len(matches)} matches")
 
@@ -135,28 +126,19 @@ class SearchAgent:
 
         return matches
 
-    def _load_latest_properties(self) -> List[Dict]:
-        """Load properties from latest scan file"""
-        try:
-            if not self.scan_path.exists():
-                logger.error(f"Scan file not found: {self.scan_path}")
-                return []
-
-            with open(self.scan_path, 'r') as f:
-                data = json.load(f)
-
-            # Always return properties on first check
-            scan_timestamp = data.get('scan_timestamp')
-            if self.last_scan_timestamp is not None and scan_timestamp == self.last_scan_timestamp:
-                logger.debug(f"Agent {self.agent_id}: Scan unchanged since last check")
-                return []
+    def _load_latest_index(self) -> Optional[ScanIndex]:
+        """Get the indexed latest scan, or None if unchanged since last check"""
+        index = self.match_engine.get_index()
+        if index is None:
+            return None
 
-            self.last_scan_timestamp = scan_timestamp
-            return data.get('properties', [])
+        # Always return properties on first check
+        if self.last_scan_timestamp is not None and index.scan_timestamp == self.last_scan_timestamp:
+            logger.debug(f"Agent {self.agent_id}: Scan unchanged since last check")
+            return None
 
-        except Exception as e:
-            logger.error(f"Error loading properties: {e}")
-            return []
+        self.last_scan_timestamp = index.scan_timestamp
+        return index
 
     def _property_matches_criteria(self, prop: Dict) -> bool:
         """
@@ -215,84 +197,7 @@ class SearchAgent:
         Returns:
             (score, reasons) tuple
         """
-        score = 0
-        reasons = []
-
-        # Start with property's opportunity score (0-100)
-        opp_score = prop.get('opportunity_score', 0)
-        score += min(opp_score, 40)  # Max 40 points from opportunity score
-
-        if opp_score >= 90:
-            reasons.append(f"🔥 HOT DEAL - {opp_score}/100 opportunity score")
-        elif opp_score >= 80:
-            reasons.append(f"✨ GOOD DEAL - {opp_score}/100 opportunity score")
-
-        # Location precision match (30 points max)
-        prop_zip = str(prop.get('zip_code', ''))
-        if prop_zip in self.criteria['zip_codes']:
-            score += 30
-            reasons.append(f"📍 Exact ZIP match: {prop_zip}")
-
-        # Price positioning (15 points max)
-        price = prop.get('list_price') or prop.get('price', 0)
-        if self.criteria['price_min'] and self.criteria['price_max']:
-            price_range = self.criteria['price_max'] - self.criteria['price_min']
-            price_midpoint = self.criteria['price_min'] + (price_range / 2)
-
-            # Closer to midpoint = higher score
-            price_deviation = abs(price - price_midpoint) / price_range
-            price_score = max(0, 15 - (price_deviation * 15))
-            score += price_score
-
-            reasons.append(f"💰 Price ${price:,.0f} within budget")
-
-        # Property characteristics match (15 points max)
-        bedrooms = prop.get('bedrooms', 0)
-        bathrooms = prop.get('bathrooms', 0)
-
-        if bedrooms >= self.criteria.get('bedrooms_min', 0):
-            score += 8
-            reasons.append(f"🛏️ {bedrooms} bedrooms")
-
-        if bathrooms >= self.criteria.get('bathrooms_min', 0):
-            score += 7
-            reasons.append(f"🚿 {bathrooms} bathrooms")
-
-        # Privy intelligence bonus (from Privy.pro CSV imports)
-        if prop.get('absentee_owner'):
-            score += 10
-            reasons.append(f"🏚️ Absentee owner - easier to motivate")
-
-        if prop.get('investor_owned'):
-            score += 5
-            owner_name = prop.get('owner_name', 'Unknown')
-            reasons.append(f"💼 Investor-owned: {owner_name[:40]}")
-
-        if prop.get('flip_history'):
-            score += 5
-            prev_owner = prop.get('previous_owner', 'Unknown')
-            reasons.append(f"🔄 Flip history (prev: {prev_owner[:30]})")
-
-        # Investment metrics bonus (bonus points, can exceed 100)
-        if self.criteria.get('investment_type') == 'cash_flow':
-            monthly_cashflow = prop.get('monthly_cashflow', 0)
-            if monthly_cashflow > 500:
-                score += 10
-                reasons.append(f"💸 Strong cash flow: ${monthly_cashflow:,.0f}/mo")
-
-        if self.criteria.get('investment_type') == 'appreciation':
-            appreciation_potential = prop.get('appreciation_potential', 0)
-            if appreciation_potential > 15:
-                score += 10
-                reasons.append(f"📈 High appreciation potential: {appreciation_potential}%")
-
-        # Market timing bonus
-        days_on_market = prop.get('days_on_market', 0)
-        if days_on_market > 60:
-            score += 5
-            reasons.append(f"⏰ Motivated seller - {days_on_market} days on market")
-
-        return min(score, 100), reasons
+        return calculate_match_score(prop, self.criteria)
 
     def process_new_matches(self, matches: List[Dict]) -> int:
         """
@@ -307,40 +212,50 @@ class SearchAgent:
         if not matches:
             return 0
 
-        new_matches_count = 0
+        if self._matched_addresses is None:
+            self._matched_addresses = self.db.get_matched_addresses(self.agent_id)
 
+        # Drop properties we've already matched (or that repeat within this batch)
+        candidates = {}
         for match in matches:
-            prop = match['property']
-            address = prop.get('address', 'Unknown Address')
-
-            # Check if we've already matched this property
-            existing_matches = self.db.get_agent_matches(self.agent_id)
-            if any(m['property_address'] == address for m in existing_matches):
+            address = match['property'].get('address', 'Unknown Address')
+            key = normalize_address(address)
+            if key in self._matched_addresses or key in candidates:
                 logger.debug(f"Property {address} already matched, skipping")
                 continue
+            candidates[key] = match
+
+        if not candidates:
+            return 0
 
-            # Store match in database
-            match_id = self.db.add_match(
-                agent_id=self.agent_id,
-                property_address=address,
-                property_data={
-                    **prop,
-                    'match_score': match['match_score'],
-                    'match_reasons': match['match_reasons']
-                }
-            )
+        # Store all new matches in one transaction; the unique index skips
+        # any address another writer stored first
+        match_ids = self.db.add_matches(self.agent_id, [
+            (match['property'].get('address', 'Unknown Address'), {
+                **match['property'],
+                'match_score': match['match_score'],
+                'match_reasons': match['match_reasons']
+            })
+            for match in candidates.values()
+        ])
+        self._matched_addresses.update(candidates)
+
+        notified = []
+        for match, match_id in zip(candidates.values(), match_ids):
+            if match_id is None:
+                continue
 
+            address = match['property'].get('address', 'Unknown Address')
             logger.info(f"New match {match_id}: {address} (score: {match['match_score']})")
 
             # Send notifications
             self._send_notifications(match)
+            notified.append(match_id)
 
-            # Mark as notified
-            self.db.mark_match_notified(match_id)
-
-            new_matches_count += 1
+        # Mark as notified
+        self.db.mark_matches_notified(notified)
 
-        return new_matches_count
+        return len(notified)
 
     def _send_notifications(self, match: Dict):
         """
@@ -406,17 +321,16 @@ View details in DealFinder Pro dashboard.
         Returns:
             Dictionary with agent status information
         """
-        agent_data = self.db.get_agent(self.agent_id)
-        matches = self.db.get_agent_matches(self.agent_id)
+        summary = self.db.get_agent_summary(self.agent_id)
 
         return {
             'agent_id': self.agent_id,
             'client_name': self.client_name,
             'status': self.status,
-            'created_at': agent_data['created_at'],
-            'last_check': agent_data.get('last_check'),
-            'matches_found': len(matches),
-            'new_matches': len([m for m in matches if m['status'] == 'new']),
+            'created_at': summary['created_at'],
+            'last_check': summary.get('last_check'),
+            'matches_found': summary['total_matches'],
+            'new_matches': summary['new_matches'],
             'criteria_summary': self._get_criteria_summary()
         }
 
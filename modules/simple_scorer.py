@@ -11,6 +11,8 @@ from datetime import datetime
 from typing import Dict, List
 import statistics
 
+from modules.batch_scorer import BatchScorer, round_cents
+
 
 class SimplePropertyScorer:
     """Lightweight property scorer for real-time analysis"""
@@ -23,6 +25,7 @@ class SimplePropertyScorer:
             config: Configuration dictionary from config.yaml
         """
         self.config = config
+        self.batch_scorer = BatchScorer(config)
 
     def score_properties(self, properties: List[Dict]) -> List[Dict]:
         """
@@ -37,22 +40,18 @@ class SimplePropertyScorer:
         if not properties:
             return []
 
-        # Calculate market averages for comparison
-        avg_price_per_sqft = self._calculate_avg_price_per_sqft(properties)
+        # Scores for the whole batch (median $/sqft comparison included)
+        frame = self.batch_scorer.build_frame(properties)
+        scores = self.batch_scorer.simple_scores(frame)
+        rounded_scores = round_cents(scores)
 
         scored_properties = []
         current_date = datetime.now().isoformat()
 
-        for prop in properties:
+        for prop, score, rounded_score in zip(properties, scores.tolist(), rounded_scores.tolist()):
             # Add timestamp
             prop['scraped_date'] = current_date
-
-            # Calculate score
-            score = self._calculate_opportunity_score(
-                prop,
-                avg_price_per_sqft
-            )
-            prop['opportunity_score'] = round(score, 2)
+            prop['opportunity_score'] = rounded_score
 
             # Add deal classification
             prop['deal_quality'] = self._classify_deal(score)
@@ -9,13 +9,18 @@ Handles:
 - Sync logging and error handling
 """
 
+import json
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
-import time
+
+from integrations.ghl_async_connector import parse_ghl_timestamp
 
 logger = logging.getLogger(__name__)
 
+# Sync log type for buyer imports (its metadata holds the contact cursor)
+BUYER_SYNC_TYPE = 'buyer_import_from_ghl'
+
 
 class SyncError(Exception):
     """Custom exception for sync operations"""
@@ -85,47 +90,41 @@ class SyncManager:
             threshold = min_score if min_score is not None else self.sync_threshold
             properties = self.db.get_unsynced_properties()
 
-            logger.info(f"Starting property sync: {len(properties)} properties to process")
+            logger.info(f"Starting property sync: {len(properties)} properties to process "
+                        f"in batches of {self.batch_size}")
 
-            for prop in properties:
-                stats['total_processed'] += 1
+            for start in range(0, len(properties), self.batch_size):
+                batch = properties[start:start + self.batch_size]
 
-                try:
-                    # Check if opportunity already exists in GHL
-                    if prop.get('ghl_opportunity_id'):
-                        # Update existing opportunity
-                        success = self._update_ghl_opportunity(prop)
-                        if success:
-                            stats['updated'] += 1
-                        else:
-                            stats['failed'] += 1
-                    else:
-                        # Create new opportunity
-                        opportunity_id = self._create_ghl_opportunity(prop)
-                        if opportunity_id:
-                            # Mark as synced in database
-                            self.db.mark_property_synced(
-                                prop['property_id'],
-                                opportunity_id
-                            )
-                            stats['created'] += 1
-                        else:
-                            stats['failed'] += 1
+                # Requests within a batch run concurrently; the connector's
+                # rate limiter decides when each one is sent
+                results = self._run_concurrently(self._export_property, batch)
 
-                except Exception as e:
-                    error_msg = f"Failed to sync property {prop.get('property_id')}: {e}"
-                    logger.error(error_msg)
-                    stats['errors'].append(error_msg)
-                    stats['failed'] += 1
+                synced = []
+                for prop, (action, opportunity_id, error) in zip(batch, results):
+                    stats['total_processed'] += 1
 
-                    # Update property sync status to failed
-                    self.db.update_property(prop['property_id'], {
-                        'ghl_sync_status': 'failed',
-                        'ghl_sync_error': str(e)
-                    })
+                    if error:
+                        error_msg = f"Failed to sync property {prop.get('property_id')}: {error}"
+                        logger.error(error_msg)
+                        stats['errors'].append(error_msg)
+                        stats['failed'] += 1
 
-                # Rate limiting: small delay between requests
-                time.sleep(0.1)
+                        # Update property sync status to failed
+                        self.db.update_property(prop['property_id'], {
+                            'ghl_sync_status': 'failed',
+                            'ghl_sync_error': str(error)
+                        })
+                    elif action == 'created':
+                        synced.append((prop['property_id'], opportunity_id))
+                        stats['created'] += 1
+                    elif action == 'updated':
+                        stats['updated'] += 1
+                    else:
+                        stats['failed'] += 1
+
+                # Mark the batch's new opportunities as synced in one write
+                self.db.mark_properties_synced(synced)
 
             # Calculate execution time
             execution_time = (datetime.now() - start_time).total_seconds()
@@ -153,6 +152,45 @@ class SyncManager:
 
             raise SyncError(f"Property sync failed: {e}")
 
+    def _export_property(self, prop: Dict[str, Any]) -> Tuple[str, Optional[str], Optional[Exception]]:
+        """
+        Create or update one property's GHL opportunity (with notes).
+
+        Args:
+            prop: Property dictionary
+
+        Returns:
+            (action, opportunity_id, error) where action is 'created',
+            'updated' or 'failed'
+        """
+        try:
+            # Check if opportunity already exists in GHL
+            if prop.get('ghl_opportunity_id'):
+                success = self._update_ghl_opportunity(prop)
+                return ('updated' if success else 'failed'), prop['ghl_opportunity_id'], None
+
+            opportunity_id = self._create_ghl_opportunity(prop)
+            return ('created' if opportunity_id else 'failed'), opportunity_id, None
+
+        except Exception as e:
+            return 'failed', None, e
+
+    def _run_concurrently(self, func, items: List[Any]) -> List[Any]:
+        """
+        Apply func to items through the connector's bounded fan-out.
+
+        Args:
+            func: Function called with one item
+            items: Items to process
+
+        Returns:
+            Results in the same order as items
+        """
+        fan_out = getattr(self.ghl, 'fan_out', None)
+        if fan_out is None:
+            return [func(item) for item in items]
+        return fan_out(func, items)
+
     def _create_ghl_opportunity(self, property_data: Dict[str, Any]) -> Optional[str]:
         """
         Create opportunity in GHL from property data.
@@ -318,10 +356,16 @@ Added: {datetime.now().strftime('%Y-%m-%d %H:%M')}
         except Exception as e:
             logger.warning(f"Failed to add notes to opportunity: {e}")
 
-    def sync_buyers_from_ghl(self) -> Dict[str, Any]:
+    def sync_buyers_from_ghl(self, full_resync: bool = False) -> Dict[str, Any]:
         """
         Import buyers from GHL contacts with 'active_buyer' tag.
 
+        Only contacts updated since the cursor saved by the last sync are
+        fetched; the new cursor is stored in the sync log metadata.
+
+        Args:
+            full_resync: Ignore the saved cursor and fetch every buyer
+
         Returns:
             Dictionary with sync statistics:
                 - total_processed: Total contacts processed
@@ -329,6 +373,7 @@ Added: {datetime.now().strftime('%Y-%m-%d %H:%M')}
                 - updated: Number of buyers updated
                 - failed: Number of failures
                 - errors: List of error messages
+                - cursor: Contact update time the next sync starts from
         """
         start_time = datetime.now()
         stats = {
@@ -340,11 +385,15 @@ Added: {datetime.now().strftime('%Y-%m-%d %H:%M')}
         }
 
         try:
-            # Fetch contacts with 'active_buyer' tag from GHL
-            contacts = self.ghl.get_contacts_by_tag('active_buyer')
+            cursor = None if full_resync else self._get_contact_cursor(BUYER_SYNC_TYPE)
+
+            # Fetch contacts with 'active_buyer' tag updated since the last sync
+            contacts = self.ghl.search_contacts(tags=['active_buyer'], updated_since=cursor)
 
-            logger.info(f"Starting buyer sync: {len(contacts)} contacts to process")
+            logger.info(f"Starting buyer sync: {len(contacts)} contacts to process"
+                        + (f" (updated since {cursor})" if cursor else ""))
 
+            failed_contacts = []
             for contact in contacts:
                 stats['total_processed'] += 1
 
@@ -361,24 +410,26 @@ Added: {datetime.now().strftime('%Y-%m-%d %H:%M')}
                         stats['updated'] += 1
                     else:
                         stats['failed'] += 1
+                        failed_contacts.append(contact)
 
                 except Exception as e:
                     error_msg = f"Failed to sync buyer {contact.get('id')}: {e}"
                     logger.error(error_msg)
                     stats['errors'].append(error_msg)
                     stats['failed'] += 1
+                    failed_contacts.append(contact)
 
-                # Rate limiting
-                time.sleep(0.05)
+            stats['cursor'] = self._next_contact_cursor(cursor, contacts, failed_contacts)
 
             # Calculate execution time
             execution_time = (datetime.now() - start_time).total_seconds()
 
             # Log sync operation
             self.log_sync_operation(
-                sync_type='buyer_import_from_ghl',
+                sync_type=BUYER_SYNC_TYPE,
                 stats={**stats, 'execution_time_seconds': int(execution_time)},
-                status='success' if stats['failed'] == 0 else 'partial'
+                status='success' if stats['failed'] == 0 else 'partial',
+                metadata={'contact_cursor': stats['cursor']}
             )
 
             logger.info(f"Buyer sync complete: {stats}")
@@ -390,13 +441,71 @@ Added: {datetime.now().strftime('%Y-%m-%d %H:%M')}
 
             # Log failed sync
             self.log_sync_operation(
-                sync_type='buyer_import_from_ghl',
+                sync_type=BUYER_SYNC_TYPE,
                 stats=stats,
                 status='failed'
             )
 
             raise SyncError(f"Buyer sync failed: {e}")
 
+    def _get_contact_cursor(self, sync_type: str) -> Optional[str]:
+        """
+        Contact cursor saved by the most recent completed sync.
+
+        Args:
+            sync_type: Sync log type the cursor was saved under
+
+        Returns:
+            ISO timestamp, or None if no sync has saved one
+        """
+        for sync in self.db.get_recent_syncs(sync_type):
+            if sync.get('status') not in ('success', 'partial'):
+                continue
+
+            metadata = sync.get('metadata')
+            if isinstance(metadata, str):
+                try:
+                    metadata = json.loads(metadata)
+                except ValueError:
+                    metadata = None
+
+            if isinstance(metadata, dict) and metadata.get('contact_cursor'):
+                return metadata['contact_cursor']
+
+        return None
+
+    @staticmethod
+    def _next_contact_cursor(cursor: Optional[str], contacts: List[Dict[str, Any]],
+                             failed_contacts: List[Dict[str, Any]]) -> Optional[str]:
+        """
+        Cursor for the next sync.
+
+        Advances to the latest contact update seen, or holds at the earliest
+        failed contact so it is fetched again.
+
+        Args:
+            cursor: Cursor this sync started from
+            contacts: Contacts fetched
+            failed_contacts: Contacts that failed to import
+
+        Returns:
+            ISO timestamp, or the unchanged cursor if nothing was fetched
+        """
+        def updated_times(items):
+            times = []
+            for contact in items:
+                updated = parse_ghl_timestamp(contact.get('dateUpdated'))
+                if updated is not None:
+                    times.append((updated, contact['dateUpdated']))
+            return times
+
+        failed = updated_times(failed_contacts)
+        if failed:
+            return min(failed)[1]
+
+        fetched = updated_times(contacts)
+        return max(fetched)[1] if fetched else cursor
+
     def _map_ghl_contact_to_buyer(self, contact: Dict[str, Any]) -> Dict[str, Any]:
         """
         Map GHL contact data to buyer schema.
@@ -424,6 +533,7 @@ Added: {datetime.now().strftime('%Y-%m-%d %H:%M')}
             'buyer_status': custom_fields.get('buyer_status', 'active').lower(),
             'tags': contact.get('tags', []),
             'sms_opt_in': 'sms_opt_in' in contact.get('tags', []),
+            'dnd': bool(contact.get('dnd', False)),
             'last_synced_at': datetime.now()
         }
 
@@ -504,7 +614,8 @@ Added: {datetime.now().strftime('%Y-%m-%d %H:%M')}
         self,
         sync_type: str,
         stats: Dict[str, Any],
-        status: str = 'success'
+        status: str = 'success',
+        metadata: Optional[Dict[str, Any]] = None
     ):
         """
         Log sync operation to database.
@@ -513,6 +624,7 @@ Added: {datetime.now().strftime('%Y-%m-%d %H:%M')}
             sync_type: Type of sync operation
             stats: Statistics dictionary
             status: 'success', 'failed', or 'partial'
+            metadata: Extra details stored as JSON (e.g. a sync cursor)
         """
         try:
             sync_data = {
@@ -527,6 +639,9 @@ Added: {datetime.now().strftime('%Y-%m-%d %H:%M')}
                 'completed_at': datetime.now()
             }
 
+            if metadata is not None:
+                sync_data['metadata'] = json.dumps(metadata, default=str)
+
             self.db.log_sync(sync_data)
 
         except Exception as e:
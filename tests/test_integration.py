@@ -4,23 +4,60 @@ Tests complete workflows and module interactions
 """
 
 import pytest
+import asyncio
 import sys
 import os
-from datetime import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from unittest.mock import patch
+import pickle
 import json
+import sqlite3
+import pandas as pd
+import httpx
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from modules.database import DatabaseManager
-from modules.scraper import RealtorScraper
+from modules.schema_mapper import SchemaMapper
+from modules.scraper import RealtorScraper, CaptchaDetectedError
+from modules.data_enrichment import DataEnrichment
+from modules.address_normalizer import normalize_address, parse_address
 from modules.analyzer import PropertyAnalyzer
+from modules.parallel_analyzer import ParallelAnalyzer
 from modules.scorer import OpportunityScorer
+from modules.batch_scorer import BatchScorer
+from modules.keyword_matcher import (
+    KEYWORD_CATEGORIES, DEFAULT_DISTRESSED_KEYWORDS, DISTRESSED_SCORE_KEYWORDS,
+    HEAVY_REHAB_KEYWORDS, MODERATE_REHAB_KEYWORDS, KeywordMatcher, get_keyword_matcher
+)
+from modules.simple_scorer import SimplePropertyScorer
 from modules.reporter import ReportGenerator
 from modules.notifier import Notifier
+from modules.pipeline import Pipeline, PipelineStage
+from modules.match_engine import MatchEngine, ScanIndex
+from modules.scan_store import ScanStore
+from modules.property_search import PropertySearchIndex, PropertySearchService
+from modules.search_agent import SearchAgent
+from modules.sync_manager import SyncManager
+from modules.client_db import ClientDatabase
+import modules.agent_manager as agent_manager_module
 from integrations.ghl_connector import GoHighLevelConnector
+from integrations.ghl_buyer_matcher import BuyerMatcher
+from integrations.ghl_buyer_index import contact_from_buyer_row
+from integrations.ghl_async_connector import (
+    AsyncGoHighLevelConnector, AsyncGHLRateLimiter, GHLAPIError
+)
+from integrations.ghl_shared_rate_limiter import SharedGHLRateLimiter
 
 
+# Benchmarks over large synthetic datasets only run with RUN_SLOW_TESTS=1
+slow = pytest.mark.skipif(not os.getenv('RUN_SLOW_TESTS'),
+                          reason='benchmark; set RUN_SLOW_TESTS=1 to run')
+
 # ========================================
 # FIXTURES
 # ========================================
@@ -65,9 +102,13 @@ def test_config():
 
 
 @pytest.fixture
-def test_db(test_config):
+def test_db(test_config, tmp_path):
     """Create test database"""
-    db = DatabaseManager(test_config['databases']['primary'])
+    db_config = dict(test_config['databases']['primary'])
+    db_config['db_type'] = db_config['type']
+    # Each SQLite connection to ':memory:' is a separate database
+    db_config['database'] = str(tmp_path / 'test.db')
+    db = DatabaseManager(db_config)
 
     # Create schema
     with db.get_connection() as conn:
@@ -86,8 +127,15 @@ def test_db(test_config):
                 bedrooms INTEGER,
                 bathrooms REAL,
                 square_feet INTEGER,
+                lot_size TEXT,
                 property_type TEXT,
+                year_built INTEGER,
                 days_on_market INTEGER,
+                mls_number TEXT,
+                description TEXT,
+                listing_url TEXT,
+                price_reduction_amount INTEGER,
+                tax_assessment INTEGER,
                 opportunity_score INTEGER,
                 deal_quality TEXT,
                 below_market_percentage REAL,
@@ -96,6 +144,28 @@ def test_db(test_config):
             )
         """)
 
+        # Market snapshots table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS market_snapshots (
+                zip_code TEXT NOT NULL,
+                property_type TEXT NOT NULL,
+                bedrooms INTEGER NOT NULL,
+                snapshot_date DATE NOT NULL,
+                listing_count INTEGER NOT NULL,
+                avg_price REAL,
+                median_price REAL,
+                priced_count INTEGER NOT NULL DEFAULT 0,
+                avg_price_per_sqft REAL,
+                median_price_per_sqft REAL,
+                avg_days_on_market REAL,
+                recent_count INTEGER NOT NULL DEFAULT 0,
+                recent_avg_price_per_sqft REAL,
+                older_count INTEGER NOT NULL DEFAULT 0,
+                older_avg_price_per_sqft REAL,
+                PRIMARY KEY (zip_code, property_type, bedrooms, snapshot_date)
+            )
+        """)
+
         # Buyers table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS buyers (
@@ -172,6 +242,77 @@ def sample_buyer():
     }
 
 
+def make_scoring_listings(count):
+    """Generate listings covering every score tier, rehab keyword tier and null field"""
+    descriptions = ['Motivated seller, sold AS-IS', 'Fixer upper, bring offers',
+                    'Needs TLC and cosmetic updates', 'Turnkey home', None]
+    listings = []
+    for i in range(count):
+        listing = {
+            'list_price': [0, 95000 + i * 173 % 700000, 310000.5][i % 3] if i % 11 else None,
+            'square_feet': 0 if i % 17 == 0 else 700 + (i * 37) % 3000,
+            'days_on_market': (i * 7) % 150,
+            'price_reduction_amount': [0, 12000, 25000][i % 3],
+            'description': descriptions[i % len(descriptions)]
+        }
+        if i % 4 == 0:
+            listing['annual_taxes'] = 1500 + i % 6000
+        elif i % 4 == 1:
+            # The scraper stores missing taxes and HOA fees as None
+            listing['annual_taxes'] = None
+        if i % 5 == 0:
+            listing['hoa_fee'] = i % 400
+        elif i % 5 == 1:
+            listing['hoa_fee'] = None
+        listings.append(listing)
+    market_data = [{'median_price_per_sqft': 120 + (i * 13) % 300 + 0.37} for i in range(count)]
+    return listings, market_data
+
+
+def make_search_listings(count):
+    """Generate scan properties for search index tests"""
+    cities = ['San Diego', 'La Jolla', 'Chula Vista', 'Las Vegas', 'Henderson']
+    qualities = ['HOT DEAL', 'GOOD OPPORTUNITY', 'FAIR DEAL', 'PASS']
+    return [{
+        'street_address': f'{i} Search Street',
+        'city': cities[i % 5],
+        'zip_code': str(92101 + i % 40),
+        'list_price': 150000 + (i * 7919) % 1500000 if i % 13 else None,
+        'opportunity_score': (i * 37) % 101,
+        'bedrooms': i % 6,
+        'bathrooms': 1 + (i % 4) * 0.5,
+        'days_on_market': (i * 11) % 180,
+        'deal_quality': qualities[(i * 7) % 4]
+    } for i in range(count)]
+
+
+def make_synthetic_listings(count, duplicate_every=10):
+    """Generate synthetic listings where every Nth record re-lists an earlier one"""
+    streets = ['Main Street', 'Oak Avenue', 'Pine Road', 'Maple Drive', 'Cedar Lane']
+    listings = []
+    for i in range(count):
+        if duplicate_every and i % duplicate_every == duplicate_every - 1:
+            # Same home from a second source with abbreviated street name
+            dup = dict(listings[i - 3])
+            dup['street_address'] = dup['street_address'].replace('Street', 'St').replace('Avenue', 'Ave')
+            dup['data_source'] = 'mls' if i % 2 else 'realtor_com'
+            dup['mls_number'] = None
+            listings.append(dup)
+            continue
+        listings.append({
+            'data_source': 'realtor_com',
+            'street_address': f"{100 + (i % 9000)} {streets[i % len(streets)]}",
+            'city': 'San Diego',
+            'state': 'CA',
+            'zip_code': f"{92100 + (i // 9000) % 40}",
+            'list_price': 400000 + (i * 137) % 900000,
+            'square_feet': 900 + (i * 31) % 2500,
+            'bedrooms': 1 + i % 5,
+            'mls_number': f"MLS{i:07d}" if i % 3 else None,
+        })
+    return listings
+
+
 # ========================================
 # DATABASE TESTS
 # ========================================
@@ -251,6 +392,288 @@ class TestAnalyzer:
         # Verify deal quality classification
         assert result['deal_quality'] in ['HOT DEAL', 'GOOD OPPORTUNITY', 'FAIR DEAL', 'PASS']
 
+    def test_market_stats_cached_per_zip(self, test_db, test_config):
+        """Test market stats are read once per ZIP and fall back to ZIP-wide stats"""
+        listings = []
+        for zip_code in ['90210', '90211']:
+            listings += [
+                {'property_id': f'{zip_code}_SF_{i}', 'zip_code': zip_code,
+                 'property_type': 'Single Family', 'bedrooms': 3,
+                 'list_price': 300000 + i * 10000, 'square_feet': 1500, 'days_on_market': 10 + i}
+                for i in range(4)
+            ] + [
+                {'property_id': f'{zip_code}_CONDO', 'zip_code': zip_code, 'property_type': 'Condo',
+                 'bedrooms': 2, 'list_price': 200000, 'square_feet': 1000, 'days_on_market': 40}
+            ]
+        test_db.bulk_upsert_properties(listings)
+        analyzer = PropertyAnalyzer(test_db, test_config)
+
+        for i in range(50):
+            segment = analyzer.get_market_data(['90210', '90211'][i % 2], 'Single Family', 3)
+            zip_wide = analyzer.get_market_data('90210', 'Condo', 2)
+
+        # Snapshots were stored by the upsert, so each ZIP is one read
+        assert analyzer.market_stats.queries == 2
+        assert segment['inventory_count'] == 4
+        assert segment['avg_price_per_sqft'] == pytest.approx(1260000 / 4 / 1500)
+        assert segment['median_price_per_sqft'] == pytest.approx(315000 / 1500)
+        assert zip_wide['inventory_count'] == 5
+
+        analyzer.market_stats.invalidate('90210')
+        analyzer.get_market_data('90210', 'Single Family', 3)
+        assert analyzer.market_stats.queries == 3
+
+    def test_market_stats_aggregated_in_database(self, test_db):
+        """Test market_stats medians, 30-day trend split and grouping"""
+        test_db.bulk_upsert_properties([
+            {'property_id': f'MKT_{i}', 'zip_code': '90210' if i < 5 else '90211',
+             'city': 'Beverly Hills', 'property_type': 'Single Family', 'bedrooms': 3,
+             'list_price': price, 'square_feet': 1000, 'days_on_market': dom,
+             'opportunity_score': score, 'estimated_profit': 10000}
+            for i, (price, dom, score) in enumerate([
+                (100000, 10, 95), (200000, 20, 80), (300000, 100, 50), (400000, 0, 60),
+                (0, 5, 40), (500000, 30, 90), (700000, 60, 70)
+            ])
+        ])
+        with test_db.get_connection() as conn:
+            # Two 90210 listings and one 90211 listing predate the trend window
+            conn.execute("UPDATE properties SET created_at = datetime('now', '-45 days') "
+                         "WHERE property_id IN ('MKT_0', 'MKT_1', 'MKT_5')")
+            conn.execute("UPDATE properties SET created_at = datetime('now', '-120 days') "
+                         "WHERE property_id = 'MKT_6'")
+
+        by_zip = {row['zip_code']: row for row in test_db.market_stats(group_by=['zip_code'])}
+        beverly = by_zip['90210']
+        assert beverly['listing_count'] == 5
+        assert beverly['median_price'] == 250000
+        assert beverly['min_price'] == 100000
+        assert beverly['avg_price_per_sqft'] == pytest.approx(250)
+        assert beverly['avg_days_on_market'] == pytest.approx(135 / 4)
+        assert (beverly['hot_deals'], beverly['good_deals']) == (1, 1)
+        assert (beverly['quick_sales'], beverly['stale_listings']) == (3, 1)
+        assert (beverly['recent_count'], beverly['older_count']) == (2, 2)
+        assert beverly['recent_avg_price_per_sqft'] == pytest.approx(350)
+        assert beverly['older_avg_price_per_sqft'] == pytest.approx(150)
+        assert beverly['total_estimated_profit'] == 50000
+
+        # The 120-day-old listing is outside the default window
+        assert by_zip['90211']['listing_count'] == 1
+        assert by_zip['90211']['median_price'] == 500000
+        assert test_db.market_stats(window=None, filters={'zip_code': '90211'})[0]['median_price'] == 600000
+
+        overall = test_db.market_stats(filters={'city': 'beverly'})
+        assert len(overall) == 1 and overall[0]['median_price'] == 300000
+
+        analyzer = PropertyAnalyzer(test_db, {})
+        assert analyzer.calculate_price_trend(beverly) == 'rising'
+
+        with pytest.raises(ValueError):
+            test_db.market_stats(group_by=['list_price'])
+
+    def test_market_snapshots_maintained_on_upsert(self, test_db, test_config):
+        """Test snapshots follow upserts and their history drives the price trend"""
+        test_db.bulk_upsert_properties([
+            {'property_id': f'SNAP_{i}', 'zip_code': '90210', 'property_type': 'Condo',
+             'bedrooms': 2, 'list_price': 300000, 'square_feet': 1000, 'days_on_market': 20}
+            for i in range(3)
+        ])
+        snapshots = test_db.get_market_snapshots('90210')
+        segments = {(row['property_type'], row['bedrooms']): row for row in snapshots}
+        assert set(segments) == {('Condo', 2), ('*', -1)}
+        assert segments[('Condo', 2)]['avg_price_per_sqft'] == 300
+
+        # A partial update without the ZIP code still refreshes the ZIP
+        test_db.bulk_upsert_properties([{'property_id': 'SNAP_0', 'list_price': 600000}])
+        segment = next(row for row in test_db.get_market_snapshots('90210')
+                       if row['property_type'] == 'Condo')
+        assert segment['avg_price_per_sqft'] == 400
+        assert segment['median_price'] == 300000
+
+        # So does a single-row update_property
+        assert test_db.update_property('SNAP_1', {'list_price': 900000})
+        segment = next(row for row in test_db.get_market_snapshots('90210')
+                       if row['property_type'] == 'Condo')
+        assert segment['avg_price_per_sqft'] == 600
+
+        analyzer = PropertyAnalyzer(test_db, test_config)
+        assert analyzer.get_market_data('90210', 'Condo', 2)['price_trend'] == 'stable'
+
+        # A stored snapshot from two weeks ago at $320/sqft makes prices rising
+        with test_db.get_connection() as conn:
+            conn.execute("""
+                INSERT INTO market_snapshots (zip_code, property_type, bedrooms, snapshot_date,
+                                              listing_count, avg_price_per_sqft)
+                VALUES ('90210', 'Condo', 2, date('now', '-14 days'), 3, 320)
+            """)
+        analyzer.market_stats.invalidate()
+        assert analyzer.get_market_data('90210', 'Condo', 2)['price_trend'] == 'rising'
+        assert len(test_db.get_market_snapshots('90210', days=30)) == 3
+
+        # The refresh job rewrites only today's rows
+        with test_db.get_connection() as conn:
+            conn.execute("DELETE FROM properties")
+        assert test_db.refresh_market_snapshots() == []
+        history = test_db.get_market_snapshots('90210', days=30)
+        assert [row['avg_price_per_sqft'] for row in history] == [320]
+
+    def test_market_snapshots_follow_zip_moves(self, test_db):
+        """Test moving a property to another ZIP refreshes both ZIP codes"""
+        def condo_count(zip_code):
+            return sum(row['listing_count'] for row in test_db.get_market_snapshots(zip_code)
+                       if row['property_type'] == 'Condo')
+
+        test_db.bulk_upsert_properties([
+            {'property_id': f'MOVE_{i}', 'zip_code': '90210', 'property_type': 'Condo',
+             'bedrooms': 2, 'list_price': 300000, 'square_feet': 1000}
+            for i in range(3)
+        ])
+        assert (condo_count('90210'), condo_count('90211')) == (3, 0)
+
+        assert test_db.update_property('MOVE_0', {'zip_code': '90211'})
+        assert (condo_count('90210'), condo_count('90211')) == (2, 1)
+
+        test_db.bulk_upsert_properties([{'property_id': 'MOVE_1', 'zip_code': '90211'}])
+        assert (condo_count('90210'), condo_count('90211')) == (1, 2)
+
+    def test_market_stats_without_snapshot_table(self, test_db, test_config, sample_property):
+        """Test analysis still gets market data when market_snapshots is missing"""
+        with test_db.get_connection() as conn:
+            conn.execute("DROP TABLE market_snapshots")
+        test_db.bulk_upsert_properties([
+            dict(sample_property, property_id=f'NOSNAP_{i}') for i in range(3)
+        ])
+
+        market_data = PropertyAnalyzer(test_db, test_config).get_market_data(
+            '90210', 'Single Family', 3)
+        assert market_data['inventory_count'] == 3
+        assert market_data['avg_price_per_sqft'] == 375
+
+    def test_batch_scoring_matches_per_property(self, test_db, test_config):
+        """Test vectorized metrics and scores equal the per-dict path to the cent"""
+        analyzer = PropertyAnalyzer(test_db, test_config)
+        listings, market_data = make_scoring_listings(3000)
+
+        batch = BatchScorer(test_config)
+        scored = batch.score(batch.build_frame(listings, market_data))
+
+        for i, (listing, market) in enumerate(zip(listings, market_data)):
+            metrics = analyzer.calculate_investment_metrics(listing, market)
+            _, _, breakdown = analyzer.scorer.calculate_score(listing, market, metrics)
+            row = scored.iloc[i]
+            assert {key: row[key] for key in metrics} == metrics, listing
+            assert {key: row[key] for key in breakdown} == breakdown, listing
+
+        for listing, analysis in zip(listings[:100], analyzer.analyze_properties(listings[:100])):
+            expected = analyzer.analyze_property(listing)
+            expected.pop('analysis_date')
+            analysis.pop('analysis_date')
+            assert analysis == expected
+
+    def test_incremental_rescoring(self, test_db, test_config, tmp_path):
+        """Test unchanged properties reuse stored analyses and changed ones are re-scored"""
+        config = dict(test_config, analysis={'incremental': {
+            'enabled': True, 'path': str(tmp_path / 'analysis_cache.db')}})
+        analyzer = PropertyAnalyzer(test_db, config)
+        listings, _ = make_scoring_listings(50)
+
+        first = analyzer.analyze_properties(listings)
+        assert analyzer.analysis_cache.get_cache_stats()['rescored'] == 50
+
+        listings[1] = dict(listings[1], list_price=listings[1]['list_price'] - 25000)
+        analyzer.analysis_cache.reset_stats()
+        second = analyzer.analyze_properties(listings)
+
+        stats = analyzer.analysis_cache.get_cache_stats()
+        assert (stats['reused'], stats['rescored']) == (49, 1)
+        assert stats['hit_rate'] == pytest.approx(0.98)
+        assert second[2:] == first[2:] and second[0] == first[0]
+        assert second[1] != first[1]
+
+        analyzer.analyze_properties(listings, force_rescore=True)
+        assert analyzer.analysis_cache.get_cache_stats()['rescored'] == 51
+
+        # A scoring config change invalidates every stored analysis
+        reweighted = PropertyAnalyzer(test_db, dict(config, scoring_weights=dict(
+            config['scoring_weights'], price_advantage=40)))
+        reweighted.analyze_properties(listings)
+        assert reweighted.analysis_cache.get_cache_stats()['reused'] == 0
+
+    def test_parallel_analysis_matches_serial(self, test_db, test_config):
+        """Test the process pool returns the serial analyses and isolates a failed chunk"""
+        analyzer = PropertyAnalyzer(test_db, test_config)
+        listings, _ = make_scoring_listings(300)
+        # Can't be sent to a worker, so its chunk is analyzed in-process
+        listings[7] = dict(listings[7], callback=lambda: None)
+
+        expected = analyzer.analyze_properties(listings)
+        parallel = ParallelAnalyzer(analyzer, test_db.config, processes=2, chunk_size=40)
+        progress = []
+        analyses = parallel.analyze(listings, progress=lambda done, total: progress.append(done))
+
+        for analysis in expected + analyses:
+            analysis.pop('analysis_date')
+        assert analyses == expected
+        assert progress[-1] == 300 and len(progress) == 8
+        assert parallel.stats['failed_chunks'] == 1
+
+    def test_parallel_analysis_shared_pool(self, test_db, test_config):
+        """Test pipeline threads can send batches to one open pool, as the analyze stage does"""
+        analyzer = PropertyAnalyzer(test_db, test_config)
+        listings, _ = make_scoring_listings(200)
+        batches = [listings[start:start + 50] for start in range(0, 200, 50)]
+        expected = [analyzer.analyze_properties(batch) for batch in batches]
+
+        parallel = ParallelAnalyzer(analyzer, test_db.config, processes=2, chunk_size=20)
+        with parallel:
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                results = list(executor.map(parallel.analyze, batches))
+            assert parallel._executor is not None
+        assert parallel._executor is None
+
+        for analysis in [a for batch in expected + results for a in batch]:
+            analysis.pop('analysis_date')
+        assert results == expected
+        assert parallel.stats['failed_chunks'] == 0
+
+    def test_keyword_matcher_word_boundaries(self, test_config):
+        """Test keywords match whole words (plurals allowed) and overlapping phrases are all found"""
+        matcher = get_keyword_matcher(test_config)
+
+        assert matcher.find('stereo by the carpool lane, potentially') == frozenset()
+        assert matcher.find('two pools, a fixer upper sold as-is. motivated seller!') == {
+            'pool', 'fixer', 'fixer upper', 'as-is', 'motivated', 'motivated seller'
+        }
+
+        enricher = DataEnrichment(test_config)
+        assert enricher.extract_keywords('Bank owned FIXER-UPPER with swimming pool') == \
+            ['fixer', 'foreclosure', 'pool']
+        assert enricher.extract_keywords('Real estate stereo') == ['estate']
+
+        analyzer = PropertyAnalyzer(None, test_config)
+        signals = analyzer.detect_distressed_signals({'description': 'Estate sale, needs work, TLC'})
+        assert signals == ['Keywords: needs work, estate sale, tlc']
+        assert analyzer._estimate_rehab_costs({'description': 'Handyman special'}, 100000) == 10000
+        assert analyzer._estimate_rehab_costs({'description': 'Gutted rehab'}, 100000) == 5000
+
+    def test_simple_scorer_batch(self):
+        """Test SimplePropertyScorer batch scores match its per-property formula"""
+        scorer = SimplePropertyScorer({})
+        listings = [
+            {'list_price': 200000 + i * 1000, 'square_feet': 1000 + (i % 7) * 150,
+             'days_on_market': i % 120, 'tax_assessed_value': [0, None, 260000][i % 3],
+             'estimated_value': 240000}
+            for i in range(200)
+        ]
+        expected = [dict(listing) for listing in listings]
+        avg_price_per_sqft = scorer._calculate_avg_price_per_sqft(expected)
+
+        scored = scorer.score_properties(listings)
+
+        for prop, original in zip(scored, expected):
+            score = scorer._calculate_opportunity_score(original, avg_price_per_sqft)
+            assert prop['opportunity_score'] == round(score, 2)
+            assert prop['deal_quality'] == scorer._classify_deal(score)
+
     def test_scorer_components(self, test_config):
         """Test individual scoring components"""
         scorer = OpportunityScorer(test_config)
@@ -284,10 +707,1264 @@ class TestAnalyzer:
         assert 'location_score' in breakdown
 
 
+# ========================================
+# DEDUPLICATION TESTS
+# ========================================
+
+class TestDeduplication:
+    """Test blocking-index deduplication"""
+
+    def test_merges_address_variants(self, test_config, sample_property):
+        """Test fuzzy address duplicates in the same ZIP are merged"""
+        enricher = DataEnrichment(test_config)
+
+        mls_copy = sample_property.copy()
+        mls_copy['street_address'] = '123 Test St.'
+        mls_copy['mls_number'] = None
+        mls_copy['data_source'] = 'mls'
+
+        other = sample_property.copy()
+        other['street_address'] = '987 Other Avenue'
+        other['mls_number'] = 'MLS99999'
+        other['list_price'] = 500000
+
+        unique = enricher.deduplicate_properties([sample_property, other, mls_copy])
+
+        assert len(unique) == 2
+        assert unique[0]['merged_from_sources'] == ['unknown', 'mls']
+        assert unique[1]['street_address'] == '987 Other Avenue'
+
+    def test_address_normalization(self, test_config):
+        """Test whole-token abbreviations, unit parsing and one shared key for every caller"""
+        assert normalize_address('123  North Main Street, Apt #4') == '123 N MAIN ST UNIT 4'
+        assert normalize_address('123 N. Main St. Suite 4') == '123 N MAIN ST UNIT 4'
+        # Only whole tokens are abbreviated
+        assert normalize_address('9 Northridge Streetcar Way') == '9 NORTHRIDGE STREETCAR WAY'
+        assert normalize_address(None) == ''
+
+        assert parse_address('123 North Main Street #4B') == {
+            'house_number': '123', 'street': 'N MAIN ST', 'unit': '4B'}
+        assert parse_address('Main Street') == {'house_number': '', 'street': 'MAIN ST', 'unit': ''}
+
+        enricher = DataEnrichment(test_config)
+        assert enricher.normalize_address('1 Oak Avenue.') == normalize_address('1 oak ave')
+
+        repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        mapper = SchemaMapper(os.path.join(repo_root, 'mappings', 'field_mappings.json'))
+        mapped = mapper.normalize_address({'street_address': ' 5  West Elm Road '})
+        assert mapped['street_address'] == '5 West Elm Road'
+        assert (mapped['address_key'], mapped['house_number'], mapped['street']) == \
+            ('5 W ELM RD', '5', 'W ELM RD')
+
+    @staticmethod
+    def pairwise_groups(enricher, listings):
+        """Reference: the original O(n^2) scan with its own duplicate rules"""
+        def address(prop):
+            return enricher.normalize_address(
+                f"{prop.get('street_address', '')} {prop.get('city', '')} "
+                f"{prop.get('state', '')} {prop.get('zip_code', '')}")
+
+        def is_duplicate(prop1, prop2):
+            if prop1.get('mls_number') and prop1.get('mls_number') == prop2.get('mls_number'):
+                return True
+
+            addr1, addr2 = address(prop1), address(prop2)
+            if addr1 and addr2 and \
+                    enricher.calculate_address_similarity(addr1, addr2) >= enricher.address_similarity_threshold:
+                return True
+
+            fields = ('list_price', 'square_feet', 'bedrooms')
+            if all(prop1.get(f) for f in fields) and all(prop2.get(f) for f in fields):
+                if all(prop1[f] == prop2[f] for f in fields) and prop1.get('zip_code') == prop2.get('zip_code'):
+                    return True
+            return False
+
+        expected = []
+        processed = set()
+        for i, prop in enumerate(listings):
+            if i in processed:
+                continue
+            group = [i]
+            for j in range(i + 1, len(listings)):
+                if j not in processed and is_duplicate(prop, listings[j]):
+                    group.append(j)
+                    processed.add(j)
+            expected.append(group)
+        return expected
+
+    def test_matches_pairwise_scan(self, test_config):
+        """Test blocking output is identical to the all-pairs comparison"""
+        enricher = DataEnrichment(test_config)
+        listings = make_synthetic_listings(600, duplicate_every=7)
+
+        # Some listings have no house number or sit in a neighbouring ZIP
+        for i in range(0, 600, 50):
+            listings[i] = dict(listings[i], street_address=listings[i]['street_address'].split(' ', 1)[1])
+        for i in range(25, 600, 75):
+            listings[i] = dict(listings[i], zip_code='92101')
+        listings.append(dict(listings[100], street_address='Main Street', mls_number=None,
+                             list_price=1, zip_code='92199'))
+
+        assert enricher.dedup_engine.find_duplicate_groups(listings) == \
+            self.pairwise_groups(enricher, listings)
+
+    def test_blocking_keeps_original_address_rule(self, test_config):
+        """Test similar addresses merge across house numbers and ZIP codes, as in the original scan"""
+        enricher = DataEnrichment(test_config)
+        base = {'city': 'San Diego', 'state': 'CA', 'zip_code': '92101'}
+        listings = [dict(base, street_address='105 Main Street'),
+                    dict(base, street_address='110 Main Street'),
+                    dict(base, street_address='Main Street'),
+                    dict(base, street_address='105 Main Street', zip_code='92102'),
+                    dict(base, street_address='4500 Coronado Boulevard Unit 12')]
+
+        assert self.pairwise_groups(enricher, listings) == [[0, 1, 2, 3], [4]]
+        assert enricher.dedup_engine.find_duplicate_groups(listings) == \
+            self.pairwise_groups(enricher, listings)
+
+    def test_streaming_index_matches_batch(self, test_config):
+        """Test the incremental index keeps the same first-seen records as the batch scan"""
+        enricher = DataEnrichment(test_config)
+        listings = make_synthetic_listings(600, duplicate_every=7)
+
+        index = enricher.dedup_engine.new_index()
+        kept = [i for i, prop in enumerate(listings)
+                if index.add(enricher.dedup_engine.build_record(prop)) is None]
+
+        groups = enricher.dedup_engine.find_duplicate_groups(listings)
+        assert kept == [group[0] for group in groups]
+
+    def test_stream_merges_duplicates(self, test_config):
+        """Test streamed duplicates are merged into the kept listing, MLS data first"""
+        enricher = DataEnrichment(test_config)
+        deduplicator = enricher.new_stream_deduplicator()
+        mls = {'property_id': 'MLS-1', 'street_address': '123 Main Street', 'city': 'San Diego',
+               'state': 'CA', 'zip_code': '92101', 'list_price': 300000, 'data_source': 'mls'}
+        scraped = dict(mls, property_id='REALTOR-1', street_address='123 Main St',
+                       list_price=310000, data_source='realtor_com', description='Needs TLC')
+        other = dict(mls, property_id='MLS-2', street_address='900 Oak Avenue')
+
+        first = deduplicator.add(mls)
+        assert first is mls
+        assert deduplicator.add(other) is other
+        # Later stages update the first version with analysis
+        first['investment_score'] = 50
+
+        merged = deduplicator.add(scraped)
+        assert merged['property_id'] == 'MLS-1'
+        assert merged['list_price'] == 300000
+        assert merged['description'] == 'Needs TLC'
+        assert 'investment_score' not in merged
+        assert deduplicator.unique == 2
+        assert deduplicator.duplicates == 1
+
+        # Only the newest version of a listing is claimed or stored
+        assert not deduplicator.claim(first, 'match')
+        assert deduplicator.claim(merged, 'match')
+        assert not deduplicator.claim(merged, 'match')
+        assert deduplicator.claim(other, 'match')
+        assert not deduplicator.is_latest(first)
+        assert deduplicator.is_latest(merged)
+
+        # The newest version wins whatever order they finish in
+        for prop in (merged, other, first):
+            deduplicator.finish(prop)
+        assert deduplicator.results() == [merged, other]
+
+    def test_stream_merge_can_cross_score_threshold(self, test_db, test_config):
+        """Test a listing whose merged version clears the threshold is claimed, and a superseded claim is redone"""
+        enricher = DataEnrichment(test_config)
+        analyzer = PropertyAnalyzer(test_db, test_config)
+        deduplicator = enricher.new_stream_deduplicator()
+        mls = {'property_id': 'MLS-1', 'street_address': '123 Main Street', 'city': 'San Diego',
+               'state': 'CA', 'zip_code': '92101', 'list_price': 300000, 'square_feet': 1500,
+               'bedrooms': 3, 'property_type': 'Single Family', 'days_on_market': 10,
+               'data_source': 'mls'}
+        scraped = dict(mls, property_id='REALTOR-1', street_address='123 Main St',
+                       data_source='realtor_com', days_on_market=120, price_reduction_amount=40000,
+                       description='Motivated seller, sold AS-IS. Fixer upper, bring offers')
+
+        def arrive(prop, min_score):
+            # What the pipeline's match stage does with one analyzed version
+            prop.update(analyzer.analyze_property(prop))
+            return prop['opportunity_score'] >= min_score and deduplicator.claim(prop, 'match')
+
+        first = deduplicator.add(mls)
+        threshold = 75
+        assert not arrive(first, threshold)
+        merged = deduplicator.add(scraped)
+        assert arrive(merged, threshold)
+        assert merged['opportunity_score'] > first['opportunity_score']
+
+        # A version claimed before a merge is claimed again once superseded
+        deduplicator = enricher.new_stream_deduplicator()
+        first = deduplicator.add(dict(mls))
+        assert arrive(first, 0)
+        merged = deduplicator.add(dict(scraped))
+        assert not deduplicator.claim(first, 'match')
+        assert arrive(merged, 0)
+        assert not deduplicator.claim(merged, 'match')
+
+
+# ========================================
+# SCRAPER TESTS
+# ========================================
+
+class TestScraperPool:
+    """Test concurrent per-ZIP scraping"""
+
+    @pytest.fixture
+    def scraper(self, test_config):
+        config = dict(test_config)
+        config['scraping'] = {'rate_limit_delay': 0.001, 'max_retries': 2}
+        config['performance'] = {'max_concurrent_scrapes': 4}
+        return RealtorScraper(config)
+
+    def test_scrapes_locations_concurrently(self, scraper):
+        """Test all locations are scraped and workers overlap"""
+        active = []
+        peak = [0]
+        lock = threading.Lock()
+
+        def fake_scrape(location, listing_type, past_days):
+            with lock:
+                active.append(location)
+                peak[0] = max(peak[0], len(active))
+            time.sleep(0.05)
+            with lock:
+                active.remove(location)
+            return pd.DataFrame([{'street': f'1 {location} St', 'zip_code': location,
+                                  'list_price': 500000}])
+
+        locations = [str(90000 + i) for i in range(8)]
+        with patch('modules.scraper.scrape_property', side_effect=fake_scrape):
+            results = dict(scraper.iter_scrape_locations(locations))
+
+        assert sorted(results) == locations
+        assert all(len(props) == 1 for props in results.values())
+        assert peak[0] > 1
+
+    def test_retries_failed_location(self, scraper):
+        """Test a transient failure is retried for that ZIP only"""
+        calls = []
+
+        def flaky_scrape(location, listing_type, past_days):
+            calls.append(location)
+            if location == '90001' and calls.count(location) == 1:
+                raise ConnectionError('connection reset')
+            return pd.DataFrame([{'street': '1 Main St', 'zip_code': location}])
+
+        with patch('modules.scraper.scrape_property', side_effect=flaky_scrape):
+            properties = scraper.scrape_multiple_locations(['90000', '90001'])
+
+        assert len(properties) == 2
+        assert calls.count('90001') == 2
+        assert calls.count('90000') == 1
+
+    def test_captcha_cancels_remaining_work(self, scraper):
+        """Test a CAPTCHA stops queued locations and is raised"""
+        calls = []
+
+        def captcha_scrape(location, listing_type, past_days):
+            calls.append(location)
+            time.sleep(0.02)
+            raise Exception('Please verify you are human')
+
+        locations = [str(90000 + i) for i in range(20)]
+        with patch('modules.scraper.scrape_property', side_effect=captcha_scrape):
+            with pytest.raises(CaptchaDetectedError):
+                list(scraper.iter_scrape_locations(locations))
+
+        assert len(calls) < len(locations)
+
+    def test_cache_fetches_delta_window(self, test_db, test_config, tmp_path):
+        """Test later scrapes fetch only days since the last success and merge"""
+        config = dict(test_config)
+        config['scraping'] = {'rate_limit_delay': 0, 'max_retries': 1,
+                              'cache': {'enabled': True, 'path': str(tmp_path / 'cache.db')}}
+        scraper = RealtorScraper(config)
+        requested_days = []
+        listings = [
+            {'property_id': 'P1', 'street': '1 Main St', 'zip_code': '92101',
+             'list_price': 500000, 'days_on_mls': 5},
+            {'property_id': 'P2', 'street': '2 Main St', 'zip_code': '92101',
+             'list_price': 600000, 'days_on_mls': 3},
+        ]
+
+        def fake_scrape(location, listing_type, past_days):
+            requested_days.append(past_days)
+            return pd.DataFrame(listings)
+
+        with patch('modules.scraper.scrape_property', side_effect=fake_scrape):
+            first = scraper.scrape_zip_code('92101', days_back=30)
+
+            # Only P2 changed; P3 is new
+            listings = [
+                {'property_id': 'P2', 'street': '2 Main St', 'zip_code': '92101',
+                 'list_price': 575000, 'days_on_mls': 4},
+                {'property_id': 'P3', 'street': '3 Main St', 'zip_code': '92101',
+                 'list_price': 450000, 'days_on_mls': 1},
+            ]
+            second = scraper.scrape_zip_code('92101', days_back=30)
+
+        assert requested_days == [30, 2]
+        assert len(first) == 2
+        by_id = {prop['property_id']: prop for prop in second}
+        assert sorted(by_id) == ['P1', 'P2', 'P3']
+        assert by_id['P1']['list_price'] == 500000
+        assert by_id['P2']['list_price'] == 575000
+
+        # P1 wasn't in the delta, so its price is served from the cache
+        assert not any(prop['cache_stale'] for prop in first)
+        assert by_id['P1']['cache_stale']
+        assert not by_id['P2']['cache_stale'] and not by_id['P3']['cache_stale']
+        analyzer = PropertyAnalyzer(test_db, test_config)
+        assert [analysis['cache_stale'] for analysis in analyzer.analyze_properties(second)] == \
+            [by_id[prop['property_id']]['cache_stale'] for prop in second]
+
+        # A full refresh drops listings that are no longer returned
+        scraper.cache.full_refresh_days = 0
+        with patch('modules.scraper.scrape_property', side_effect=fake_scrape):
+            third = scraper.scrape_zip_code('92101', days_back=30)
+        assert requested_days[-1] == 30
+        assert sorted(prop['property_id'] for prop in third) == ['P2', 'P3']
+
+
+# ========================================
+# PIPELINE TESTS
+# ========================================
+
+class TestPipeline:
+    """Test the streaming stage executor"""
+
+    def test_items_flow_through_stages(self):
+        """Test filtering, batching and per-stage metrics"""
+        batches = []
+        results = []
+
+        def store(batch):
+            batches.append(len(batch))
+            return batch
+
+        stages = [
+            PipelineStage('double', lambda n: [n * 2], workers=3, queue_size=5),
+            PipelineStage('filter', lambda n: [n] if n % 4 == 0 else [], workers=1, queue_size=5),
+            PipelineStage('store', store, workers=1, queue_size=5, batch_size=10)
+        ]
+        metrics = Pipeline(stages, sink=results.append).run(range(100))
+
+        assert sorted(results) == [n * 2 for n in range(100) if n % 2 == 0]
+        assert metrics['source']['items_out'] == 100
+        assert metrics['double']['items_out'] == 100
+        assert metrics['filter']['items_out'] == 50
+        assert sum(batches) == 50
+        assert max(batches) <= 10
+
+    def test_backpressure_bounds_queues(self):
+        """Test a slow stage holds back the source instead of buffering everything"""
+        produced = []
+
+        def source():
+            for n in range(50):
+                produced.append(n)
+                yield n
+
+        def slow(n):
+            time.sleep(0.002)
+            # Source can only be ahead by the queue size plus in-flight items
+            assert len(produced) - n <= 5
+            return [n]
+
+        stages = [PipelineStage('slow', slow, workers=1, queue_size=3)]
+        metrics = Pipeline(stages).run(source())
+
+        assert metrics['slow']['errors'] == 0
+        assert metrics['slow']['max_queue_depth'] <= 3
+
+    def test_stage_errors_are_isolated(self):
+        """Test a failing item is counted and the rest continue"""
+        results = []
+
+        def fragile(n):
+            if n == 7:
+                raise ValueError('bad listing')
+            return [n]
+
+        stages = [PipelineStage('fragile', fragile, workers=2, queue_size=4)]
+        metrics = Pipeline(stages, sink=results.append).run(range(20))
+
+        assert sorted(results) == [n for n in range(20) if n != 7]
+        assert metrics['fragile']['errors'] == 1
+
+
+# ========================================
+# AGENT MATCHING TESTS
+# ========================================
+
+class TestMatchEngine:
+    """Test indexed criteria matching for search agents"""
+
+    def make_scan(self, count):
+        zips = ['92101', '92102', '92103', '92104']
+        types = ['Single Family', 'Condo', 'Townhouse']
+        qualities = ['HOT DEAL', 'GOOD OPPORTUNITY', 'FAIR DEAL', '']
+        return [{
+            'address': f'{i} Test Street',
+            'zip_code': zips[i % 4],
+            'list_price': 300000 + (i * 7919) % 700000 if i % 11 else None,
+            'price': 450000,
+            'bedrooms': i % 6,
+            'bathrooms': 1 + (i % 4) * 0.5,
+            'property_type': types[i % 3],
+            'deal_quality': qualities[i % 4],
+            'opportunity_score': (i * 37) % 100,
+            'days_on_market': (i * 13) % 120,
+            'absentee_owner': i % 5 == 0
+        } for i in range(count)]
+
+    def make_criteria(self):
+        return [
+            {'zip_codes': ['92101'], 'price_min': 400000, 'price_max': 800000,
+             'bedrooms_min': 2, 'bathrooms_min': 1, 'property_types': [],
+             'deal_quality': [], 'min_score': 50, 'investment_type': None},
+            {'zip_codes': ['92102', '92104'], 'price_min': None, 'price_max': 600000,
+             'bedrooms_min': 1, 'bathrooms_min': 1, 'property_types': ['Condo'],
+             'deal_quality': ['HOT DEAL', 'GOOD OPPORTUNITY'], 'min_score': 40,
+             'investment_type': None},
+            {'zip_codes': [], 'price_min': 350000, 'price_max': None,
+             'bedrooms_min': 1, 'bathrooms_min': 2, 'property_types': ['Single Family', 'Townhouse'],
+             'deal_quality': [], 'min_score': 30, 'investment_type': None},
+        ]
+
+    def test_matches_identical_to_linear_scan(self):
+        """Test indexed matches and scores equal the per-property loop"""
+        properties = self.make_scan(500)
+        index = ScanIndex(properties, '2026-01-01T00:00:00')
+        engine = MatchEngine()
+
+        for criteria in self.make_criteria():
+            agent = SearchAgent.__new__(SearchAgent)
+            agent.criteria = criteria
+
+            expected = []
+            for prop in properties:
+                if agent._property_matches_criteria(prop):
+                    score, reasons = agent._calculate_match_score(prop)
+                    if score >= criteria['min_score']:
+                        expected.append({'property': prop, 'match_score': score,
+                                         'match_reasons': reasons})
+            expected.sort(key=lambda x: x['match_score'], reverse=True)
+
+            assert engine.find_matches(criteria, index) == expected
+            assert expected
+
+    def test_scan_parsed_once(self, tmp_path):
+        """Test all agents share one index until a new scan version is published"""
+        store = ScanStore(tmp_path / 'scan_store', tmp_path / 'latest_scan.json')
+        store.publish({'scan_timestamp': 'a', 'properties': self.make_scan(50)})
+        engine = MatchEngine(store)
+
+        criteria = {f'agent_{i}': c for i, c in enumerate(self.make_criteria())}
+        first = engine.get_index()
+        results = engine.match_all(criteria)
+
+        assert engine.get_index() is first
+        assert set(results) == set(criteria)
+
+        store.publish({'scan_timestamp': 'b', 'properties': self.make_scan(10)})
+        assert engine.get_index().scan_timestamp == 'b'
+
+
+class TestScanStore:
+    """Test the memory-mapped scan store"""
+
+    def test_publish_indexes_and_export(self, tmp_path):
+        """Test publish is versioned, indexed and round-trips to JSON"""
+        properties = TestMatchEngine().make_scan(200)
+        for i, prop in enumerate(properties):
+            prop['city'] = 'San Diego' if i % 2 else 'La Jolla'
+
+        legacy_path = tmp_path / 'latest_scan.json'
+        store = ScanStore(tmp_path / 'scan_store', legacy_path, keep_versions=2)
+        scan = {'scan_timestamp': 'a', 'properties': properties}
+        version = store.publish(scan, json_export_path=legacy_path)
+        snapshot = store.current()
+
+        assert snapshot.version == version
+        assert snapshot.properties() == properties
+
+        rows = snapshot.rows_for_zip('92101')
+        assert [properties[r] for r in rows] == [p for p in properties if p['zip_code'] == '92101']
+        assert len(snapshot.rows_for_city('la jolla')) == 100
+
+        in_range = snapshot.rows_in_range('list_price', 400000, 600000)
+        prices = [properties[r]['list_price'] or properties[r]['price'] for r in in_range]
+        expected = [p['list_price'] or p['price'] for p in properties]
+        assert prices == sorted(price for price in expected if 400000 <= price <= 600000)
+
+        with open(legacy_path) as f:
+            exported = json.load(f)
+        assert exported['properties'] == properties
+        assert exported['property_count'] == 200
+
+        for timestamp in ('b', 'c'):
+            store.publish({'scan_timestamp': timestamp, 'properties': properties[:10]})
+        assert store.current().scan_timestamp == 'c'
+        assert len(list((tmp_path / 'scan_store').glob('scan-*.dfs'))) == 2
+
+        # Snapshot records are shared, so they can't be modified in place
+        shared = store.current().properties()[0]
+        with pytest.raises(TypeError):
+            shared['list_price'] = 1
+        assert dict(shared) == properties[0]
+        assert pickle.loads(pickle.dumps(shared)) == properties[0]
+
+    def test_reimports_newer_legacy_json(self, tmp_path):
+        """Test a latest_scan.json written outside the store replaces an older version"""
+        properties = TestMatchEngine().make_scan(20)
+        legacy_path = tmp_path / 'latest_scan.json'
+        store = ScanStore(tmp_path / 'scan_store', legacy_path)
+
+        with open(legacy_path, 'w') as f:
+            json.dump({'scan_timestamp': 'a', 'properties': properties}, f)
+        first = store.current()
+        assert (first.scan_timestamp, len(first)) == ('a', 20)
+
+        # The store's own exports aren't imported back
+        store.publish({'scan_timestamp': 'b', 'properties': properties[:5]},
+                      json_export_path=legacy_path)
+        published = store.current()
+        assert published.scan_timestamp == 'b'
+
+        # A legacy writer replaces the file with a newer scan
+        time.sleep(0.01)
+        with open(legacy_path, 'w') as f:
+            json.dump({'scan_timestamp': 'c', 'properties': properties[:8]}, f)
+        imported = store.current()
+        assert (imported.scan_timestamp, len(imported)) == ('c', 8)
+        assert imported.version > published.version
+        assert store.current() is imported
+
+        # A stale file left behind by an older run is ignored
+        store.publish({'scan_timestamp': 'd', 'properties': properties[:3]})
+        assert store.current().scan_timestamp == 'd'
+
+
+class TestPropertySearch:
+    """Test the indexed property search used by the API"""
+
+    def linear_search(self, properties, filters, limit, sort_by):
+        """Reference filter-then-sort over every property"""
+        def number(prop, field):
+            return prop.get(field) or 0
+
+        matches = [
+            p for p in properties
+            if number(p, 'list_price') >= filters.get('min_price', float('-inf'))
+            and number(p, 'list_price') <= filters.get('max_price', float('inf'))
+            and filters.get('city', '').lower() in p['city'].lower()
+            and (not filters.get('zip_codes') or p['zip_code'] in filters['zip_codes'])
+            and (not filters.get('deal_quality') or p['deal_quality'] in filters['deal_quality'])
+            and number(p, 'bedrooms') >= filters.get('bedrooms', 0)
+            and number(p, 'opportunity_score') >= filters.get('min_score', 0)
+        ]
+        if sort_by in ('opportunity_score', 'list_price', 'days_on_market'):
+            matches.sort(key=lambda p: number(p, sort_by), reverse=(sort_by != 'list_price'))
+        return len(matches), matches[:limit]
+
+    def test_matches_linear_search(self):
+        """Test indexed results, order and totals equal a full filter and sort"""
+        properties = make_search_listings(3000)
+        index = PropertySearchIndex(properties)
+
+        searches = [
+            {},
+            {'min_score': 90},
+            {'min_price': 300000, 'max_price': 600000, 'bedrooms': 3},
+            {'city': 'la', 'min_score': 40},
+            {'zip_codes': ['92101', '92105'], 'deal_quality': ['HOT DEAL', 'FAIR DEAL']},
+            {'min_price': 5000000},
+        ]
+        for filters in searches:
+            for sort_by in ('opportunity_score', 'list_price', 'days_on_market', 'address'):
+                for limit in (0, 10, 500):
+                    total, expected = self.linear_search(properties, filters, limit, sort_by)
+                    result = index.search(filters, limit=limit, sort_by=sort_by)
+                    assert result['total_found'] == total, (filters, sort_by)
+                    assert result['properties'] == expected, (filters, sort_by, limit)
+
+        assert index.search({'deal_quality': ['HOT']})['total_found'] == \
+            sum(1 for p in properties if p['deal_quality'] == 'HOT DEAL')
+        assert index.find_by_address('17 search')['street_address'] == '17 Search Street'
+
+    def test_rebuilds_on_new_scan_version(self, tmp_path):
+        """Test the service reuses its index until a new scan is published"""
+        store = ScanStore(tmp_path / 'scan_store', tmp_path / 'latest_scan.json')
+        service = PropertySearchService(store)
+        assert service.get_index().count == 0
+
+        store.publish({'scan_timestamp': 'a', 'properties': make_search_listings(100)})
+        index = service.get_index()
+        assert index.count == 100
+        assert service.get_index() is index
+
+        store.publish({'scan_timestamp': 'b', 'properties': make_search_listings(20)})
+        assert service.get_index().count == 20
+
+
+class TestClientDatabase:
+    """Test the WAL client database and its writer queue"""
+
+    @pytest.fixture
+    def client_db(self, tmp_path):
+        db = ClientDatabase(tmp_path / 'clients.db')
+        yield db
+        db.close()
+
+    def test_reads_see_committed_writes(self, client_db):
+        """Test writes are committed before returning and readers see them"""
+        client_id = client_db.create_client('Ada', email='ada@example.com')
+        criteria_id = client_db.create_search_criteria(client_id, zip_codes=['92101'], price_max=500000)
+        agent_id = client_db.create_agent(client_id, criteria_id)
+
+        match_id = client_db.add_match(agent_id, '1 Main St', {'list_price': 400000})
+        client_db.update_match_status(match_id, 'sent')
+
+        agent = client_db.get_agent(agent_id)
+        assert agent['client_name'] == 'Ada'
+        assert agent['zip_codes'] == ['92101']
+        assert agent['matches_found'] == 1
+        assert client_db.get_agent_matches(agent_id, status='sent')[0]['property_data'] == {'list_price': 400000}
+
+        with sqlite3.connect(client_db.db_path) as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+
+    def test_failed_write_isolated_in_batch(self, client_db):
+        """Test a failing write raises to its caller without undoing others in the batch"""
+        client_id = client_db.create_client('Ada')
+
+        def bad_write():
+            client_db._write(lambda conn: conn.execute("INSERT INTO missing_table VALUES (1)"))
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            names = [executor.submit(client_db.update_client, client_id, notes=str(i)) for i in range(20)]
+            failures = [executor.submit(bad_write) for _ in range(4)]
+
+            for future in names:
+                future.result()
+            for future in failures:
+                with pytest.raises(sqlite3.OperationalError):
+                    future.result()
+
+        assert client_db.get_client(client_id)['notes'] in {str(i) for i in range(20)}
+
+    def test_add_matches_skips_matched_addresses(self, client_db):
+        """Test batch match inserts dedupe on the normalized address"""
+        client_id = client_db.create_client('Ada')
+        agent_id = client_db.create_agent(client_id, client_db.create_search_criteria(client_id))
+
+        first = client_db.add_matches(agent_id, [('1 Main St.', {}), ('2 Oak Ave', {})])
+        second = client_db.add_matches(agent_id, [('1 MAIN  ST', {}), ('3 Elm Rd', {})])
+
+        assert all(first) and second[0] is None and second[1]
+        assert client_db.get_agent(agent_id)['matches_found'] == 3
+        assert client_db.get_matched_addresses(agent_id) == {'1 MAIN ST', '2 OAK AVE', '3 ELM RD'}
+
+    def test_match_dedup_migration_keeps_history(self, tmp_path):
+        """Test existing duplicate matches survive adding the unique address index"""
+        db_path = tmp_path / 'clients.db'
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("""CREATE TABLE agent_matches (match_id TEXT PRIMARY KEY, agent_id TEXT NOT NULL,
+                            property_address TEXT NOT NULL, property_data TEXT, matched_at TEXT NOT NULL,
+                            notified INTEGER DEFAULT 0, notified_at TEXT, status TEXT DEFAULT 'new')""")
+            conn.executemany("INSERT INTO agent_matches (match_id, agent_id, property_address, matched_at) "
+                             "VALUES (?, 'A1', ?, '2025-01-01')",
+                             [('m1', '1 Main St'), ('m2', '1 Main St'), ('m3', '2 Oak Ave')])
+
+        db = ClientDatabase(db_path)
+        try:
+            assert len(db.get_agent_matches('A1')) == 3
+            assert db.get_matched_addresses('A1') == {'1 MAIN ST', '2 OAK AVE'}
+            assert db.add_match('A1', '1 main st', {}) is None
+        finally:
+            db.close()
+
+    def test_match_keys_recomputed_when_rules_change(self, tmp_path):
+        """Test stored dedup keys are rebuilt with the shared normalizer, keeping the first duplicate"""
+        db_path = tmp_path / 'clients.db'
+        db = ClientDatabase(db_path)
+        db.close()
+
+        # Keys written by older rules, where these two addresses differed
+        with sqlite3.connect(db_path) as conn:
+            conn.executemany("INSERT INTO agent_matches (match_id, agent_id, property_address, matched_at, "
+                             "normalized_address) VALUES (?, 'A1', ?, '2025-01-01', ?)",
+                             [('m1', '1 Main Street', '1 MAIN STREET'), ('m2', '1 Main St.', '1 MAIN ST')])
+            conn.execute("PRAGMA user_version = 0")
+
+        db = ClientDatabase(db_path)
+        try:
+            assert db.get_matched_addresses('A1') == {'1 MAIN ST'}
+            assert len(db.get_agent_matches('A1')) == 2
+            assert db.add_match('A1', '1 main st', {}) is None
+        finally:
+            db.close()
+
+    def test_status_counts_follow_match_changes(self, client_db):
+        """Test summaries and system counts track inserts and status changes without scanning matches"""
+        client_id = client_db.create_client('Ada')
+        criteria_id = client_db.create_search_criteria(client_id)
+        agent_id = client_db.create_agent(client_id, criteria_id)
+        paused_id = client_db.create_agent(client_id, criteria_id)
+        client_db.update_agent_status(paused_id, 'paused')
+        client_db.add_match(paused_id, '9 Elm St', {})
+
+        match_ids = client_db.add_matches(agent_id, [(f'{i} Main St', {}) for i in range(5)])
+        client_db.update_match_status(match_ids[0], 'sent')
+        client_db.update_match_status(match_ids[1], 'sent')
+        client_db.update_match_status(match_ids[1], 'sent')
+
+        summary = client_db.get_agent_summary(agent_id)
+        assert summary['client_name'] == 'Ada'
+        assert (summary['total_matches'], summary['new_matches']) == (5, 3)
+        assert [s['agent_id'] for s in client_db.get_active_agent_summaries(client_id)] == [agent_id]
+
+        counts = client_db.get_status_counts()
+        assert counts['agents'] == {'active': 1, 'paused': 1}
+        assert counts['matches'] == {'new': 3, 'sent': 2}
+
+    def test_match_counts_backfilled_on_upgrade(self, tmp_path):
+        """Test databases created before the counts table get their existing matches counted"""
+        db_path = tmp_path / 'clients.db'
+        db = ClientDatabase(db_path)
+        client_id = db.create_client('Ada')
+        agent_id = db.create_agent(client_id, db.create_search_criteria(client_id))
+        db.add_matches(agent_id, [('1 Main St', {}), ('2 Oak Ave', {})])
+        db.close()
+
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("DROP TABLE agent_match_counts")
+
+        db = ClientDatabase(db_path)
+        try:
+            assert db.get_agent_summary(agent_id)['new_matches'] == 2
+            db.add_match(agent_id, '3 Pine Rd', {})
+            assert db.get_status_counts()['matches'] == {'new': 3}
+        finally:
+            db.close()
+
+    def test_process_new_matches_uses_seen_set(self, client_db):
+        """Test repeated agent checks never reload the match history"""
+        client_id = client_db.create_client('Ada')
+        agent_id = client_db.create_agent(client_id, client_db.create_search_criteria(client_id))
+
+        agent = SearchAgent.__new__(SearchAgent)
+        agent.agent_id = agent_id
+        agent.db = client_db
+        agent._matched_addresses = None
+        agent._send_notifications = lambda match: None
+
+        matches = [{'property': {'address': f'{i} Main St'}, 'match_score': 80, 'match_reasons': []}
+                   for i in range(500)]
+
+        with patch.object(client_db, 'get_agent_matches', side_effect=AssertionError("history reloaded")):
+            assert agent.process_new_matches(matches) == 500
+            assert agent.process_new_matches(matches + matches[:10]) == 0
+
+        stored = client_db.get_agent_matches(agent_id)
+        assert len(stored) == 500
+        assert all(match['notified'] == 1 for match in stored)
+
+
+class TestAgentScheduler:
+    """Test batched agent checks"""
+
+    @pytest.fixture
+    def manager(self, monkeypatch, tmp_path):
+        class AgentDB:
+            def __init__(self):
+                self.agents = {}
+
+            def create_search_criteria(self, client_id, **criteria):
+                return f'criteria_{client_id}'
+
+            def create_agent(self, client_id, criteria_id, **notifications):
+                agent_id = f'agent_{len(self.agents)}'
+                self.agents[agent_id] = {'agent_id': agent_id, 'status': 'active'}
+                return agent_id
+
+            def get_active_agents(self, client_id=None):
+                return list(self.agents.values())
+
+            def get_status_counts(self):
+                return {'agents': {'active': len(self.agents)}, 'matches': {}}
+
+        class SlowAgent:
+            checks = []
+
+            def __init__(self, agent_id):
+                self.agent_id = agent_id
+
+            def check_for_matches(self):
+                time.sleep(0.2)
+                SlowAgent.checks.append(self.agent_id)
+                return []
+
+        monkeypatch.setattr(agent_manager_module, 'get_db', AgentDB)
+        monkeypatch.setattr(agent_manager_module, 'SearchAgent', SlowAgent)
+        store = ScanStore(tmp_path / 'scan_store', tmp_path / 'latest_scan.json')
+        monkeypatch.setattr(agent_manager_module, 'get_match_engine', lambda: MatchEngine(store))
+
+        manager = agent_manager_module.AgentManager(max_workers=4)
+        yield manager, SlowAgent.checks
+        manager.shutdown()
+
+    def test_create_returns_before_first_check(self, manager):
+        """Test creation queues the first check instead of running it inline"""
+        manager, checks = manager
+
+        start = time.time()
+        agent_ids = [manager.create_agent(f'client_{i}', {}) for i in range(8)]
+        assert time.time() - start < 0.2
+
+        deadline = time.time() + 5
+        while len(checks) < len(agent_ids) and time.time() < deadline:
+            time.sleep(0.05)
+
+        assert sorted(checks) == sorted(agent_ids)
+
+        status = manager.get_system_status()
+        assert status['queue_depth'] == 0
+        assert status['scheduled_jobs'] == 1
+        assert status['batches_run'] >= 1
+        assert status['last_batch_latency_seconds'] is not None
+        assert set(status['agent_last_runs']) == set(agent_ids)
+        assert all(run['error'] is None for run in status['agent_last_runs'].values())
+
+    def test_due_agents_queued_once(self, manager):
+        """Test the tick only queues agents whose interval elapsed"""
+        manager, checks = manager
+
+        agent_id = manager.create_agent('client_x', {})
+        manager.run_batch([agent_id])
+        manager._dequeue_check(agent_id)
+
+        manager._queue_due_agents()
+        assert manager.get_system_status()['queue_depth'] == 0
+
+
+# ========================================
+# GHL CONNECTOR TESTS
+# ========================================
+
+class TestGHLConnector:
+    """Test the async GHL connector and its sync wrapper"""
+
+    @staticmethod
+    def mock_client(handler):
+        return httpx.AsyncClient(base_url="https://services.leadconnectorhq.com",
+                                 transport=httpx.MockTransport(handler))
+
+    def test_server_errors_retried(self):
+        """Test 5xx responses are retried, each attempt taking a rate limiter token"""
+        calls = []
+        tokens = []
+
+        class CountingLimiter(AsyncGHLRateLimiter):
+            async def wait_if_needed(self):
+                tokens.append(1)
+                await super().wait_if_needed()
+
+        def handler(request):
+            calls.append(request.url.path)
+            if request.url.path == "/contacts/missing":
+                return httpx.Response(404, json={})
+            if len(calls) == 1:
+                return httpx.Response(503, json={})
+            return httpx.Response(200, json={"contact": {"id": "c1"}})
+
+        async def run():
+            connector = AsyncGoHighLevelConnector("key", "loc", rate_limiter=CountingLimiter())
+            connector._client = self.mock_client(handler)
+            async with connector:
+                contact = await connector.update_contact("c1", {"firstName": "A"})
+                with pytest.raises(GHLAPIError) as error:
+                    await connector.update_contact("missing", {})
+            return contact, error.value
+
+        contact, error = asyncio.run(run())
+        assert contact == {"id": "c1"}
+        assert error.status_code == 404
+        assert calls == ["/contacts/c1", "/contacts/c1", "/contacts/missing"]
+        assert len(tokens) == len(calls)
+
+    def test_rate_limiter_caps_throughput(self):
+        """Test the token bucket spaces requests beyond the burst"""
+        limiter = AsyncGHLRateLimiter(max_requests=60, time_window=1, burst=5)
+
+        async def run():
+            start = time.monotonic()
+            await asyncio.gather(*(limiter.wait_if_needed() for _ in range(17)))
+            return time.monotonic() - start
+
+        # 5 burst tokens, then 12 more at 60/s
+        assert asyncio.run(run()) >= 0.18
+        assert limiter.total_waits >= 12
+
+    def test_sync_fan_out_runs_concurrently(self):
+        """Test fan-out overlaps requests on the shared connection pool"""
+        in_flight = []
+        peak = []
+
+        async def handler(request):
+            in_flight.append(1)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.05)
+            in_flight.pop()
+            return httpx.Response(200, json={"messageId": request.url.path})
+
+        ghl = GoHighLevelConnector("key", "loc", max_connections=10)
+        ghl.async_connector.rate_limiter = AsyncGHLRateLimiter(6000, 60, burst=50)
+        ghl.async_connector._client = self.mock_client(handler)
+
+        start = time.time()
+        results = ghl.fan_out(lambda i: ghl.send_sms(f"c{i}", "hi"), range(20))
+        elapsed = time.time() - start
+        ghl.close()
+
+        assert len(results) == 20
+        assert max(peak) > 1
+        assert elapsed < 20 * 0.05
+
+    @staticmethod
+    def make_contacts(count, start=0):
+        return [{"id": f"c{i}", "tags": ["active_buyer"] if i % 3 == 0 else ["lead"],
+                 "dateUpdated": f"2025-01-01T00:{i // 60 % 60:02d}:{i % 60:02d}.000Z"}
+                for i in range(start, start + count)]
+
+    def test_search_contacts_server_filters_and_pages(self):
+        """Test filters go to the v2 search endpoint and later pages are fetched concurrently"""
+        matching = [c for c in self.make_contacts(750) if "active_buyer" in c["tags"]]
+        bodies = []
+
+        def handler(request):
+            body = json.loads(request.content)
+            bodies.append(body)
+            start = (body["page"] - 1) * body["pageLimit"]
+            return httpx.Response(200, json={
+                "contacts": matching[start:start + body["pageLimit"]],
+                "total": len(matching)
+            })
+
+        ghl = GoHighLevelConnector("key", "loc")
+        ghl.async_connector.rate_limiter = AsyncGHLRateLimiter(6000, 60, burst=50)
+        ghl.async_connector._client = self.mock_client(handler)
+        contacts = ghl.search_contacts(tags=["active_buyer"],
+                                       updated_since="2025-01-01T00:00:00.000Z")
+        ghl.close()
+
+        assert [c["id"] for c in contacts] == [c["id"] for c in matching]
+        assert sorted(body["page"] for body in bodies) == [1, 2, 3]
+        assert {"field": "tags", "operator": "contains", "value": "active_buyer"} in bodies[0]["filters"]
+        assert any(f["field"] == "dateUpdated" for f in bodies[0]["filters"])
+
+    def test_search_contacts_fallback_pages_by_raw_size(self):
+        """Test listing fallback keeps paging while raw pages are full, however few match"""
+        everyone = self.make_contacts(237)
+        requests = []
+
+        def handler(request):
+            requests.append(request.url.path)
+            if request.url.path == "/contacts/search":
+                return httpx.Response(404, json={})
+            skip, limit = int(request.url.params["skip"]), int(request.url.params["limit"])
+            return httpx.Response(200, json={"contacts": everyone[skip:skip + limit]})
+
+        async def run():
+            connector = AsyncGoHighLevelConnector("key", "loc")
+            connector.rate_limiter = AsyncGHLRateLimiter(6000, 60, burst=50)
+            connector._client = self.mock_client(handler)
+            async with connector:
+                return await connector.search_contacts(tags=["active_buyer"])
+
+        contacts = asyncio.run(run())
+
+        assert len(contacts) == len([c for c in everyone if "active_buyer" in c["tags"]])
+        assert requests.count("/contacts/") == 3
+
+    def test_buyer_sync_resumes_from_cursor(self):
+        """Test buyer sync stores a contact cursor and passes it to the next search"""
+        class FakeDB:
+            def __init__(self):
+                self.logs = []
+                self.buyers = {}
+
+            def upsert_buyer(self, buyer):
+                self.buyers[buyer['ghl_contact_id']] = buyer
+                return len(self.buyers)
+
+            def log_sync(self, sync_data):
+                self.logs.insert(0, sync_data)
+
+            def get_recent_syncs(self, sync_type, limit=10):
+                return [log for log in self.logs if log['sync_type'] == sync_type][:limit]
+
+        class FakeGHL:
+            def __init__(self, contacts):
+                self.contacts = contacts
+                self.calls = []
+
+            def search_contacts(self, tags=None, custom_fields=None, updated_since=None):
+                self.calls.append(updated_since)
+                return [c for c in self.contacts
+                        if updated_since is None or c["dateUpdated"] >= updated_since]
+
+        contacts = self.make_contacts(5)
+        db, ghl = FakeDB(), FakeGHL(contacts)
+        manager = SyncManager(db, ghl, {})
+
+        first = manager.sync_buyers_from_ghl()
+        second = manager.sync_buyers_from_ghl()
+        manager.sync_buyers_from_ghl(full_resync=True)
+
+        assert ghl.calls == [None, contacts[-1]["dateUpdated"], None]
+        assert first['total_processed'] == 5
+        assert second['total_processed'] == 1
+        assert json.loads(db.logs[0]['metadata'])['contact_cursor'] == contacts[-1]["dateUpdated"]
+
+    def test_property_sync_batches_concurrently(self):
+        """Test property export fans out per batch and marks each batch synced in one write"""
+        properties = [{'property_id': f'P{i}', 'street_address': f'{i} Main St', 'city': 'X',
+                       'square_feet': 1000, 'list_price': 100000, 'opportunity_score': 90}
+                      for i in range(12)]
+
+        class FakeDB:
+            def __init__(self):
+                self.marked = []
+
+            def get_unsynced_properties(self):
+                return properties
+
+            def mark_properties_synced(self, synced):
+                self.marked.append(list(synced))
+                return len(synced)
+
+            def log_sync(self, sync_data):
+                pass
+
+        class FakeGHL:
+            def create_opportunity(self, opportunity):
+                time.sleep(0.05)
+                return {'id': f"opp-{opportunity['name'].split()[0]}"}
+
+            def add_note_to_opportunity(self, opportunity_id, notes):
+                time.sleep(0.05)
+
+            def fan_out(self, func, items):
+                with ThreadPoolExecutor(max_workers=len(items)) as executor:
+                    return list(executor.map(func, items))
+
+        db = FakeDB()
+        manager = SyncManager(db, FakeGHL(), {'batch_size': 5})
+
+        start = time.time()
+        stats = manager.sync_properties_to_ghl()
+        elapsed = time.time() - start
+
+        assert stats['created'] == 12 and stats['failed'] == 0
+        assert [len(batch) for batch in db.marked] == [5, 5, 2]
+        assert db.marked[0][0] == ('P0', 'opp-0')
+        # Three batches of two 50ms calls, not twelve
+        assert elapsed < 12 * 0.1
+
+    def test_shared_limiter_spans_instances(self, tmp_path):
+        """Test limiters for one location in different processes draw from one budget"""
+        db_path = tmp_path / 'limits.db'
+        limiters = [SharedGHLRateLimiter('loc', caller, db_path=db_path, max_requests=60,
+                                         time_window=1, burst=5)
+                    for caller in ('workflow', 'chat')]
+
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(lambda limiter: [limiter.acquire() for _ in range(9)], limiters))
+        elapsed = time.monotonic() - start
+
+        # 5 burst tokens, then 13 more at 60/s, whichever instance asks
+        assert elapsed >= 0.2
+        stats = limiters[0].get_stats()
+        assert stats['workflow']['requests'] == stats['chat']['requests'] == 9
+
+    def test_shared_limiter_fair_share_and_backoff(self, tmp_path):
+        """Test a light caller isn't starved by a busy one and 429s pause every caller"""
+        db_path = tmp_path / 'limits.db'
+        busy = SharedGHLRateLimiter('loc', 'workflow', db_path=db_path, max_requests=40,
+                                    time_window=1, burst=1, weight=1)
+        light = SharedGHLRateLimiter('loc', 'chat', db_path=db_path, max_requests=40,
+                                     time_window=1, burst=1, weight=1)
+        stop = time.monotonic() + 1.0
+
+        def run(limiter):
+            count = 0
+            while time.monotonic() < stop:
+                limiter.acquire()
+                count += 1
+            return count
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            busy_count, light_count = executor.map(run, [busy, light])
+
+        assert light_count >= 0.35 * (busy_count + light_count)
+
+        async def throttled():
+            await busy.backoff(0.3)
+
+        asyncio.run(throttled())
+        start = time.monotonic()
+        light.acquire()
+        assert time.monotonic() - start < 0.3
+        assert light.get_stats()['workflow']['throttled'] == 1
+        assert light.get_stats()['workflow']['backoff_seconds'] == 0.3
+
+    def test_connector_backs_off_on_429(self, tmp_path):
+        """Test a 429 is recorded on the shared limiter and the request retried"""
+        responses = [httpx.Response(429, headers={'Retry-After': '0.2'}, json={}),
+                     httpx.Response(200, json={"contact": {"id": "c1"}})]
+
+        def handler(request):
+            return responses.pop(0)
+
+        async def run():
+            connector = AsyncGoHighLevelConnector(
+                "key", "loc", rate_limiter=SharedGHLRateLimiter('loc', 'workflow',
+                                                                db_path=tmp_path / 'limits.db'))
+            connector._client = self.mock_client(handler)
+            async with connector:
+                return await connector.update_contact("c1", {}), connector.rate_limiter.get_stats()
+
+        contact, stats = asyncio.run(run())
+        assert contact == {"id": "c1"}
+        assert stats['workflow']['throttled'] == 1
+        assert stats['workflow']['requests'] == 2
+
+
 # ========================================
 # REPORTER TESTS
 # ========================================
 
+class TestBuyerMatcher:
+    """Test indexed buyer matching and the buyer cache"""
+
+    def make_buyers(self, count):
+        locations = ['san diego', 'la jolla, 92037', '921', 'las vegas, henderson', '', 'chula']
+        types = ['single family', 'condo, townhouse', '', 'multi-family', 'family']
+        return [{
+            'id': f'contact_{i}',
+            'firstName': f'Buyer{i}',
+            'lastName': 'Test',
+            'email': f'buyer{i}@example.com',
+            'tags': ['active_buyer'],
+            'customFields': {
+                'budget_min': str(100000 + (i * 7919) % 400000) if i % 7 else '',
+                'budget_max': 300000 + (i * 104729) % 900000 if i % 9 else None,
+                'location_preference': locations[i % len(locations)],
+                'property_type_preference': types[(i // 2) % len(types)],
+                'min_bedrooms': str(i % 5) if i % 3 else ''
+            }
+        } for i in range(count)]
+
+    def make_properties(self):
+        cities = ['San Diego', 'La Jolla', 'Henderson', 'Chula Vista', 'Reno']
+        types = ['Single Family', 'Condo', 'Multi-Family', '']
+        return [{
+            'address': f'{i} Match Street',
+            'city': cities[i % 5],
+            'zip_code': ['92101', '92037', '89002', '91910'][i % 4],
+            'list_price': 150000 + i * 45000,
+            'property_type': types[i % 4],
+            'bedrooms': i % 6
+        } for i in range(30)]
+
+    class FakeGHL:
+        def __init__(self, buyers):
+            self.buyers = buyers
+            self.searches = 0
+
+        def search_contacts(self, tags=None):
+            self.searches += 1
+            return self.buyers
+
+    def test_index_matches_full_scan(self):
+        """Test indexed matches equal scoring every buyer"""
+        buyers = self.make_buyers(600)
+        ghl = self.FakeGHL(buyers)
+        matcher = BuyerMatcher(ghl, None, {})
+
+        for prop in self.make_properties():
+            for min_score in (40, 70, 85):
+                expected = []
+                for buyer in buyers:
+                    score, reasons = matcher.calculate_match_score(prop, buyer)
+                    if score >= min_score:
+                        expected.append((buyer['id'], score, reasons))
+                expected.sort(key=lambda m: m[1], reverse=True)
+
+                matches = matcher.match_property_to_buyers(prop, min_score=min_score)
+                assert [(m['contact_id'], m['score'], m['reasons']) for m in matches] == expected[:5]
+
+            # Candidates are a subset of the buyer list
+            assert len(matcher.get_buyer_index().candidate_rows(prop, 70)) < len(buyers)
+
+        assert ghl.searches == 1
+
+    def test_buyer_cache_ttl_and_database(self):
+        """Test buyers come from a fresh buyers table and the index honours its TTL"""
+        class BuyerDB:
+            db_type = 'postgresql'
+
+            def __init__(self):
+                self.rows = {}
+
+            def upsert_buyer(self, row):
+                self.rows[row['ghl_contact_id']] = dict(row)
+                return len(self.rows)
+
+            def get_active_buyers(self):
+                return list(self.rows.values())
+
+        buyers = self.make_buyers(20)
+        for i, buyer in enumerate(buyers):
+            if i % 3 == 0:
+                buyer['tags'].append('sms_opt_in')
+            if i % 4:
+                buyer['dnd'] = i % 4 == 1
+        ghl = self.FakeGHL(buyers)
+        db = BuyerDB()
+        prop = self.make_properties()[0]
+
+        matcher = BuyerMatcher(ghl, db, {})
+        first = matcher.match_property_to_buyers(prop, min_score=40)
+        assert ghl.searches == 1 and len(db.rows) == 20
+
+        # Buyers read back from the table pass the same SMS checks as the live contacts
+        rows = [contact_from_buyer_row(row) for row in db.get_active_buyers()]
+        assert [matcher.check_sms_opt_in(contact) for contact in rows] == \
+            [matcher.check_sms_opt_in(buyer) for buyer in buyers]
+        assert not all(matcher.check_sms_opt_in(buyer) for buyer in buyers)
+
+        # A new matcher (e.g. next run) reads the fresh buyers table instead of GHL
+        cached = BuyerMatcher(ghl, db, {})
+        assert [m['contact_id'] for m in cached.match_property_to_buyers(prop, min_score=40)] == \
+            [m['contact_id'] for m in first]
+        assert ghl.searches == 1
+
+        # Expired index and stale table fall back to GHL
+        for row in db.rows.values():
+            row['last_synced_at'] = datetime.now() - timedelta(hours=2)
+        cached._buyer_index_expires = 0
+        cached.match_property_to_buyers(prop)
+        assert ghl.searches == 2
+
+
 class TestReporter:
     """Test report generation"""
 
@@ -310,6 +1987,20 @@ class TestReporter:
         assert os.path.exists(filepath)
         assert os.path.getsize(filepath) > 0
 
+    def test_market_sheet_aggregated_in_database(self, test_db, test_config, sample_property):
+        """Test the market sheet covers every stored listing in the report's ZIP codes"""
+        other = dict(sample_property, property_id='TEST_PROP_002', list_price=850000,
+                     opportunity_score=92, estimated_profit=50000)
+        elsewhere = dict(sample_property, property_id='TEST_PROP_003', zip_code='10001')
+        test_db.bulk_upsert_properties([dict(sample_property, opportunity_score=80), other, elsewhere])
+
+        rows = ReportGenerator(test_config, test_db)._market_rows([sample_property])
+
+        assert len(rows) == 1
+        zip_code, total, avg_score, hot_deals, avg_price, *_ = rows[0]
+        assert (zip_code, total, hot_deals) == ('90210', 2, 1)
+        assert (avg_score, avg_price) == (86, 800000)
+
     def test_email_report_generation(self, test_config, sample_property):
         """Test HTML email generation"""
         reporter = ReportGenerator(test_config)
@@ -429,6 +2120,196 @@ class TestPerformance:
         results = test_db.get_properties_by_criteria({})
         assert len(results) == 100
 
+    def test_bulk_upsert_many_rows(self, test_db, sample_property):
+        """Test batched upserts insert every row, then update them in place"""
+        count = 5000
+        properties = []
+        for i in range(count):
+            prop = sample_property.copy()
+            prop['property_id'] = f'TEST_PROP_{i:05d}'
+            prop['street_address'] = f'{i} Test Street'
+            properties.append(prop)
+
+        result = test_db.bulk_upsert_properties(properties, batch_size=500)
+
+        assert result['upserted'] == count
+        assert result['failed'] == 0
+
+        # Verify count
+        results = test_db.get_properties_by_criteria({})
+        assert len(results) == count
+
+        # Second pass updates in place instead of inserting
+        for prop in properties:
+            prop['list_price'] = 700000
+        result = test_db.bulk_upsert_properties(properties, batch_size=500)
+        assert result['upserted'] == count
+
+        results = test_db.get_properties_by_criteria({})
+        assert len(results) == count
+        assert all(row['list_price'] == 700000 for row in results)
+
+    @slow
+    def test_batch_scoring_performance(self, test_config):
+        """Benchmark vectorized scoring over 100k listings"""
+        import time
+
+        listings, market_data = make_scoring_listings(100000)
+        batch = BatchScorer(test_config)
+        frame = batch.build_frame(listings, market_data)
+
+        start = time.time()
+        scored = batch.score(frame)
+        duration = time.time() - start
+
+        assert len(scored) == len(listings)
+        assert duration < 5.0
+
+    @slow
+    def test_property_search_latency(self):
+        """Benchmark indexed search latency over 100k listings"""
+        import time
+
+        index = PropertySearchIndex(make_search_listings(100000))
+        searches = [
+            {},
+            {'min_score': 90},
+            {'city': 'jolla', 'bedrooms': 3},
+            {'min_price': 300000, 'max_price': 600000, 'bedrooms': 2},
+            {'zip_codes': ['92101', '92102'], 'deal_quality': ['HOT DEAL']},
+        ]
+
+        latencies = []
+        for _ in range(100):
+            for filters in searches:
+                start = time.perf_counter()
+                index.search(filters, limit=10, sort_by='opportunity_score')
+                latencies.append(time.perf_counter() - start)
+
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99)]
+        assert p99 < 0.005  # Sub-millisecond in practice; loose bound for slow CI
+
+    @slow
+    def test_match_engine_scaling(self):
+        """Benchmark index build and agent candidate queries over 100k listings"""
+        import time
+
+        scan = TestMatchEngine()
+        start = time.perf_counter()
+        index = ScanIndex(scan.make_scan(100000))
+        build_duration = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for criteria in scan.make_criteria():
+            index.candidate_rows(criteria)
+        query_duration = time.perf_counter() - start
+
+        assert build_duration < 5.0
+        assert query_duration < 0.5  # A few milliseconds in practice
+
+    @slow
+    def test_keyword_matcher_benchmark(self, test_config):
+        """Benchmark one matcher pass against the per-keyword scans over 100k descriptions"""
+        import random
+
+        rng = random.Random(7)
+        filler = ("bright open floor plan with updated kitchen granite counters and stainless "
+                  "appliances large backyard close to schools parks shopping and freeway access "
+                  "hardwood floors throughout spacious primary suite walk-in closet two car "
+                  "garage laundry room new roof and windows").split()
+        phrases = get_keyword_matcher(test_config).phrases
+        descriptions = []
+        for i in range(100000):
+            words = [rng.choice(filler) for _ in range(85)]
+            for _ in range(i % 4):
+                words.insert(rng.randrange(len(words)), rng.choice(phrases))
+            descriptions.append(' '.join(words).capitalize() + '.')
+
+        def per_keyword_scans(description):
+            text = description.lower()
+            categories = [c for c, group in KEYWORD_CATEGORIES.items() if any(p in text for p in group)]
+            signals = [kw for kw in DEFAULT_DISTRESSED_KEYWORDS if kw in description.lower()]
+            heavy = any(kw in description.lower() for kw in HEAVY_REHAB_KEYWORDS)
+            moderate = any(kw in description.lower() for kw in MODERATE_REHAB_KEYWORDS)
+            score_hits = sum(1 for kw in DISTRESSED_SCORE_KEYWORDS if kw in description.lower())
+            return categories, signals, heavy, moderate, score_hits
+
+        # Fresh matcher so no results are cached before timing
+        matcher = KeywordMatcher(phrases)
+
+        def one_pass(description):
+            text = description.lower()
+            found = matcher.find(text)
+            return (matcher.categories(text, KEYWORD_CATEGORIES),
+                    [kw for kw in DEFAULT_DISTRESSED_KEYWORDS if kw in found],
+                    not found.isdisjoint(HEAVY_REHAB_KEYWORDS),
+                    not found.isdisjoint(MODERATE_REHAB_KEYWORDS),
+                    sum(1 for kw in DISTRESSED_SCORE_KEYWORDS if kw in found))
+
+        start = time.time()
+        for description in descriptions:
+            per_keyword_scans(description)
+        scan_duration = time.time() - start
+
+        start = time.time()
+        results = [one_pass(description) for description in descriptions]
+        matcher_duration = time.time() - start
+
+        # Filler words never contain keywords, so both approaches agree
+        assert results[:1000] == [per_keyword_scans(d) for d in descriptions[:1000]]
+
+        assert matcher_duration < scan_duration
+
+    @slow
+    def test_client_db_concurrent_stress(self, tmp_path):
+        """Benchmark concurrent agent match writes and API-style reads on one ClientDatabase"""
+        import time
+
+        db = ClientDatabase(tmp_path / 'clients.db')
+        client_id = db.create_client('Stress')
+        criteria_id = db.create_search_criteria(client_id, zip_codes=['92101'])
+        agent_ids = [db.create_agent(client_id, criteria_id) for _ in range(16)]
+        per_agent = 200
+
+        def write_matches(agent_id):
+            for i in range(per_agent):
+                db.add_match(agent_id, f'{i} Main St', {'list_price': i})
+                db.update_agent_last_check(agent_id)
+
+        def read_agent(agent_id):
+            for _ in range(per_agent):
+                db.get_agent(agent_id)
+                db.get_agent_matches(agent_id, status='new')
+
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=32) as executor:
+            futures = [executor.submit(write_matches, a) for a in agent_ids]
+            futures += [executor.submit(read_agent, a) for a in agent_ids]
+            for future in futures:
+                future.result()
+        duration = time.time() - start
+
+        assert all(len(db.get_agent_matches(a)) == per_agent for a in agent_ids)
+        assert all(db.get_agent(a)['matches_found'] == per_agent for a in agent_ids)
+        assert duration < 60.0
+        db.close()
+
+    @slow
+    def test_deduplication_performance(self, test_config):
+        """Benchmark blocking deduplication over 50k synthetic listings"""
+        import time
+
+        enricher = DataEnrichment(test_config)
+        listings = make_synthetic_listings(50000)
+
+        start = time.time()
+        unique = enricher.deduplicate_properties(listings)
+        duration = time.time() - start
+
+        assert len(unique) < len(listings)
+        assert duration < 30.0  # All-pairs comparison would take hours
+
 
 # ========================================
 # ERROR HANDLING TESTS
@@ -473,6 +2354,25 @@ class TestErrorHandling:
         )
         assert len(results) == 1
 
+    def test_bulk_upsert_reports_bad_rows(self, test_db, sample_property):
+        """Test a bad row is reported without losing the rest of its batch"""
+        good = sample_property.copy()
+        bad = sample_property.copy()
+        bad['property_id'] = 'TEST_PROP_BAD'
+        bad['description'] = {'not': 'storable'}
+        missing_id = {'street_address': '1 Nowhere Road'}
+        # Keys that aren't columns (e.g. nested analysis results) are skipped
+        extra = dict(sample_property, property_id='TEST_PROP_EXTRA', score_breakdown={'total': 80})
+
+        result = test_db.bulk_upsert_properties([good, bad, missing_id, extra], batch_size=10)
+
+        assert result['upserted'] == 2
+        assert result['failed'] == 2
+        assert [error['index'] for error in sorted(result['errors'], key=lambda e: e['index'])] == [1, 2]
+        assert test_db.get_property_by_id('TEST_PROP_001') is not None
+        assert test_db.get_property_by_id('TEST_PROP_EXTRA') is not None
+        assert test_db.get_property_by_id('TEST_PROP_BAD') is None
+
 
 # ========================================
 # RUN TESTS